@@ -0,0 +1,160 @@
+"""Chunked background purge for self-service account deletion.
+
+DeleteMeView only does the constant-time part inline: disable and
+anonymize the user, drop social links, revoke sessions and create an
+AccountDeletionJob. ``run_deletion_job`` (Celery task
+accounts.tasks.purge_deleted_account) then works through ``PURGE_STEPS``,
+removing at most ``ACCOUNT_DELETION_CHUNK_SIZE`` rows per statement. Each
+chunk commits on its own, so no long transaction holds locks on the
+session/reminder/view tables. A run stops after
+``ACCOUNT_DELETION_RUN_SECONDS`` and the task re-enqueues itself, and
+``resume_stalled_jobs`` (beat) restarts jobs whose worker died. Every step
+is idempotent, so a repeated run just finds fewer rows.
+
+DeleteMeView logs the user out, so progress is read with a signed status
+token (``status_token``) rather than the account's credentials.
+
+Comments, reactions and notifications are not purged: they stay attached
+to the anonymized, disabled user, as they did before the purge existed.
+"""
+from __future__ import annotations
+
+import logging
+import time
+from datetime import timedelta
+from typing import Optional
+
+from django.apps import apps
+from django.conf import settings
+from django.core import signing
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import AccountDeletionJob
+
+logger = logging.getLogger(__name__)
+
+_STATUS_SALT = "accounts.account_deletion.status"
+
+DELETE = "delete"
+# Analytics rows that outlive the account (FK is SET_NULL)
+DETACH = "detach"
+
+# (model label, user FK field, action), purged in this order
+PURGE_STEPS = (
+    ("user_sessions.Device", "user", DELETE),
+    ("accounts.UserSession", "user", DELETE),
+    ("series.ShowReminder", "user", DELETE),
+    ("series.EpisodeView", "user", DETACH),
+    ("otp_auth.OTPRequest", "user", DELETE),
+    ("accounts.Membership", "user", DELETE),
+)
+
+
+def _setting(name: str, default):
+    return getattr(settings, name, default)
+
+
+def start_deletion(user) -> AccountDeletionJob:
+    """Create (or return the unfinished) deletion job for user and schedule it."""
+    job = AccountDeletionJob.objects.filter(
+        user=user, status__in=[AccountDeletionJob.STATUS_PENDING, AccountDeletionJob.STATUS_RUNNING]
+    ).first()
+    if job is None:
+        job = AccountDeletionJob.objects.create(user=user)
+    transaction.on_commit(lambda: _enqueue(job.id))
+    return job
+
+
+def status_token(job: AccountDeletionJob) -> str:
+    """Unguessable token that lets its holder read job's status."""
+    return signing.dumps(str(job.pk), salt=_STATUS_SALT)
+
+
+def status_token_matches(job_id, token: str) -> bool:
+    try:
+        return signing.loads(token, salt=_STATUS_SALT) == str(job_id)
+    except signing.BadSignature:
+        return False
+
+
+def _enqueue(job_id) -> None:
+    from .tasks import purge_deleted_account
+
+    try:
+        purge_deleted_account.delay(str(job_id))
+    except Exception as e:
+        # resume_stalled_jobs picks the job up on the next beat
+        logger.warning("Could not enqueue account deletion %s: %s", job_id, e)
+
+
+def _purge_chunk(label: str, field: str, action: str, user_id, chunk: int) -> int:
+    model = apps.get_model(label)
+    ids = list(model.objects.filter(**{field: user_id}).values_list("pk", flat=True)[:chunk])
+    if not ids:
+        return 0
+    rows = model.objects.filter(pk__in=ids)
+    with transaction.atomic():
+        if action == DETACH:
+            return rows.update(**{field: None})
+        rows.delete()
+    return len(ids)
+
+
+def run_deletion_job(job_id, budget_seconds: Optional[float] = None) -> bool:
+    """Purge as much of job as fits in the time budget; True when finished."""
+    job = AccountDeletionJob.objects.filter(pk=job_id).first()
+    if job is None or job.status in (AccountDeletionJob.STATUS_COMPLETED, AccountDeletionJob.STATUS_FAILED):
+        return True
+    budget = _setting("ACCOUNT_DELETION_RUN_SECONDS", 30) if budget_seconds is None else budget_seconds
+    chunk = int(_setting("ACCOUNT_DELETION_CHUNK_SIZE", 500))
+    deadline = time.monotonic() + budget
+
+    now = timezone.now()
+    AccountDeletionJob.objects.filter(pk=job.pk).update(
+        status=AccountDeletionJob.STATUS_RUNNING, started_at=job.started_at or now, updated_at=now
+    )
+    progress = dict(job.progress or {})
+    # Some models in this tree ship without migrations; skip their tables
+    # where they were never created instead of failing the whole job
+    tables = set(connection.introspection.table_names())
+    try:
+        for label, field, action in PURGE_STEPS:
+            if apps.get_model(label)._meta.db_table not in tables:
+                continue
+            while True:
+                removed = _purge_chunk(label, field, action, job.user_id, chunk)
+                if removed:
+                    progress[label] = progress.get(label, 0) + removed
+                AccountDeletionJob.objects.filter(pk=job.pk).update(
+                    step=label, progress=progress, updated_at=timezone.now()
+                )
+                if removed < chunk:
+                    break
+                if time.monotonic() >= deadline:
+                    return False
+    except Exception as e:
+        logger.exception("Account deletion %s failed at %s", job.pk, label)
+        AccountDeletionJob.objects.filter(pk=job.pk).update(
+            status=AccountDeletionJob.STATUS_FAILED, error=str(e)[:1000], finished_at=timezone.now()
+        )
+        return True
+    AccountDeletionJob.objects.filter(pk=job.pk).update(
+        status=AccountDeletionJob.STATUS_COMPLETED, step="", finished_at=timezone.now()
+    )
+    return True
+
+
+def resume_stalled_jobs() -> int:
+    """Re-enqueue unfinished jobs nobody has touched for a while."""
+    cutoff = timezone.now() - timedelta(seconds=int(_setting("ACCOUNT_DELETION_STALL_SECONDS", 300)))
+    stalled = AccountDeletionJob.objects.filter(
+        status__in=[AccountDeletionJob.STATUS_PENDING, AccountDeletionJob.STATUS_RUNNING],
+        updated_at__lt=cutoff,
+    )
+    ids = list(stalled.values_list("pk", flat=True))
+    # Touch them so the next beat does not enqueue them again
+    AccountDeletionJob.objects.filter(pk__in=ids).update(updated_at=timezone.now())
+    for job_id in ids:
+        _enqueue(job_id)
+    return len(ids)
@@ -0,0 +1,139 @@
+"""Request-scoped authentication context.
+
+Several layers look at the same Bearer token on one request: the session
+binding middleware, the session-bound CSRF middleware (in process_view and
+again in process_response) and the DRF authenticator. Verifying the JWT
+signature in each of them is wasted work, so the first caller builds an
+``AuthContext`` and stores it on the underlying Django request. Every later
+caller reuses the decoded claims, the parsed refresh cookie and the session
+lookup.
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+from django.conf import settings
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from .session_cache import SessionState, aget_session_state, get_session_state
+
+_REQUEST_ATTR = "_auth_context"
+_UNSET = object()
+
+
+class AuthContext:
+    """Lazily decoded view of the credentials presented on one request."""
+
+    def __init__(self, request):
+        self._request = request
+        self._access_token = _UNSET
+        self._refresh_session_id = _UNSET
+        self._session_state = _UNSET
+        self.token_error: Optional[Exception] = None
+        # Populated by CustomJWTAuthentication once the user row is loaded
+        self.user = None
+
+        auth_header = request.META.get("HTTP_AUTHORIZATION", "")
+        self.raw_token: Optional[str] = None
+        if auth_header.startswith("Bearer "):
+            parts = auth_header.split(" ")
+            if len(parts) > 1 and parts[1]:
+                self.raw_token = parts[1]
+
+    # ---- Access token ----
+
+    @property
+    def access_token(self) -> Optional[AccessToken]:
+        """Verified access token, or None when absent/invalid. Decoded once."""
+        if self._access_token is _UNSET:
+            token = None
+            if self.raw_token:
+                try:
+                    token = AccessToken(self.raw_token)
+                except (TokenError, ValueError) as exc:
+                    self.token_error = exc
+            self._access_token = token
+        return self._access_token
+
+    @property
+    def claims(self) -> dict:
+        token = self.access_token
+        if token is None:
+            return {}
+        return token.payload
+
+    @property
+    def user_id(self) -> Optional[str]:
+        uid = self.claims.get("user_id")
+        return str(uid) if uid is not None else None
+
+    @property
+    def session_id(self) -> Optional[str]:
+        sid = self.claims.get("session_id")
+        return str(sid) if sid else None
+
+    @property
+    def jti(self) -> Optional[str]:
+        return self.claims.get("jti")
+
+    def matches(self, raw_token) -> bool:
+        """True when raw_token (bytes or str) is the token this context decoded."""
+        if raw_token is None or self.raw_token is None:
+            return False
+        if isinstance(raw_token, bytes):
+            try:
+                raw_token = raw_token.decode()
+            except UnicodeDecodeError:
+                return False
+        return raw_token == self.raw_token
+
+    # ---- Refresh cookie ----
+
+    @property
+    def refresh_session_id(self) -> Optional[str]:
+        """session_id claim of the refresh cookie, if present and parseable."""
+        if self._refresh_session_id is _UNSET:
+            sid = None
+            cookie_name = getattr(settings, "REFRESH_COOKIE_NAME", "refresh_token")
+            cookie_value = self._request.COOKIES.get(cookie_name)
+            if cookie_value:
+                try:
+                    sid = RefreshToken(cookie_value).get("session_id")
+                except Exception:
+                    sid = None
+            self._refresh_session_id = str(sid) if sid else None
+        return self._refresh_session_id
+
+    # ---- Session lookup ----
+
+    @property
+    def session_state(self) -> Optional[SessionState]:
+        """State of the session named by the access token, looked up once.
+
+        Served from the shared session-state cache (see accounts.session_cache).
+        None when the token has no session_id or no such session exists.
+        """
+        if self._session_state is _UNSET:
+            self._session_state = get_session_state(self.session_id) if self.session_id else None
+        return self._session_state
+
+    async def asession_state(self) -> Optional[SessionState]:
+        """Async session_state for ASGI middleware; shares the same per-request result."""
+        if self._session_state is _UNSET:
+            self._session_state = await aget_session_state(self.session_id) if self.session_id else None
+        return self._session_state
+
+
+def get_auth_context(request) -> AuthContext:
+    """Return the AuthContext for request, creating it on first use.
+
+    Accepts either a Django HttpRequest or a DRF Request; the context always
+    lives on the underlying HttpRequest so middleware and views share it.
+    """
+    django_request = getattr(request, "_request", request)
+    ctx = getattr(django_request, _REQUEST_ATTR, None)
+    if ctx is None:
+        ctx = AuthContext(django_request)
+        setattr(django_request, _REQUEST_ATTR, ctx)
+    return ctx
@@ -0,0 +1,183 @@
+"""Cached authorization snapshot per (user, tenant).
+
+Views used to answer "is this an AdminFrontend user?" and "which roles and
+permissions apply here?" with a fresh groups/Membership query each time.
+``get_authz(request)`` returns an ``AuthzSnapshot`` computed once per
+(user, tenant) and kept in the default cache for ``AUTHZ_CACHE_TTL``
+seconds; AuthzMiddleware also exposes it lazily as ``request.authz``.
+
+Entries are versioned rather than deleted: every key embeds a global
+version and a per-user version. Group/role/membership/permission changes
+bump the affected user's version (or the global one when a group's own
+permissions change), so all of that user's tenants go stale at once.
+See accounts.signals for the receivers.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import FrozenSet, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+
+from common.middleware.base import HybridMiddlewareMixin
+
+from .models import Membership
+
+ADMIN_FRONTEND_ROLE = "AdminFrontend"
+
+_GLOBAL_VERSION_KEY = "auth:authz:v"
+_USER_VERSION_PREFIX = "auth:authz:v:"
+
+
+@dataclass(frozen=True)
+class AuthzSnapshot:
+    user_id: Optional[str]
+    tenant_id: Optional[str]
+    roles: Tuple[str, ...]  # global Django groups
+    tenant_roles: Tuple[str, ...]  # Membership.roles for tenant_id
+    permissions: FrozenSet[str]  # user.get_all_permissions()
+    tenant_permissions: FrozenSet[str]  # granted through tenant_roles
+    is_superuser: bool = False
+
+    @property
+    def is_admin_frontend(self) -> bool:
+        """Superuser or member of the global AdminFrontend group."""
+        return self.is_superuser or ADMIN_FRONTEND_ROLE in self.roles
+
+    @property
+    def is_tenant_admin_frontend(self) -> bool:
+        """is_admin_frontend, or holds the AdminFrontend role in this tenant."""
+        return self.is_admin_frontend or ADMIN_FRONTEND_ROLE in self.tenant_roles
+
+    @property
+    def effective_permissions(self) -> FrozenSet[str]:
+        return self.permissions | self.tenant_permissions
+
+    def has_perm(self, perm: str) -> bool:
+        """Same answer as user.has_perm(perm) (global permissions only)."""
+        return self.is_superuser or perm in self.permissions
+
+
+ANONYMOUS = AuthzSnapshot(None, None, (), (), frozenset(), frozenset())
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "AUTHZ_CACHE_TTL", 300))
+
+
+def _version(key: str):
+    # Seeded from the clock so an evicted counter never reuses old versions
+    cache.add(key, time.time_ns(), None)
+    return cache.get(key)
+
+
+def _bump(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def bump_user_authz(*user_ids) -> None:
+    """Make every cached snapshot of these users stale."""
+    for user_id in user_ids:
+        if user_id is not None:
+            _bump(f"{_USER_VERSION_PREFIX}{user_id}")
+
+
+def bump_all_authz() -> None:
+    """Make every cached snapshot stale (e.g. a group's permissions changed)."""
+    _bump(_GLOBAL_VERSION_KEY)
+
+
+def compute_authz(user, tenant=None) -> AuthzSnapshot:
+    """Build the snapshot from the database (no caching)."""
+    if user is None or not getattr(user, "is_authenticated", False):
+        return ANONYMOUS
+    roles = tuple(sorted(user.groups.values_list("name", flat=True)))
+    tenant_roles: Tuple[str, ...] = ()
+    tenant_perms: FrozenSet[str] = frozenset()
+    if tenant is not None:
+        tenant_roles = tuple(sorted(
+            name for name in Membership.objects.filter(user=user, tenant=tenant).values_list("roles__name", flat=True)
+            if name
+        ))
+        if tenant_roles:
+            # Permission strings in get_all_permissions format: "app_label.codename"
+            tenant_perms = frozenset(
+                f"{app_label}.{codename}"
+                for app_label, codename in Permission.objects.filter(
+                    group__tenant_memberships__user=user,
+                    group__tenant_memberships__tenant=tenant,
+                ).values_list("content_type__app_label", "codename")
+            )
+    return AuthzSnapshot(
+        user_id=str(user.pk),
+        tenant_id=str(tenant.pk) if tenant is not None else None,
+        roles=roles,
+        tenant_roles=tenant_roles,
+        permissions=frozenset(user.get_all_permissions()),
+        tenant_permissions=tenant_perms,
+        is_superuser=bool(getattr(user, "is_superuser", False)),
+    )
+
+
+def get_user_authz(user, tenant=None) -> AuthzSnapshot:
+    """Cached compute_authz."""
+    if user is None or not getattr(user, "is_authenticated", False):
+        return ANONYMOUS
+    ttl = _ttl()
+    if ttl <= 0:
+        return compute_authz(user, tenant)
+    key = "auth:authz:{}:{}:{}:{}".format(
+        _version(_GLOBAL_VERSION_KEY),
+        _version(f"{_USER_VERSION_PREFIX}{user.pk}"),
+        user.pk,
+        tenant.pk if tenant is not None else "-",
+    )
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = compute_authz(user, tenant)
+        cache.set(key, snapshot, timeout=ttl)
+    return snapshot
+
+
+def get_authz(request) -> AuthzSnapshot:
+    """Snapshot for request.user in request.tenant, memoized on the request."""
+    # DRF's Request proxies attribute reads but not writes to the HttpRequest
+    http_request = getattr(request, "_request", request)
+    user = getattr(request, "user", None)
+    cached = getattr(http_request, "_authz", None)
+    if cached is not None and cached.user_id == (str(user.pk) if getattr(user, "is_authenticated", False) else None):
+        return cached
+    snapshot = get_user_authz(user, getattr(http_request, "tenant", None))
+    http_request._authz = snapshot
+    return snapshot
+
+
+class _RequestAuthz:
+    """request.authz: reads through to get_authz(request) on each access.
+
+    Resolving late matters because DRF only authenticates inside the view,
+    after the middleware chain has run.
+    """
+
+    __slots__ = ("_request",)
+
+    def __init__(self, request):
+        self._request = request
+
+    def __getattr__(self, name):
+        return getattr(get_authz(self._request), name)
+
+
+class AuthzMiddleware(HybridMiddlewareMixin):
+    """Expose the authorization snapshot as request.authz."""
+
+    nonblocking = True
+
+    def process_request(self, request):
+        request.authz = _RequestAuthz(request)
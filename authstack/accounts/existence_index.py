@@ -0,0 +1,168 @@
+"""Bloom filter of taken usernames/emails for live form validation.
+
+The ``unique`` rule of /api/forms/validate/ is checked on every keystroke.
+``might_exist(field, value)`` answers from an in-process Bloom filter of
+normalized (lowercased, stripped) values, so the common case of a value
+nobody has is answered without touching the database. A positive can be a
+false positive (about ``EXISTENCE_INDEX_FP_RATE``), so callers confirm it
+with a query; see ``value_exists``.
+
+Each process builds its filter once from the User table and then follows a
+journal in the default cache: the User post_save receiver (accounts.signals)
+calls ``note_user`` with the saved values. That appends them under a new
+generation number. A process that is behind reads only the missing journal
+entries, and rebuilds from the table if any of them have been evicted or it
+is too far behind. Deleted or renamed values stay in the filter and only
+cost a confirming query.
+
+The journal only reaches other processes through a shared cache. Without
+one (LocMem), a filter could miss users created by another worker and
+report a taken value as free, so ``might_exist`` is always True and every
+check goes to the database.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import threading
+from typing import Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from common.cache import cache_is_shared
+
+_GENERATION_KEY = "auth:exists:gen"
+_JOURNAL_PREFIX = "auth:exists:j:"
+# Journal entries a lagging process will replay before rebuilding instead
+_MAX_REPLAY = 500
+_MIN_CAPACITY = 10000
+
+_lock = threading.Lock()
+_index: Optional["_ExistenceIndex"] = None
+
+
+def indexed_fields() -> Tuple[str, ...]:
+    """User fields the filter covers (phone_e164 only on models that have it)."""
+    names = {f.name for f in get_user_model()._meta.get_fields()}
+    return tuple(f for f in ("username", "email", "phone_e164") if f in names)
+
+
+def _normalize(field: str, value) -> str:
+    return f"{field}:{str(value).strip().lower()}"
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, fp_rate: float):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class _ExistenceIndex:
+    def __init__(self, generation: int):
+        fields = indexed_fields()
+        users = get_user_model().objects
+        total = users.count()
+        fp_rate = float(getattr(settings, "EXISTENCE_INDEX_FP_RATE", 0.01))
+        self.bloom = BloomFilter(max(_MIN_CAPACITY, total * len(fields) * 2), fp_rate)
+        self.generation = generation
+        for row in users.values_list(*fields).iterator():
+            self._add(zip(fields, row))
+
+    def _add(self, items: Iterable[Tuple[str, object]]) -> None:
+        for field, value in items:
+            if value:
+                self.bloom.add(_normalize(field, value))
+
+    @property
+    def full(self) -> bool:
+        return self.bloom.count > self.bloom.capacity
+
+    def catch_up(self, generation: int) -> bool:
+        """Replay journal entries up to generation; False if a rebuild is needed."""
+        if generation - self.generation > _MAX_REPLAY:
+            return False
+        keys = [f"{_JOURNAL_PREFIX}{g}" for g in range(self.generation + 1, generation + 1)]
+        entries = cache.get_many(keys)
+        if len(entries) != len(keys):
+            return False
+        for key in keys:
+            self._add(entries[key])
+        self.generation = generation
+        return not self.full
+
+
+def _generation() -> int:
+    value = cache.get(_GENERATION_KEY)
+    if value is None:
+        # Fresh (or evicted) counter: every process rebuilds once
+        cache.add(_GENERATION_KEY, 0, None)
+        value = cache.get(_GENERATION_KEY) or 0
+    return value
+
+
+def _current_index() -> _ExistenceIndex:
+    global _index
+    generation = _generation()
+    with _lock:
+        index = _index
+        if index is None or generation < index.generation or (
+            generation != index.generation and not index.catch_up(generation)
+        ):
+            index = _index = _ExistenceIndex(generation)
+        return index
+
+
+def might_exist(field: str, value) -> bool:
+    """False only if no user has this value (normalized) in field."""
+    if field not in indexed_fields() or not cache_is_shared():
+        return True
+    return _normalize(field, value) in _current_index().bloom
+
+
+def value_exists(field: str, value) -> bool:
+    """Exact User.objects.filter(field=value).exists(), skipped when the filter says no."""
+    if not might_exist(field, value):
+        return False
+    return get_user_model().objects.filter(**{field: value}).exists()
+
+
+def note_user(user) -> None:
+    """Journal user's indexed values so every process adds them."""
+    items = [(field, getattr(user, field, None)) for field in indexed_fields()]
+    items = [(field, value) for field, value in items if value]
+    if not items:
+        return
+    cache.add(_GENERATION_KEY, 0, None)
+    try:
+        generation = cache.incr(_GENERATION_KEY)
+    except ValueError:
+        return
+    # A reader that sees the new generation before this entry lands just
+    # rebuilds from the table
+    cache.set(f"{_JOURNAL_PREFIX}{generation}", items, int(getattr(settings, "EXISTENCE_INDEX_JOURNAL_TTL", 86400)))
+
+
+def reset_index() -> None:
+    """Drop this process's filter (tests)."""
+    global _index
+    with _lock:
+        _index = None
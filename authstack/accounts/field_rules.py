@@ -0,0 +1,166 @@
+"""Rule engine behind /api/forms/validate/.
+
+Clients send the rules from the form schema with each keystroke. Two rules
+used to be expensive or unsafe:
+
+  - ``pattern`` compiled whatever regex the client sent, so a pattern with
+    catastrophic backtracking could pin a worker. Patterns now come only
+    from ``PATTERNS``, compiled once at import and checked by
+    ``assert_linear``. A rule names one by ``pattern_id``; a raw ``value``
+    is accepted only when it is the source of a registered pattern, which
+    keeps older app builds working. Values longer than ``MAX_VALUE_LENGTH``
+    are rejected before any regex runs.
+  - ``unique`` ran a query per call; it now asks the Bloom filter in
+    accounts.existence_index first and only queries on a possible hit.
+"""
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional, Pattern
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+from .existence_index import value_exists
+
+try:  # Python 3.11+
+    from re import _parser as sre_parse
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+MAX_VALUE_LENGTH = 256
+
+_REPEATS = {
+    sre_parse.MAX_REPEAT,
+    sre_parse.MIN_REPEAT,
+    getattr(sre_parse, "POSSESSIVE_REPEAT", sre_parse.MAX_REPEAT),
+}
+_SUBPATTERN_OPS = {sre_parse.SUBPATTERN, sre_parse.ASSERT, sre_parse.ASSERT_NOT}
+
+
+def _walk(parsed, inside_repeat: bool) -> None:
+    for op, av in parsed:
+        if op in (sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS):
+            raise ValueError("backreferences are not allowed")
+        if op in _REPEATS:
+            _, max_count, sub = av
+            repeats = max_count > 1  # includes MAXREPEAT (unbounded)
+            if repeats and inside_repeat:
+                raise ValueError("nested quantifiers are not allowed")
+            _walk(sub, inside_repeat or repeats)
+        elif op in _SUBPATTERN_OPS:
+            _walk(av[-1], inside_repeat)
+        elif op == getattr(sre_parse, "ATOMIC_GROUP", None):
+            _walk(av, inside_repeat)
+        elif op == sre_parse.BRANCH:
+            if inside_repeat:
+                raise ValueError("alternation under a quantifier is not allowed")
+            for branch in av[1]:
+                _walk(branch, inside_repeat)
+
+
+def assert_linear(pattern: str) -> None:
+    """Raise ValueError unless pattern matches in linear time.
+
+    Rejects the constructs that make backtracking exponential: quantifiers
+    nested under quantifiers, alternation under a quantifier, and
+    backreferences.
+    """
+    _walk(sre_parse.parse(pattern), False)
+
+
+def _compile(pattern: str) -> Pattern:
+    assert_linear(pattern)
+    return re.compile(pattern)
+
+
+# Every regex the validate endpoint will run, by id. Form schemas reference
+# these ids (rule "pattern_id").
+PATTERNS: Dict[str, Pattern] = {
+    "username": _compile(r"^[a-zA-Z0-9_]+$"),
+    "phone": _compile(r"^\+?[1-9]\d{1,14}$"),
+    "otp_code": _compile(r"^[0-9]{6}$"),
+}
+_BY_SOURCE = {p.pattern: p for p in PATTERNS.values()}
+
+_SPECIAL_CHARS = re.compile(r'[!@#$%^&*(),.?":{}|<>]')
+
+
+def resolve_pattern(rule) -> Optional[Pattern]:
+    """Registered pattern for a pattern rule, by pattern_id or exact source."""
+    pattern_id = rule.get("pattern_id")
+    if pattern_id is not None:
+        return PATTERNS.get(pattern_id)
+    return _BY_SOURCE.get(rule.get("value", ""))
+
+
+def _user_field(name) -> bool:
+    return name in {f.name for f in get_user_model()._meta.concrete_fields}
+
+
+def validate_field(field_name, field_value, rules, form_data=None) -> List[str]:
+    """Error messages for field_value under rules (empty list if valid)."""
+    form_data = form_data or {}
+    if field_value is not None and len(str(field_value)) > MAX_VALUE_LENGTH:
+        return [f"Maximum {MAX_VALUE_LENGTH} characters"]
+
+    errors = []
+    for rule in rules:
+        rule_type = rule.get("rule")
+
+        if rule_type == "required" and not field_value:
+            errors.append(rule.get("message", "Field is required"))
+
+        elif rule_type == "min_length":
+            min_len = rule.get("value", 0)
+            if len(str(field_value)) < min_len:
+                errors.append(rule.get("message", f"Minimum {min_len} characters"))
+
+        elif rule_type == "max_length":
+            max_len = rule.get("value", 999)
+            if len(str(field_value)) > max_len:
+                errors.append(rule.get("message", f"Maximum {max_len} characters"))
+
+        elif rule_type == "pattern":
+            pattern = resolve_pattern(rule)
+            if pattern is None:
+                errors.append("Unsupported validation pattern")
+            elif not pattern.match(str(field_value)):
+                errors.append(rule.get("message", "Invalid format"))
+
+        elif rule_type == "email":
+            try:
+                validate_email(field_value)
+            except ValidationError:
+                errors.append(rule.get("message", "Invalid email address"))
+
+        elif rule_type == "phone":
+            if not PATTERNS["phone"].match(str(field_value)):
+                errors.append(rule.get("message", "Invalid phone number"))
+
+        elif rule_type == "match_field":
+            if field_value != form_data.get(rule.get("field")):
+                errors.append(rule.get("message", "Fields do not match"))
+
+        elif rule_type == "unique":
+            field = rule.get("field")
+            # Only real User fields; anything else cannot be checked
+            if rule.get("model") == "User" and _user_field(field) and field_value:
+                if value_exists(field, field_value):
+                    errors.append(rule.get("message", f"{field_name} already exists"))
+
+        elif rule_type == "strong_password":
+            value = str(field_value or "")
+            if len(value) < 8:
+                errors.append("Password must be at least 8 characters")
+            if not re.search(r"[A-Z]", value):
+                errors.append("Password must contain uppercase letter")
+            if not re.search(r"[a-z]", value):
+                errors.append("Password must contain lowercase letter")
+            if not re.search(r"\d", value):
+                errors.append("Password must contain number")
+            if not _SPECIAL_CHARS.search(value):
+                errors.append("Password must contain special character")
+
+    return errors
@@ -127,7 +127,7 @@ class DynamicFormSchema:
                     {"rule": ValidationRule.REQUIRED, "message": "Username is required"},
                     {"rule": ValidationRule.MIN_LENGTH, "value": 3, "message": "Minimum 3 characters"},
                     {"rule": ValidationRule.MAX_LENGTH, "value": 20, "message": "Maximum 20 characters"},
-                    {"rule": ValidationRule.PATTERN, "value": "^[a-zA-Z0-9_]+$", "message": "Only letters, numbers, and underscores"},
+                    {"rule": ValidationRule.PATTERN, "pattern_id": "username", "value": "^[a-zA-Z0-9_]+$", "message": "Only letters, numbers, and underscores"},
                     {"rule": ValidationRule.UNIQUE, "model": "User", "field": "username", "message": "Username taken"}
                 ]
             }
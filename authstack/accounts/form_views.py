@@ -2,28 +2,43 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from accounts.field_rules import validate_field
 from accounts.form_schemas import DynamicFormSchema, FormAction
 from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
 from django.utils import timezone
-import re
+from django.utils.cache import patch_cache_control
+from django.utils.http import http_date, parse_etags
+from collections import namedtuple
+from functools import lru_cache
+import hashlib
+import json
 
 
-@api_view(['GET'])
-@permission_classes([AllowAny])
-def get_form_schema_view(request):
-    """Get dynamic form schema for specific action"""
-    action = request.GET.get('action', 'login').lower()
-    context_str = request.GET.get('context', None)
-    
-    # Get form schema based on action
+# Keys of ?context= that apply_context_modifications acts on. Other keys do
+# not change the schema, so they are left out of the compiled-schema key.
+FORM_CONTEXT_KEYS = ('enterprise', 'disable_social')
+FORM_SCHEMA_VERSION = '1.0.0'
+# compile_form_schema is cached per argument tuple, so only these values
+# (the first of each is the default) reach it; anything else a client sends
+# falls back to the default rather than adding a cache entry
+FORM_ACTIONS = ('login', 'register', 'verify_email', 'verify_phone', 'verify_otp', 'reset_password')
+FORM_LOCALES = ('en', 'am')
+FORM_THEMES = ('light', 'dark')
+
+CompiledFormSchema = namedtuple('CompiledFormSchema', ['body', 'etag', 'compiled_at'])
+
+
+def build_form_schema(action):
+    """Schema dict for action, or None if the action is unknown"""
     if action == 'login':
         schema = DynamicFormSchema.get_login_schema()
     elif action == 'register':
         schema = DynamicFormSchema.get_register_schema()
     elif action == 'verify_email':
-        schema = DynamicFormSchema.get_email_verification_schema()
+        schema = DynamicFormSchema.get_otp_verification_schema('email')
     elif action == 'verify_phone':
-        schema = DynamicFormSchema.get_phone_verification_schema()
+        schema = DynamicFormSchema.get_otp_verification_schema('phone')
     elif action == 'verify_otp':
         # OTP verification form (generic)
         schema = {
@@ -51,7 +66,7 @@ def get_form_schema_view(request):
                     "maxLength": 6,
                     "validation": [
                         {"rule": "required", "message": "Code is required"},
-                        {"rule": "pattern", "value": "^[0-9]{6}$", "message": "Must be 6 digits"}
+                        {"rule": "pattern", "pattern_id": "otp_code", "value": "^[0-9]{6}$", "message": "Must be 6 digits"}
                     ]
                 }
             ],
@@ -92,27 +107,82 @@ def get_form_schema_view(request):
             "social_auth": {"enabled": False}
         }
     else:
-        return Response({
-            'error': f'Unknown form action: {action}'
-        }, status=status.HTTP_400_BAD_REQUEST)
+        return None
     
-    # Apply context modifications if provided
-    if context_str:
-        try:
-            context = json.loads(context_str)
-            schema = apply_context_modifications(schema, context)
-        except json.JSONDecodeError:
-            pass
-    
-    # Add metadata
+    return schema
+
+
+@lru_cache(maxsize=512)
+def compile_form_schema(action, context_key, locale, theme):
+    """Serialized schema for (action, context, locale, theme), built once per process
+
+    Schemas only depend on code, so the bytes and their ETag are computed on
+    first use and reused until the next deploy. context_key is the sorted
+    tuple of FORM_CONTEXT_KEYS items from the request's context.
+    """
+    schema = build_form_schema(action)
+    if schema is None:
+        return None
+    if context_key:
+        schema = apply_context_modifications(schema, dict(context_key))
     schema['metadata'] = {
-        'version': '1.0.0',
-        'timestamp': timezone.now().isoformat(),
-        'locale': request.GET.get('locale', 'en'),
-        'theme': request.GET.get('theme', 'light')
+        'version': FORM_SCHEMA_VERSION,
+        'locale': locale,
+        'theme': theme,
     }
-    
-    return Response(schema, status=status.HTTP_200_OK)
+    # Same encoding as DRF's JSONRenderer
+    body = json.dumps(schema, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+    return CompiledFormSchema(body, etag, timezone.now())
+
+
+def _form_context_key(context_str):
+    try:
+        context = json.loads(context_str) if context_str else None
+    except json.JSONDecodeError:
+        return ()
+    if not isinstance(context, dict):
+        return ()
+    return tuple(sorted((key, bool(context[key])) for key in FORM_CONTEXT_KEYS if key in context))
+
+
+def _known(value, choices):
+    """value if it is one of choices (case-insensitive, en-US counts as en), else the default"""
+    value = (value or '').strip().lower().replace('_', '-')
+    if value in choices:
+        return value
+    value = value.split('-', 1)[0]
+    return value if value in choices else choices[0]
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_form_schema_view(request):
+    """Get dynamic form schema for specific action
+
+    Served from compile_form_schema with an ETag; If-None-Match gets a 304.
+    The schema's build time is in Last-Modified rather than the body.
+    """
+    action = request.GET.get('action', 'login').lower()
+    if action not in FORM_ACTIONS:
+        return Response({
+            'error': f'Unknown form action: {action}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    compiled = compile_form_schema(
+        action,
+        _form_context_key(request.GET.get('context', None)),
+        _known(request.GET.get('locale'), FORM_LOCALES),
+        _known(request.GET.get('theme'), FORM_THEMES),
+    )
+
+    if compiled.etag in parse_etags(request.headers.get('If-None-Match', '')):
+        res = HttpResponseNotModified()
+    else:
+        res = HttpResponse(compiled.body, content_type='application/json')
+    res['ETag'] = compiled.etag
+    res['Last-Modified'] = http_date(compiled.compiled_at.timestamp())
+    patch_cache_control(res, public=True, max_age=int(getattr(settings, 'FORM_SCHEMA_MAX_AGE', 300)))
+    return res
 
 
 @api_view(['POST'])
@@ -124,71 +194,7 @@ def validate_field_view(request):
     validation_rules = request.data.get('rules', [])
     form_data = request.data.get('form_data', {})
     
-    errors = []
-    
-    for rule in validation_rules:
-        rule_type = rule.get('rule')
-        
-        if rule_type == 'required' and not field_value:
-            errors.append(rule.get('message', 'Field is required'))
-            
-        elif rule_type == 'min_length':
-            min_len = rule.get('value', 0)
-            if len(str(field_value)) < min_len:
-                errors.append(rule.get('message', f'Minimum {min_len} characters'))
-                
-        elif rule_type == 'max_length':
-            max_len = rule.get('value', 999)
-            if len(str(field_value)) > max_len:
-                errors.append(rule.get('message', f'Maximum {max_len} characters'))
-                
-        elif rule_type == 'pattern':
-            pattern = rule.get('value', '')
-            if not re.match(pattern, str(field_value)):
-                errors.append(rule.get('message', 'Invalid format'))
-                
-        elif rule_type == 'email':
-            from django.core.validators import validate_email
-            from django.core.exceptions import ValidationError
-            try:
-                validate_email(field_value)
-            except ValidationError:
-                errors.append(rule.get('message', 'Invalid email address'))
-                
-        elif rule_type == 'phone':
-            # Basic phone validation
-            phone_pattern = r'^\+?[1-9]\d{1,14}$'
-            if not re.match(phone_pattern, str(field_value)):
-                errors.append(rule.get('message', 'Invalid phone number'))
-                
-        elif rule_type == 'match_field':
-            match_field = rule.get('field')
-            if field_value != form_data.get(match_field):
-                errors.append(rule.get('message', 'Fields do not match'))
-                
-        elif rule_type == 'unique':
-            model_name = rule.get('model')
-            field = rule.get('field')
-            
-            # Check uniqueness in database
-            if model_name == 'User':
-                from django.contrib.auth import get_user_model
-                User = get_user_model()
-                if User.objects.filter(**{field: field_value}).exists():
-                    errors.append(rule.get('message', f'{field_name} already exists'))
-                    
-        elif rule_type == 'strong_password':
-            # Check password strength
-            if len(field_value) < 8:
-                errors.append('Password must be at least 8 characters')
-            if not re.search(r'[A-Z]', field_value):
-                errors.append('Password must contain uppercase letter')
-            if not re.search(r'[a-z]', field_value):
-                errors.append('Password must contain lowercase letter')
-            if not re.search(r'\d', field_value):
-                errors.append('Password must contain number')
-            if not re.search(r'[!@#$%^&*(),.?":{}|<>]', field_value):
-                errors.append('Password must contain special character')
+    errors = validate_field(field_name, field_value, validation_rules, form_data)
     
     if errors:
         return Response({
@@ -287,10 +293,13 @@ def handle_registration_submission(data, request):
                 user.save()
             
             # Send verification email
-            from otp_auth.models import OTPRequest
+            from otp_auth.backends import get_otp_backend
+            from otp_auth.outbox import request_dedupe_key
             from otp_auth.services import OTPService
             
-            otp_request = OTPRequest.create_otp(
+            # Through OTP_BACKEND, so verify_otp_view finds the challenge
+            backend = get_otp_backend()
+            otp_request = backend.create(
                 otp_type='email',
                 destination=user.email,
                 purpose='verify',
@@ -298,17 +307,25 @@ def handle_registration_submission(data, request):
                 request=request
             )
             
-            OTPService.send_email_otp(
+            message = OTPService.send_email_otp(
                 user.email,
                 otp_request.otp_code,
-                purpose='verify'
+                purpose='verify',
+                dedupe_key=request_dedupe_key(request, 'otp', 'verify', user.email),
+                reference=otp_request.id
             )
+            otp_id = str(otp_request.id)
+            if message and message.reference != otp_id:
+                # A retry: the code already on its way belongs to the first challenge
+                backend.discard(otp_request.id)
+                otp_id = message.reference
             
             return Response({
                 'message': 'Registration successful. Please verify your email.',
                 'user_id': str(user.id),
                 'verification_required': True,
-                'verification_type': 'email'
+                'verification_type': 'email',
+                'otp_id': otp_id
             }, status=status.HTTP_201_CREATED)
             
     except Exception as e:
@@ -326,15 +343,18 @@ def handle_password_reset_submission(data, request):
             'error': 'Email is required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    from accounts.models import User
-    from otp_auth.models import OTPRequest
+    from django.contrib.auth import get_user_model
+    from otp_auth.backends import get_otp_backend
+    from otp_auth.outbox import request_dedupe_key
     from otp_auth.services import OTPService
     
+    User = get_user_model()
     try:
         user = User.objects.get(email=email)
         
         # Create OTP for password reset
-        otp_request = OTPRequest.create_otp(
+        backend = get_otp_backend()
+        otp_request = backend.create(
             otp_type='email',
             destination=email,
             purpose='reset',
@@ -343,15 +363,22 @@ def handle_password_reset_submission(data, request):
         )
         
         # Send OTP email
-        OTPService.send_email_otp(
+        message = OTPService.send_email_otp(
             email,
             otp_request.otp_code,
-            purpose='reset'
+            purpose='reset',
+            dedupe_key=request_dedupe_key(request, 'otp', 'reset', email),
+            reference=otp_request.id
         )
+        otp_id = str(otp_request.id)
+        if message and message.reference != otp_id:
+            # A retry: the code already on its way belongs to the first challenge
+            backend.discard(otp_request.id)
+            otp_id = message.reference
         
         return Response({
             'message': 'Password reset instructions sent to your email',
-            'otp_id': str(otp_request.id)
+            'otp_id': otp_id
         }, status=status.HTTP_200_OK)
         
     except User.DoesNotExist:
@@ -370,6 +397,7 @@ def handle_email_verification_submission(data, request):
     verify_data = {
         'otp_type': 'email',
         'destination': data.get('email'),
+        'otp_id': data.get('otp_id'),
         'otp_code': data.get('otp_code'),
         'purpose': 'verify'
     }
@@ -393,6 +421,7 @@ def handle_phone_verification_submission(data, request):
     verify_data = {
         'otp_type': 'phone',
         'destination': data.get('phone'),
+        'otp_id': data.get('otp_id'),
         'otp_code': data.get('otp_code'),
         'purpose': 'verify'
     }
@@ -412,11 +441,11 @@ def apply_context_modifications(schema, context):
     if not isinstance(context, dict):
         return schema
         
-    if context.get('enterprise'):
+    if context.get('enterprise') and 'social_auth' in schema:
         # Hide social auth for enterprise context
         schema['social_auth']['enabled'] = False
     
-    if context.get('disable_social'):
+    if context.get('disable_social') and 'social_auth' in schema:
         # Disable social auth
         schema['social_auth']['enabled'] = False
     
@@ -0,0 +1,180 @@
+"""Process-wide JWKS cache for social sign-in verification.
+
+Verifying a Google or Apple ID token needs the provider's signing keys.
+Fetching them per login put the provider's cert endpoint on the login path,
+so each provider gets one ``JWKSCache`` per process:
+
+  - keys are kept for the provider's Cache-Control max-age
+    (``JWKS_DEFAULT_MAX_AGE`` when it sends none);
+  - once that lapses the old keys keep being served while a background
+    thread refetches, for up to ``JWKS_MAX_STALE_SECONDS``;
+  - an unknown ``kid`` (key rotation) triggers a refetch, at most once per
+    ``JWKS_MIN_REFETCH_SECONDS`` so junk tokens cannot hammer the provider.
+    While a process has no keys at all (a failed cold fetch) it retries
+    after only ``JWKS_EMPTY_RETRY_SECONDS``, since every login fails until
+    then;
+  - fetched key sets are written to the default cache, so a fresh worker
+    starts from the shared copy instead of the network.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+import jwt
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def _setting(name: str, default: int) -> int:
+    return int(getattr(settings, name, default))
+
+
+def _max_age(headers) -> int:
+    match = _MAX_AGE_RE.search((headers or {}).get("Cache-Control", "") or "")
+    if match:
+        return int(match.group(1))
+    return _setting("JWKS_DEFAULT_MAX_AGE", 3600)
+
+
+def _parse_keys(jwks: dict) -> Dict[str, jwt.PyJWK]:
+    keys = {}
+    for data in jwks.get("keys", []):
+        kid = data.get("kid")
+        if not kid:
+            continue
+        try:
+            keys[kid] = jwt.PyJWK(data)
+        except jwt.PyJWTError as e:
+            logger.debug("[JWKS] Skipping unusable key kid=%s: %s", kid, e)
+    return keys
+
+
+class JWKSCache:
+    """Signing keys for one provider, shared by all threads in the process."""
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        # Wall-clock times, so entries loaded from the shared cache compare too
+        self._fresh_until = 0.0
+        self._last_fetch = 0.0
+        self._refreshing = False
+
+    @property
+    def _cache_key(self) -> str:
+        return f"auth:jwks:{self.name}"
+
+    def get_signing_key(self, kid: str) -> Optional[jwt.PyJWK]:
+        """Key for kid, or None if the provider does not publish it."""
+        now = time.time()
+        if not self._keys:
+            self._load_shared()
+        if not self._keys or now > self._fresh_until + _setting("JWKS_MAX_STALE_SECONDS", 86400):
+            # Nothing usable yet: this caller has to wait for the fetch
+            self._fetch()
+        elif now > self._fresh_until:
+            self._refresh_in_background()
+        key = self._keys.get(kid)
+        if key is None:
+            # Unknown kid: the provider may have rotated its keys
+            self._fetch()
+            key = self._keys.get(kid)
+        return key
+
+    def get_signing_key_from_jwt(self, token: str) -> jwt.PyJWK:
+        """PyJWKClient-compatible lookup; raises PyJWKClientError on a miss."""
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self.get_signing_key(kid) if kid else None
+        if key is None:
+            raise jwt.PyJWKClientError(f'Unable to find a signing key that matches: "{kid}"')
+        return key
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys = {}
+            self._fresh_until = 0.0
+            self._last_fetch = 0.0
+        cache.delete(self._cache_key)
+
+    def _load_shared(self) -> None:
+        try:
+            shared = cache.get(self._cache_key)
+        except Exception:
+            shared = None
+        if not shared:
+            return
+        jwks, fetched_at, fresh_until = shared
+        keys = _parse_keys(jwks)
+        with self._lock:
+            if keys and fresh_until > self._fresh_until:
+                self._keys, self._last_fetch, self._fresh_until = keys, fetched_at, fresh_until
+
+    def _fetch(self) -> None:
+        # One fetch at a time; threads that queued behind it find the
+        # result (or the rate limit) when they get the lock
+        with self._fetch_lock:
+            if self._keys:
+                wait = _setting("JWKS_MIN_REFETCH_SECONDS", 60)
+            else:
+                wait = _setting("JWKS_EMPTY_RETRY_SECONDS", 2)
+            if time.time() - self._last_fetch < wait:
+                return
+            self._last_fetch = time.time()
+            try:
+                response = requests.get(self.url, timeout=_setting("JWKS_FETCH_TIMEOUT", 5))
+                response.raise_for_status()
+                jwks = response.json()
+                keys = _parse_keys(jwks)
+            except Exception as e:
+                logger.warning("[JWKS] Failed to fetch %s keys from %s: %s", self.name, self.url, e)
+                return
+            if not keys:
+                logger.warning("[JWKS] %s returned no usable keys", self.url)
+                return
+            self._store(jwks, keys, _max_age(response.headers))
+
+    def _store(self, jwks: dict, keys: Dict[str, jwt.PyJWK], max_age: int) -> None:
+        fetched_at = time.time()
+        with self._lock:
+            self._keys = keys
+            self._last_fetch = fetched_at
+            self._fresh_until = fetched_at + max_age
+        try:
+            timeout = max_age + _setting("JWKS_MAX_STALE_SECONDS", 86400)
+            cache.set(self._cache_key, (jwks, fetched_at, fetched_at + max_age), timeout)
+        except Exception as e:
+            logger.debug("[JWKS] Failed to share %s keys: %s", self.name, e)
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                # A sibling worker may already have refreshed the shared copy
+                self._load_shared()
+                if time.time() > self._fresh_until:
+                    self._fetch()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name=f"jwks-refresh-{self.name}", daemon=True).start()
+
+
+GOOGLE_JWKS = JWKSCache("google", "https://www.googleapis.com/oauth2/v3/certs")
+APPLE_JWKS = JWKSCache("apple", "https://appleid.apple.com/auth/keys")
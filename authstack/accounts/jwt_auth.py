@@ -1,23 +1,34 @@
 """Custom JWT authentication with token versioning and refresh token rotation"""
 import hashlib
+import logging
 import secrets
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import F
 from django.utils import timezone
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework.exceptions import AuthenticationFailed
 
+from accounts.auth_context import get_auth_context
+from accounts.authz import get_user_authz
 from accounts.models import UserSession
+from accounts.session_cache import invalidate_session_state
+from accounts.session_revocation import enforce_session_limit, revoke_sessions
+from accounts.session_store import hash_refresh_token, record_activity
+from accounts.user_cache import get_user_state
 from accounts.models import Membership
 from tenants.models import Tenant
-from user_sessions.models import Session as RefreshSession
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 
 def _get_client_ip(request) -> str:
@@ -135,15 +146,10 @@ def _is_admin_frontend_user(user, membership: Membership) -> bool:
     AdminFrontend role on the resolved membership.
     """
     try:
-        if bool(getattr(user, 'is_superuser', False)):
-            return True
-        if user.groups.filter(name='AdminFrontend').exists():
-            return True
-        if membership.roles.filter(name='AdminFrontend').exists():
-            return True
+        # Also warms the snapshot that the admin views read afterwards
+        return get_user_authz(user, membership.tenant).is_tenant_admin_frontend
     except Exception:
         return False
-    return False
 
 
 class TokenVersionMixin:
@@ -252,47 +258,49 @@ class CustomTokenObtainPairSerializer(TokenVersionMixin, TokenObtainPairSerializ
             # Normalize device type to one of: android | ios | web
             device_type_norm = _normalize_device_type(request, ua)
 
-            # Try to find existing session for this device and update it, or create new
-            # Handle edge case where multiple sessions exist for same device_id
-            try:
-                session, created = UserSession.objects.update_or_create(
-                    user=self.user,
-                    device_id=device_id,
-                    defaults={
-                        'device_name': request.META.get('HTTP_X_DEVICE_NAME', ''),
-                        'device_type': device_type_norm,
-                        'os_name': os_name,
-                        'os_version': os_version,
-                        'ip_address': client_ip,
-                        'user_agent': ua,
-                        'refresh_token_jti': jti,
-                        'access_token_jti': access_token_jti,
-                        'expires_at': timezone.now() + timedelta(days=7),
-                        'is_active': True,
-                        'last_activity': timezone.now()
-                    }
-                )
-            except UserSession.MultipleObjectsReturned:
-                # Multiple sessions exist for this device - use most recent and delete others
-                sessions = UserSession.objects.filter(user=self.user, device_id=device_id).order_by('-last_activity')
-                session = sessions.first()
-                # Update the most recent session
-                session.device_name = request.META.get('HTTP_X_DEVICE_NAME', '')
-                session.device_type = device_type_norm
-                session.os_name = os_name
-                session.os_version = os_version
-                session.ip_address = client_ip
-                session.user_agent = ua
-                session.refresh_token_jti = jti
-                session.access_token_jti = access_token_jti
-                session.expires_at = timezone.now() + timedelta(days=7)
-                session.is_active = True
-                session.last_activity = timezone.now()
-                session.save()
+            # Reuse the session for this device (most recent one if there are
+            # several), or open a new one. The id is settled first so the
+            # session row is written once, together with the token's audit hash.
+            device_sessions = list(
+                UserSession.objects.filter(user=self.user, device_id=device_id)
+                .order_by('-last_activity')
+                .values_list('id', flat=True)
+            )
+            session_id = device_sessions[0] if device_sessions else uuid.uuid4()
+
+            # Store session ID in token
+            refresh_token['session_id'] = str(session_id)
+            # Also embed session_id into the access token for middleware checks
+            refresh_token.access_token['session_id'] = str(session_id)
+            refresh_str = str(refresh_token)
+
+            now = timezone.now()
+            fields = {
+                'device_name': request.META.get('HTTP_X_DEVICE_NAME', ''),
+                'device_type': device_type_norm,
+                'os_name': os_name,
+                'os_version': os_version,
+                'ip_address': client_ip,
+                'user_agent': ua,
+                'refresh_token_jti': jti,
+                'access_token_jti': access_token_jti,
+                'refresh_token_hash': hash_refresh_token(refresh_str),
+                'refresh_token_family': jti,
+                'rotation_counter': 0,
+                'expires_at': now + timedelta(days=7),
+                'is_active': True,
+                'revoked_at': None,
+                'revoke_reason': '',
+                'last_activity': now,
+            }
+            if device_sessions:
+                UserSession.objects.filter(id=session_id).update(**fields)
                 # Delete duplicates
-                sessions.exclude(id=session.id).delete()
-                created = False
-            
+                if len(device_sessions) > 1:
+                    UserSession.objects.filter(id__in=device_sessions[1:]).delete()
+            else:
+                UserSession.objects.create(id=session_id, user=self.user, device_id=device_id, **fields)
+
             # Enforce per-device-type session concurrency limits
             from django.conf import settings
             # Prefer per-type limits if provided; fallback to global
@@ -308,94 +316,88 @@ class CustomTokenObtainPairSerializer(TokenVersionMixin, TokenObtainPairSerializ
                 type_filter = {'device_type': 'web'}
 
             if limit > 0:
-                active_sessions = UserSession.objects.filter(
-                    user=self.user,
-                    is_active=True,
-                    **type_filter,
-                ).order_by('-last_activity')
-
-                if active_sessions.count() > limit:
-                    sessions_to_revoke = active_sessions[limit:]
-                    for old_session in sessions_to_revoke:
-                        old_session.revoke('session_limit_exceeded')
-                        # Also revoke in new backend
-                        try:
-                            rs = RefreshSession.objects.get(id=old_session.id)
-                            rs.revoked_at = timezone.now()
-                            rs.revoke_reason = 'session_limit_exceeded'
-                            rs.save()
-                        except RefreshSession.DoesNotExist:
-                            pass
+                # One SELECT for the stale ids, then one UPDATE
+                enforce_session_limit(
+                    UserSession.objects.filter(user=self.user, is_active=True, **type_filter),
+                    limit,
+                    'last_activity',
+                    keep_id=session_id,
+                )
             
-            # Store session ID in token
-            refresh_token['session_id'] = str(session.id)
-            # Also embed session_id into the access token for middleware checks
-            refresh_token.access_token['session_id'] = str(session.id)
-            data['refresh'] = str(refresh_token)
+            data['refresh'] = refresh_str
             data['access'] = str(refresh_token.access_token)
 
-            # Mirror into new refresh session backend so Admin and middleware can use either
-            try:
-                # Use same UUID so tokens and both tables align
-                import hashlib as _hashlib
-                from django.utils import timezone as _tz
-                # Hash the actual SimpleJWT refresh string for audit
-                refresh_hash = _hashlib.sha256(str(refresh_token).encode()).hexdigest()
-                RefreshSession.objects.update_or_create(
-                    id=session.id,
-                    defaults={
-                        'user': self.user,
-                        'device': None,
-                        'refresh_token_hash': refresh_hash,
-                        'refresh_token_family': session.refresh_token_jti if hasattr(session, 'refresh_token_jti') else jti or '',
-                        'rotation_counter': 0,
-                        'ip_address': client_ip,
-                        'user_agent': ua,
-                        'revoked_at': None,
-                        'revoke_reason': '',
-                        # Keep a reasonable expiry for audit; SimpleJWT refresh lifetime is 7 days in settings
-                        'expires_at': _tz.now() + timedelta(days=7),
-                    }
-                )
-            except Exception:
-                # Do not block login if mirroring fails
-                pass
+            # The session may have been reactivated; drop any cached revoked state
+            invalidate_session_state(session_id)
         
         return data
 
 
 class CustomJWTAuthentication(JWTAuthentication):
     """JWT authentication with token version checking"""
-    
+
+    def authenticate(self, request):
+        # Remember the request-scoped context so the token decoded by the
+        # middleware chain is reused instead of re-verified here.
+        self._auth_context = get_auth_context(request)
+        result = super().authenticate(request)
+        if result is not None:
+            # Buffered; last_activity is written by the periodic flush
+            record_activity(result[1].get('session_id'))
+        return result
+
     def get_validated_token(self, raw_token):
         """Validate token and check version"""
-        validated_token = super().get_validated_token(raw_token)
+        ctx = getattr(self, '_auth_context', None)
+        if ctx is not None and ctx.matches(raw_token) and ctx.access_token is not None:
+            validated_token = ctx.access_token
+        else:
+            validated_token = super().get_validated_token(raw_token)
         
-        # Get user and check token version
+        # Check token version / account status against the cached user state;
+        # the User row is only read on a cache miss.
         user_id = validated_token.get('user_id')
         token_version = validated_token.get('token_version')
         
         if user_id:
-            try:
-                user = User.objects.get(id=user_id)
-                
-                # Check if user is active
-                if hasattr(user, 'status') and user.status != 'active':
-                    raise InvalidToken('User account is not active')
-                
-                # Check token version if both token and user have it
-                if token_version is not None and hasattr(user, 'token_version'):
-                    # Refresh user from DB to get latest token_version
-                    user.refresh_from_db()
-                    user_token_version = getattr(user, 'token_version', 1)
-                    if user_token_version != token_version:
-                        raise InvalidToken('Token has been revoked')
-                    
-            except User.DoesNotExist:
+            state, user = get_user_state(user_id)
+            if state is None:
                 raise InvalidToken('User not found')
+            if user is not None and ctx is not None:
+                # Reuse the row we just loaded for request.user
+                ctx.user = user
+            if api_settings.CHECK_USER_IS_ACTIVE and not state.is_active:
+                raise AuthenticationFailed('User is inactive', code='user_inactive')
+            
+            # Check if user is active
+            if state.status is not None and state.status != 'active':
+                raise InvalidToken('User account is not active')
+            
+            # Check token version if both token and user have it
+            if token_version is not None and state.token_version is not None:
+                if state.token_version != token_version:
+                    raise InvalidToken('Token has been revoked')
         
         return validated_token
 
+    def get_user(self, validated_token):
+        """Return the user, reusing the instance loaded during validation"""
+        ctx = getattr(self, '_auth_context', None)
+        user = getattr(ctx, 'user', None)
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if (
+            user is None
+            or user_id is None
+            or str(getattr(user, api_settings.USER_ID_FIELD)) != str(user_id)
+            or api_settings.CHECK_REVOKE_TOKEN
+        ):
+            user = super().get_user(validated_token)
+        elif api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if ctx is not None:
+            ctx.user = user
+        return user
+
 
 class RefreshTokenRotation:
     """Handle refresh token rotation for enhanced security"""
@@ -421,48 +423,7 @@ class RefreshTokenRotation:
             jti = old_token.get('jti')
             
             if session_id:
-                try:
-                    session = UserSession.objects.get(
-                        id=session_id,
-                        refresh_token_jti=jti,
-                        is_active=True
-                    )
-                    
-                    # Check if session is expired
-                    if session.expires_at < timezone.now():
-                        session.revoke('expired')
-                        raise InvalidToken('Session has expired')
-                    
-                    # Get user
-                    user = session.user
-                    
-                    # Create new token
-                    new_token = RefreshToken.for_user(user)
-                    new_token['session_id'] = str(session.id)
-                    new_token['token_version'] = getattr(user, 'token_version', 1)
-                    
-                    # Preserve tenant_id from old token
-                    tenant_id = old_token.get('tenant_id')
-                    if tenant_id:
-                        new_token['tenant_id'] = tenant_id
-                        new_token.access_token['tenant_id'] = tenant_id
-                    
-                    # Ensure access token also carries session_id
-                    new_token.access_token['session_id'] = str(session.id)
-                    
-                    # Update session with new JTIs
-                    session.refresh_token_jti = new_token['jti']
-                    session.access_token_jti = new_token.access_token['jti']
-                    session.last_activity = timezone.now()
-                    session.save()
-                    
-                    return {
-                        'access': str(new_token.access_token),
-                        'refresh': str(new_token)
-                    }
-                    
-                except UserSession.DoesNotExist:
-                    raise InvalidToken('Session not found or inactive')
+                return RefreshTokenRotation._rotate_session_token(old_token, str(session_id), jti)
             else:
                 # Fallback for tokens without session
                 user_id = old_token.get('user_id')
@@ -484,3 +445,88 @@ class RefreshTokenRotation:
                 
         except TokenError as e:
             raise InvalidToken(f'Token is invalid or expired: {str(e)}')
+
+    @staticmethod
+    def _rotate_session_token(old_token, session_id: str, jti: str) -> dict:
+        """Rotate a session-bound refresh token with a compare-and-swap.
+
+        The session row is only advanced if it still holds the presented JTI,
+        in a single UPDATE, so concurrent refreshes cannot both succeed. The
+        user's token_version comes from the cached user state, so the happy
+        path is that one UPDATE and no SELECTs.
+        """
+        user_id = old_token.get(api_settings.USER_ID_CLAIM)
+        state, _ = get_user_state(user_id)
+        if state is None:
+            raise InvalidToken('User not found')
+
+        # Build the new pair up front; it is only handed out if the swap wins
+        new_token = RefreshToken()
+        new_token[api_settings.USER_ID_CLAIM] = user_id
+        new_token['session_id'] = session_id
+        new_token['token_version'] = state.token_version if state.token_version is not None else 1
+        if api_settings.REVOKE_TOKEN_CLAIM and old_token.get(api_settings.REVOKE_TOKEN_CLAIM):
+            new_token[api_settings.REVOKE_TOKEN_CLAIM] = old_token[api_settings.REVOKE_TOKEN_CLAIM]
+        # Preserve tenant_id from old token
+        tenant_id = old_token.get('tenant_id')
+        if tenant_id:
+            new_token['tenant_id'] = tenant_id
+        access = new_token.access_token
+        if tenant_id:
+            access['tenant_id'] = tenant_id
+        # Ensure access token also carries session_id
+        access['session_id'] = session_id
+        refresh_str = str(new_token)
+
+        now = timezone.now()
+        swapped = UserSession.objects.filter(
+            id=session_id,
+            refresh_token_jti=jti,
+            is_active=True,
+            expires_at__gt=now,
+        ).update(
+            refresh_token_jti=new_token['jti'],
+            access_token_jti=access['jti'],
+            refresh_token_hash=hash_refresh_token(refresh_str),
+            rotation_counter=F('rotation_counter') + 1,
+            last_activity=now,
+            rotated_at=now,
+        )
+        if not swapped:
+            RefreshTokenRotation._reject_stale_refresh(session_id, jti, now)
+
+        return {
+            'access': str(access),
+            'refresh': refresh_str,
+        }
+
+    @staticmethod
+    def _reject_stale_refresh(session_id: str, jti: str, now) -> None:
+        """Explain why the compare-and-swap matched no row, and always raise.
+
+        A live session holding a different JTI means this refresh token was
+        already rotated. Within REFRESH_REUSE_GRACE_SECONDS of the last
+        rotation (rotated_at, not last_activity, which every authenticated
+        request moves) that is treated as a concurrent refresh from the same
+        client and simply rejected; later it is a replay, and the session is
+        revoked.
+        """
+        row = UserSession.objects.filter(id=session_id).values(
+            'refresh_token_jti', 'is_active', 'expires_at', 'rotated_at'
+        ).first()
+        if row is None or not row['is_active']:
+            raise InvalidToken('Session not found or inactive')
+        if row['expires_at'] <= now:
+            UserSession.objects.get(id=session_id).revoke('expired')
+            raise InvalidToken('Session has expired')
+        if row['refresh_token_jti'] != jti:
+            grace = int(getattr(settings, 'REFRESH_REUSE_GRACE_SECONDS', 10))
+            if row['rotated_at'] and (now - row['rotated_at']).total_seconds() <= grace:
+                raise InvalidToken('Refresh token already rotated')
+            logger.warning(
+                "[RefreshTokenRotation] Refresh token reuse detected: session_id=%s; revoking session",
+                session_id,
+            )
+            revoke_sessions([session_id], 'refresh_token_reuse', now=now)
+            raise InvalidToken('Refresh token reuse detected')
+        raise InvalidToken('Session not found or inactive')
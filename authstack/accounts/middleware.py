@@ -1,44 +1,39 @@
-from django.utils.deprecation import MiddlewareMixin
-from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from rest_framework_simplejwt.tokens import AccessToken
 from rest_framework_simplejwt.exceptions import TokenError
 from django.http import JsonResponse
 from user_sessions.models import Session as RefreshSession
 from .models import UserSession as LegacySession
-from django.conf import settings
+from common.middleware.base import HybridMiddlewareMixin
+from common.route_policy import policy_for_request
+from .auth_context import get_auth_context
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-class SessionRevocationMiddleware(MiddlewareMixin):
+class SessionRevocationMiddleware(HybridMiddlewareMixin):
     """Check if the session has been revoked on every authenticated request"""
+
+    nonblocking = True
     
     def process_request(self, request):
-        # Skip for non-API routes
-        if not request.path.startswith('/api/'):
+        # Only routes under session binding carry a session to check
+        if not policy_for_request(request).session_binding:
             return None
 
 
-class AuthenticatedCSRFMiddleware(MiddlewareMixin):
+class AuthenticatedCSRFMiddleware(HybridMiddlewareMixin):
     """Enforce double-submit CSRF for authenticated unsafe API methods."""
+
+    # Header/cookie comparison only, safe to run on the event loop
+    nonblocking = True
+
     def process_request(self, request):
-        # Only protect API routes
-        if not request.path.startswith('/api/'):
-            return None
         # Safe methods do not require CSRF
         if request.method in ('GET', 'HEAD', 'OPTIONS'):
             return None
-        # Skip public/auth endpoints
-        _skip_paths = {
-            '/api/social/login/',
-            '/api/token/',
-            '/api/token/refresh/',
-            '/api/register/',
-            '/api/password-reset/request/',
-            '/api/password-reset/verify/',
-            '/api/password-reset/confirm/',
-        }
-        if request.path in _skip_paths:
+        # Only protected API routes (public/auth endpoints opt out via route_policy)
+        if not policy_for_request(request).csrf_double_submit:
             return None
         # Apply only when using Bearer tokens (authenticated API clients)
         auth_header = request.META.get('HTTP_AUTHORIZATION', '')
@@ -118,7 +113,7 @@ class AuthenticatedCSRFMiddleware(MiddlewareMixin):
         return None
 
 
-class TokenSessionBindingMiddleware(MiddlewareMixin):
+class TokenSessionBindingMiddleware(HybridMiddlewareMixin):
     """AUDIT FIX #6 & #7: Enforce server-side token-to-session binding.
     
     Prevents token injection attacks by validating that:
@@ -132,113 +127,80 @@ class TokenSessionBindingMiddleware(MiddlewareMixin):
     """
     
     def process_request(self, request):
-        # Skip for non-API routes and public endpoints
-        if not request.path.startswith('/api/'):
-            return None
-        
-        _skip_paths = {
-            '/api/token/',
-            '/api/token/refresh/',
-            '/api/register/',
-            '/api/social/login/',
-            '/api/password-reset/request/',
-            '/api/password-reset/confirm/',
-        }
-        if request.path in _skip_paths:
-            return None
-        
-        # Get authorization header
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        if not auth_header.startswith('Bearer '):
-            return None
-        
-        try:
-            # Extract and decode access token
-            token_str = auth_header.split(' ')[1]
-            token = AccessToken(token_str)
-            
-            # Get user_id and session_id from token claims
-            token_user_id = token.get('user_id')
-            session_id = token.get('session_id')
-            
-            if not token_user_id or not session_id:
-                # Token missing required claims - let auth middleware handle
-                return None
-            
-            # Enforce binding between access token and refresh-cookie session (if cookie present)
-            try:
-                refresh_cookie_name = getattr(settings, 'REFRESH_COOKIE_NAME', 'refresh_token')
-                refresh_cookie_value = request.COOKIES.get(refresh_cookie_name)
-                if refresh_cookie_value:
-                    rt = RefreshToken(refresh_cookie_value)
-                    refresh_sid = rt.get('session_id')
-                    if refresh_sid and str(refresh_sid) != str(session_id):
-                        logger.warning(
-                            f"[TokenSessionBinding] Access/refresh session mismatch: access.session_id={session_id} refresh.session_id={refresh_sid}"
-                        )
-                        return JsonResponse({
-                            'error': 'Session cookie mismatch',
-                            'code': 'SESSION_COOKIE_MISMATCH'
-                        }, status=401)
-            except Exception:
-                # If cookie is absent or cannot be parsed, continue with existing checks
-                pass
-            
-            # Verify session exists and belongs to the token's user
-            try:
-                session = RefreshSession.objects.get(id=session_id)
-                
-                # CRITICAL: Verify session owner matches token user
-                if str(session.user_id) != str(token_user_id):
-                    logger.warning(
-                        f'[TokenSessionBinding] Token injection detected: '
-                        f'token_user={token_user_id} session_owner={session.user_id} '
-                        f'session_id={session_id} ip={request.META.get("REMOTE_ADDR")}'
-                    )
-                    return JsonResponse({
-                        'error': 'Token-session mismatch detected',
-                        'code': 'TOKEN_INJECTION_DETECTED'
-                    }, status=401)
-                
-                # Verify session is not revoked
-                if session.revoked_at:
-                    return JsonResponse({
-                        'error': 'Session has been revoked',
-                        'code': 'SESSION_REVOKED'
-                    }, status=401)
-                
-            except RefreshSession.DoesNotExist:
-                # Try legacy session table
-                try:
-                    legacy_session = LegacySession.objects.get(id=session_id)
-                    
-                    if str(legacy_session.user_id) != str(token_user_id):
-                        logger.warning(
-                            f'[TokenSessionBinding] Token injection (legacy): '
-                            f'token_user={token_user_id} session_owner={legacy_session.user_id}'
-                        )
-                        return JsonResponse({
-                            'error': 'Token-session mismatch detected',
-                            'code': 'TOKEN_INJECTION_DETECTED'
-                        }, status=401)
-                    
-                    if not legacy_session.is_active:
-                        return JsonResponse({
-                            'error': 'Session has been revoked',
-                            'code': 'SESSION_REVOKED'
-                        }, status=401)
-                        
-                except LegacySession.DoesNotExist:
-                    logger.warning(
-                        f'[TokenSessionBinding] Session not found: session_id={session_id}'
-                    )
-                    return JsonResponse({
-                        'error': 'Invalid session',
-                        'code': 'SESSION_NOT_FOUND'
-                    }, status=401)
-        
-        except (TokenError, IndexError, ValueError) as e:
-            # Invalid token - let auth middleware handle
-            pass
+        ctx, response = self._bound_context(request)
+        if ctx is None:
+            return response
+        return self._verify_session(request, ctx, ctx.session_state)
+
+    async def aprocess_request(self, request):
+        ctx, response = self._bound_context(request)
+        if ctx is None:
+            return response
+        return self._verify_session(request, ctx, await ctx.asession_state())
+
+    def _bound_context(self, request):
+        """Return (ctx, None) when the session must be checked, else (None, response or None)."""
+        # Skip for non-API routes and public endpoints (see common.route_policy)
+        if not policy_for_request(request).session_binding:
+            return None, None
         
+        # Decode the Bearer token once; later middleware and DRF auth reuse it
+        ctx = get_auth_context(request)
+        if ctx.raw_token is None or ctx.access_token is None:
+            # No/invalid token - let auth middleware handle
+            return None, None
+
+        # Get user_id and session_id from token claims
+        token_user_id = ctx.user_id
+        session_id = ctx.session_id
+
+        if not token_user_id or not session_id:
+            # Token missing required claims - let auth middleware handle
+            return None, None
+
+        # Enforce binding between access token and refresh-cookie session (if cookie present)
+        refresh_sid = ctx.refresh_session_id
+        if refresh_sid and refresh_sid != session_id:
+            logger.warning(
+                f"[TokenSessionBinding] Access/refresh session mismatch: access.session_id={session_id} refresh.session_id={refresh_sid}"
+            )
+            return None, JsonResponse({
+                'error': 'Session cookie mismatch',
+                'code': 'SESSION_COOKIE_MISMATCH'
+            }, status=401)
+        return ctx, None
+
+    def _verify_session(self, request, ctx, state):
+        token_user_id = ctx.user_id
+        session_id = ctx.session_id
+
+        # Verify session exists and belongs to the token's user
+        if state is None:
+            logger.warning(
+                f'[TokenSessionBinding] Session not found: session_id={session_id}'
+            )
+            return JsonResponse({
+                'error': 'Invalid session',
+                'code': 'SESSION_NOT_FOUND'
+            }, status=401)
+
+        # CRITICAL: Verify session owner matches token user
+        if state.user_id != token_user_id:
+            logger.warning(
+                f'[TokenSessionBinding] Token injection detected ({state.source}): '
+                f'token_user={token_user_id} session_owner={state.user_id} '
+                f'session_id={session_id} ip={request.META.get("REMOTE_ADDR")}'
+            )
+            return JsonResponse({
+                'error': 'Token-session mismatch detected',
+                'code': 'TOKEN_INJECTION_DETECTED'
+            }, status=401)
+
+        # Verify session is not revoked
+        if state.revoked:
+            return JsonResponse({
+                'error': 'Session has been revoked',
+                'code': 'SESSION_REVOKED'
+            }, status=401)
+
         return None
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_accountdeletionjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersession',
+            name='rotated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_usersession_rotated_at'),
+        ('user_sessions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usersession',
+            name='refresh_token_hash',
+            field=models.CharField(blank=True, max_length=128),
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='refresh_token_family',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='rotation_counter',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='usersession',
+            name='registered_device',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sessions', to='user_sessions.device'),
+        ),
+        migrations.AddIndex(
+            model_name='usersession',
+            index=models.Index(fields=['refresh_token_family'], name='accounts_us_refresh_5eda54_idx'),
+        ),
+    ]
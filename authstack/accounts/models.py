@@ -7,7 +7,11 @@ from django.contrib.auth import get_user_model
 
 
 class UserSession(models.Model):
-    """Track user sessions for security and device management"""
+    """Track user sessions for security and device management.
+
+    This is the one session table. user_sessions.Session is a read-only
+    database view over it for the admin and older code paths.
+    """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sessions')
     
@@ -26,10 +30,20 @@ class UserSession(models.Model):
     # Token tracking
     refresh_token_jti = models.CharField(max_length=255, unique=True, db_index=True)
     access_token_jti = models.CharField(max_length=255, blank=True, db_index=True)  # Track current access token
+    # Refresh token audit trail (formerly user_sessions.Session)
+    refresh_token_hash = models.CharField(max_length=128, blank=True)
+    refresh_token_family = models.CharField(max_length=64, blank=True)
+    rotation_counter = models.IntegerField(default=0)
+    # Registered device, for sessions opened by the device/OTP flows
+    registered_device = models.ForeignKey(
+        'user_sessions.Device', on_delete=models.SET_NULL, null=True, blank=True, related_name='sessions'
+    )
     
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     last_activity = models.DateTimeField(auto_now=True)
+    # Last refresh token rotation; last_activity also moves on every request
+    rotated_at = models.DateTimeField(null=True, blank=True)
     expires_at = models.DateTimeField()
     
     # Status
@@ -42,6 +56,7 @@ class UserSession(models.Model):
         indexes = [
             models.Index(fields=['user', 'is_active']),
             models.Index(fields=['refresh_token_jti']),
+            models.Index(fields=['refresh_token_family']),
         ]
     
     def __str__(self):
@@ -53,6 +68,8 @@ class UserSession(models.Model):
         self.revoked_at = timezone.now()
         self.revoke_reason = reason
         self.save()
+        from .session_cache import invalidate_session_state
+        invalidate_session_state(self.id)
 
 
 class LoginAttempt(models.Model):
@@ -194,3 +211,46 @@ class ActionToken(models.Model):
 
     def __str__(self) -> str:  # pragma: no cover - trivial
         return f"ActionToken<{self.purpose}:{self.user_id}>"
+
+
+class AccountDeletionJob(models.Model):
+    """Background purge of a deleted account's data (see accounts.account_deletion).
+
+    DeleteMeView disables and anonymizes the user immediately and creates
+    one of these; the Celery task then removes dependent rows in chunks and
+    records per-model counts in ``progress``.
+    """
+
+    STATUS_PENDING = "pending"
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_COMPLETED, "Completed"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="deletion_jobs",
+    )
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    # Step currently being purged, e.g. "channels.ShortComment"
+    step = models.CharField(max_length=64, blank=True)
+    # {"<app_label.Model>": rows removed}
+    progress = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial
+        return f"AccountDeletionJob<{self.user_id}:{self.status}>"
@@ -0,0 +1,97 @@
+"""Compact permission claims for access tokens.
+
+Access tokens used to carry the full sorted ``perms`` list, which made the
+Authorization header of admin users several KB. Instead the token carries
+
+  - ``perms_v``: the version of the permission registry (a hash of every
+    "app_label.codename" in the Permission table, in id order), and
+  - ``perms_b``: a base64url bitset over that registry.
+
+Server-side checks use the cached authz snapshot (accounts.authz), not the
+token; clients that need the codenames read them from /api/me/permissions/.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+
+VERSION_CLAIM = "perms_v"
+BITS_CLAIM = "perms_b"
+
+_CURRENT_KEY = "auth:permreg:current"
+
+_lock = threading.Lock()
+# (expires_at monotonic, registry) for the current registry in this process
+_current: Optional[Tuple[float, "PermissionRegistry"]] = None
+
+
+@dataclass(frozen=True)
+class PermissionRegistry:
+    version: str
+    codenames: Tuple[str, ...]
+    _index: Dict[str, int] = field(default_factory=dict, compare=False, repr=False)
+
+    def __post_init__(self):
+        self._index.update({name: i for i, name in enumerate(self.codenames)})
+
+    def encode(self, perms: Iterable[str]) -> str:
+        bits = 0
+        for perm in perms:
+            i = self._index.get(perm)
+            if i is not None:
+                bits |= 1 << i
+        raw = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "PERM_REGISTRY_CACHE_TTL", 300))
+
+
+def _build() -> PermissionRegistry:
+    codenames = tuple(
+        f"{app_label}.{codename}"
+        for app_label, codename in Permission.objects.order_by("id").values_list("content_type__app_label", "codename")
+    )
+    version = hashlib.sha1("\n".join(codenames).encode()).hexdigest()[:10]
+    return PermissionRegistry(version, codenames)
+
+
+def current_registry() -> PermissionRegistry:
+    """Registry that new tokens are encoded against."""
+    global _current
+    hit = _current
+    if hit is not None and hit[0] > time.monotonic():
+        return hit[1]
+    codenames = cache.get(_CURRENT_KEY)
+    if codenames is not None:
+        registry = PermissionRegistry(codenames[0], tuple(codenames[1]))
+    else:
+        registry = _build()
+        cache.set(_CURRENT_KEY, (registry.version, registry.codenames), _ttl())
+    with _lock:
+        _current = (time.monotonic() + _ttl(), registry)
+    return registry
+
+
+def clear_registry() -> None:
+    """Forget the current registry (Permission rows changed)."""
+    global _current
+    with _lock:
+        _current = None
+    cache.delete(_CURRENT_KEY)
+
+
+def apply_permission_claims(token, perms: Iterable[str]) -> None:
+    """Set perms_v/perms_b on token for the given "app_label.codename" strings."""
+    registry = current_registry()
+    token[VERSION_CLAIM] = registry.version
+    token[BITS_CLAIM] = registry.encode(perms)
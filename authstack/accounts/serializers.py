@@ -1,10 +1,12 @@
-from django.contrib.auth.models import User, Permission
+from django.contrib.auth.models import User
 from django.db.models import Q
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from .validators import validate_email_domain, sanitize_input
+from .authz import get_authz, get_user_authz
 from .models import Membership
+from .perm_codec import apply_permission_claims
 
 class MeSerializer(serializers.ModelSerializer):
     roles = serializers.SerializerMethodField()
@@ -27,35 +29,24 @@ class MeSerializer(serializers.ModelSerializer):
             "permissions",
         ]
 
+    def _authz(self, obj):
+        # Cached snapshot for obj in the request's tenant (see accounts.authz)
+        request = self.context.get("request") if hasattr(self, "context") else None
+        if request is not None and getattr(request, "user", None) == obj:
+            return get_authz(request)
+        return get_user_authz(obj, getattr(request, "tenant", None) if request is not None else None)
+
     def get_roles(self, obj):
-        return list(obj.groups.values_list("name", flat=True))
+        return list(self._authz(obj).roles)
 
     def get_permissions(self, obj):
-        # Effective permissions including global groups and per-tenant Membership roles
-        perms = set(obj.get_all_permissions())
-        # If request has a tenant, merge in permissions from Membership.roles
-        request = self.context.get("request") if hasattr(self, "context") else None
-        tenant = getattr(request, "tenant", None) if request is not None else None
-        if tenant is not None:
-            from .models import Membership
-            member = Membership.objects.filter(user=obj, tenant=tenant).first()
-            if member:
-                role_perms = Permission.objects.filter(group__in=member.roles.all())
-                # Permission.__str__ is app_label | codename; we want "app_label.codename"
-                # get_all_permissions returns strings in format "app_label.codename"
-                perms.update({f"{p.content_type.app_label}.{p.codename}" for p in role_perms})
-        return sorted(list(perms))
+        # Effective permissions including global groups and per-tenant Membership roles,
+        # as "app_label.codename" strings
+        return sorted(self._authz(obj).effective_permissions)
 
     def get_tenant_roles(self, obj):
-        # Resolve per-tenant roles for the current request. If no tenant, return [].
-        request = self.context.get("request") if hasattr(self, "context") else None
-        tenant = getattr(request, "tenant", None) if request is not None else None
-        if not tenant:
-            return []
-        member = Membership.objects.filter(user=obj, tenant=tenant).first()
-        if not member:
-            return []
-        return list(member.roles.values_list("name", flat=True))
+        # Per-tenant roles for the current request; [] without a tenant
+        return list(self._authz(obj).tenant_roles)
 
     def get_email_verified(self, obj):
         """Return whether this user's email has been verified.
@@ -91,8 +82,9 @@ class CookieTokenObtainPairSerializer(TokenObtainPairSerializer):
         token = super().get_token(user)
         # Add claims for UI (never trust these on backend)
         token["roles"] = list(user.groups.values_list("name", flat=True))
-        # Effective permissions, including group-derived ones
-        token["perms"] = sorted(list(user.get_all_permissions()))
+        # Effective permissions, including group-derived ones, as a registry
+        # version + bitset (see accounts.perm_codec)
+        apply_permission_claims(token, user.get_all_permissions())
         token["username"] = user.username
         return token
 
@@ -0,0 +1,122 @@
+"""Shared-cache view of session revocation state.
+
+Every Bearer request needs to know who owns its session and whether it has
+been revoked. Instead of querying accounts.UserSession on each request, the
+answer is kept in the default cache keyed by session_id.
+
+Code paths that revoke sessions call ``invalidate_session_state`` so the
+change is visible immediately on this cache. Entries also expire after
+``SESSION_STATE_CACHE_TTL`` seconds, which bounds how long a revocation can
+go unnoticed when an invalidation is missed (e.g. a bulk ``.update()`` or a
+per-process cache in development). Set the TTL to 0 to disable caching.
+"""
+from __future__ import annotations
+
+from collections import namedtuple
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+# Minimal view of a session row; source names the table it was read from.
+SessionState = namedtuple("SessionState", ["session_id", "user_id", "revoked", "expires_at", "source"])
+
+_KEY_PREFIX = "auth:session:"
+# Cached marker for session ids with no row
+_MISSING = "missing"
+
+
+def _cache_key(session_id) -> str:
+    return f"{_KEY_PREFIX}{session_id}"
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "SESSION_STATE_CACHE_TTL", 30))
+
+
+_FIELDS = ("user_id", "is_active", "expires_at")
+
+
+def _state(session_id: str, row) -> SessionState:
+    return SessionState(session_id, str(row["user_id"]), not row["is_active"], row["expires_at"], "session")
+
+
+def _lookup(session_id: str) -> Optional[SessionState]:
+    from .models import UserSession
+
+    try:
+        return _state(session_id, UserSession.objects.values(*_FIELDS).get(id=session_id))
+    except (UserSession.DoesNotExist, ValidationError, ValueError):
+        return None
+
+
+async def _alookup(session_id: str) -> Optional[SessionState]:
+    from .models import UserSession
+
+    try:
+        return _state(session_id, await UserSession.objects.values(*_FIELDS).aget(id=session_id))
+    except (UserSession.DoesNotExist, ValidationError, ValueError):
+        return None
+
+
+def _from_cache(session_id: str, cached):
+    if cached == _MISSING:
+        return None
+    return SessionState(session_id, *cached)
+
+
+def _cache_entry(state: Optional[SessionState], ttl: int):
+    """(value, timeout) to store for state."""
+    if state is None:
+        return _MISSING, ttl
+    timeout = ttl
+    if state.expires_at is not None:
+        # Never keep an entry around longer than the session itself
+        remaining = int((state.expires_at - timezone.now()).total_seconds())
+        timeout = max(1, min(ttl, remaining))
+    return (state.user_id, state.revoked, state.expires_at, state.source), timeout
+
+
+def get_session_state(session_id) -> Optional[SessionState]:
+    """Return the SessionState for session_id, or None if no such session."""
+    session_id = str(session_id)
+    ttl = _ttl()
+    if ttl <= 0:
+        return _lookup(session_id)
+
+    key = _cache_key(session_id)
+    cached = cache.get(key)
+    if cached is not None:
+        return _from_cache(session_id, cached)
+
+    state = _lookup(session_id)
+    value, timeout = _cache_entry(state, ttl)
+    cache.set(key, value, timeout=timeout)
+    return state
+
+
+async def aget_session_state(session_id) -> Optional[SessionState]:
+    """Async get_session_state using the async cache and ORM APIs."""
+    session_id = str(session_id)
+    ttl = _ttl()
+    if ttl <= 0:
+        return await _alookup(session_id)
+
+    key = _cache_key(session_id)
+    cached = await cache.aget(key)
+    if cached is not None:
+        return _from_cache(session_id, cached)
+
+    state = await _alookup(session_id)
+    value, timeout = _cache_entry(state, ttl)
+    await cache.aset(key, value, timeout=timeout)
+    return state
+
+
+def invalidate_session_state(*session_ids) -> None:
+    """Drop cached state for the given session ids (None values are ignored)."""
+    keys = [_cache_key(sid) for sid in session_ids if sid]
+    if keys:
+        cache.delete_many(keys)
@@ -0,0 +1,50 @@
+"""Set-based session revocation.
+
+These helpers revoke a batch of accounts.UserSession rows with one UPDATE
+instead of a load/save per row, and drop the revoked ids from the
+session-state cache. user_sessions.Session is a view over the same table,
+so it reflects the revocation without a write of its own.
+"""
+from __future__ import annotations
+
+from typing import Iterable, List
+
+from django.utils import timezone
+
+from .models import UserSession
+from .session_cache import invalidate_session_state
+
+
+def revoke_sessions(session_ids: Iterable, reason: str, now=None) -> int:
+    """Revoke session_ids; returns the number of rows revoked."""
+    ids = list(session_ids)
+    if not ids:
+        return 0
+    now = now or timezone.now()
+    revoked = UserSession.objects.filter(id__in=ids, is_active=True).update(
+        is_active=False, revoked_at=now, revoke_reason=reason
+    )
+    invalidate_session_state(*ids)
+    return revoked
+
+
+def stale_session_ids(queryset, limit: int, order_field: str, keep_id=None) -> List:
+    """Ids in queryset beyond the `limit` most recent rows by order_field.
+
+    keep_id (the session being logged into) is never returned.
+    """
+    if limit <= 0:
+        return []
+    ids = list(queryset.order_by(f'-{order_field}').values_list('id', flat=True)[limit:])
+    if keep_id is not None:
+        ids = [sid for sid in ids if str(sid) != str(keep_id)]
+    return ids
+
+
+def enforce_session_limit(
+    queryset, limit: int, order_field: str, keep_id=None, reason: str = 'session_limit_exceeded'
+) -> List:
+    """Revoke everything in queryset over the concurrency limit; returns the revoked ids."""
+    ids = stale_session_ids(queryset, limit, order_field, keep_id=keep_id)
+    revoke_sessions(ids, reason)
+    return ids
@@ -0,0 +1,138 @@
+"""Session storage shared by the login, refresh and request paths.
+
+accounts.UserSession is the one session table. user_sessions.Session is a
+read-only database view over it (user_sessions migration 0002) that keeps
+the admin and older readers working; nothing writes to it. Login and
+refresh each write the session row once, including the refresh token's
+audit hash (``hash_refresh_token``).
+
+Hot timestamps are write-behind: ``record_activity`` notes an authenticated
+request in the cache instead of updating the row, and ``flush_activity``
+(run by the ``accounts.tasks.flush_session_activity`` beat task) writes the
+buffered values with one bulk UPDATE per batch. Resolution is one flush
+interval. The buffer lives in the default cache, so it is only used when
+that cache is shared by the web and worker processes (common.cache). Without
+one, or with ``SESSION_ACTIVITY_WRITE_BEHIND = False``, requests record no
+activity at all, and last_activity moves only on login and refresh.
+
+Writes never move a timestamp backwards: a buffered stamp is the first
+request after the previous flush, and a refresh rotation may have written
+a newer value since.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import operator
+from functools import reduce
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, DateTimeField, F, Q, Value, When
+from django.utils import timezone
+
+from common.cache import cache_is_shared
+
+from .models import UserSession
+
+logger = logging.getLogger(__name__)
+
+_STAMP_PREFIX = "auth:activity:"
+_SEQ_KEY = "auth:activity:seq"
+_FLUSHED_KEY = "auth:activity:flushed"
+_SLOT_PREFIX = "auth:activity:slot:"
+# Sequence head seen by the previous flush
+_SEEN_KEY = "auth:activity:seen"
+
+
+def _write_behind() -> bool:
+    # A per-process buffer would never reach the worker that flushes it
+    return bool(getattr(settings, "SESSION_ACTIVITY_WRITE_BEHIND", True)) and cache_is_shared()
+
+
+def _interval() -> int:
+    return int(getattr(settings, "SESSION_ACTIVITY_FLUSH_SECONDS", 60))
+
+
+def _buffer_ttl() -> int:
+    # Long enough to survive a few missed beats before entries expire
+    return _interval() * 10
+
+
+def _batch_size() -> int:
+    return int(getattr(settings, "SESSION_ACTIVITY_FLUSH_BATCH", 500))
+
+
+def hash_refresh_token(refresh_str: str) -> str:
+    """Audit hash of a SimpleJWT refresh string, stored as refresh_token_hash."""
+    return hashlib.sha256(refresh_str.encode()).hexdigest()
+
+
+def record_activity(session_id, when=None) -> None:
+    """Note that session_id was just used; the row is updated by the next flush.
+
+    Does nothing without write-behind, so the request path never writes.
+    """
+    if not session_id or not _write_behind():
+        return
+    when = when or timezone.now()
+    try:
+        # Only the first request after a flush enqueues the session, so a busy
+        # session costs one cache add per request and one slot per interval
+        if not cache.add(f"{_STAMP_PREFIX}{session_id}", when, _buffer_ttl()):
+            return
+        cache.add(_SEQ_KEY, 0, None)
+        seq = cache.incr(_SEQ_KEY)
+        cache.set(f"{_SLOT_PREFIX}{seq}", str(session_id), _buffer_ttl())
+    except Exception as e:
+        logger.warning("[session_store] Failed to buffer activity for %s: %s", session_id, e)
+
+
+def flush_activity() -> int:
+    """Write buffered activity to the session table; returns sessions flushed."""
+    head = cache.get(_SEQ_KEY) or 0
+    start = (cache.get(_FLUSHED_KEY) or 0) + 1
+    # A missing slot numbered after the previous flush's head may still be
+    # between record_activity's incr and set: stop before it. One the
+    # previous flush already saw has expired and is skipped.
+    seen = cache.get(_SEEN_KEY) or 0
+    flushed = 0
+    batch = _batch_size()
+    while start <= head:
+        numbers = range(start, min(start + batch, head + 1))
+        slots = cache.get_many([f"{_SLOT_PREFIX}{n}" for n in numbers])
+        pending = [n for n in numbers if n > seen and f"{_SLOT_PREFIX}{n}" not in slots]
+        end = pending[0] - 1 if pending else numbers[-1]
+        slot_keys = [f"{_SLOT_PREFIX}{n}" for n in range(start, end + 1)]
+        ids = {slots[key] for key in slot_keys if key in slots}
+        stamp_keys = [f"{_STAMP_PREFIX}{sid}" for sid in ids]
+        stamps = {key[len(_STAMP_PREFIX):]: ts for key, ts in cache.get_many(stamp_keys).items()}
+        if stamps:
+            _write(stamps)
+            flushed += len(stamps)
+        # Dropping the stamps lets the next request re-enqueue the session
+        cache.delete_many(slot_keys + stamp_keys)
+        if end >= start:
+            cache.set(_FLUSHED_KEY, end, None)
+        if pending:
+            break
+        start = end + 1
+    cache.set(_SEEN_KEY, head, None)
+    return flushed
+
+
+def _write(stamps: Dict[str, object]) -> None:
+    """Set last_activity to the stamp of each id, where the stored value is older."""
+    items = list(stamps.items())
+    for i in range(0, len(items), _batch_size()):
+        batch = items[i:i + _batch_size()]
+        conditions = [
+            Q(id=sid) & (Q(last_activity__lt=ts) | Q(last_activity__isnull=True)) for sid, ts in batch
+        ]
+        stale = reduce(operator.or_, conditions)
+        whens = [When(condition, then=Value(ts)) for condition, (_, ts) in zip(conditions, batch)]
+        # update() skips auto_now, so the stamps are kept as-is
+        UserSession.objects.filter(stale).update(
+            last_activity=Case(*whens, default=F('last_activity'), output_field=DateTimeField())
+        )
@@ -0,0 +1,88 @@
+"""Signal handlers for the accounts app (connected in AccountsConfig.ready)."""
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .authz import bump_all_authz, bump_user_authz
+from .existence_index import indexed_fields, note_user
+from .models import Membership
+from .perm_codec import clear_registry
+from .user_cache import invalidate_user_state
+
+User = get_user_model()
+
+_M2M_WRITES = {"post_add", "post_remove", "post_clear"}
+
+
+@receiver(post_save, sender=User, dispatch_uid="accounts_user_state_saved")
+@receiver(post_delete, sender=User, dispatch_uid="accounts_user_state_deleted")
+def drop_cached_user_state(sender, instance, **kwargs):
+    # token_version / status / is_active may have changed
+    invalidate_user_state(instance.pk)
+    # ... and so may is_superuser / is_active, which feed the authz snapshot
+    bump_user_authz(instance.pk)
+
+
+@receiver(post_save, sender=User, dispatch_uid="accounts_existence_index_saved")
+def index_user_identifiers(sender, instance, update_fields=None, **kwargs):
+    # Feeds the unique-rule Bloom filter; skip saves like update_last_login
+    if update_fields is not None and not set(update_fields) & set(indexed_fields()):
+        return
+    # Only once the row is committed: a process that sees the new generation
+    # without its journal entry rebuilds from the table, and must find the user
+    transaction.on_commit(lambda: note_user(instance))
+
+
+@receiver(m2m_changed, sender=User.groups.through, dispatch_uid="accounts_authz_user_groups")
+@receiver(m2m_changed, sender=User.user_permissions.through, dispatch_uid="accounts_authz_user_perms")
+def drop_authz_on_user_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in _M2M_WRITES:
+        return
+    if not reverse:
+        bump_user_authz(instance.pk)
+    elif pk_set:
+        # group.user_set.add(...) / permission.user_set.add(...)
+        bump_user_authz(*pk_set)
+    else:
+        # Reverse clear: the affected users are no longer known
+        bump_all_authz()
+
+
+@receiver(m2m_changed, sender=Membership.roles.through, dispatch_uid="accounts_authz_membership_roles")
+def drop_authz_on_roles(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in _M2M_WRITES:
+        return
+    if not reverse:
+        bump_user_authz(instance.user_id)
+    else:
+        bump_all_authz()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through, dispatch_uid="accounts_authz_group_perms")
+def drop_authz_on_group_perms(sender, action, **kwargs):
+    # A group's permissions reach every member in every tenant
+    if action in _M2M_WRITES:
+        bump_all_authz()
+
+
+@receiver(post_save, sender=Membership, dispatch_uid="accounts_authz_membership_saved")
+@receiver(post_delete, sender=Membership, dispatch_uid="accounts_authz_membership_deleted")
+def drop_authz_on_membership(sender, instance, **kwargs):
+    bump_user_authz(instance.user_id)
+
+
+@receiver(post_save, sender=Group, dispatch_uid="accounts_authz_group_saved")
+@receiver(post_delete, sender=Group, dispatch_uid="accounts_authz_group_deleted")
+def drop_authz_on_group(sender, instance, created=False, **kwargs):
+    # Renames and deletes change role names for every member
+    if not created:
+        bump_all_authz()
+
+
+@receiver(post_save, sender=Permission, dispatch_uid="accounts_perm_registry_saved")
+@receiver(post_delete, sender=Permission, dispatch_uid="accounts_perm_registry_deleted")
+def drop_permission_registry(sender, **kwargs):
+    # New tokens must be encoded against the new codename list
+    clear_registry()
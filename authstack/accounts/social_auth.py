@@ -1,12 +1,12 @@
 import jwt
-import requests
-import json
 from datetime import datetime, timedelta
 from django.conf import settings
 from django.utils import timezone
 from typing import Dict, Tuple, Optional
 import logging
 
+from .jwks_cache import APPLE_JWKS, GOOGLE_JWKS
+
 logger = logging.getLogger(__name__)
 
 class SocialAuthService:
@@ -29,13 +29,11 @@ class SocialAuthService:
             except Exception:
                 pass
             
-            # Use PyJWT's JWK client to resolve the correct signing key
-            jwks_url = 'https://www.googleapis.com/oauth2/v3/certs'
+            # Resolve the signing key from the process-wide JWKS cache
             header = jwt.get_unverified_header(id_token)
             logger.debug("[GoogleAuth] Token header kid=%s alg=%s", header.get('kid'), header.get('alg'))
             try:
-                jwk_client = jwt.PyJWKClient(jwks_url)
-                signing_key = jwk_client.get_signing_key_from_jwt(id_token)
+                signing_key = GOOGLE_JWKS.get_signing_key_from_jwt(id_token)
                 public_key = signing_key.key
             except Exception as e:
                 logger.warning("[GoogleAuth] Failed to obtain signing key from JWKs: %s", e)
@@ -99,20 +97,13 @@ class SocialAuthService:
     def verify_apple_token(id_token: str, nonce: str = None) -> Tuple[bool, Dict]:
         """Verify Apple ID token"""
         try:
-            # Get Apple's public keys
-            response = requests.get('https://appleid.apple.com/auth/keys')
-            keys = response.json()['keys']
-            
-            # Get the matching key
+            # Get the matching key from Apple's (cached) public keys
             header = jwt.get_unverified_header(id_token)
-            key = next((k for k in keys if k['kid'] == header['kid']), None)
+            key = APPLE_JWKS.get_signing_key(header.get('kid'))
             
             if not key:
                 return False, {'error': 'Invalid key ID'}
-            
-            # Convert to PEM format
-            from jwt.algorithms import RSAAlgorithm
-            public_key = RSAAlgorithm.from_jwk(json.dumps(key))
+            public_key = key.key
             
             # Verify token
             decoded = jwt.decode(
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from celery import shared_task
+
+from accounts.account_deletion import resume_stalled_jobs, run_deletion_job
+from accounts.session_store import flush_activity
+
+
+@shared_task(bind=True)
+def flush_session_activity(self) -> int:
+    """Write buffered session activity (see accounts.session_store)."""
+    return flush_activity()
+
+
+@shared_task(bind=True)
+def purge_deleted_account(self, job_id: str) -> bool:
+    """Run an AccountDeletionJob in time-boxed slices (see accounts.account_deletion)."""
+    finished = run_deletion_job(job_id)
+    if not finished:
+        self.apply_async(args=[job_id])
+    return finished
+
+
+@shared_task(bind=True)
+def resume_account_deletions(self) -> int:
+    return resume_stalled_jobs()
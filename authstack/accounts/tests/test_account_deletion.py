@@ -0,0 +1,104 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.account_deletion import run_deletion_job, status_token
+from accounts.models import AccountDeletionJob, Membership, UserSession
+from onchannels.models import UserNotification
+from otp_auth.models import OTPRequest
+from tenants.models import Tenant
+from user_sessions.models import Device, Session as RefreshSession
+
+
+class AccountDeletionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.tenant = Tenant.objects.create(slug="ontime", name="Ontime")
+        self.user = User.objects.create_user(username="bye@example.com", email="bye@example.com", password="x")
+        Membership.objects.create(user=self.user, tenant=self.tenant)
+        self.session = UserSession.objects.create(
+            user=self.user,
+            device_id="dev-1",
+            ip_address="127.0.0.1",
+            user_agent="tests",
+            refresh_token_jti="jti-1",
+            expires_at=timezone.now() + timedelta(days=7),
+        )
+        UserNotification.objects.bulk_create(
+            [UserNotification(user=self.user, title=f"n{i}") for i in range(5)]
+        )
+        Device.objects.bulk_create(
+            [Device(user=self.user, device_id=f"dev-{i}", device_name="Phone", device_type="ios") for i in range(5)]
+        )
+        OTPRequest.create_otp("email", "bye@example.com", "login", user=self.user)
+
+    def _delete(self):
+        access = RefreshToken.for_user(self.user).access_token
+        access["tenant_id"] = self.tenant.slug
+        access["session_id"] = str(self.session.id)
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {access}", "HTTP_X_TENANT_ID": "ontime"}
+        # Authenticated POSTs need the double-submit CSRF token
+        csrf = self.client.get("/api/me/", **headers).cookies["csrftoken"].value
+        return self.client.post("/api/me/delete-account/", HTTP_X_CSRFTOKEN=csrf, **headers)
+
+    def test_request_defers_the_purge(self):
+        res = self._delete()
+        self.assertEqual(res.status_code, 200)
+        job = AccountDeletionJob.objects.get(pk=res.data["deletion_job"])
+        self.assertEqual(job.status, AccountDeletionJob.STATUS_PENDING)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertFalse(UserSession.objects.get(pk=self.session.pk).is_active)
+        # Dependents are left for the background job
+        self.assertEqual(Device.objects.filter(user=self.user).count(), 5)
+
+        self.assertEqual(res.data["deletion_status"], AccountDeletionJob.STATUS_PENDING)
+
+        # No credentials: the owner is logged out, the signed URL still works
+        status = self.client.get(res.data["deletion_status_url"], HTTP_X_TENANT_ID="ontime")
+        self.assertEqual(status.status_code, 200)
+        self.assertEqual(status.data["status"], AccountDeletionJob.STATUS_PENDING)
+
+    def test_status_needs_the_job_token(self):
+        job = AccountDeletionJob.objects.create(user=self.user)
+        other = AccountDeletionJob.objects.create(user=User.objects.create_user(username="other", password="x"))
+        url = f"/api/account-deletions/{job.id}/"
+        self.assertEqual(self.client.get(url, HTTP_X_TENANT_ID="ontime").status_code, 404)
+        # Another job's token does not open this one
+        res = self.client.get(url, {"token": status_token(other)}, HTTP_X_TENANT_ID="ontime")
+        self.assertEqual(res.status_code, 404)
+
+        res = self.client.get(url, {"token": status_token(job)}, HTTP_X_TENANT_ID="ontime")
+        self.assertEqual(res.status_code, 200)
+
+        self.client.force_authenticate(User.objects.create_superuser(username="root", password="x"))
+        self.assertEqual(self.client.get(url, HTTP_X_TENANT_ID="ontime").status_code, 200)
+
+    @override_settings(ACCOUNT_DELETION_CHUNK_SIZE=2)
+    def test_job_purges_in_chunks_and_resumes(self):
+        job = AccountDeletionJob.objects.create(user=self.user)
+        # No time budget: stops after the first full chunk
+        self.assertFalse(run_deletion_job(job.pk, budget_seconds=0))
+        job.refresh_from_db()
+        self.assertEqual(job.status, AccountDeletionJob.STATUS_RUNNING)
+        self.assertEqual(job.step, "user_sessions.Device")
+        self.assertEqual(job.progress["user_sessions.Device"], 2)
+
+        self.assertTrue(run_deletion_job(job.pk))
+        job.refresh_from_db()
+        self.assertEqual(job.status, AccountDeletionJob.STATUS_COMPLETED)
+        self.assertEqual(job.progress["user_sessions.Device"], 5)
+        self.assertEqual(job.progress["otp_auth.OTPRequest"], 1)
+        self.assertFalse(Device.objects.filter(user=self.user).exists())
+        self.assertFalse(RefreshSession.objects.filter(user=self.user).exists())
+        self.assertFalse(Membership.objects.filter(user=self.user).exists())
+        # The anonymized user row itself stays, with its content
+        self.assertTrue(User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(UserNotification.objects.filter(user=self.user).count(), 5)
+        self.assertNotIn("channels.UserNotification", job.progress)
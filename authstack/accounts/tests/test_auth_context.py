@@ -0,0 +1,150 @@
+from datetime import timedelta
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import Membership, UserSession
+from accounts.session_cache import get_session_state
+from tenants.models import Tenant
+
+
+class AuthContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.tenant = Tenant.objects.create(slug="ontime", name="Ontime")
+        self.user = User.objects.create_user(username="ctx@example.com", email="ctx@example.com", password="x")
+        Membership.objects.create(user=self.user, tenant=self.tenant)
+        self.session = UserSession.objects.create(
+            user=self.user,
+            device_id="dev-1",
+            ip_address="127.0.0.1",
+            user_agent="tests",
+            refresh_token_jti="jti-1",
+            expires_at=timezone.now() + timedelta(days=7),
+        )
+
+    def _token(self):
+        refresh = RefreshToken.for_user(self.user)
+        access = refresh.access_token
+        access["tenant_id"] = self.tenant.slug
+        access["session_id"] = str(self.session.id)
+        return str(access)
+
+    def test_access_token_decoded_once_per_request(self):
+        token = self._token()
+        with mock.patch.object(TokenBackend, "decode", autospec=True, side_effect=TokenBackend.decode) as decode:
+            resp = self.client.get("/api/me/", HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_X_TENANT_ID="ontime")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(decode.call_count, 1)
+
+    def test_revoked_session_rejected(self):
+        token = self._token()
+        UserSession.objects.filter(id=self.session.id).update(is_active=False, revoked_at=timezone.now())
+        resp = self.client.get("/api/me/", HTTP_AUTHORIZATION=f"Bearer {token}", HTTP_X_TENANT_ID="ontime")
+        self.assertEqual(resp.status_code, 401)
+        self.assertEqual(resp.json().get("code"), "SESSION_REVOKED")
+
+    def test_session_state_served_from_cache(self):
+        self.assertFalse(get_session_state(self.session.id).revoked)
+        with self.assertNumQueries(0):
+            state = get_session_state(self.session.id)
+        self.assertEqual(state.user_id, str(self.user.id))
+
+    def test_revoke_invalidates_cached_state(self):
+        token = self._token()
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}", "HTTP_X_TENANT_ID": "ontime"}
+        self.assertEqual(self.client.get("/api/me/", **headers).status_code, 200)
+        self.session.revoke("tests")
+        resp = self.client.get("/api/me/", **headers)
+        self.assertEqual(resp.status_code, 401)
+        self.assertEqual(resp.json().get("code"), "SESSION_REVOKED")
+
+    def test_user_loaded_once_per_request(self):
+        token = self._token()
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}", "HTTP_X_TENANT_ID": "ontime"}
+        with mock.patch.object(User.objects, "get", wraps=User.objects.get) as get:
+            self.assertEqual(self.client.get("/api/me/", **headers).status_code, 200)
+        self.assertEqual(get.call_count, 1)
+        # Second request: token checks come from the cached user state
+        with mock.patch.object(User.objects, "get", wraps=User.objects.get) as get:
+            self.assertEqual(self.client.get("/api/me/", **headers).status_code, 200)
+        self.assertEqual(get.call_count, 1)
+
+    def test_deactivation_invalidates_cached_user_state(self):
+        token = self._token()
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}", "HTTP_X_TENANT_ID": "ontime"}
+        self.assertEqual(self.client.get("/api/me/", **headers).status_code, 200)
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.assertEqual(self.client.get("/api/me/", **headers).status_code, 401)
+
+    def test_stateless_csrf_cookie_issued_once(self):
+        token = self._token()
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}", "HTTP_X_TENANT_ID": "ontime"}
+        resp = self.client.get("/api/me/", **headers)
+        self.assertIn("csrftoken", resp.cookies)
+        self.assertNotIn("sessionid", resp.cookies)
+        # Client already holds the current token: nothing to re-send
+        resp = self.client.get("/api/me/", **headers)
+        self.assertNotIn("csrftoken", resp.cookies)
+
+    def test_stateless_csrf_rejects_a_forged_pair(self):
+        token = self._token()
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}", "HTTP_X_TENANT_ID": "ontime"}
+        issued = self.client.get("/api/me/", **headers).cookies["csrftoken"].value
+
+        self.client.cookies["csrftoken"] = "a" * 32
+        resp = self.client.post("/api/me/permissions/", HTTP_X_CSRFTOKEN="a" * 32, **headers)
+        self.assertEqual(resp.status_code, 403)
+        # The reject hands back the session's token so the client can retry
+        self.assertEqual(resp.cookies["csrftoken"].value, issued)
+
+        # The issued token passes CSRF and reaches the view (GET only)
+        self.client.cookies["csrftoken"] = issued
+        resp = self.client.post("/api/me/permissions/", HTTP_X_CSRFTOKEN=issued, **headers)
+        self.assertEqual(resp.status_code, 405)
+
+    def test_login_and_refresh_cookies_pass_the_first_write(self):
+        user = User.objects.create_user(username="writer@example.com", email="writer@example.com", password="p@ssw0rd!123")
+        membership = Membership.objects.create(user=user, tenant=self.tenant)
+        membership.roles.add(Group.objects.get_or_create(name="AdminFrontend")[0])
+
+        resp = self.client.post(
+            "/api/token/",
+            {"username": user.username, "password": "p@ssw0rd!123"},
+            format="json",
+            HTTP_X_TENANT_ID="ontime",
+        )
+        self.assertEqual(resp.status_code, 200)
+        csrf = resp.cookies["csrftoken"].value
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {resp.data['access']}", "HTTP_X_TENANT_ID": "ontime"}
+        # Passes CSRF and reaches the view (GET only)
+        resp = self.client.post("/api/me/permissions/", HTTP_X_CSRFTOKEN=csrf, **headers)
+        self.assertEqual(resp.status_code, 405)
+
+        resp = self.client.post("/api/token/refresh/", HTTP_X_TENANT_ID="ontime")
+        self.assertEqual(resp.status_code, 200)
+        csrf = resp.cookies["csrftoken"].value
+        headers["HTTP_AUTHORIZATION"] = f"Bearer {resp.data['access']}"
+        resp = self.client.post("/api/me/permissions/", HTTP_X_CSRFTOKEN=csrf, **headers)
+        self.assertEqual(resp.status_code, 405)
+
+    async def test_asgi_chain(self):
+        client = AsyncClient()
+        headers = {"Authorization": f"Bearer {self._token()}", "X-Tenant-Id": "ontime"}
+        resp = await client.get("/api/me/", headers=headers)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn("csrftoken", resp.cookies)
+        await sync_to_async(self.session.revoke)("tests")
+        resp = await client.get("/api/me/", headers=headers)
+        self.assertEqual(resp.status_code, 401)
+        self.assertEqual(resp.json().get("code"), "SESSION_REVOKED")
@@ -0,0 +1,48 @@
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.test import TestCase
+
+from accounts.authz import get_user_authz
+from accounts.models import Membership
+from tenants.models import Tenant
+
+
+class AuthzSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.tenant = Tenant.objects.create(slug="ontime", name="Ontime")
+        self.user = User.objects.create_user(username="authz@example.com", password="x")
+        self.admin_fe = Group.objects.create(name="AdminFrontend")
+        self.viewer = Group.objects.create(name="Viewer")
+        self.membership = Membership.objects.create(user=self.user, tenant=self.tenant)
+
+    def test_snapshot_is_cached(self):
+        first = get_user_authz(self.user, self.tenant)
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_user_authz(user, self.tenant), first)
+
+    def test_group_change_invalidates(self):
+        self.assertFalse(get_user_authz(self.user, self.tenant).is_admin_frontend)
+        self.user.groups.add(self.admin_fe)
+        self.assertTrue(get_user_authz(self.user, self.tenant).is_admin_frontend)
+        self.admin_fe.user_set.remove(self.user)
+        self.assertFalse(get_user_authz(self.user, self.tenant).is_admin_frontend)
+
+    def test_tenant_roles_and_permissions(self):
+        perm = Permission.objects.get(codename="change_live")
+        self.assertEqual(get_user_authz(self.user, self.tenant).tenant_roles, ())
+        self.membership.roles.add(self.admin_fe)
+        snap = get_user_authz(self.user, self.tenant)
+        self.assertEqual(snap.tenant_roles, ("AdminFrontend",))
+        self.assertTrue(snap.is_tenant_admin_frontend)
+        self.assertFalse(snap.is_admin_frontend)
+
+        # Group permission changes reach every member
+        self.admin_fe.permissions.add(perm)
+        snap = get_user_authz(self.user, self.tenant)
+        self.assertIn("live.change_live", snap.effective_permissions)
+        self.assertFalse(snap.has_perm("live.change_live"))
+
+        self.membership.delete()
+        self.assertEqual(get_user_authz(self.user, self.tenant).tenant_roles, ())
@@ -0,0 +1,81 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from accounts import existence_index
+from accounts.field_rules import assert_linear, validate_field
+
+UNIQUE_EMAIL = [{'rule': 'unique', 'model': 'User', 'field': 'email'}]
+
+
+class PatternRegistryTests(TestCase):
+    def test_only_registered_patterns_run(self):
+        rule = {'rule': 'pattern', 'pattern_id': 'username'}
+        self.assertEqual(validate_field('username', 'user_1', [rule]), [])
+        self.assertEqual(validate_field('username', 'user@1', [rule]), ['Invalid format'])
+        # Raw source of a registered pattern (older clients)
+        self.assertEqual(validate_field('username', 'user_1', [{'rule': 'pattern', 'value': '^[a-zA-Z0-9_]+$'}]), [])
+        evil = {'rule': 'pattern', 'value': '^(a+)+$'}
+        self.assertEqual(validate_field('username', 'a' * 40 + '!', [evil]), ['Unsupported validation pattern'])
+
+    def test_linear_guard(self):
+        for pattern in (r'^(a+)+$', r'(a|aa)*', r'(\w+)\1', r'^(\d*)*$'):
+            with self.assertRaises(ValueError, msg=pattern):
+                assert_linear(pattern)
+        assert_linear(r'^\+?[1-9]\d{1,14}$')
+        assert_linear(r'^(abc)?[a-z]+@(?:x|y)\.com$')
+
+    def test_long_values_are_rejected_up_front(self):
+        self.assertEqual(len(validate_field('username', 'a' * 1000, [{'rule': 'required'}])), 1)
+
+
+@override_settings(SHARED_CACHE=True)
+class UniqueRuleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        existence_index.reset_index()
+        User.objects.create_user(username='taken', email='taken@example.com')
+
+    def test_misses_skip_the_database(self):
+        self.assertEqual(validate_field('email', 'taken@example.com', UNIQUE_EMAIL), ['email already exists'])
+        with self.assertNumQueries(0):
+            self.assertEqual(validate_field('email', 'free@example.com', UNIQUE_EMAIL), [])
+        # Filter positives are confirmed exactly
+        self.assertEqual(validate_field('email', 'TAKEN@example.com', UNIQUE_EMAIL), [])
+
+    def test_new_users_are_seen_without_a_rebuild(self):
+        validate_field('email', 'warm@example.com', UNIQUE_EMAIL)
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user(username='later', email='later@example.com')
+        self.assertEqual(validate_field('email', 'later@example.com', UNIQUE_EMAIL), ['email already exists'])
+        self.assertTrue(existence_index.might_exist('username', 'LATER'))
+
+    def test_evicted_journal_forces_rebuild(self):
+        validate_field('email', 'warm@example.com', UNIQUE_EMAIL)
+        with self.captureOnCommitCallbacks(execute=True):
+            User.objects.create_user(username='gone', email='gone@example.com')
+        cache.delete_many([f"auth:exists:j:{g}" for g in range(1, 10)])
+        self.assertEqual(validate_field('email', 'gone@example.com', UNIQUE_EMAIL), ['email already exists'])
+
+    def test_journal_waits_for_the_commit(self):
+        validate_field('email', 'warm@example.com', UNIQUE_EMAIL)
+        generation = cache.get("auth:exists:gen")
+        with self.captureOnCommitCallbacks() as callbacks:
+            User.objects.create_user(username='pending', email='pending@example.com')
+            # Not committed yet: other processes must not be told about it
+            self.assertEqual(cache.get("auth:exists:gen"), generation)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(cache.get("auth:exists:gen"), generation)
+        self.assertEqual(validate_field('email', 'pending@example.com', UNIQUE_EMAIL), ['email already exists'])
+
+    def test_unknown_fields_are_ignored(self):
+        rules = [{'rule': 'unique', 'model': 'User', 'field': 'phone_e164'}]
+        self.assertEqual(validate_field('phone', '+251900000000', rules), [])
+
+    @override_settings(SHARED_CACHE=False)
+    def test_without_a_shared_cache_the_database_decides(self):
+        validate_field('email', 'warm@example.com', UNIQUE_EMAIL)
+        # Created by another worker: no journal entry reaches this process
+        User.objects.bulk_create([User(username='elsewhere', email='elsewhere@example.com')])
+        self.assertEqual(validate_field('email', 'elsewhere@example.com', UNIQUE_EMAIL), ['email already exists'])
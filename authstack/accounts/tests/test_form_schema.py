@@ -0,0 +1,62 @@
+import json
+
+from django.test import TestCase
+
+from accounts.form_views import compile_form_schema
+from tenants.models import Tenant
+
+
+class FormSchemaCacheTests(TestCase):
+    url = '/api/forms/schema/'
+
+    def setUp(self):
+        compile_form_schema.cache_clear()
+        Tenant.objects.create(name="Default", slug="default", active=True)
+        self.client.defaults['HTTP_X_TENANT_ID'] = 'default'
+
+    def test_etag_revalidation(self):
+        res = self.client.get(self.url, {'action': 'login'})
+        self.assertEqual(res.status_code, 200)
+        etag = res['ETag']
+        self.assertIn('Last-Modified', res)
+        self.assertNotIn('timestamp', res.json()['metadata'])
+
+        again = self.client.get(self.url, {'action': 'login'})
+        self.assertEqual(again['ETag'], etag)
+        self.assertEqual(again.content, res.content)
+
+        res = self.client.get(self.url, {'action': 'login'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 304)
+        self.assertEqual(res.content, b'')
+
+        res = self.client.get(self.url, {'action': 'login', 'theme': 'dark'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['metadata']['theme'], 'dark')
+
+    def test_context_is_part_of_the_key(self):
+        plain = self.client.get(self.url, {'action': 'login'})
+        ignored = self.client.get(self.url, {'action': 'login', 'context': json.dumps({'tenant_id': 'x'})})
+        self.assertEqual(ignored['ETag'], plain['ETag'])
+
+        no_social = self.client.get(self.url, {'action': 'login', 'context': json.dumps({'disable_social': True})})
+        self.assertNotEqual(no_social['ETag'], plain['ETag'])
+        self.assertFalse(no_social.json()['social_auth']['enabled'])
+        # The cached default schema was not modified in place
+        self.assertTrue(self.client.get(self.url, {'action': 'login'}).json()['social_auth']['enabled'])
+
+    def test_verification_actions_and_unknown_action(self):
+        for action in ('verify_email', 'verify_phone', 'verify_otp', 'reset_password', 'register'):
+            self.assertEqual(self.client.get(self.url, {'action': action}).status_code, 200, action)
+        self.assertEqual(self.client.get(self.url, {'action': 'nope'}).status_code, 400)
+
+    def test_unknown_locales_and_themes_share_the_default_entry(self):
+        self.client.get(self.url, {'action': 'login'})
+        for i in range(3):
+            res = self.client.get(self.url, {'action': 'login', 'locale': f'xx{i}', 'theme': f't{i}'})
+            self.assertEqual(res.json()['metadata'], {'version': '1.0.0', 'locale': 'en', 'theme': 'light'})
+        self.client.get(self.url, {'action': 'nope'})
+        self.assertEqual(compile_form_schema.cache_info().currsize, 1)
+
+        res = self.client.get(self.url, {'action': 'login', 'locale': 'AM-et', 'theme': 'Dark'})
+        self.assertEqual(res.json()['metadata']['locale'], 'am')
+        self.assertEqual(res.json()['metadata']['theme'], 'dark')
@@ -0,0 +1,42 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from tenants.models import Tenant
+
+
+@override_settings(OTP_BACKEND='otp_auth.backends.CacheOTPBackend', OTP_AUDIT_ASYNC=False)
+class FormOTPFlowTests(TestCase):
+    """Form submissions create OTPs through OTP_BACKEND, so /api/auth/otp/verify/ accepts them."""
+
+    def setUp(self):
+        cache.clear()
+        Tenant.objects.create(slug="ontime", name="Ontime")
+        self.client = APIClient()
+        self.client.defaults['HTTP_X_TENANT_ID'] = 'ontime'
+
+    def _verify(self, otp_id):
+        return self.client.post('/api/auth/otp/verify/', {'otp_id': otp_id, 'otp_code': '123456'}, format='json')
+
+    def _submit(self, action, data):
+        with mock.patch('otp_auth.backends.generate_otp_code', return_value='123456'):
+            return self.client.post('/api/forms/submit/', {'action': action, 'data': data}, format='json')
+
+    def test_password_reset(self):
+        User.objects.create_user(username='reset', email='reset@example.com', password='x')
+        res = self._submit('reset_password', {'email': 'reset@example.com'})
+        self.assertEqual(res.status_code, 200)
+        verified = self._verify(res.json()['otp_id'])
+        self.assertEqual(verified.status_code, 200, verified.json())
+
+    def test_registration_verification(self):
+        res = self._submit('register', {
+            'username': 'newbie', 'email': 'newbie@example.com',
+            'password': 'Passw0rd!x', 'confirm_password': 'Passw0rd!x',
+        })
+        self.assertEqual(res.status_code, 201)
+        verified = self._verify(res.json()['otp_id'])
+        self.assertEqual(verified.status_code, 200, verified.json())
@@ -0,0 +1,78 @@
+import json
+import time
+from unittest import mock
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from jwt.algorithms import RSAAlgorithm
+
+from accounts.jwks_cache import JWKSCache
+
+
+def _jwk(kid):
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    data = json.loads(RSAAlgorithm.to_jwk(key.public_key()))
+    data.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return key, data
+
+
+def _response(keys, cache_control="public, max-age=300"):
+    resp = mock.Mock()
+    resp.json.return_value = {"keys": keys}
+    resp.headers = {"Cache-Control": cache_control}
+    resp.raise_for_status.return_value = None
+    return resp
+
+
+@override_settings(JWKS_MIN_REFETCH_SECONDS=60, JWKS_EMPTY_RETRY_SECONDS=2, JWKS_MAX_STALE_SECONDS=600)
+class JWKSCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.private, self.jwk = _jwk("k1")
+        self.jwks = JWKSCache("test", "https://example.invalid/certs")
+
+    def test_keys_are_fetched_once_and_shared(self):
+        token = jwt.encode({"sub": "1"}, self.private, algorithm="RS256", headers={"kid": "k1"})
+        with mock.patch("accounts.jwks_cache.requests.get", return_value=_response([self.jwk])) as get:
+            for _ in range(3):
+                key = self.jwks.get_signing_key_from_jwt(token)
+                self.assertEqual(jwt.decode(token, key.key, algorithms=["RS256"])["sub"], "1")
+            self.assertEqual(get.call_count, 1)
+            self.assertLessEqual(self.jwks._fresh_until - time.time(), 300)
+
+            # A new process starts warm from the shared cache
+            other = JWKSCache("test", "https://example.invalid/certs")
+            self.assertIsNotNone(other.get_signing_key("k1"))
+            self.assertEqual(get.call_count, 1)
+
+    def test_unknown_kid_refetch_is_rate_limited(self):
+        _, rotated = _jwk("k2")
+        with mock.patch("accounts.jwks_cache.requests.get", return_value=_response([self.jwk])) as get:
+            self.assertIsNotNone(self.jwks.get_signing_key("k1"))
+            self.assertIsNone(self.jwks.get_signing_key("k2"))
+            self.assertEqual(get.call_count, 1)
+
+        self.jwks._last_fetch -= 61
+        with mock.patch("accounts.jwks_cache.requests.get", return_value=_response([self.jwk, rotated])) as get:
+            self.assertIsNotNone(self.jwks.get_signing_key("k2"))
+            self.assertIsNone(self.jwks.get_signing_key("nope"))
+            self.assertEqual(get.call_count, 1)
+
+    def test_expired_keys_are_served_while_refreshing(self):
+        with mock.patch("accounts.jwks_cache.requests.get", return_value=_response([self.jwk])):
+            self.jwks.get_signing_key("k1")
+        self.jwks._fresh_until = time.time() - 1
+        with mock.patch.object(self.jwks, "_refresh_in_background") as refresh:
+            self.assertIsNotNone(self.jwks.get_signing_key("k1"))
+            refresh.assert_called_once()
+
+    def test_failed_cold_fetch_is_retried_soon(self):
+        with mock.patch("accounts.jwks_cache.requests.get", side_effect=ConnectionError("down")):
+            self.assertIsNone(self.jwks.get_signing_key("k1"))
+        # Not the 60s rotation limit: only the short empty-cache backoff
+        self.jwks._last_fetch -= 3
+        with mock.patch("accounts.jwks_cache.requests.get", return_value=_response([self.jwk])) as get:
+            self.assertIsNotNone(self.jwks.get_signing_key("k1"))
+            self.assertEqual(get.call_count, 1)
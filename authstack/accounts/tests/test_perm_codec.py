@@ -0,0 +1,56 @@
+import base64
+
+from django.contrib.auth.models import Group, Permission, User
+from django.core.cache import cache
+from django.test import TestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from accounts.models import Membership
+from accounts.perm_codec import (
+    BITS_CLAIM,
+    VERSION_CLAIM,
+    clear_registry,
+    current_registry,
+)
+from accounts.serializers import CookieTokenObtainPairSerializer
+from tenants.models import Tenant
+
+
+class PermissionClaimTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        clear_registry()
+        self.user = User.objects.create_user(username="perms@example.com", password="Root@1324")
+        group = Group.objects.create(name="Editors")
+        group.permissions.add(*Permission.objects.filter(content_type__app_label="live"))
+        self.user.groups.add(group)
+        self.expected = set(User.objects.get(pk=self.user.pk).get_all_permissions())
+
+    def test_token_carries_bitset_not_list(self):
+        access = CookieTokenObtainPairSerializer.get_token(self.user).access_token
+        self.assertNotIn("perms", access.payload)
+        self.assertEqual(access[VERSION_CLAIM], current_registry().version)
+        self.assertLess(len(access[BITS_CLAIM]), 100)
+        bits = AccessToken(str(access))[BITS_CLAIM]
+        bits = int.from_bytes(base64.urlsafe_b64decode(bits + "=" * (-len(bits) % 4)), "little")
+        codenames = current_registry().codenames
+        self.assertEqual({name for i, name in enumerate(codenames) if bits >> i & 1}, self.expected)
+
+    def test_permissions_endpoint(self):
+        tenant = Tenant.objects.create(slug="ontime", name="Ontime")
+        Membership.objects.create(user=self.user, tenant=tenant)
+        client = APIClient()
+        client.force_authenticate(self.user)
+        resp = client.get("/api/me/permissions/", HTTP_X_TENANT_ID="ontime")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(set(resp.data["permissions"]), self.expected)
+        self.assertIn("private", resp["Cache-Control"])
+        again = client.get("/api/me/permissions/", HTTP_X_TENANT_ID="ontime", HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(again.status_code, 304)
+        # Proxies weaken ETags, and clients may send several
+        for header in ("W/" + resp["ETag"], '"stale", ' + resp["ETag"]):
+            again = client.get("/api/me/permissions/", HTTP_X_TENANT_ID="ontime", HTTP_IF_NONE_MATCH=header)
+            self.assertEqual(again.status_code, 304, header)
+        stale = client.get("/api/me/permissions/", HTTP_X_TENANT_ID="ontime", HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(stale.status_code, 200)
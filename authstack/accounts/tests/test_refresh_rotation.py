@@ -0,0 +1,79 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.jwt_auth import RefreshTokenRotation
+from accounts.models import UserSession
+from accounts.session_store import hash_refresh_token
+from user_sessions.models import Session as RefreshSession
+
+
+class RefreshRotationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="rot@example.com", password="x")
+        refresh = RefreshToken.for_user(self.user)
+        self.session = UserSession.objects.create(
+            user=self.user,
+            device_id="dev-1",
+            ip_address="127.0.0.1",
+            user_agent="tests",
+            refresh_token_jti=refresh["jti"],
+            expires_at=timezone.now() + timedelta(days=7),
+        )
+        refresh["session_id"] = str(self.session.id)
+        refresh["tenant_id"] = "ontime"
+        self.refresh = str(refresh)
+
+    def test_rotation_swaps_jti_and_records_hash(self):
+        tokens = RefreshTokenRotation.rotate_refresh_token(self.refresh)
+        new = RefreshToken(tokens["refresh"])
+        self.assertEqual(new["session_id"], str(self.session.id))
+        self.assertEqual(new["tenant_id"], "ontime")
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.refresh_token_jti, new["jti"])
+        self.assertEqual(self.session.rotation_counter, 1)
+        self.assertEqual(self.session.refresh_token_hash, hash_refresh_token(tokens["refresh"]))
+        # The legacy view reads the same row
+        self.assertEqual(RefreshSession.objects.get(id=self.session.id).rotation_counter, 1)
+        # Rotating the new token works too
+        RefreshTokenRotation.rotate_refresh_token(tokens["refresh"])
+
+    def test_concurrent_refresh_rejected_without_revoking(self):
+        RefreshTokenRotation.rotate_refresh_token(self.refresh)
+        with self.assertRaisesMessage(InvalidToken, "already rotated"):
+            RefreshTokenRotation.rotate_refresh_token(self.refresh)
+        self.session.refresh_from_db()
+        self.assertTrue(self.session.is_active)
+
+    @override_settings(REFRESH_REUSE_GRACE_SECONDS=-1)
+    def test_reuse_revokes_session(self):
+        RefreshTokenRotation.rotate_refresh_token(self.refresh)
+        with self.assertRaisesMessage(InvalidToken, "reuse detected"):
+            RefreshTokenRotation.rotate_refresh_token(self.refresh)
+        self.session.refresh_from_db()
+        self.assertFalse(self.session.is_active)
+        self.assertIsNotNone(RefreshSession.objects.get(id=self.session.id).revoked_at)
+
+    def test_recent_activity_does_not_hide_a_replay(self):
+        RefreshTokenRotation.rotate_refresh_token(self.refresh)
+        # Rotated a while ago, but the victim is active right now
+        UserSession.objects.filter(id=self.session.id).update(
+            rotated_at=timezone.now() - timedelta(minutes=5), last_activity=timezone.now()
+        )
+        with self.assertRaisesMessage(InvalidToken, "reuse detected"):
+            RefreshTokenRotation.rotate_refresh_token(self.refresh)
+        self.session.refresh_from_db()
+        self.assertFalse(self.session.is_active)
+
+    def test_revoked_session_blocks_rotation(self):
+        UserSession.objects.filter(id=self.session.id).update(is_active=False, revoked_at=timezone.now())
+        with self.assertRaises(InvalidToken):
+            RefreshTokenRotation.rotate_refresh_token(self.refresh)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.refresh_token_jti, RefreshToken(self.refresh)["jti"])
@@ -0,0 +1,39 @@
+from django.test import SimpleTestCase
+
+from common.route_policy import (
+    ADMIN_POLICY,
+    API_POLICY,
+    DEFAULT_POLICY,
+    RoutePolicyRegistry,
+    route_policy,
+)
+
+
+class RoutePolicyRegistryTests(SimpleTestCase):
+    def setUp(self):
+        self.registry = RoutePolicyRegistry()
+
+    def test_area_defaults(self):
+        self.assertEqual(self.registry.lookup("/api/me/"), API_POLICY)
+        self.assertEqual(self.registry.lookup("/api/sessions/00000000-0000-0000-0000-000000000000/"), API_POLICY)
+        self.assertEqual(self.registry.lookup(f"{self.registry.admin_prefix}login/"), ADMIN_POLICY)
+        self.assertEqual(self.registry.lookup("/somewhere/"), DEFAULT_POLICY)
+
+    def test_public_auth_endpoints(self):
+        for path in ("/api/token/", "/api/token/refresh/", "/api/register/", "/api/social/login/"):
+            policy = self.registry.lookup(path)
+            self.assertTrue(policy.tenant_required, path)
+            self.assertFalse(policy.session_binding, path)
+            self.assertFalse(policy.csrf_double_submit, path)
+        verify = self.registry.lookup("/api/password-reset/verify/")
+        self.assertTrue(verify.session_binding)
+        self.assertFalse(verify.csrf_double_submit)
+
+    def test_version_gate_exemptions(self):
+        self.assertFalse(self.registry.lookup("/api/logout/").version_gate)
+        self.assertFalse(self.registry.lookup("/api/channels/version/check/").version_gate)
+        self.assertTrue(self.registry.lookup("/api/channels/features/").version_gate)
+
+    def test_unknown_field_rejected(self):
+        with self.assertRaises(TypeError):
+            route_policy(skip_everything=True)
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import UserSession
+from accounts.session_cache import get_session_state
+from accounts.session_revocation import enforce_session_limit, revoke_sessions
+from user_sessions.models import Session as RefreshSession
+
+
+class SessionRevocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="limit@example.com", password="x")
+        now = timezone.now()
+        self.sessions = []
+        for i in range(4):
+            s = UserSession.objects.create(
+                user=self.user,
+                device_id=f"dev-{i}",
+                refresh_token_jti=f"jti-{i}",
+                ip_address="127.0.0.1",
+                user_agent="tests",
+                expires_at=now + timedelta(days=7),
+            )
+            # last_activity is auto_now, so spread it out explicitly
+            UserSession.objects.filter(id=s.id).update(last_activity=now - timedelta(minutes=10 - i))
+            self.sessions.append(s)
+
+    def test_limit_revokes_oldest_in_one_update(self):
+        current = self.sessions[0]
+        # Warm the cache so invalidation is observable
+        for s in self.sessions:
+            get_session_state(s.id)
+        with self.assertNumQueries(2):  # SELECT, UPDATE
+            revoked = enforce_session_limit(
+                UserSession.objects.filter(user=self.user, is_active=True),
+                2,
+                'last_activity',
+                keep_id=current.id,
+            )
+        self.assertEqual(set(revoked), {self.sessions[1].id})
+        active = set(UserSession.objects.filter(is_active=True).values_list('id', flat=True))
+        self.assertEqual(active, {current.id, self.sessions[2].id, self.sessions[3].id})
+        rs = RefreshSession.objects.get(id=self.sessions[1].id)
+        self.assertEqual(rs.revoke_reason, 'session_limit_exceeded')
+        self.assertIsNotNone(rs.revoked_at)
+        self.assertTrue(get_session_state(self.sessions[1].id).revoked)
+
+    def test_revoke_sessions_skips_already_revoked(self):
+        ids = [s.id for s in self.sessions[:2]]
+        self.assertEqual(revoke_sessions(ids, 'logout'), 2)
+        self.assertEqual(revoke_sessions(ids, 'logout'), 0)
+        self.assertEqual(RefreshSession.objects.filter(revoked_at__isnull=False).count(), 2)
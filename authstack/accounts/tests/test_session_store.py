@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import UserSession
+from accounts.session_store import flush_activity, hash_refresh_token, record_activity
+from user_sessions.models import Session as RefreshSession
+
+
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="store@example.com", password="x")
+        self.session = UserSession.objects.create(
+            user=self.user,
+            device_id="dev-1",
+            ip_address="127.0.0.1",
+            user_agent="tests",
+            refresh_token_jti="jti-1",
+            expires_at=timezone.now() + timedelta(days=7),
+        )
+        self.old = timezone.now() - timedelta(hours=1)
+        UserSession.objects.filter(id=self.session.id).update(last_activity=self.old)
+
+    def test_legacy_view_reads_the_session_row(self):
+        UserSession.objects.filter(id=self.session.id).update(
+            refresh_token_hash=hash_refresh_token("refresh-1"), refresh_token_family="jti-1", rotation_counter=2
+        )
+        rs = RefreshSession.objects.get(id=self.session.id)
+        self.assertEqual(rs.user_id, self.user.id)
+        self.assertEqual(rs.refresh_token_hash, hash_refresh_token("refresh-1"))
+        self.assertEqual(rs.rotation_counter, 2)
+        self.assertEqual(rs.last_used_at, self.old)
+        self.assertIsNone(rs.revoked_at)
+        self.assertTrue(rs.is_valid())
+
+        # An inactive row reads as revoked even without a revoked_at stamp
+        UserSession.objects.filter(id=self.session.id).update(is_active=False)
+        rs = RefreshSession.objects.get(id=self.session.id)
+        self.assertEqual(rs.revoked_at, self.old)
+        self.assertFalse(rs.is_valid())
+
+    @override_settings(SHARED_CACHE=True)
+    def test_activity_is_buffered_until_flush(self):
+        seen = timezone.now()
+        with self.assertNumQueries(0):
+            record_activity(self.session.id, seen)
+            record_activity(self.session.id)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.last_activity, self.old)
+
+        self.assertEqual(flush_activity(), 1)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.last_activity, seen)
+        self.assertEqual(RefreshSession.objects.get(id=self.session.id).last_used_at, seen)
+        self.assertEqual(flush_activity(), 0)
+
+        # Flushed sessions are enqueued again on their next request
+        record_activity(self.session.id)
+        self.assertEqual(flush_activity(), 1)
+
+    @override_settings(SESSION_ACTIVITY_WRITE_BEHIND=False)
+    def test_no_writes_when_disabled(self):
+        with self.assertNumQueries(0):
+            record_activity(self.session.id, timezone.now())
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.last_activity, self.old)
+        self.assertEqual(flush_activity(), 0)
+
+    @override_settings(SHARED_CACHE=False)
+    def test_no_writes_without_shared_cache(self):
+        # A per-process buffer would never be flushed by the worker
+        with self.assertNumQueries(0):
+            record_activity(self.session.id, timezone.now())
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.last_activity, self.old)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_flush_waits_for_a_slot_being_filled(self):
+        # record_activity between its incr and set when the flush runs
+        cache.add(f"auth:activity:{self.session.id}", timezone.now(), None)
+        cache.set("auth:activity:seq", 1, None)
+        self.assertEqual(flush_activity(), 0)
+        cache.set("auth:activity:slot:1", str(self.session.id), None)
+        self.assertEqual(flush_activity(), 1)
+
+        # A slot that is still missing on the next flush has expired
+        cache.set("auth:activity:seq", 2, None)
+        flush_activity()
+        record_activity(self.session.id)
+        self.assertEqual(flush_activity(), 1)
+        self.assertEqual(cache.get("auth:activity:flushed"), 3)
+
+    @override_settings(SHARED_CACHE=True)
+    def test_flush_never_moves_activity_backwards(self):
+        stale = timezone.now()
+        record_activity(self.session.id, stale)
+        # A rotation writes a newer value before the flush
+        newer = stale + timedelta(seconds=30)
+        UserSession.objects.filter(id=self.session.id).update(last_activity=newer)
+        flush_activity()
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.last_activity, newer)
+        self.assertEqual(RefreshSession.objects.get(id=self.session.id).last_used_at, newer)
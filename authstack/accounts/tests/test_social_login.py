@@ -0,0 +1,53 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import SocialAccount, UserSession
+from tenants.models import Tenant
+from user_sessions.models import Device
+
+
+@override_settings(WEB_MAX_CONCURRENT_SESSIONS=2)
+class SocialLoginSessionLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        Tenant.objects.create(slug="ontime", name="Ontime")
+        self.user = User.objects.create_user(username="social@example.com", email="social@example.com")
+        SocialAccount.objects.create(user=self.user, provider="google", provider_id="g-1", email="social@example.com")
+        now = timezone.now()
+        for i in range(2):
+            s = UserSession.objects.create(
+                user=self.user,
+                device_id=f"web-{i}",
+                device_type="web",
+                ip_address="127.0.0.1",
+                user_agent="tests",
+                refresh_token_jti=f"jti-{i}",
+                expires_at=now + timedelta(days=7),
+            )
+            UserSession.objects.filter(id=s.id).update(last_activity=now - timedelta(minutes=10 - i))
+        # A device with no session yet, so the login opens a new one
+        Device.objects.create(user=self.user, device_id="laptop", device_name="Laptop", device_type="web")
+
+    @mock.patch("accounts.social_auth.SocialAuthService.verify_google_token")
+    def test_login_at_the_limit_revokes_the_oldest(self, verify):
+        verify.return_value = (True, {"provider_id": "g-1", "email": "social@example.com"})
+        resp = self.client.post(
+            "/api/social/login/",
+            {"provider": "google", "token": "t"},
+            format="json",
+            HTTP_X_TENANT_ID="ontime",
+            HTTP_X_DEVICE_ID="laptop",
+            HTTP_X_DEVICE_TYPE="web",
+        )
+        self.assertEqual(resp.status_code, 200)
+        active = UserSession.objects.filter(user=self.user, is_active=True)
+        self.assertEqual(active.count(), 2)
+        self.assertTrue(active.filter(registered_device__device_id="laptop").exists())
+        self.assertFalse(active.filter(device_id="web-0").exists())
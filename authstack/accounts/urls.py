@@ -4,6 +4,7 @@ from .views import (
     CookieTokenRefreshView,
     LogoutView,
     MeView,
+    MePermissionsView,
     RequestEmailVerificationView,
     VerifyEmailView,
     ChangePasswordView,
@@ -14,6 +15,7 @@ from .views import (
     VerifyPasswordResetCodeView,
     ConfirmPasswordResetView,
     DeleteMeView,
+    AccountDeletionStatusView,
     AdminOnlyView,
     UserWriteView,
     RegisterView,
@@ -44,6 +46,7 @@ urlpatterns = [
     path("register/", RegisterView.as_view(), name="register"),
 
     path("me/", MeView.as_view(), name="me"),
+    path("me/permissions/", MePermissionsView.as_view(), name="me_permissions"),
     path("me/request-email-verification/", RequestEmailVerificationView.as_view(), name="request_email_verification"),
     path("me/verify-email/", VerifyEmailView.as_view(), name="verify_email"),
     path("me/request-security-otp/", RequestSecurityOtpView.as_view(), name="me_request_security_otp"),
@@ -51,6 +54,7 @@ urlpatterns = [
     path("me/enable-password/", EnablePasswordView.as_view(), name="me_enable_password"),
     path("me/disable-password/", DisablePasswordView.as_view(), name="me_disable_password"),
     path("me/delete-account/", DeleteMeView.as_view(), name="me_delete_account"),
+    path("account-deletions/<uuid:job_id>/", AccountDeletionStatusView.as_view(), name="account_deletion_status"),
     path("admin-only/", AdminOnlyView.as_view(), name="admin_only"),
     path("users/", UserWriteView.as_view(), name="users"),
     # Tenant-scoped admin users management
@@ -0,0 +1,82 @@
+"""Shared-cache view of the per-user fields checked on every request.
+
+CustomJWTAuthentication only needs (token_version, status, is_active) to
+decide whether an access token is still acceptable. Those are kept in the
+default cache keyed by user id so the common case needs no User query at
+all; the full row is loaded once, by get_user, only when request.user is
+actually needed.
+
+Entries are dropped by the User post_save/post_delete signals (see
+accounts.signals), so bumping ``token_version`` or disabling an account is
+visible immediately. ``USER_STATE_CACHE_TTL`` bounds staleness for writes
+that bypass signals (queryset ``.update()``). Set it to 0 to disable.
+"""
+from __future__ import annotations
+
+from collections import namedtuple
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+# token_version/status are None when the user model does not define them
+UserState = namedtuple("UserState", ["user_id", "token_version", "status", "is_active"])
+
+_KEY_PREFIX = "auth:user:"
+_MISSING = "missing"
+
+
+def _cache_key(user_id) -> str:
+    return f"{_KEY_PREFIX}{user_id}"
+
+
+def _ttl() -> int:
+    return int(getattr(settings, "USER_STATE_CACHE_TTL", 60))
+
+
+def state_for_user(user) -> UserState:
+    return UserState(
+        str(user.pk),
+        getattr(user, "token_version", None),
+        getattr(user, "status", None),
+        bool(getattr(user, "is_active", True)),
+    )
+
+
+def get_user_state(user_id) -> Tuple[Optional[UserState], Optional[object]]:
+    """Return (state, user) for user_id.
+
+    ``user`` is the loaded User instance when the state had to be read from
+    the database, so callers can reuse it instead of querying again; it is
+    None on a cache hit. ``state`` is None when no such user exists.
+    """
+    user_id = str(user_id)
+    ttl = _ttl()
+    key = _cache_key(user_id)
+    if ttl > 0:
+        cached = cache.get(key)
+        if cached == _MISSING:
+            return None, None
+        if cached is not None:
+            return UserState(user_id, *cached), None
+
+    User = get_user_model()
+    try:
+        user = User.objects.get(pk=user_id)
+    except (User.DoesNotExist, ValueError, TypeError):
+        if ttl > 0:
+            cache.set(key, _MISSING, timeout=ttl)
+        return None, None
+
+    state = state_for_user(user)
+    if ttl > 0:
+        cache.set(key, tuple(state[1:]), timeout=ttl)
+    return state, user
+
+
+def invalidate_user_state(*user_ids) -> None:
+    """Drop cached state for the given user ids (None values are ignored)."""
+    keys = [_cache_key(uid) for uid in user_ids if uid is not None]
+    if keys:
+        cache.delete_many(keys)
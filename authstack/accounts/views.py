@@ -1,9 +1,10 @@
 from django.conf import settings
+import hashlib
+import json
 import logging
 import secrets
 from django.contrib.auth.models import User
 from django.contrib.auth.models import Group
-from django.core.mail import send_mail
 from django.urls import reverse
 from django.utils import timezone
 from django.shortcuts import render
@@ -12,16 +13,27 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from rest_framework.throttling import AnonRateThrottle
 from django_ratelimit.decorators import ratelimit
 from django.utils.decorators import method_decorator
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags, urlencode
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth.password_validation import validate_password
-from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
+from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
+from common.csrf_middleware import csrf_token_for_access
+from common.pagination import paginate
+from common.ratelimit import SlidingAnonRateThrottle
+from common.route_policy import route_policy
+from otp_auth.outbox import enqueue_email, request_dedupe_key
 from accounts.jwt_auth import CustomTokenObtainPairSerializer, RefreshTokenRotation, _get_client_ip, _infer_os_from_ua
-from .models import UserSession, ActionToken, UserProfile
+from .auth_context import get_auth_context
+from .authz import get_authz
+from .account_deletion import start_deletion, status_token, status_token_matches
+from .models import AccountDeletionJob, UserSession, ActionToken, UserProfile
+from .perm_codec import apply_permission_claims, current_registry
+from .session_revocation import revoke_sessions
 from .serializers import CookieTokenObtainPairSerializer, RegistrationSerializer, MeSerializer, UserAdminSerializer
 from .permissions import (
     HasAnyRole,
@@ -82,14 +94,15 @@ def clear_refresh_cookie(response: Response):
     response.delete_cookie(REFRESH_COOKIE_NAME, path=REFRESH_COOKIE_PATH)
 
 
-class LoginThrottle(AnonRateThrottle):
+class LoginThrottle(SlidingAnonRateThrottle):
     rate = '5/minute'
     scope = 'login'
 
-class RegisterThrottle(AnonRateThrottle):
+class RegisterThrottle(SlidingAnonRateThrottle):
     rate = '30/hour' if settings.DEBUG else '3/hour'
     scope = 'register'
 
+@route_policy(public=True)
 @method_decorator(ratelimit(key='ip', rate='5/m', method='POST', block=False), name='dispatch')
 class TokenObtainPairWithCookieView(TokenObtainPairView):
     """Login endpoint that returns JWT tokens and sets refresh token in httpOnly cookie"""
@@ -138,11 +151,17 @@ class TokenObtainPairWithCookieView(TokenObtainPairView):
         if res.status_code == 200 and "refresh" in res.data:
             refresh = res.data.pop("refresh")
             set_refresh_cookie(res, refresh)
-            # Set CSRF double-submit cookie so authenticated writes can include X-CSRFToken
-            try:
-                csrf = secrets.token_urlsafe(32)
-            except Exception:
-                csrf = "csrf"
+            # Set CSRF double-submit cookie so authenticated writes can include X-CSRFToken.
+            # With stateless tokens it must be the one derived for the new session.
+            csrf = csrf_token_for_access(res.data.get("access") or "")
+            if csrf:
+                # Keep Django's CSRF middleware from swapping in a random cookie
+                request.META['CSRF_COOKIE'] = csrf
+            else:
+                try:
+                    csrf = secrets.token_urlsafe(32)
+                except Exception:
+                    csrf = "csrf"
             res.set_cookie(
                 key='csrftoken',
                 value=csrf,
@@ -158,6 +177,7 @@ class TokenObtainPairWithCookieView(TokenObtainPairView):
         return {"request": self.request, "view": self}
 
 
+@route_policy(public=True)
 class CookieTokenRefreshView(TokenRefreshView):
     permission_classes = [AllowAny]
     # Disable DRF throttling here; refresh is cookie-based and often unauthenticated at DRF layer,
@@ -210,10 +230,14 @@ class CookieTokenRefreshView(TokenRefreshView):
                 max_age=60 * 60 * 24 * 7,
             )
             # Also rotate/set CSRF cookie for double-submit on authenticated writes
-            try:
-                csrf = secrets.token_urlsafe(32)
-            except Exception:
-                csrf = "csrf"
+            csrf = csrf_token_for_access(new_tokens['access'])
+            if csrf:
+                request.META['CSRF_COOKIE'] = csrf
+            else:
+                try:
+                    csrf = secrets.token_urlsafe(32)
+                except Exception:
+                    csrf = "csrf"
             response.set_cookie(
                 key='csrftoken',
                 value=csrf,
@@ -232,6 +256,7 @@ class CookieTokenRefreshView(TokenRefreshView):
             )
 
 
+@route_policy(version_gate=False)
 class LogoutView(APIView):
     permission_classes = [IsAuthenticated]
     @swagger_auto_schema(
@@ -247,28 +272,10 @@ class LogoutView(APIView):
         """
         # Attempt to revoke by session_id from access token
         try:
-            auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-            if auth_header.startswith('Bearer '):
-                token_str = auth_header.split(' ')[1]
-                at = AccessToken(token_str)
-                sid = at.get('session_id')
-                if sid:
-                    try:
-                        # Revoke without enforcing user equality; possession of the token implies control
-                        session = UserSession.objects.get(id=sid)
-                        session.revoke('user_logout')
-                    except UserSession.DoesNotExist:
-                        pass
-                    # Revoke in new refresh-session backend as well
-                    try:
-                        from user_sessions.models import Session as RefreshSession
-                        from django.utils import timezone as _tz
-                        rs = RefreshSession.objects.get(id=sid)
-                        rs.revoked_at = _tz.now()
-                        rs.revoke_reason = 'user_logout'
-                        rs.save()
-                    except Exception:
-                        pass
+            sid = get_auth_context(request).session_id
+            if sid:
+                # Revoke without enforcing user equality; possession of the token implies control
+                revoke_sessions([sid], 'user_logout')
         except Exception:
             # Ignore token parsing errors and continue to cookie fallback
             pass
@@ -457,6 +464,40 @@ class MeView(APIView):
         return Response(MeSerializer(user, context={"request": request}).data)
 
 
+class MePermissionsView(APIView):
+    """Expanded permissions for the current user and tenant.
+
+    Access tokens only carry a registry version and bitset (perms_v/perms_b);
+    clients that need the codenames read them here. Served from the cached
+    authz snapshot and revalidated with an ETag.
+    """
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        manual_parameters=[TokenObtainPairWithCookieView.PARAM_TENANT],
+        operation_id="me_permissions",
+        tags=["Auth"],
+    )
+    def get(self, request):
+        authz = get_authz(request)
+        body = {
+            "version": current_registry().version,
+            "roles": list(authz.roles),
+            "tenant_roles": list(authz.tenant_roles),
+            "permissions": sorted(authz.effective_permissions),
+        }
+        etag = '"%s"' % hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest()[:16]
+        # If-None-Match uses the weak comparison: W/"x" matches "x"
+        tags = {t.removeprefix("W/") for t in parse_etags(request.headers.get("If-None-Match", ""))}
+        if etag in tags or "*" in tags:
+            res = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            res = Response(body)
+        res["ETag"] = etag
+        patch_cache_control(res, private=True, max_age=int(getattr(settings, "AUTHZ_CACHE_TTL", 300)))
+        return res
+
+
 @method_decorator(ratelimit(key='user', rate='3/h', method='POST', block=False), name='dispatch')
 class RequestEmailVerificationView(APIView):
     """Send a verification email with a one-time token to the current user."""
@@ -547,7 +588,7 @@ class RequestEmailVerificationView(APIView):
         token_str = secrets.token_urlsafe(48)
         now = timezone.now()
         expires_at = now + timezone.timedelta(hours=1)
-        ActionToken.objects.create(
+        action_token = ActionToken.objects.create(
             user=user,
             purpose=ActionToken.PURPOSE_VERIFY_EMAIL,
             token=token_str,
@@ -568,16 +609,18 @@ class RequestEmailVerificationView(APIView):
         )
 
         try:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [email],
-                fail_silently=False,
+            # Delivered by the outbox workers (otp_auth.outbox)
+            queued = enqueue_email(
+                email, subject, message,
+                dedupe_key=request_dedupe_key(request, "action-token", action_token.purpose, email),
+                reference=action_token.pk,
             )
+            if queued.reference != str(action_token.pk):
+                # A retry: the link already on its way is the first token's
+                action_token.delete()
         except Exception as exc:
             # Log but do not 500; avoid user leakage and noisy errors
-            logger.exception("Failed to send verification email to %s: %s", email, exc)
+            logger.exception("Failed to queue verification email to %s: %s", email, exc)
             return Response(
                 {"detail": "Verification email could not be sent right now. Please try again later."},
                 status=status.HTTP_200_OK,
@@ -725,6 +768,7 @@ class UserWriteView(APIView):
 
 
 # AUDIT FIX #5: Removed csrf_exempt to enable CSRF protection on registration
+@route_policy(public=True)
 @method_decorator(ratelimit(key='ip', rate=('30/h' if settings.DEBUG else '3/h'), method='POST', block=False), name='dispatch')
 class RegisterView(APIView):
     permission_classes = [AllowAny]
@@ -806,14 +850,14 @@ class RegisterView(APIView):
         # Add global roles and effective perms to access for client-side hints
         access["roles"] = list(user.groups.values_list("name", flat=True))
         try:
-            access["perms"] = sorted(list(user.get_all_permissions()))
+            apply_permission_claims(access, user.get_all_permissions())
         except Exception:
-            access["perms"] = []
+            apply_permission_claims(access, ())
 
-        # ---- Create session entries (accounts.UserSession and user_sessions.Session) and embed session_id ----
+        # ---- Create the session (accounts.UserSession) and embed session_id ----
         try:
             from .models import UserSession as LegacySession
-            from user_sessions.models import Session as RefreshSession
+            from .session_store import hash_refresh_token
             from django.utils import timezone as _tz
             import hashlib as _hashlib
 
@@ -837,7 +881,8 @@ class RegisterView(APIView):
                     os_version = inferred_ver
             ip_addr = _get_client_ip(request)
 
-            # Create legacy session (authoritative session_id UUID)
+            # Create the session (authoritative session_id UUID)
+            refresh_jti = refresh_jti or _hashlib.sha256(str(refresh).encode()).hexdigest()
             legacy = LegacySession.objects.create(
                 user=user,
                 device_id=dev_id or _hashlib.sha256(f"{ua}:{ip_addr}".encode()).hexdigest()[:32],
@@ -848,30 +893,14 @@ class RegisterView(APIView):
                 ip_address=ip_addr,
                 user_agent=ua,
                 location='',
-                refresh_token_jti=refresh_jti or _hashlib.sha256(str(refresh).encode()).hexdigest(),
+                refresh_token_jti=refresh_jti,
                 access_token_jti=access_jti or '',
+                refresh_token_hash=hash_refresh_token(str(refresh)),
+                refresh_token_family=refresh_jti,
                 expires_at=_tz.now() + _tz.timedelta(days=7),
                 is_active=True,
             )
 
-            # Mirror into new refresh-session backend with same UUID
-            refresh_hash = _hashlib.sha256(str(refresh).encode()).hexdigest()
-            RefreshSession.objects.update_or_create(
-                id=legacy.id,
-                defaults={
-                    'user': user,
-                    'device': None,
-                    'refresh_token_hash': refresh_hash,
-                    'refresh_token_family': legacy.refresh_token_jti,
-                    'rotation_counter': 0,
-                    'ip_address': ip_addr,
-                    'user_agent': ua,
-                    'revoked_at': None,
-                    'revoke_reason': '',
-                    'expires_at': _tz.now() + _tz.timedelta(days=7),
-                }
-            )
-
             # Embed session_id into both tokens
             rt['session_id'] = str(legacy.id)
             access['session_id'] = str(legacy.id)
@@ -894,7 +923,7 @@ class AdminUsersView(APIView):
     def _require_admin(self, request):
         user = request.user
         try:
-            return bool(getattr(user, 'is_superuser', False)) or user.groups.filter(name='AdminFrontend').exists()
+            return get_authz(request).is_admin_frontend
         except Exception:
             return bool(getattr(user, 'is_superuser', False))
 
@@ -936,27 +965,13 @@ class AdminUsersView(APIView):
                 name = f[1:] if desc else f
                 if name in allowed:
                     order_fields.append(f)
-        if order_fields:
-            qs = qs.order_by(*order_fields)
-        else:
-            qs = qs.order_by('id')
-
-        total = qs.count()
-        # Pagination
-        try:
-            page = int(request.query_params.get('page') or 1)
-        except Exception:
-            page = 1
-        try:
-            page_size = int(request.query_params.get('page_size') or 20)
-        except Exception:
-            page_size = 20
-        page_size = max(1, min(page_size, 100))
-        start = (page - 1) * page_size
-        end = start + page_size
-        items = qs[start:end]
-        data = UserAdminSerializer(items, many=True, context={"request": request}).data
-        return Response({'results': data, 'count': total, 'page': page, 'page_size': page_size})
+        # Cursor pagination on the ordering (id breaks ties)
+        page = paginate(qs, request, order_fields or ['id'])
+        data = UserAdminSerializer(page.items, many=True, context={"request": request}).data
+        body = {'results': data, 'next_cursor': page.next_cursor}
+        if page.count is not None:
+            body['count'] = page.count
+        return Response(body)
 
     def post(self, request):
         if not self._require_admin(request):
@@ -1010,7 +1025,7 @@ class AdminUserDetailView(APIView):
     def _require_admin(self, request):
         user = request.user
         try:
-            return bool(getattr(user, 'is_superuser', False)) or user.groups.filter(name='AdminFrontend').exists()
+            return get_authz(request).is_admin_frontend
         except Exception:
             return bool(getattr(user, 'is_superuser', False))
 
@@ -1071,7 +1086,7 @@ class AdminUserRolesView(APIView):
     def _require_admin(self, request):
         user = request.user
         try:
-            return bool(getattr(user, 'is_superuser', False)) or user.groups.filter(name='AdminFrontend').exists()
+            return get_authz(request).is_admin_frontend
         except Exception:
             return bool(getattr(user, 'is_superuser', False))
 
@@ -1195,28 +1210,11 @@ class ChangePasswordView(APIView):
         request.user.set_password(new_password)
         request.user.save()
 
-        # Revoke all sessions for this user in legacy UserSession table
-        try:
-            from .models import UserSession as LegacySession
-            sessions = list(LegacySession.objects.filter(user=request.user, is_active=True))
-            for s in sessions:
-                try:
-                    s.revoke('password_change')
-                except Exception:
-                    try:
-                        s.is_active = False
-                        s.save(update_fields=['is_active'])
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-
-        # Revoke all sessions in new user_sessions backend
+        # Revoke all sessions for this user
         try:
-            from user_sessions.models import Session as RefreshSession
-            from django.utils import timezone as _tz
-            RefreshSession.objects.filter(user=request.user, revoked_at__isnull=True).update(
-                revoked_at=_tz.now(), revoke_reason='password_change'
+            revoke_sessions(
+                UserSession.objects.filter(user=request.user, is_active=True).values_list("id", flat=True),
+                'password_change',
             )
         except Exception:
             pass
@@ -1267,7 +1265,7 @@ class RequestSecurityOtpView(APIView):
         otp_code = ''.join([str(random.randint(0, 9)) for _ in range(6)])
         now = timezone.now()
         expires_at = now + timezone.timedelta(minutes=15)
-        ActionToken.objects.create(
+        action_token = ActionToken.objects.create(
             user=request.user,
             purpose=token_purpose,
             token=otp_code,
@@ -1290,17 +1288,17 @@ class RequestSecurityOtpView(APIView):
         </body></html>
         """
         try:
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [request.user.email],
-                html_message=html_message,
-                fail_silently=False,
+            queued = enqueue_email(
+                request.user.email, subject, message, html_body=html_message,
+                dedupe_key=request_dedupe_key(request, "action-token", token_purpose, request.user.email),
+                reference=action_token.pk,
             )
+            if queued.reference != str(action_token.pk):
+                # A retry: the code already on its way is the first token's
+                action_token.delete()
         except Exception as exc:
             # Log but do not fail the endpoint to avoid UX leakage
-            logger.exception("Failed to send security OTP email: %s", exc)
+            logger.exception("Failed to queue security OTP email: %s", exc)
 
         return Response({"detail": "Verification code sent."}, status=status.HTTP_200_OK)
 
@@ -1405,27 +1403,9 @@ class EnablePasswordView(APIView):
 
         # Revoke all sessions so the new password becomes the only valid credential
         try:
-            from .models import UserSession as LegacySession
-
-            sessions = list(LegacySession.objects.filter(user=user, is_active=True))
-            for s in sessions:
-                try:
-                    s.revoke("password_enabled")
-                except Exception:
-                    try:
-                        s.is_active = False
-                        s.save(update_fields=["is_active"])
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-
-        try:
-            from user_sessions.models import Session as RefreshSession
-            from django.utils import timezone as _tz
-
-            RefreshSession.objects.filter(user=user, revoked_at__isnull=True).update(
-                revoked_at=_tz.now(), revoke_reason="password_enabled"
+            revoke_sessions(
+                UserSession.objects.filter(user=user, is_active=True).values_list("id", flat=True),
+                "password_enabled",
             )
         except Exception:
             pass
@@ -1473,27 +1453,9 @@ class DisablePasswordView(APIView):
 
         # Revoke all sessions just like a password change
         try:
-            from .models import UserSession as LegacySession
-
-            sessions = list(LegacySession.objects.filter(user=user, is_active=True))
-            for s in sessions:
-                try:
-                    s.revoke("password_disabled")
-                except Exception:
-                    try:
-                        s.is_active = False
-                        s.save(update_fields=["is_active"])
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-
-        try:
-            from user_sessions.models import Session as RefreshSession
-            from django.utils import timezone as _tz
-
-            RefreshSession.objects.filter(user=user, revoked_at__isnull=True).update(
-                revoked_at=_tz.now(), revoke_reason="password_disabled"
+            revoke_sessions(
+                UserSession.objects.filter(user=user, is_active=True).values_list("id", flat=True),
+                "password_disabled",
             )
         except Exception:
             pass
@@ -1506,6 +1468,7 @@ class DisablePasswordView(APIView):
         return res
 
 
+@route_policy(public=True)
 @method_decorator(ratelimit(key='ip', rate='3/h', method='POST', block=False), name='dispatch')
 class RequestPasswordResetView(APIView):
     """Initiate a password reset via email.
@@ -1577,7 +1540,7 @@ class RequestPasswordResetView(APIView):
         otp_code = ''.join([str(random.randint(0, 9)) for _ in range(6)])
         now = timezone.now()
         expires_at = now + timezone.timedelta(minutes=15)
-        ActionToken.objects.create(
+        action_token = ActionToken.objects.create(
             user=user,
             purpose=ActionToken.PURPOSE_RESET_PASSWORD,
             token=otp_code,
@@ -1642,19 +1605,17 @@ class RequestPasswordResetView(APIView):
         """
 
         try:
-            from django.core.mail import EmailMultiAlternatives
-            
-            email_msg = EmailMultiAlternatives(
-                subject,
-                message,  # Plain text fallback
-                settings.DEFAULT_FROM_EMAIL,
-                [email],
+            queued = enqueue_email(
+                email, subject, message, html_body=html_message,
+                dedupe_key=request_dedupe_key(request, "action-token", action_token.purpose, email),
+                reference=action_token.pk,
             )
-            email_msg.attach_alternative(html_message, "text/html")
-            email_msg.send(fail_silently=False)
+            if queued.reference != str(action_token.pk):
+                # A retry: the code already on its way is the first token's
+                action_token.delete()
         except Exception as exc:
             # Log the failure but return a generic 200 to avoid user enumeration and 500s
-            logger.exception("Failed to send password reset email to %s: %s", email, exc)
+            logger.exception("Failed to queue password reset email to %s: %s", email, exc)
             return Response(
                 {"detail": "If an account exists for this email, a reset link has been sent."},
                 status=status.HTTP_200_OK,
@@ -1666,6 +1627,7 @@ class RequestPasswordResetView(APIView):
         )
 
 
+@route_policy(csrf_double_submit=False)
 class VerifyPasswordResetCodeView(APIView):
     """Verify a password reset OTP code without consuming it.
     
@@ -1705,6 +1667,7 @@ class VerifyPasswordResetCodeView(APIView):
             )
 
 
+@route_policy(public=True)
 class ConfirmPasswordResetView(APIView):
     """Confirm a password reset using a one-time token.
 
@@ -1774,27 +1737,9 @@ class ConfirmPasswordResetView(APIView):
 
         # Revoke all sessions for security, similar to ChangePasswordView
         try:
-            from .models import UserSession as LegacySession
-
-            sessions = list(LegacySession.objects.filter(user=user, is_active=True))
-            for s in sessions:
-                try:
-                    s.revoke("password_reset")
-                except Exception:
-                    try:
-                        s.is_active = False
-                        s.save(update_fields=["is_active"])
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-
-        try:
-            from user_sessions.models import Session as RefreshSession
-            from django.utils import timezone as _tz
-
-            RefreshSession.objects.filter(user=user, revoked_at__isnull=True).update(
-                revoked_at=_tz.now(), revoke_reason="password_reset",
+            revoke_sessions(
+                UserSession.objects.filter(user=user, is_active=True).values_list("id", flat=True),
+                "password_reset",
             )
         except Exception:
             pass
@@ -1808,9 +1753,12 @@ class ConfirmPasswordResetView(APIView):
 class DeleteMeView(APIView):
     """Allow the authenticated user to delete their own account.
 
-    We implement this as an anonymization + deactivation step so that
-    existing content (comments, reactions, notifications) can remain
-    without being clearly tied to a real identity.
+    The request itself only anonymizes and deactivates the user, detaches
+    social accounts and revokes sessions. Sessions, devices, reminders,
+    OTP requests and memberships are then purged by an AccountDeletionJob in
+    the background (accounts.account_deletion), whose progress is reported by
+    AccountDeletionStatusView. Existing content (comments, reactions,
+    notifications) remains, tied only to the anonymized user.
     """
 
     permission_classes = [IsAuthenticated]
@@ -1860,6 +1808,9 @@ class DeleteMeView(APIView):
                 user.is_active = False
             except Exception:
                 pass
+            # Custom user models with token_version reject older tokens too
+            if hasattr(user, "token_version"):
+                user.token_version = (user.token_version or 0) + 1
             user.save()
         except Exception:
             # If anonymization fails we still proceed to revoke sessions
@@ -1880,33 +1831,61 @@ class DeleteMeView(APIView):
             # social link is removed manually.
             pass
 
-        # Revoke all sessions for this user in legacy UserSession table.
-        try:
-            from .models import UserSession as LegacySession
-            sessions = list(LegacySession.objects.filter(user=user, is_active=True))
-            for s in sessions:
-                try:
-                    s.revoke("user_deleted")
-                except Exception:
-                    try:
-                        s.is_active = False
-                        s.save(update_fields=["is_active"])
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-
-        # Revoke all sessions in new user_sessions backend.
+        # Revoke every session with one UPDATE.
         try:
-            from user_sessions.models import Session as RefreshSession
-            from django.utils import timezone as _tz
-
-            RefreshSession.objects.filter(user=user, revoked_at__isnull=True).update(
-                revoked_at=_tz.now(), revoke_reason="user_deleted"
+            revoke_sessions(
+                UserSession.objects.filter(user=user, is_active=True).values_list("id", flat=True),
+                "user_deleted",
             )
         except Exception:
             pass
 
-        res = Response({"detail": "Account deleted and anonymized. You have been logged out from all devices."}, status=status.HTTP_200_OK)
+        # Everything else the account owns is purged in the background, in
+        # chunks, so this request stays fast however much data there is.
+        job = start_deletion(user)
+
+        res = Response(
+            {
+                "detail": "Account deleted and anonymized. You have been logged out from all devices.",
+                "deletion_job": str(job.id),
+                "deletion_status": job.status,
+                # Usable without a live account: the token is the credential
+                "deletion_status_url": "%s?%s" % (
+                    reverse("account_deletion_status", args=[job.id]),
+                    urlencode({"token": status_token(job)}),
+                ),
+            },
+            status=status.HTTP_200_OK,
+        )
         clear_refresh_cookie(res)
         return res
+
+
+class AccountDeletionStatusView(APIView):
+    """Progress of a background account purge started by DeleteMeView.
+
+    The deletion logs its owner out, so the URL DeleteMeView returns carries
+    a signed ``token`` for the job instead. Superusers need no token; any
+    other caller gets 404, so job ids cannot be probed.
+    """
+
+    permission_classes = [AllowAny]
+
+    @swagger_auto_schema(operation_id="account_deletion_status", tags=["Auth"])
+    def get(self, request, job_id):
+        allowed = getattr(request.user, "is_superuser", False) or status_token_matches(
+            job_id, request.query_params.get("token", "")
+        )
+        job = AccountDeletionJob.objects.filter(pk=job_id).first() if allowed else None
+        if job is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(
+            {
+                "id": str(job.id),
+                "status": job.status,
+                "step": job.step,
+                "progress": job.progress,
+                "created_at": job.created_at,
+                "finished_at": job.finished_at,
+            }
+        )
@@ -3,12 +3,14 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from django.utils import timezone
-from rest_framework_simplejwt.tokens import AccessToken
-from rest_framework_simplejwt.exceptions import TokenError
 from django.db.models import Count
 from django.db.models.functions import TruncDate
 from datetime import timedelta
+from common.pagination import paginate
+from .auth_context import get_auth_context
+from .authz import get_authz
 from .models import UserSession, Membership
+from .session_revocation import revoke_sessions
 from tenants.models import Tenant
 
 
@@ -25,17 +27,9 @@ class SessionListView(APIView):
         ).order_by('-last_activity')
         
         # Get current session identifiers from the access token
-        current_access_jti = None
-        current_session_id = None
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        if auth_header.startswith('Bearer '):
-            try:
-                token_str = auth_header.split(' ')[1]
-                token = AccessToken(token_str)
-                current_access_jti = token.get('jti')
-                current_session_id = token.get('session_id')
-            except (TokenError, IndexError):
-                pass
+        ctx = get_auth_context(request)
+        current_access_jti = ctx.jti
+        current_session_id = ctx.session_id
         
         session_data = []
         for session in sessions:
@@ -76,17 +70,9 @@ class SessionDetailView(APIView):
                 is_active=True
             )
             # Extract current token details
-            current_access_jti = None
-            current_session_id = None
-            auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-            if auth_header.startswith('Bearer '):
-                try:
-                    token_str = auth_header.split(' ')[1]
-                    token = AccessToken(token_str)
-                    current_access_jti = token.get('jti')
-                    current_session_id = token.get('session_id')
-                except (TokenError, IndexError):
-                    pass
+            ctx = get_auth_context(request)
+            current_access_jti = ctx.jti
+            current_session_id = ctx.session_id
             
             return Response({
                 'id': str(session.id),
@@ -143,15 +129,7 @@ class RevokeAllSessionsView(APIView):
     def post(self, request):
         current_jti = getattr(request, 'refresh_jti', None)
         # Also try to get current session_id from access token
-        current_session_id = None
-        auth_header = request.META.get('HTTP_AUTHORIZATION', '')
-        if auth_header.startswith('Bearer '):
-            try:
-                token_str = auth_header.split(' ')[1]
-                token = AccessToken(token_str)
-                current_session_id = token.get('session_id')
-            except (TokenError, IndexError):
-                pass
+        current_session_id = get_auth_context(request).session_id
         
         # Revoke all sessions except current
         sessions = UserSession.objects.filter(
@@ -163,9 +141,7 @@ class RevokeAllSessionsView(APIView):
         elif current_jti:
             sessions = sessions.exclude(refresh_token_jti=current_jti)
         
-        count = sessions.count()
-        for session in sessions:
-            session.revoke(reason='User revoked all sessions')
+        count = revoke_sessions(sessions.values_list('id', flat=True), 'User revoked all sessions')
         
         return Response({
             'message': f'Revoked {count} session(s)',
@@ -180,7 +156,7 @@ class AdminSessionsStatsView(APIView):
         user = request.user
         is_admin_fe = False
         try:
-            is_admin_fe = bool(getattr(user, 'is_superuser', False)) or user.groups.filter(name='AdminFrontend').exists()
+            is_admin_fe = get_authz(request).is_admin_frontend
         except Exception:
             is_admin_fe = bool(getattr(user, 'is_superuser', False))
         if not is_admin_fe:
@@ -218,13 +194,13 @@ class AdminSessionsStatsView(APIView):
 
 
 class AdminSessionsListView(APIView):
-    """Tenant-scoped sessions list with pagination/search/ordering for AdminFrontend/staff"""
+    """Tenant-scoped sessions list with cursor pagination/search/ordering for AdminFrontend/staff"""
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         user = request.user
         try:
-            is_admin = bool(getattr(user, 'is_superuser', False)) or user.groups.filter(name='AdminFrontend').exists()
+            is_admin = get_authz(request).is_admin_frontend
         except Exception:
             is_admin = bool(getattr(user, 'is_superuser', False))
         if not is_admin:
@@ -264,25 +240,8 @@ class AdminSessionsListView(APIView):
                 name = f[1:] if f.startswith('-') else f
                 if name in allowed:
                     order_fields.append(f)
-        if order_fields:
-            qs = qs.order_by(*order_fields)
-        else:
-            qs = qs.order_by('-last_activity')
-
-        total = qs.count()
-        # Pagination
-        try:
-            page = int(request.query_params.get('page') or 1)
-        except Exception:
-            page = 1
-        try:
-            page_size = int(request.query_params.get('page_size') or 20)
-        except Exception:
-            page_size = 20
-        page_size = max(1, min(page_size, 100))
-        start = (page - 1) * page_size
-        end = start + page_size
-        items = qs[start:end]
+        # Cursor pagination on the ordering (id breaks ties)
+        page = paginate(qs, request, order_fields or ['-last_activity'])
 
         def row(s: UserSession):
             return {
@@ -298,12 +257,10 @@ class AdminSessionsListView(APIView):
                 'expires_at': s.expires_at.isoformat(),
             }
 
-        return Response({
-            'results': [row(s) for s in items],
-            'count': total,
-            'page': page,
-            'page_size': page_size,
-        })
+        body = {'results': [row(s) for s in page.items], 'next_cursor': page.next_cursor}
+        if page.count is not None:
+            body['count'] = page.count
+        return Response(body)
 
 
 class AdminSessionRevokeView(APIView):
@@ -312,7 +269,7 @@ class AdminSessionRevokeView(APIView):
     def post(self, request, session_id):
         user = request.user
         try:
-            is_admin = bool(getattr(user, 'is_superuser', False)) or user.groups.filter(name='AdminFrontend').exists()
+            is_admin = get_authz(request).is_admin_frontend
         except Exception:
             is_admin = bool(getattr(user, 'is_superuser', False))
         if not is_admin:
@@ -1,3 +1,6 @@
+import uuid
+from datetime import timedelta
+
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
@@ -7,9 +10,12 @@ from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 from accounts.social_auth import SocialAuthService
-from accounts.models import SocialAccount
+from accounts.models import SocialAccount, UserSession
 from accounts.jwt_auth import CustomTokenObtainPairSerializer
-from user_sessions.models import Session
+from accounts.session_cache import invalidate_session_state
+from accounts.session_revocation import enforce_session_limit
+from accounts.session_store import hash_refresh_token
+from common.route_policy import route_policy
 
 User = get_user_model()
 
@@ -36,6 +42,7 @@ def _normalize_device_type(request) -> str:
     return 'web'
 
 
+@route_policy(public=True)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def social_login_view(request):
@@ -165,87 +172,13 @@ def social_login_view(request):
     except Exception:
         device_obj = None
 
-    # Try to reuse a session for this user+device (even if previously revoked)
-    from django.utils import timezone as _tz
-    existing_session = None
-    session = None
-    refresh_token_plain = None
-    try:
-        qs = Session.objects.filter(user=user)
-        if device_obj:
-            qs = qs.filter(device=device_obj)
-        existing_session = qs.order_by('-last_used_at').first()
-    except Exception:
-        existing_session = None
-
-    if existing_session:
-        # Reactivate (if needed), extend expiry, rotate token, and keep the same session id
-        try:
-            if existing_session.revoked_at is not None:
-                existing_session.revoked_at = None
-                existing_session.revoke_reason = ''
-                # extend expiry window from now
-                existing_session.expires_at = _tz.now() + (_tz.timedelta(days=30))
-                existing_session.save()
-            refresh_token_plain = existing_session.rotate_token()
-            session = existing_session
-        except Exception:
-            session, refresh_token_plain = Session.create_session(user=user, request=request, device=device_obj)
+    # Try to reuse a session for this user+device (even if previously revoked),
+    # keeping its id; otherwise open a new one
+    qs = UserSession.objects.filter(user=user)
+    if device_obj:
+        qs = qs.filter(registered_device=device_obj)
+    session_id = qs.order_by('-last_activity').values_list('id', flat=True).first() or uuid.uuid4()
 
-    # Ensure we have a session if none could be reused
-    if session is None:
-        session, refresh_token_plain = Session.create_session(user=user, request=request, device=device_obj)
-
-    # Enforce concurrent session limit (aligns with JWT login path)
-    # Enforce per-device-type limits (prefer MOBILE_/WEB_ caps, fallback to global MAX_CONCURRENT_SESSIONS)
-    try:
-        from django.conf import settings as _settings
-        global_limit = int(getattr(_settings, 'MAX_CONCURRENT_SESSIONS', 5))
-        mobile_limit = getattr(_settings, 'MOBILE_MAX_CONCURRENT_SESSIONS', None)
-        web_limit = getattr(_settings, 'WEB_MAX_CONCURRENT_SESSIONS', None)
-        if device_type_norm == 'mobile':
-            limit = int(mobile_limit) if mobile_limit is not None else global_limit
-        else:
-            limit = int(web_limit) if web_limit is not None else global_limit
-    except Exception:
-        limit = 5
-
-    if limit > 0:
-        try:
-            from django.db.models import Q
-            # Enforce on new refresh-session backend (user_sessions.Session)
-            active = Session.objects.filter(user=user, revoked_at__isnull=True)
-            if device_type_norm in ('android', 'ios'):
-                active = active.filter(device__device_type__in=['android', 'ios'])
-            else:
-                active = active.filter(Q(device__isnull=True) | Q(device__device_type='web'))
-            active = active.order_by('-last_used_at')
-            if active.count() > limit:
-                for old in active[limit:]:
-                    old.revoked_at = _tz.now()
-                    old.revoke_reason = 'session_limit_exceeded'
-                    old.save(update_fields=['revoked_at', 'revoke_reason'])
-        except Exception:
-            pass
-        try:
-            # Also enforce on legacy accounts.UserSession for parity
-            from .models import UserSession as LegacySession
-            legacy_active = LegacySession.objects.filter(user=user, is_active=True)
-            if device_type_norm == 'mobile':
-                legacy_active = legacy_active.filter(device_type='mobile')
-            else:
-                legacy_active = legacy_active.filter(device_type='web')
-            legacy_active = legacy_active.order_by('-last_activity')
-            if legacy_active.count() > limit:
-                for old_l in legacy_active[limit:]:
-                    try:
-                        old_l.revoke('session_limit_exceeded')
-                    except Exception:
-                        pass
-        except Exception:
-            pass
-    # session already ensured above
-    
     # Generate JWT tokens
     serializer = CustomTokenObtainPairSerializer()
     token = serializer.get_token(user)
@@ -253,8 +186,8 @@ def social_login_view(request):
     access = refresh.access_token
     
     # Add session info to tokens (middleware expects 'session_id')
-    refresh['session_id'] = str(session.id)
-    access['session_id'] = str(session.id)
+    refresh['session_id'] = str(session_id)
+    access['session_id'] = str(session_id)
 
     # Ensure tenant membership and add tenant context expected by MeView (slug)
     tenant = getattr(request, 'tenant', None)
@@ -286,65 +219,89 @@ def social_login_view(request):
         refresh['tenant_id'] = str(getattr(tenant, 'slug', tenant))
         access['tenant_id'] = str(getattr(tenant, 'slug', tenant))
 
-    # Mirror into legacy accounts.UserSession for admin and compatibility
+    # Write the session row once; the tokens above already carry its id
+    # Extract JTIs from JWTs for rotation compatibility
+    access_jti = access.get('jti')
+    refresh_jti = refresh.get('jti')
+    # Prefer explicit device headers sent by the app; fall back to the session id
+    dev_id = request.META.get('HTTP_X_DEVICE_ID') or str(session_id)
+    dev_name = request.META.get('HTTP_X_DEVICE_NAME') or request.META.get('HTTP_USER_AGENT', '')[:255]
+    os_name = request.META.get('HTTP_X_OS_NAME', '')
+    os_version = request.META.get('HTTP_X_OS_VERSION', '')
+    # Prefer original client IP from X-Forwarded-For, falling back to REMOTE_ADDR
+    meta = getattr(request, 'META', {}) or {}
+    xff = meta.get('HTTP_X_FORWARDED_FOR', '')
+    if xff:
+        # Take the first IP in the list (client IP)
+        ip_addr = xff.split(',')[0].strip() or meta.get('REMOTE_ADDR') or '127.0.0.1'
+    else:
+        ip_addr = meta.get('REMOTE_ADDR') or '127.0.0.1'
+    ua = request.META.get('HTTP_USER_AGENT', '')
+    UserSession.objects.update_or_create(
+        id=session_id,
+        defaults={
+            'user': user,
+            # Store the JWT refresh JTI so /api/token/refresh/ can validate against this session
+            'refresh_token_jti': (refresh_jti or ''),
+            'refresh_token_hash': hash_refresh_token(str(refresh)),
+            'refresh_token_family': (refresh_jti or ''),
+            'registered_device': device_obj,
+            'device_id': dev_id,
+            'device_name': dev_name,
+            'device_type': device_type_norm,
+            'os_name': os_name,
+            'os_version': os_version,
+            'ip_address': ip_addr,
+            'user_agent': ua,
+            'location': '',
+            'access_token_jti': (access_jti or ''),
+            'expires_at': timezone.now() + timedelta(days=30),
+            'is_active': True,
+            'revoked_at': None,
+            'revoke_reason': '',
+        }
+    )
+    # The session may have been reactivated; drop any cached revoked state
+    invalidate_session_state(session_id)
+
+    # Enforce concurrent session limit now that this session is written and
+    # counted (aligns with JWT login path)
+    # Enforce per-device-type limits (prefer MOBILE_/WEB_ caps, fallback to global MAX_CONCURRENT_SESSIONS)
     try:
-        from .models import UserSession as LegacySession
-        from django.utils import timezone as _tz
-        # Derive values required by legacy model
-        # Extract JTIs from JWTs for rotation compatibility
-        try:
-            access_jti = access.get('jti')
-        except Exception:
-            access_jti = None
-        try:
-            refresh_jti = refresh.get('jti')
-        except Exception:
-            refresh_jti = None
-        # Prefer explicit device headers sent by the app; fall back to UA/IP
-        dev_id = request.META.get('HTTP_X_DEVICE_ID') or str(session.id)
-        dev_name = request.META.get('HTTP_X_DEVICE_NAME') or request.META.get('HTTP_USER_AGENT', '')[:255]
-        dev_type = device_type_norm
-        os_name = request.META.get('HTTP_X_OS_NAME', '')
-        os_version = request.META.get('HTTP_X_OS_VERSION', '')
-        # Prefer original client IP from X-Forwarded-For, falling back to REMOTE_ADDR
-        meta = getattr(request, 'META', {}) or {}
-        xff = meta.get('HTTP_X_FORWARDED_FOR', '')
-        if xff:
-            # Take the first IP in the list (client IP)
-            ip_addr = xff.split(',')[0].strip() or meta.get('REMOTE_ADDR') or '127.0.0.1'
+        from django.conf import settings as _settings
+        global_limit = int(getattr(_settings, 'MAX_CONCURRENT_SESSIONS', 5))
+        mobile_limit = getattr(_settings, 'MOBILE_MAX_CONCURRENT_SESSIONS', None)
+        web_limit = getattr(_settings, 'WEB_MAX_CONCURRENT_SESSIONS', None)
+        if device_type_norm == 'mobile':
+            limit = int(mobile_limit) if mobile_limit is not None else global_limit
         else:
-            ip_addr = meta.get('REMOTE_ADDR') or '127.0.0.1'
-        ua = request.META.get('HTTP_USER_AGENT', '')
-        LegacySession.objects.update_or_create(
-            id=session.id,
-            defaults={
-                'user': user,
-                # Store the JWT refresh JTI so /api/token/refresh/ can validate against this session
-                'refresh_token_jti': (refresh_jti or ''),
-                'device_id': dev_id,
-                'device_name': dev_name,
-                'device_type': device_type_norm,
-                'os_name': os_name,
-                'os_version': os_version,
-                'ip_address': ip_addr,
-                'user_agent': ua,
-                'location': '',
-                'access_token_jti': (access_jti or ''),
-                'expires_at': session.expires_at,
-                'is_active': True,
-                'revoked_at': None,
-                'revoke_reason': '',
-            }
-        )
+            limit = int(web_limit) if web_limit is not None else global_limit
     except Exception:
-        # Do not block login if legacy mirroring fails
-        pass
+        limit = 5
+
+    if limit > 0:
+        try:
+            from django.db.models import Q
+            # Over-limit sessions of the same kind, by registered device or by device type
+            active = UserSession.objects.filter(user=user, is_active=True)
+            if device_type_norm in ('android', 'ios'):
+                active = active.filter(
+                    Q(registered_device__device_type__in=['android', 'ios'])
+                    | Q(device_type__in=['android', 'ios', 'mobile'])
+                )
+            else:
+                active = active.filter(
+                    Q(registered_device__isnull=True) | Q(registered_device__device_type='web') | Q(device_type='web')
+                )
+            enforce_session_limit(active, limit, 'last_activity', keep_id=session_id)
+        except Exception:
+            pass
     
     # Set refresh token cookie (must be the SimpleJWT refresh string so /api/token/refresh/ works)
     response = Response({
         'access': str(access),
         'refresh': str(refresh),
-        'session_id': str(session.id),
+        'session_id': str(session_id),
         'expires_in': settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds(),
         'user': {
             'id': str(user.id),
@@ -41,6 +41,8 @@ INSTALLED_APPS = [
     'tenants',
     'series',
     'live.apps.LiveConfig',
+    # After onchannels/series: its receivers read what theirs wrote
+    'search',
     'django_celery_beat',
 ]
 
@@ -62,6 +64,8 @@ MIDDLEWARE = [
     "common.middleware.version_enforce.AppVersionEnforceMiddleware",
     # Ensure request.user is populated before CSRF middlewares that bind/set tokens
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # request.authz: cached roles/permissions for the current user and tenant
+    "accounts.authz.AuthzMiddleware",
     "accounts.middleware.SessionRevocationMiddleware",  # Check session revocation early
     # AUDIT FIX #6 & #7: Prevent token injection by validating token-session ownership
     "accounts.middleware.TokenSessionBindingMiddleware",
@@ -126,6 +130,29 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'onchannels.tasks.evict_shorts_low_water',
         'schedule': 60.0 * 15,  # every 15 minutes
     },
+    'flush-session-activity': {
+        'task': 'accounts.tasks.flush_session_activity',
+        'schedule': float(os.environ.get('SESSION_ACTIVITY_FLUSH_SECONDS', '60')),
+    },
+    # Retries and any message whose on-commit nudge was lost
+    'deliver-outbox': {
+        'task': 'otp_auth.tasks.deliver_outbox',
+        'schedule': 30.0,
+    },
+    'resume-account-deletions': {
+        'task': 'accounts.tasks.resume_account_deletions',
+        'schedule': 60.0 * 5,  # every 5 minutes
+    },
+    # Shorts feed snapshots; jobs becoming ready rebuild theirs right away
+    'rebuild-shorts-feeds': {
+        'task': 'onchannels.tasks.rebuild_shorts_feeds',
+        'schedule': 60.0 * 5,  # every 5 minutes
+    },
+    # Changes made with queryset.update() (no signals), e.g. shorts eviction
+    'refresh-search-index': {
+        'task': 'search.tasks.refresh_search_index',
+        'schedule': 60.0 * 5,  # every 5 minutes
+    },
 }
 CELERY_BEAT_SCHEDULER = 'django_celery_beat.schedulers:DatabaseScheduler'
 
@@ -221,12 +248,14 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    # Keyset pages with signed cursors; totals only with ?count=1
+    "DEFAULT_PAGINATION_CLASS": "common.pagination.KeysetPagination",
     "PAGE_SIZE": 20,
     # Rate limiting
     "DEFAULT_THROTTLE_CLASSES": [
-        "rest_framework.throttling.AnonRateThrottle",
-        "rest_framework.throttling.UserRateThrottle",
+        # Sliding-window counters in the shared cache (common.ratelimit)
+        "common.ratelimit.SlidingAnonRateThrottle",
+        "common.ratelimit.SlidingUserRateThrottle",
     ],
     "DEFAULT_THROTTLE_RATES": {
         "anon": "20/hour",  # Anonymous users
@@ -280,6 +309,87 @@ REFRESH_COOKIE_PATH = "/api/token/refresh/"
 # Set to 0 to disable limit (not recommended for production).
 MAX_CONCURRENT_SESSIONS = int(os.environ.get("MAX_CONCURRENT_SESSIONS", "5"))
 
+# Seconds a session's owner/revoked state may be served from cache by the
+# token-session binding middleware. Revocations invalidate the entry directly;
+# this TTL is the upper bound on how long a missed invalidation can linger.
+# Set to 0 to always read the session tables.
+SESSION_STATE_CACHE_TTL = int(os.environ.get("SESSION_STATE_CACHE_TTL", "30"))
+# Seconds to cache per-user (token_version, status, is_active) for JWT checks.
+# User saves invalidate the entry; 0 disables the cache.
+USER_STATE_CACHE_TTL = int(os.environ.get("USER_STATE_CACHE_TTL", "60"))
+# A rotated refresh token presented again within this many seconds is treated
+# as a concurrent refresh from the same client (rejected, session kept);
+# after that it is a replay and the session is revoked.
+REFRESH_REUSE_GRACE_SECONDS = int(os.environ.get("REFRESH_REUSE_GRACE_SECONDS", "10"))
+# Per-process tenant resolution cache (slug/host -> Tenant, including misses).
+# Tenant/TenantDomain changes clear it in the saving process; other workers
+# see them after at most this many seconds. 0 disables the cache.
+TENANT_CACHE_TTL = int(os.environ.get("TENANT_CACHE_TTL", "60"))
+# Per-process compiled AppVersion policy used by AppVersionEnforceMiddleware.
+# AppVersion changes rebuild it in the saving process; 0 disables the cache.
+APP_VERSION_POLICY_TTL = int(os.environ.get("APP_VERSION_POLICY_TTL", "60"))
+# Seconds to cache per-(user, tenant) roles/permissions (accounts.authz).
+# Group, role and membership changes invalidate them; 0 disables the cache.
+AUTHZ_CACHE_TTL = int(os.environ.get("AUTHZ_CACHE_TTL", "300"))
+# Browser/CDN lifetime of /api/forms/schema/ responses; clients revalidate
+# with If-None-Match afterwards
+FORM_SCHEMA_MAX_AGE = int(os.environ.get("FORM_SCHEMA_MAX_AGE", "300"))
+# Bloom filter behind the forms "unique" rule (accounts.existence_index):
+# target false-positive rate, and how long journal entries that let other
+# processes catch up incrementally are kept
+EXISTENCE_INDEX_FP_RATE = float(os.environ.get("EXISTENCE_INDEX_FP_RATE", "0.01"))
+EXISTENCE_INDEX_JOURNAL_TTL = int(os.environ.get("EXISTENCE_INDEX_JOURNAL_TTL", "86400"))
+# Background purge after self-service account deletion
+# (accounts.account_deletion): rows per DELETE, seconds per task run before
+# it re-enqueues itself, and idle time after which beat restarts a job.
+ACCOUNT_DELETION_CHUNK_SIZE = int(os.environ.get("ACCOUNT_DELETION_CHUNK_SIZE", "500"))
+ACCOUNT_DELETION_RUN_SECONDS = int(os.environ.get("ACCOUNT_DELETION_RUN_SECONDS", "30"))
+ACCOUNT_DELETION_STALL_SECONDS = int(os.environ.get("ACCOUNT_DELETION_STALL_SECONDS", "300"))
+# Seconds a process reuses the permission codename registry that access
+# token perms_v/perms_b claims are encoded against (accounts.perm_codec).
+PERM_REGISTRY_CACHE_TTL = int(os.environ.get("PERM_REGISTRY_CACHE_TTL", "300"))
+# OTP challenge storage (otp_auth.backends): "database" keeps everything in
+# otp_requests; "cache" keeps hash/expiry/attempts in the shared cache and
+# writes otp_requests only as an audit trail, via Celery when
+# OTP_AUDIT_ASYNC is true.
+OTP_BACKEND = {
+    "database": "otp_auth.backends.DatabaseOTPBackend",
+    "cache": "otp_auth.backends.CacheOTPBackend",
+}[os.environ.get("OTP_BACKEND", "database")]
+OTP_AUDIT_ASYNC = os.environ.get("OTP_AUDIT_ASYNC", "True").lower() in ("1", "true", "yes")
+
+# Transactional email/SMS outbox (otp_auth.outbox). Workers send up to
+# OUTBOX_BATCH_SIZE messages per claim over one SMTP connection and retry
+# failures with exponential backoff from OUTBOX_RETRY_BASE_SECONDS.
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get("OUTBOX_MAX_ATTEMPTS", "5"))
+OUTBOX_RETRY_BASE_SECONDS = int(os.environ.get("OUTBOX_RETRY_BASE_SECONDS", "30"))
+# A claimed message is handed to another worker after this long
+OUTBOX_CLAIM_SECONDS = int(os.environ.get("OUTBOX_CLAIM_SECONDS", "300"))
+# Retries of a request without an Idempotency-Key in the same bucket of
+# this many seconds share one message while it is still undelivered
+# (outbox.request_dedupe_key)
+OUTBOX_DEDUPE_SECONDS = int(os.environ.get("OUTBOX_DEDUPE_SECONDS", "60"))
+# Shorts feed (onchannels.shorts_feed): the newest SHORTS_FEED_SNAPSHOT_SIZE
+# ready shorts per tenant are kept rendered in the cache for SHORTS_FEED_TTL
+# seconds, longer than the rebuild-shorts-feeds interval. Without a shared
+# cache, Celery's rebuilds never reach the web processes, so each keeps its
+# own snapshot for at most SHORTS_FEED_LOCAL_TTL seconds.
+SHORTS_FEED_SNAPSHOT_SIZE = int(os.environ.get("SHORTS_FEED_SNAPSHOT_SIZE", "300"))
+SHORTS_FEED_TTL = int(os.environ.get("SHORTS_FEED_TTL", "900"))
+SHORTS_FEED_LOCAL_TTL = int(os.environ.get("SHORTS_FEED_LOCAL_TTL", "60"))
+# Search index (search app). Empty SEARCH_BACKEND picks by database vendor:
+# SQLite FTS5 or Postgres tsvector + pg_trgm (search.backends).
+SEARCH_BACKEND = os.environ.get("SEARCH_BACKEND", "") or None
+SEARCH_PAGE_SIZE = int(os.environ.get("SEARCH_PAGE_SIZE", "20"))
+# Session last_activity is buffered in the cache and written in batches by
+# the flush-session-activity beat task every this many seconds. Only with a
+# cache shared with the Celery worker (REDIS_URL); otherwise, or with
+# SESSION_ACTIVITY_WRITE_BEHIND=false, requests do not record activity and it
+# only moves on login and refresh.
+SESSION_ACTIVITY_FLUSH_SECONDS = int(os.environ.get("SESSION_ACTIVITY_FLUSH_SECONDS", "60"))
+SESSION_ACTIVITY_WRITE_BEHIND = os.environ.get("SESSION_ACTIVITY_WRITE_BEHIND", "True").lower() in ("1", "true", "yes")
+
 # YouTube API key (set via environment)
 YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
 
@@ -331,6 +441,18 @@ CACHES = {
         'LOCATION': 'unique-snowflake',
     }
 }
+# Shared cache for rate limits, session/authz state and write-behind buffers.
+# LocMem above is per worker process; set REDIS_URL in production.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES['default'] = {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': REDIS_URL,
+        'OPTIONS': {'CLIENT_CLASS': 'django_redis.client.DefaultClient'},
+    }
+# Whether the default cache is shared by web and worker processes
+# (common.cache); detected from the backend when unset.
+SHARED_CACHE = None
 
 LOGGING = {
     "version": 1,
@@ -398,6 +520,17 @@ GOOGLE_WEB_CLIENT_IDS = {
     "695500579619-qve5grj7enro7j1pn8hma04mjpe3oo8t.apps.googleusercontent.com",
 } | _extra_google_web_ids
 
+# Google/Apple signing keys (accounts.jwks_cache). Kept for the provider's
+# Cache-Control max-age (fallback JWKS_DEFAULT_MAX_AGE), then served stale
+# while refreshing in the background for up to JWKS_MAX_STALE_SECONDS.
+# Fetches (including unknown-kid refetches) happen at most once per
+# JWKS_MIN_REFETCH_SECONDS per process.
+JWKS_DEFAULT_MAX_AGE = int(os.environ.get("JWKS_DEFAULT_MAX_AGE", "3600"))
+JWKS_MAX_STALE_SECONDS = int(os.environ.get("JWKS_MAX_STALE_SECONDS", "86400"))
+JWKS_MIN_REFETCH_SECONDS = int(os.environ.get("JWKS_MIN_REFETCH_SECONDS", "60"))
+# Retry interval after a failed fetch while a process has no keys at all
+JWKS_EMPTY_RETRY_SECONDS = int(os.environ.get("JWKS_EMPTY_RETRY_SECONDS", "2"))
+
 # Production security settings (tuned via environment; safe defaults under HTTPS)
 # Respect reverse proxy SSL (Nginx) so request.is_secure() works
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
@@ -422,6 +555,11 @@ CSRF_COOKIE_SAMESITE = os.environ.get("CSRF_COOKIE_SAMESITE", "Lax")
 CSRF_COOKIE_HTTPONLY = False  # Must be False for JavaScript to read it
 CSRF_USE_SESSIONS = False  # Use cookie-based CSRF (unique per session)
 CSRF_COOKIE_NAME = 'csrftoken'  # Standard Django CSRF cookie name
+# Derive per-(user, session) CSRF tokens with an HMAC instead of storing them
+# in the DB-backed session. Tokens rotate every CSRF_TOKEN_ROTATION_SECONDS;
+# the previous period's token is still accepted.
+CSRF_STATELESS_TOKENS = os.environ.get("CSRF_STATELESS_TOKENS", "True").lower() in ("1", "true", "yes")
+CSRF_TOKEN_ROTATION_SECONDS = int(os.environ.get("CSRF_TOKEN_ROTATION_SECONDS", "86400"))
 # Enforce Origin/Referer header checks
 CSRF_TRUSTED_ORIGINS = CSRF_TRUSTED_ORIGINS  # Already defined above
 
@@ -45,6 +45,7 @@ urlpatterns = [
     path("api/series/", include("series.urls")),
     path("api/live/", include("live.urls")),
     path("api/user-sessions/", include("user_sessions.urls")),
+    path("api/search/", include("search.urls")),
 ]
 
 if schema_view:
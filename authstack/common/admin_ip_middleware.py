@@ -8,6 +8,9 @@ import os
 from django.http import HttpResponseForbidden
 from django.conf import settings
 
+from common.middleware.base import HybridMiddlewareMixin
+from common.route_policy import policy_for_request
+
 
 def get_client_ip(request):
     """Extract client IP from request, considering X-Forwarded-For."""
@@ -19,28 +22,26 @@ def get_client_ip(request):
     return ip
 
 
-class AdminIPAllowlistMiddleware:
+class AdminIPAllowlistMiddleware(HybridMiddlewareMixin):
     """Restrict Django admin access to allowlisted IPs only."""
+
+    nonblocking = True
     
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
         # Load allowed IPs from environment variable
         allowed_ips_str = os.environ.get('ADMIN_ALLOWED_IPS', '')
         self.allowed_ips = set()
         if allowed_ips_str:
             self.allowed_ips = {ip.strip() for ip in allowed_ips_str.split(',') if ip.strip()}
         
-        # Get admin URL path
-        self.admin_path = os.environ.get('ADMIN_URL_PATH', 'secret-admin-panel')
-        
         # In DEBUG mode, allow localhost by default
         if settings.DEBUG:
             self.allowed_ips.update(['127.0.0.1', '::1', 'localhost'])
     
-    def __call__(self, request):
-        # Check if this is an admin request
-        path = request.path.lstrip('/')
-        if path.startswith(f'{self.admin_path}/'):
+    def process_request(self, request):
+        # Check if this is an admin request (admin site routes, see common.route_policy)
+        if policy_for_request(request).admin_ip:
             # If no IPs configured and not DEBUG, block all (fail-secure)
             if not self.allowed_ips and not settings.DEBUG:
                 return HttpResponseForbidden(
@@ -55,6 +56,4 @@ class AdminIPAllowlistMiddleware:
                     f'<h1>Access Denied</h1>'
                     f'<p>Your IP address ({client_ip}) is not authorized to access this interface.</p>'
                 )
-        
-        response = self.get_response(request)
-        return response
+        return None
@@ -0,0 +1,24 @@
+"""Whether the default cache is shared by every web and worker process.
+
+State handed from one process to another through the cache (write-behind
+buffers, counters used as limits, snapshots rebuilt by Celery) only works
+when every process sees the same cache. LocMem is private to one process,
+so callers check ``cache_is_shared()`` and fall back to the database, or to
+short-lived per-process state, when it is not.
+
+The ``SHARED_CACHE`` setting overrides the detection (None detects it from
+the backend).
+"""
+from django.conf import settings
+
+_PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def cache_is_shared() -> bool:
+    explicit = getattr(settings, "SHARED_CACHE", None)
+    if explicit is not None:
+        return bool(explicit)
+    return settings.CACHES["default"]["BACKEND"] not in _PROCESS_LOCAL_BACKENDS
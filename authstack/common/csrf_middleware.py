@@ -3,12 +3,68 @@ AUDIT FIX #5 & #6: Enhanced CSRF Protection Middleware
 
 This middleware ensures CSRF tokens are unique per session and properly validated
 on all state-changing endpoints (POST, PUT, PATCH, DELETE).
+
+Two token modes are supported (settings.CSRF_STATELESS_TOKENS):
+  - stateless (default): the token is an HMAC of (user_id, session_id, epoch)
+    keyed by SECRET_KEY. On unsafe methods of API routes (route_policy
+    csrf_double_submit) the X-CSRFToken header must equal the token derived
+    for the current or the previous epoch, so rotation does not break
+    in-flight clients and a cookie/header pair the client made up is
+    rejected. Nothing is stored. The cookie is only re-sent when the
+    client's copy is missing or out of date.
+  - session: a random per-user token kept in request.session (DB-backed).
 """
+import time
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
 from django.middleware.csrf import CsrfViewMiddleware
 import logging
-from django.utils.crypto import get_random_string
-from typing import Optional
+from django.utils.crypto import constant_time_compare, get_random_string, salted_hmac
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import AccessToken
+from typing import Optional, Tuple
+from accounts.auth_context import get_auth_context
+from common.route_policy import policy_for_request
+
+_HMAC_SALT = "common.csrf_middleware.SessionBoundCSRFMiddleware"
+# Matches CSRF_SECRET_LENGTH so Django accepts the value as an unmasked secret
+_TOKEN_LENGTH = 32
+_UNSET = object()
+
+
+def _stateless_enabled() -> bool:
+    return bool(getattr(settings, "CSRF_STATELESS_TOKENS", True))
+
+
+def _current_epoch() -> int:
+    period = int(getattr(settings, "CSRF_TOKEN_ROTATION_SECONDS", 86400)) or 86400
+    return int(time.time() // period)
+
+
+def derive_csrf_token(user_id: str, session_id: str, epoch: int) -> str:
+    """Stateless CSRF token for (user, session) in the given rotation epoch."""
+    value = f"{user_id}:{session_id}:{epoch}"
+    return salted_hmac(_HMAC_SALT, value, algorithm="sha256").hexdigest()[:_TOKEN_LENGTH]
+
+
+def csrf_token_for_access(access: str) -> Optional[str]:
+    """Current stateless CSRF token for the session an access token was issued for.
+
+    Used by login and refresh so the cookie they set is the one the middleware
+    will accept. Returns None when stateless tokens are off or the token
+    cannot be read.
+    """
+    if not _stateless_enabled():
+        return None
+    try:
+        payload = AccessToken(access).payload
+    except (TokenError, ValueError):
+        return None
+    uid = payload.get("user_id")
+    if uid is None:
+        return None
+    return derive_csrf_token(str(uid), str(payload.get("session_id") or ""), _current_epoch())
 
 
 class SessionBoundCSRFMiddleware(CsrfViewMiddleware):
@@ -17,37 +73,127 @@ class SessionBoundCSRFMiddleware(CsrfViewMiddleware):
     
     This fixes audit findings #5 (Missing CSRF Protection) and #6 (CSRF token reuse).
     Each user session gets a unique CSRF token that cannot be reused across accounts.
+
+    Under ASGI the stateless mode runs entirely on the event loop: the user is
+    loaded with request.auser() and the token work is pure CPU. The
+    session-backed mode still goes through a thread for its DB access.
     """
-    
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if iscoroutinefunction(get_response):
+            # Async chain: avoid the per-request thread hop Django adds for a
+            # sync process_view
+            self.process_view = self._aprocess_view
+
+    async def __acall__(self, request):
+        if not _stateless_enabled():
+            # Session-backed tokens need the DB; keep MiddlewareMixin's thread hop
+            return await super().__acall__(request)
+        request._csrf_user = await self._aresolve_user(request)
+        response = self.process_request(request)
+        response = response or await self.get_response(request)
+        # The view may have authenticated the user (DRF sets request.user)
+        request._csrf_user = await self._aresolve_user(request)
+        return self.process_response(request, response)
+
+    async def _aprocess_view(self, request, callback, callback_args, callback_kwargs):
+        if _stateless_enabled():
+            return SessionBoundCSRFMiddleware.process_view(self, request, callback, callback_args, callback_kwargs)
+        return await sync_to_async(SessionBoundCSRFMiddleware.process_view, thread_sensitive=True)(
+            self, request, callback, callback_args, callback_kwargs
+        )
+
+    async def _aresolve_user(self, request):
+        user = getattr(request, 'user', None)
+        if isinstance(user, SimpleLazyObject) and hasattr(request, 'auser'):
+            # Lazy user from AuthenticationMiddleware: resolving it synchronously
+            # would touch the DB from the event loop
+            user = await request.auser()
+        return user
+
     def _resolve_user_id(self, request) -> Optional[str]:
         try:
-            if hasattr(request, 'user') and getattr(request.user, 'is_authenticated', False):
-                uid = getattr(request.user, 'id', None)
+            user = getattr(request, '_csrf_user', _UNSET)
+            if user is _UNSET:
+                user = getattr(request, 'user', None)
+            if user is not None and getattr(user, 'is_authenticated', False):
+                uid = getattr(user, 'id', None)
                 if uid is not None:
                     return str(uid)
         except Exception:
             pass
         # Fallback: derive from JWT Authorization header so API clients using Bearer auth
         # can receive a CSRF token on authenticated GETs before DRF auth runs
+        # The token is decoded at most once per request (shared AuthContext).
         try:
-            auth = request.META.get('HTTP_AUTHORIZATION', '')
-            if auth.startswith('Bearer '):
-                raw = auth.split(' ', 1)[1]
-                at = AccessToken(raw)
-                uid = at.get('user_id')
-                if uid is not None:
-                    return str(uid)
+            return get_auth_context(request).user_id
         except Exception:
             pass
         return None
 
+    def _resolve_session_id(self, request) -> str:
+        """Session the token is bound to: JWT session_id, else the Django session key."""
+        try:
+            sid = get_auth_context(request).session_id
+            if sid:
+                return sid
+        except Exception:
+            pass
+        session = getattr(request, 'session', None)
+        return (getattr(session, 'session_key', None) or '') if session is not None else ''
+
+    def _stateless_token(self, request, uid: str) -> Tuple[str, Optional[str]]:
+        """Return (token the client holds if valid, else the current one; token to re-issue or None).
+
+        Computed once per request and reused by process_response.
+        """
+        cached = getattr(request, '_stateless_csrf', None)
+        if cached is not None and cached[0] == uid:
+            return cached[1]
+        sid = self._resolve_session_id(request)
+        epoch = _current_epoch()
+        current = derive_csrf_token(uid, sid, epoch)
+        cookie = request.COOKIES.get(settings.CSRF_COOKIE_NAME) or ''
+        if constant_time_compare(cookie, current):
+            result = (current, None)
+        elif cookie and constant_time_compare(cookie, derive_csrf_token(uid, sid, epoch - 1)):
+            # Previous epoch is still accepted; hand out the rotated token
+            result = (cookie, current)
+        else:
+            result = (current, current)
+        request._stateless_csrf = (uid, result)
+        return result
+
+    def _header_matches(self, request, uid: str) -> bool:
+        """Whether the request's CSRF header is the token of uid's session (this or the previous epoch)."""
+        header = request.META.get('HTTP_X_CSRFTOKEN') or request.META.get('HTTP_X_CSRF_TOKEN') or ''
+        if not header:
+            return False
+        sid = self._resolve_session_id(request)
+        epoch = _current_epoch()
+        return any(
+            constant_time_compare(header, derive_csrf_token(uid, sid, e)) for e in (epoch, epoch - 1)
+        )
+
     def process_view(self, request, callback, callback_args, callback_kwargs):
         """
         Override to bind CSRF token to authenticated user (session or Bearer) so
         the cookie is issued on authenticated GETs before POSTs.
         """
         uid = self._resolve_user_id(request)
-        if uid is not None:
+        if uid is not None and _stateless_enabled():
+            token, _ = self._stateless_token(request, uid)
+            # Set before a possible reject so Django re-issues the derived
+            # token rather than a random one and the client can retry
+            request.META['CSRF_COOKIE'] = token
+            if (
+                request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+                and policy_for_request(request).csrf_double_submit
+                and not self._header_matches(request, uid)
+            ):
+                return self._reject(request, 'CSRF token does not belong to this session.')
+        elif uid is not None:
             # Get or create session-specific CSRF token
             session_key = f'csrf_token_{uid}'
             if not request.session.get(session_key):
@@ -83,8 +229,12 @@ class SessionBoundCSRFMiddleware(CsrfViewMiddleware):
         """
         uid = self._resolve_user_id(request)
         if uid is not None:
-            session_key = f'csrf_token_{uid}'
-            csrf_token = request.session.get(session_key)
+            if _stateless_enabled():
+                # Only send the cookie when the client's copy is missing or stale
+                _, csrf_token = self._stateless_token(request, uid)
+            else:
+                session_key = f'csrf_token_{uid}'
+                csrf_token = request.session.get(session_key)
             if csrf_token:
                 # Set the CSRF cookie with the session-bound token
                 response.set_cookie(
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from asgiref.sync import sync_to_async
+from django.utils.deprecation import MiddlewareMixin
+
+
+class HybridMiddlewareMixin(MiddlewareMixin):
+    """MiddlewareMixin that runs natively under both WSGI and ASGI.
+
+    Django's MiddlewareMixin supports async chains, but only by pushing
+    process_request/process_response through sync_to_async, i.e. a thread hop
+    per middleware per request. Subclasses keep their sync hooks for WSGI and
+    add async twins for ASGI:
+
+      - ``aprocess_request`` / ``aprocess_response``: async versions, used when
+        present (they should use cache.aget / the async ORM for I/O).
+      - ``nonblocking = True``: the sync hooks do no I/O (header/path/JWT work
+        only), so they are safe to call inline from the event loop.
+
+    Anything else falls back to MiddlewareMixin's thread hop.
+    """
+
+    nonblocking = False
+
+    async def __acall__(self, request):
+        response = None
+        if hasattr(self, "aprocess_request"):
+            response = await self.aprocess_request(request)
+        elif hasattr(self, "process_request"):
+            if self.nonblocking:
+                response = self.process_request(request)
+            else:
+                response = await sync_to_async(self.process_request, thread_sensitive=True)(request)
+        response = response or await self.get_response(request)
+        if hasattr(self, "aprocess_response"):
+            response = await self.aprocess_response(request, response)
+        elif hasattr(self, "process_response"):
+            if self.nonblocking:
+                response = self.process_response(request, response)
+            else:
+                response = await sync_to_async(self.process_response, thread_sensitive=True)(request, response)
+        return response
@@ -1,68 +1,47 @@
 from __future__ import annotations
-from typing import Optional
 from django.http import JsonResponse, HttpRequest
-from django.utils.deprecation import MiddlewareMixin
-from django.urls import resolve
+
+from common.middleware.base import HybridMiddlewareMixin
+from common.route_policy import policy_for_request
 
 try:
-    from onchannels.version_models import AppVersion, VersionStatus
+    from onchannels.version_models import AppVersion
+    from onchannels.version_policy import aget_platform_policy, get_platform_policy
 except Exception:  # pragma: no cover
     AppVersion = None  # type: ignore
-    VersionStatus = None  # type: ignore
-
-
-# Exact paths that remain allowed even when outdated (logout only)
-SAFE_PATHS_EXACT = (
-    "/api/logout/",
-)
-
-# Prefixes allowed (version endpoints only)
-SAFE_PATH_PREFIXES = (
-    "/api/channels/version/",
-)
-
-SAFE_NAMESPACES = (
-    "admin",
-    "static",
-)
-
+    get_platform_policy = None  # type: ignore
+    aget_platform_policy = None  # type: ignore
 
-def _parse_version_tuple(v: str) -> tuple:
-    parts = (v or "0").split(".")
-    out = []
-    for p in parts:
-        try:
-            out.append(int(p))
-        except Exception:
-            out.append(0)
-    while len(out) < 3:
-        out.append(0)
-    return tuple(out[:3])
 
-
-class AppVersionEnforceMiddleware(MiddlewareMixin):
+class AppVersionEnforceMiddleware(HybridMiddlewareMixin):
     """Return HTTP 426 Upgrade Required when app version is below minimum.
 
     Expects headers injected by the mobile client:
       - X-Device-Platform: ios|android|web
       - X-App-Version: semantic version string e.g. 1.0.0
 
-    Safe-list version and auth endpoints to avoid dead-ends.
+    Safe-list version and auth endpoints to avoid dead-ends. The version
+    policy for each platform is compiled once (onchannels.version_policy),
+    so a request costs no queries.
     """
 
     def process_request(self, request: HttpRequest):
-        # Skip admin/static and safe prefixes
-        path = request.path or ""
-        if path in SAFE_PATHS_EXACT:
+        client = self._client_build(request)
+        if client is None:
             return None
-        if any(path.startswith(p) for p in SAFE_PATH_PREFIXES):
+        return self._check(client[1], get_platform_policy(client[0]))
+
+    async def aprocess_request(self, request: HttpRequest):
+        client = self._client_build(request)
+        if client is None:
+            return None
+        return self._check(client[1], await aget_platform_policy(client[0]))
+
+    def _client_build(self, request: HttpRequest):
+        """(platform, version) to enforce for this request, or None to allow through."""
+        # Skip admin/static, logout and version endpoints (see common.route_policy)
+        if not policy_for_request(request).version_gate:
             return None
-        try:
-            match = resolve(path)
-            if match and match.namespace in SAFE_NAMESPACES:
-                return None
-        except Exception:
-            pass
 
         # Extract platform/version from headers
         platform = request.headers.get("X-Device-Platform", "").lower().strip()
@@ -71,28 +50,17 @@ class AppVersionEnforceMiddleware(MiddlewareMixin):
             # If we cannot determine platform/version, allow through
             return None
 
-        if AppVersion is None:
+        if get_platform_policy is None:
             return None
+        return platform, version
 
-        # Latest active for platform
-        latest: Optional[AppVersion] = (
-            AppVersion.objects.filter(platform=platform, status=VersionStatus.ACTIVE.value)
-            .order_by("-released_at")
-            .first()
-        )
-        if not latest:
+    def _check(self, version: str, policy):
+        if policy is None:
             return None
 
-        # If there is a row for current version and it's blocked/unsupported -> force update
-        current = AppVersion.objects.filter(platform=platform, version=version).first()
-        if current and current.status in {VersionStatus.BLOCKED.value, VersionStatus.UNSUPPORTED.value}:
-            return self._reject(latest)
-
-        # If min_supported_version is set on latest, enforce it
-        msv = (latest.min_supported_version or "").strip()
-        if msv:
-            if _parse_version_tuple(version) < _parse_version_tuple(msv):
-                return self._reject(latest)
+        # Blocked/unsupported build, or below latest.min_supported_version
+        if policy.requires_update(version):
+            return self._reject(policy.latest)
 
         return None
 
@@ -0,0 +1,266 @@
+"""Keyset (cursor) pagination shared by list endpoints.
+
+OFFSET pagination makes the database walk and discard every row before
+the page, and the usual ``count()`` next to it costs as much again, so
+deep pages of an infinite scroll get slower the further a client goes.
+Here a page is instead "the next page_size rows after the last row
+served", in a total order on the list's sort key with the primary key
+appended as tie-breaker. Page 500 is one indexed range scan, like page 1.
+
+The cursor carries the sort key of that last row (and the ordering it
+belongs to), signed with SECRET_KEY: clients treat it as opaque and cannot
+forge positions. A cursor from another ordering, or a tampered one, is
+rejected with 404 as DRF's own CursorPagination does. The total is only
+counted when the client asks with ``?count=1``.
+
+  - ``paginate(queryset, request, ordering)`` serves APIViews and function
+    views that build their own response.
+  - ``KeysetPagination`` is the DRF ``DEFAULT_PAGINATION_CLASS``; it takes
+    the queryset's ordering (OrderingFilter, ``order_by`` or Meta.ordering)
+    unless the view sets ``cursor_ordering``. Requests that still send
+    ``?page=`` (and no cursor) get the previous page-number response with
+    count/next/previous, so existing admin screens keep working until they
+    move to cursors.
+
+NULLs sort before every value, in both directions, on every database.
+"""
+from __future__ import annotations
+
+import datetime
+import json
+from typing import Any, List, NamedTuple, Optional, Sequence
+
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Model, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+CURSOR_PARAM = "cursor"
+PAGE_SIZE_PARAM = "page_size"
+COUNT_PARAM = "count"
+PAGE_PARAM = "page"
+MAX_PAGE_SIZE = 100
+# Viewsets also feed admin dropdowns that load whole lists in one request
+VIEWSET_MAX_PAGE_SIZE = 500
+
+_SALT = "common.pagination"
+
+
+class _Encoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder cuts microseconds, which would skip rows sharing
+        # the millisecond of the last one served
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class _JSONSerializer:
+    # signing's default JSONSerializer does not handle datetimes or UUIDs
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(",", ":"), cls=_Encoder).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data.decode("utf-8"))
+
+
+def sign_cursor(value: Any) -> str:
+    return signing.dumps(value, salt=_SALT, serializer=_JSONSerializer, compress=True)
+
+
+def unsign_cursor(token: str) -> Any:
+    try:
+        return signing.loads(token, salt=_SALT, serializer=_JSONSerializer)
+    except signing.BadSignature:
+        raise NotFound("Invalid cursor")
+
+
+class CursorPage(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+    # Only when the client asked for it
+    count: Optional[int]
+
+
+def _int(value, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _normalized(ordering: Sequence[str]) -> List[str]:
+    """ordering up to its primary key, with the primary key appended if missing."""
+    out = []
+    for field in ordering:
+        name = field.lstrip("-")
+        if name in ("pk", "id"):
+            out.append(field.replace(name, "pk"))
+            return out
+        out.append(field)
+    desc = bool(out) and out[-1].startswith("-")
+    return out + ["-pk" if desc else "pk"]
+
+
+def _expand(model, field: str, depth: int = 0) -> List[str]:
+    """field, or the related model's ordering if field is a foreign key (as Django sorts it)."""
+    desc = field.startswith("-")
+    name = field.lstrip("-")
+    target, f = model, None
+    for part in name.split("__"):
+        try:
+            f = target._meta.get_field(part)
+        except FieldDoesNotExist:
+            # pk or an annotation
+            return [field]
+        if f.is_relation:
+            target = f.related_model
+    if f is None or not f.many_to_one or not target._meta.ordering or depth > 2:
+        return [field]
+    out = []
+    for sub in target._meta.ordering:
+        sub_desc = sub.startswith("-") != desc
+        out += _expand(model, ("-" if sub_desc else "") + f"{name}__{sub.lstrip('-')}", depth + 1)
+    return out
+
+
+def queryset_ordering(queryset) -> List[str]:
+    ordering = list(queryset.query.order_by) or list(queryset.model._meta.ordering)
+    if not all(isinstance(f, str) for f in ordering) or "?" in ordering:
+        raise ImproperlyConfigured(
+            f"Cannot keyset paginate {queryset.model.__name__} by {ordering!r}; set cursor_ordering on the view."
+        )
+    return ordering
+
+
+def _order_by(field: str):
+    if field.startswith("-"):
+        return F(field[1:]).desc(nulls_last=True)
+    return F(field).asc(nulls_first=True)
+
+
+def _after(field: str, value) -> Q:
+    """Rows after value in field's order (NULL is the smallest value)."""
+    name = field.lstrip("-")
+    if field.startswith("-"):
+        if value is None:
+            return Q(pk__in=[])
+        return Q(**{f"{name}__lt": value}) | Q(**{f"{name}__isnull": True})
+    if value is None:
+        return Q(**{f"{name}__isnull": False})
+    return Q(**{f"{name}__gt": value})
+
+
+def _equal(field: str, value) -> Q:
+    name = field.lstrip("-")
+    return Q(**{f"{name}__isnull": True}) if value is None else Q(**{name: value})
+
+
+def _seek(ordering: List[str], values: List[Any]) -> Q:
+    # (a after x) or (a = x and b after y) or ...
+    condition = Q(pk__in=[])
+    for i, field in enumerate(ordering):
+        term = _after(field, values[i])
+        for j in range(i):
+            term &= _equal(ordering[j], values[j])
+        condition |= term
+    return condition
+
+
+def _key(obj, ordering: List[str]) -> List[Any]:
+    values = []
+    for field in ordering:
+        value = obj
+        for attr in field.lstrip("-").split("__"):
+            value = getattr(value, attr, None) if value is not None else None
+        # Ordering by a foreign key sorts by its id
+        values.append(value.pk if isinstance(value, Model) else value)
+    return values
+
+
+def paginate(
+    queryset, request, ordering: Optional[Sequence[str]] = None, page_size: Optional[int] = None,
+    max_page_size: int = MAX_PAGE_SIZE,
+) -> CursorPage:
+    """One page of queryset after the request's cursor."""
+    ordering = _normalized([
+        part for field in (ordering or queryset_ordering(queryset)) for part in _expand(queryset.model, field)
+    ])
+    params = request.query_params
+    page_size = max(1, min(_int(params.get(PAGE_SIZE_PARAM), page_size or api_settings.PAGE_SIZE or 20), max_page_size))
+
+    count = queryset.count() if params.get(COUNT_PARAM) in ("1", "true") else None
+    queryset = queryset.order_by(*[_order_by(f) for f in ordering])
+    token = params.get(CURSOR_PARAM)
+    if token:
+        cursor = unsign_cursor(token)
+        if not isinstance(cursor, dict) or cursor.get("o") != ordering or len(cursor.get("v") or ()) != len(ordering):
+            raise NotFound("Invalid cursor")
+        queryset = queryset.filter(_seek(ordering, cursor["v"]))
+
+    # One extra row says whether there is a next page
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_cursor = sign_cursor({"o": ordering, "v": _key(items[-1], ordering)})
+    return CursorPage(items, next_cursor, count)
+
+
+class _PageNumbers(PageNumberPagination):
+    page_query_param = PAGE_PARAM
+    page_size_query_param = PAGE_SIZE_PARAM
+    max_page_size = VIEWSET_MAX_PAGE_SIZE
+
+
+class KeysetPagination(BasePagination):
+    """DRF pagination class over ``paginate``; responses carry next/next_cursor/results."""
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.legacy = None
+        if PAGE_PARAM in request.query_params and CURSOR_PARAM not in request.query_params:
+            self.legacy = _PageNumbers()
+            return self.legacy.paginate_queryset(queryset, request, view)
+        self.page = paginate(
+            queryset, request, getattr(view, "cursor_ordering", None), max_page_size=VIEWSET_MAX_PAGE_SIZE
+        )
+        return self.page.items
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        body = {}
+        if self.page.count is not None:
+            body["count"] = self.page.count
+        next_url = None
+        if self.page.next_cursor:
+            next_url = replace_query_param(self.request.build_absolute_uri(), CURSOR_PARAM, self.page.next_cursor)
+        body.update({"next": next_url, "next_cursor": self.page.next_cursor, "results": data})
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "count": {"type": "integer", "description": f"Only with ?{COUNT_PARAM}=1"},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "next_cursor": {"type": "string", "nullable": True},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {"name": CURSOR_PARAM, "required": False, "in": "query", "schema": {"type": "string"}},
+            {"name": PAGE_SIZE_PARAM, "required": False, "in": "query", "schema": {"type": "integer"}},
+            {"name": COUNT_PARAM, "required": False, "in": "query", "schema": {"type": "boolean"}},
+            {"name": PAGE_PARAM, "required": False, "in": "query", "schema": {"type": "integer"},
+             "description": "Deprecated page-number paging"},
+        ]
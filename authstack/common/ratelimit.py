@@ -0,0 +1,146 @@
+"""Sliding-window rate limiting over the shared cache.
+
+Every limiter in the project (DRF throttles, login/register, OTP requests)
+goes through ``hit()``. It approximates a sliding window with two fixed
+buckets: the count in the current bucket plus the previous bucket's count
+weighted by how much of it still overlaps the window. That costs one atomic
+``incr`` and one ``get`` per check, and the stored state is two integers per
+key regardless of traffic. DRF's own throttles keep a list of timestamps per
+key and rewrite it on every request.
+
+Counters live in the default cache. Any backend with atomic ``add``/``incr``
+works: Redis (django-redis, when ``REDIS_URL`` is set) shares limits across
+workers, while LocMem keeps them per process, which is enough for
+development and tests.
+"""
+from __future__ import annotations
+
+import math
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from django.core.cache import cache
+from rest_framework.throttling import AnonRateThrottle, SimpleRateThrottle, UserRateThrottle
+
+_KEY_PREFIX = "rl:"
+
+_PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_PERIOD_RE = re.compile(r"(\d*)([smhd])")
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    count: float  # estimated requests in the window, including this one
+    limit: int
+    retry_after: float  # seconds until a request would be allowed again
+
+
+def parse_rate(rate: str) -> Tuple[int, int]:
+    """'5/minute', '3/h' or '10/30s' -> (requests, window seconds)."""
+    num, period = rate.split("/")
+    match = _PERIOD_RE.match(period)
+    if match is None:
+        raise ValueError(f"Invalid rate {rate!r}")
+    return int(num), int(match.group(1) or 1) * _PERIODS[match.group(2)]
+
+
+def _incr(key: str, timeout: int) -> int:
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # First hit in this bucket
+        if cache.add(key, 1, timeout):
+            return 1
+        return cache.incr(key)
+
+
+def _bucket_keys(key: str, window: int, now: float):
+    bucket, into = divmod(now, window)
+    bucket = int(bucket)
+    return f"{_KEY_PREFIX}{key}:{bucket}", f"{_KEY_PREFIX}{key}:{bucket - 1}", into
+
+
+def _result(limit: int, window: int, into: float, current: int, previous: int) -> RateLimitResult:
+    weight = 1 - into / window
+    count = previous * weight + current
+    if count <= limit:
+        return RateLimitResult(True, count, limit, 0.0)
+    if current > limit or previous == 0:
+        retry_after = window - into
+    else:
+        # When the previous bucket has decayed enough to fit another request
+        retry_after = max(0.0, (1 - (limit - current) / previous) * window - into)
+    return RateLimitResult(False, count, limit, math.ceil(retry_after))
+
+
+def hit(key: str, limit: int, window: int, now: Optional[float] = None) -> RateLimitResult:
+    """Count one request against key and report whether it is within limit per window."""
+    now = time.time() if now is None else now
+    current_key, previous_key, into = _bucket_keys(key, window, now)
+    # Buckets are read for up to two windows, then expire on their own
+    current = _incr(current_key, window * 2)
+    previous = cache.get(previous_key) or 0
+    return _result(limit, window, into, current, previous)
+
+
+def peek(key: str, limit: int, window: int, now: Optional[float] = None) -> RateLimitResult:
+    """Whether one more request would be allowed, without counting it.
+
+    For limits on events recorded elsewhere (see record()).
+    """
+    now = time.time() if now is None else now
+    current_key, previous_key, into = _bucket_keys(key, window, now)
+    counts = cache.get_many([current_key, previous_key])
+    return _result(limit, window, into, counts.get(current_key, 0) + 1, counts.get(previous_key, 0))
+
+
+def record(key: str, window: int, now: Optional[float] = None) -> None:
+    """Count one event against key without checking the limit."""
+    now = time.time() if now is None else now
+    current_key, _, _ = _bucket_keys(key, window, now)
+    _incr(current_key, window * 2)
+
+
+def reset(key: str, window: int, now: Optional[float] = None) -> None:
+    """Forget the counters for key (e.g. after a successful login)."""
+    now = time.time() if now is None else now
+    bucket = int(now // window)
+    cache.delete_many([f"{_KEY_PREFIX}{key}:{bucket}", f"{_KEY_PREFIX}{key}:{bucket - 1}"])
+
+
+class SlidingWindowThrottleMixin:
+    """Replace SimpleRateThrottle's timestamp history with hit()."""
+
+    _result: Optional[RateLimitResult] = None
+
+    def parse_rate(self, rate):
+        if rate is None:
+            return (None, None)
+        return parse_rate(rate)
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+        self._result = hit(self.key, self.num_requests, self.duration)
+        return self._result.allowed
+
+    def wait(self):
+        return self._result.retry_after if self._result is not None else None
+
+
+class SlidingWindowRateThrottle(SlidingWindowThrottleMixin, SimpleRateThrottle):
+    pass
+
+
+class SlidingAnonRateThrottle(SlidingWindowThrottleMixin, AnonRateThrottle):
+    pass
+
+
+class SlidingUserRateThrottle(SlidingWindowThrottleMixin, UserRateThrottle):
+    pass
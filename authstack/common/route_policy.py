@@ -0,0 +1,173 @@
+"""Per-route middleware policy.
+
+Our custom middlewares each used to decide for themselves whether a path was
+in scope (``request.path.startswith('/api/')`` plus a hand-maintained
+``_skip_paths`` set). That knowledge now lives in one registry compiled from
+the URLconf the first time it is needed. Every route gets a ``RoutePolicy``
+saying which checks apply; middlewares look the policy up once per request
+via ``policy_for_request``.
+
+Defaults come from the area a path lives in (API, admin site, static files,
+anything else). Views can override them with the ``route_policy`` decorator::
+
+    @route_policy(public=True)          # no session binding / CSRF double-submit
+    class RegisterView(APIView): ...
+
+    @route_policy(version_gate=False)   # reachable from outdated app builds
+    @api_view(["POST"])
+    def check_version_view(request): ...
+"""
+from __future__ import annotations
+
+import re
+import threading
+from dataclasses import dataclass, fields, replace
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.urls.resolvers import RoutePattern
+
+_OVERRIDES_ATTR = "route_policy_overrides"
+_REQUEST_ATTR = "_route_policy"
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    # 400 when no tenant can be resolved (TenantResolverMiddleware)
+    tenant_required: bool = False
+    # 426 for outdated app builds (AppVersionEnforceMiddleware)
+    version_gate: bool = True
+    # Bearer token must match a live session it owns (TokenSessionBindingMiddleware)
+    session_binding: bool = False
+    # Double-submit CSRF for Bearer writes (AuthenticatedCSRFMiddleware)
+    csrf_double_submit: bool = False
+    # Client IP must be allowlisted (AdminIPAllowlistMiddleware)
+    admin_ip: bool = False
+
+
+API_POLICY = RoutePolicy(tenant_required=True, session_binding=True, csrf_double_submit=True)
+ADMIN_POLICY = RoutePolicy(version_gate=False, admin_ip=True)
+STATIC_POLICY = RoutePolicy(version_gate=False)
+DEFAULT_POLICY = RoutePolicy()
+
+_FIELD_NAMES = frozenset(f.name for f in fields(RoutePolicy))
+
+
+def route_policy(public: bool = False, **overrides):
+    """Declare middleware policy for a view function or class.
+
+    ``public=True`` is shorthand for skipping the auth chain
+    (session binding and CSRF double-submit). Other keyword arguments are
+    RoutePolicy fields and override the area defaults for the route.
+    """
+    unknown = set(overrides) - _FIELD_NAMES
+    if unknown:
+        raise TypeError(f"Unknown route policy field(s): {', '.join(sorted(unknown))}")
+    if public:
+        overrides = {"session_binding": False, "csrf_double_submit": False, **overrides}
+
+    def decorator(view):
+        setattr(view, _OVERRIDES_ATTR, dict(overrides))
+        return view
+
+    return decorator
+
+
+def _declared_overrides(callback) -> Optional[dict]:
+    for obj in (callback, getattr(callback, "cls", None), getattr(callback, "view_class", None)):
+        overrides = getattr(obj, _OVERRIDES_ATTR, None) if obj is not None else None
+        if overrides is not None:
+            return overrides
+    return None
+
+
+class RoutePolicyRegistry:
+    """Policies for every route in a URLconf, keyed for O(1) lookup by path."""
+
+    def __init__(self, urlconf=None):
+        self.admin_prefix: Optional[str] = None
+        static_url = getattr(settings, "STATIC_URL", "") or ""
+        self.static_prefix: Optional[str] = (
+            "/" + static_url.lstrip("/") if static_url and "://" not in static_url else None
+        )
+        # Literal paths (routes without converters)
+        self.exact: Dict[str, RoutePolicy] = {}
+        # Routes with converters that declare a policy, checked in URLconf order
+        self.dynamic: List[Tuple[Pattern, RoutePolicy]] = []
+        self._walk(get_resolver(urlconf).url_patterns, "/", "", True)
+
+    def _walk(self, patterns, literal: str, regex: str, is_literal: bool):
+        for entry in patterns:
+            pattern = entry.pattern
+            part_literal = isinstance(pattern, RoutePattern) and not pattern.converters
+            sub_literal = literal + str(pattern) if part_literal else literal
+            sub_regex = regex + pattern.regex.pattern.lstrip("^")
+            if isinstance(entry, URLResolver):
+                if entry.app_name == "admin" and is_literal and part_literal and self.admin_prefix is None:
+                    self.admin_prefix = sub_literal
+                self._walk(entry.url_patterns, sub_literal, sub_regex, is_literal and part_literal)
+            elif isinstance(entry, URLPattern):
+                overrides = _declared_overrides(entry.callback)
+                if is_literal and part_literal:
+                    self.exact.setdefault(sub_literal, self._policy(sub_literal, overrides))
+                elif overrides:
+                    self.dynamic.append((re.compile("^/" + sub_regex), self._policy(sub_literal, overrides)))
+
+    def _policy(self, path: str, overrides: Optional[dict]) -> RoutePolicy:
+        base = self.area_policy(path)
+        return replace(base, **overrides) if overrides else base
+
+    def area_policy(self, path: str) -> RoutePolicy:
+        if self.admin_prefix and path.startswith(self.admin_prefix):
+            return ADMIN_POLICY
+        if self.static_prefix and path.startswith(self.static_prefix):
+            return STATIC_POLICY
+        if path.startswith("/api/"):
+            return API_POLICY
+        return DEFAULT_POLICY
+
+    def lookup(self, path: str) -> RoutePolicy:
+        policy = self.exact.get(path)
+        if policy is not None:
+            return policy
+        for regex, policy in self.dynamic:
+            if regex.match(path):
+                return policy
+        return self.area_policy(path)
+
+
+_registry: Optional[RoutePolicyRegistry] = None
+_lock = threading.Lock()
+
+
+def get_registry() -> RoutePolicyRegistry:
+    global _registry
+    if _registry is None:
+        with _lock:
+            if _registry is None:
+                _registry = RoutePolicyRegistry()
+    return _registry
+
+
+def reset_route_policies() -> None:
+    global _registry
+    with _lock:
+        _registry = None
+
+
+def policy_for_request(request) -> RoutePolicy:
+    """RoutePolicy for request.path, looked up once per request."""
+    policy = getattr(request, _REQUEST_ATTR, None)
+    if policy is None:
+        policy = get_registry().lookup(request.path or "/")
+        setattr(request, _REQUEST_ATTR, policy)
+    return policy
+
+
+@receiver(setting_changed, dispatch_uid="common_route_policy_setting_changed")
+def _on_setting_changed(setting, **kwargs):
+    if setting in {"ROOT_URLCONF", "STATIC_URL"}:
+        reset_route_policies()
@@ -1,23 +1,27 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import List, Optional, Tuple
 import logging
 from django.conf import settings
 from django.http import JsonResponse
-from django.utils.deprecation import MiddlewareMixin
 
-from tenants.models import Tenant, TenantDomain
+from common.middleware.base import HybridMiddlewareMixin
+from common.route_policy import policy_for_request
+from tenants.cache import aget_tenant_by_domain, aget_tenant_by_slug, get_tenant_by_domain, get_tenant_by_slug
+from tenants.models import Tenant
 
 logger = logging.getLogger(__name__)
 
 
-class AuthorizationHeaderNormalizerMiddleware(MiddlewareMixin):
+class AuthorizationHeaderNormalizerMiddleware(HybridMiddlewareMixin):
     """
     Dev-only helper: if Swagger UI (or any client) sends a raw JWT without the
     'Bearer ' prefix in the Authorization header, normalize it so DRF SimpleJWT
     can authenticate it. Only active when settings.DEBUG is True.
     """
 
+    nonblocking = True
+
     def process_request(self, request):
         # Only for /api/* in DEBUG; do nothing in production
         if not getattr(settings, "DEBUG", False):
@@ -46,21 +50,33 @@ class AuthorizationHeaderNormalizerMiddleware(MiddlewareMixin):
         return None
 
 
-class TenantResolverMiddleware(MiddlewareMixin):
+class TenantResolverMiddleware(HybridMiddlewareMixin):
     """
     Resolve request.tenant from Host (portal) or X-Tenant-Id header (mobile).
-    If path starts with /api/ and no tenant could be resolved, return 400.
+    If the route requires a tenant (all /api/ routes unless declared otherwise,
+    see common.route_policy) and none could be resolved, return 400.
     """
 
     HEADER_NAME = "X-Tenant-Id"
 
     def process_request(self, request):
+        self._log_headers(request)
+        return self._apply(request, self._resolve_tenant(request))
+
+    async def aprocess_request(self, request):
+        self._log_headers(request)
+        return self._apply(request, await self._aresolve_tenant(request))
+
+    def _header_tenant(self, request) -> Optional[str]:
+        return request.headers.get(self.HEADER_NAME) or request.META.get(
+            f"HTTP_{self.HEADER_NAME.replace('-', '_').upper()}"
+        )
+
+    def _log_headers(self, request) -> None:
         # For API requests, log presence of Authorization and X-Tenant-Id headers (DEBUG only)
         if logger.isEnabledFor(logging.DEBUG) and request.path.startswith("/api/"):
             auth_header = request.headers.get("Authorization") or request.META.get("HTTP_AUTHORIZATION")
-            tenant_header = request.headers.get(self.HEADER_NAME) or request.META.get(
-                f"HTTP_{self.HEADER_NAME.replace('-', '_').upper()}"
-            )
+            tenant_header = self._header_tenant(request)
 
             def _mask_token(tok: str) -> str:
                 try:
@@ -79,37 +95,33 @@ class TenantResolverMiddleware(MiddlewareMixin):
             masked = _mask_token(auth_header)
             logger.debug("Auth header present: %s; X-Tenant-Id: %s", masked, tenant_header or "<none>")
 
-        tenant = self._resolve_tenant(request)
-        if tenant is None and request.path.startswith("/api/"):
+    def _apply(self, request, tenant: Optional[Tenant]):
+        if tenant is None and policy_for_request(request).tenant_required:
             # Emit a concise debug log to help diagnose why tenant was not resolved
-            header_val = request.headers.get(self.HEADER_NAME) or request.META.get(
-                f"HTTP_{self.HEADER_NAME.replace('-', '_').upper()}"
-            )
             host_only = (request.get_host() or "").split(":")[0]
             logger.debug(
                 "Tenant resolution failed: path=%s header[%s]=%s host=%s",
                 request.path,
                 self.HEADER_NAME,
-                header_val,
+                self._header_tenant(request),
                 host_only,
             )
             return JsonResponse({"detail": "Unknown tenant"}, status=400)
         request.tenant = tenant
+        return None
 
-    def _resolve_tenant(self, request) -> Optional[Tenant]:
+    def _candidates(self, request) -> List[Tuple[str, str, str, bool]]:
+        """Lookups to try in order: (kind, key, source, final).
+
+        kind is "slug" or "domain"; a final candidate decides the result even
+        when it resolves to None.
+        """
         # 1) Mobile header takes precedence if present
-        header_tenant = request.headers.get(self.HEADER_NAME) or request.META.get(
-            f"HTTP_{self.HEADER_NAME.replace('-', '_').upper()}"
-        )
+        header_tenant = self._header_tenant(request)
         if header_tenant:
-            tenant = Tenant.objects.filter(slug=header_tenant, active=True).first()
-            logger.debug(
-                "Tenant resolution via header: %s -> %s",
-                header_tenant,
-                getattr(tenant, "slug", None),
-            )
-            return tenant
+            return [("slug", header_tenant, "header", True)]
 
+        candidates = []
         # 1b) Special-cases: allow query param for public preview/proxy so Admin "Preview" works
         # This keeps other API routes strict to headers/subdomain.
         try:
@@ -121,16 +133,13 @@ class TenantResolverMiddleware(MiddlewareMixin):
             ):
                 qp_tenant = request.GET.get("tenant") or getattr(request, "query_params", {}).get("tenant")  # type: ignore[attr-defined]
                 if qp_tenant:
-                    tenant = Tenant.objects.filter(slug=qp_tenant, active=True).first()
-                    if tenant:
-                        if path.startswith("/api/live/radio/preview/"):
-                            which = "radio-preview"
-                        elif path.startswith("/api/live/preview/"):
-                            which = "preview"
-                        else:
-                            which = "proxy"
-                        logger.debug("Tenant resolution via query param for %s: %s", which, tenant.slug)
-                        return tenant
+                    if path.startswith("/api/live/radio/preview/"):
+                        which = "radio-preview"
+                    elif path.startswith("/api/live/preview/"):
+                        which = "preview"
+                    else:
+                        which = "proxy"
+                    candidates.append(("slug", qp_tenant, f"query param for {which}", False))
         except Exception:
             # Fall through to host-based resolution
             pass
@@ -142,16 +151,25 @@ class TenantResolverMiddleware(MiddlewareMixin):
             subdomain = host.split(".")[0]
             # Optionally ignore common prefixes
             if subdomain and subdomain.lower() not in {"www"}:
-                # Try direct slug match first
-                t = Tenant.objects.filter(slug=subdomain, active=True).first()
-                if t:
-                    logger.debug("Tenant resolution via subdomain: host=%s subdomain=%s -> %s", host, subdomain, t.slug)
-                    return t
-                # Then via explicit domain mapping table
-                dom = TenantDomain.objects.filter(domain=host).select_related("tenant").first()
-                if dom and dom.tenant.active:
-                    logger.debug("Tenant resolution via domain mapping: host=%s -> %s", host, dom.tenant.slug)
-                    return dom.tenant
+                # Try direct slug match first, then the explicit domain mapping table
+                candidates.append(("slug", subdomain, f"subdomain (host={host})", False))
+                candidates.append(("domain", host, "domain mapping", False))
         else:
             logger.debug("Tenant resolution skipped host branch (no dot in host): host=%s", host)
+        return candidates
+
+    def _resolve_tenant(self, request) -> Optional[Tenant]:
+        for kind, key, source, final in self._candidates(request):
+            tenant = get_tenant_by_slug(key) if kind == "slug" else get_tenant_by_domain(key)
+            if tenant is not None or final:
+                logger.debug("Tenant resolution via %s: %s -> %s", source, key, getattr(tenant, "slug", None))
+                return tenant
+        return None
+
+    async def _aresolve_tenant(self, request) -> Optional[Tenant]:
+        for kind, key, source, final in self._candidates(request):
+            tenant = await (aget_tenant_by_slug(key) if kind == "slug" else aget_tenant_by_domain(key))
+            if tenant is not None or final:
+                logger.debug("Tenant resolution via %s: %s -> %s", source, key, getattr(tenant, "slug", None))
+                return tenant
         return None
@@ -0,0 +1,170 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIClient
+
+from common.pagination import paginate
+from common.ratelimit import hit, parse_rate, peek, record
+from onchannels.models import Channel, Playlist, ShortComment, ShortJob, UserNotification
+from tenants.models import Tenant
+
+
+class SlidingWindowTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_parse_rate(self):
+        self.assertEqual(parse_rate("5/minute"), (5, 60))
+        self.assertEqual(parse_rate("3/hour"), (3, 3600))
+        self.assertEqual(parse_rate("10/30s"), (10, 30))
+
+    def test_limit_within_window(self):
+        start = 6000.0  # bucket boundary for a 60s window
+        for i in range(5):
+            self.assertTrue(hit("k", 5, 60, now=start + i).allowed)
+        blocked = hit("k", 5, 60, now=start + 10)
+        self.assertFalse(blocked.allowed)
+        self.assertGreater(blocked.retry_after, 0)
+
+    def test_previous_bucket_decays(self):
+        start = 6000.0
+        for i in range(5):
+            hit("k", 5, 60, now=start + i)
+        # Early in the next bucket the previous one still nearly fills the window
+        self.assertFalse(hit("k", 5, 60, now=start + 61).allowed)
+        # Two buckets later it no longer counts at all
+        for i in range(5):
+            self.assertTrue(hit("k", 5, 60, now=start + 180 + i).allowed)
+
+    def test_keys_are_independent(self):
+        for _ in range(3):
+            hit("a", 3, 60, now=6000.0)
+        self.assertFalse(hit("a", 3, 60, now=6001.0).allowed)
+        self.assertTrue(hit("b", 3, 60, now=6001.0).allowed)
+
+    def test_peek_does_not_count(self):
+        for _ in range(2):
+            record("r", 60, now=6000.0)
+        self.assertTrue(peek("r", 3, 60, now=6001.0).allowed)
+        self.assertTrue(peek("r", 3, 60, now=6001.0).allowed)
+        record("r", 60, now=6002.0)
+        self.assertFalse(peek("r", 3, 60, now=6003.0).allowed)
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="reader", password="Passw0rd!")
+        now = timezone.now()
+        self.notes = [UserNotification.objects.create(user=self.user, title=f"n{i}") for i in range(7)]
+        # Ties on created_at and NULL read_at exercise the tie-breaker
+        UserNotification.objects.filter(pk__in=[n.pk for n in self.notes[:4]]).update(created_at=now)
+        UserNotification.objects.filter(pk__in=[n.pk for n in self.notes[::2]]).update(read_at=now)
+
+    def _page(self, ordering, **params):
+        request = Request(RequestFactory().get("/", params))
+        return paginate(UserNotification.objects.filter(user=self.user), request, ordering)
+
+    def _walk(self, ordering, page_size=2):
+        seen, cursor = [], None
+        while True:
+            params = {"page_size": page_size, **({"cursor": cursor} if cursor else {})}
+            with CaptureQueriesContext(connection) as ctx:
+                page = self._page(ordering, **params)
+            self.assertEqual(len(ctx.captured_queries), 1)
+            seen += [n.pk for n in page.items]
+            cursor = page.next_cursor
+            if not cursor:
+                return seen
+
+    def test_pages_follow_the_full_ordering(self):
+        for ordering in (["-created_at"], ["read_at", "-created_at"], ["-read_at", "title"]):
+            qs = UserNotification.objects.filter(user=self.user)
+            expected = list(paginate(qs, Request(RequestFactory().get("/", {"page_size": 100})), ordering).items)
+            self.assertEqual(self._walk(ordering), [n.pk for n in expected])
+            self.assertEqual(len(expected), 7)
+        by_hand = sorted(UserNotification.objects.filter(user=self.user), key=lambda n: (n.created_at, n.pk), reverse=True)
+        self.assertEqual(self._walk(["-created_at"], page_size=3), [n.pk for n in by_hand])
+
+    def test_count_only_on_request(self):
+        self.assertIsNone(self._page(["-created_at"]).count)
+        self.assertEqual(self._page(["-created_at"], count="1").count, 7)
+
+    def test_cursor_is_signed_and_bound_to_its_ordering(self):
+        cursor = self._page(["-created_at"], page_size=2).next_cursor
+        with self.assertRaises(NotFound):
+            self._page(["title"], cursor=cursor)
+        with self.assertRaises(NotFound):
+            self._page(["-created_at"], cursor=cursor[:-2] + "xx")
+
+    def test_foreign_key_ordering_uses_related_ordering(self):
+        late = Channel.objects.create(id_slug="a-late", sort_order=2)
+        early = Channel.objects.create(id_slug="z-early", sort_order=1)
+        Playlist.objects.create(id="P1", channel=late, title="A")
+        Playlist.objects.create(id="P2", channel=early, title="B")
+        # Playlist.Meta.ordering is ["channel", "title"]
+        page = paginate(Playlist.objects.all(), Request(RequestFactory().get("/", {"page_size": 1})))
+        self.assertEqual([p.id for p in page.items], ["P2"])
+
+
+class CursorEndpointTests(TestCase):
+    def setUp(self):
+        Tenant.objects.create(slug="ontime", name="Ontime", active=True)
+        self.user = get_user_model().objects.create_user(username="commenter", password="Passw0rd!")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.headers = {"HTTP_X_TENANT_ID": "ontime"}
+
+    def test_comments_walk_with_next_cursor(self):
+        job = ShortJob.objects.create(tenant="ontime", source_url="https://youtu.be/c1")
+        for i in range(5):
+            ShortComment.objects.create(job=job, user=self.user, text=f"c{i}")
+        url = f"/api/channels/shorts/{job.id}/comments/"
+        texts, params = [], {"page_size": 2, "count": 1}
+        while True:
+            body = self.client.get(url, params, **self.headers).json()
+            texts += [c["text"] for c in body["results"]]
+            if not body["next_cursor"]:
+                break
+            params = {"page_size": 2, "cursor": body["next_cursor"]}
+        self.assertEqual(texts, [f"c{i}" for i in reversed(range(5))])
+        self.assertEqual(self.client.get(url, {"count": 1}, **self.headers).json()["count"], 5)
+        self.assertNotIn("count", body)
+
+    def test_comments_still_accept_offset(self):
+        job = ShortJob.objects.create(tenant="ontime", source_url="https://youtu.be/c2")
+        for i in range(3):
+            ShortComment.objects.create(job=job, user=self.user, text=f"c{i}")
+        body = self.client.get(f"/api/channels/shorts/{job.id}/comments/", {"offset": 1, "limit": 1}, **self.headers).json()
+        self.assertEqual((body["count"], [c["text"] for c in body["results"]]), (3, ["c1"]))
+        # Unparseable values fall back to the first page of 20, as before
+        res = self.client.get(f"/api/channels/shorts/{job.id}/comments/", {"offset": "x", "limit": "y"}, **self.headers)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(res.json()["results"]), 3)
+
+    def test_viewsets_keep_page_numbers_for_page_clients(self):
+        for i in range(3):
+            Channel.objects.create(tenant="ontime", id_slug=f"ch{i}", sort_order=i, is_active=True)
+        body = self.client.get("/api/channels/", {"page": 2, "page_size": 2}, **self.headers).json()
+        self.assertEqual(body["count"], 3)
+        self.assertEqual([c["id_slug"] for c in body["results"]], ["ch2"])
+        self.assertTrue(body["previous"])
+        cursor_page = self.client.get("/api/channels/", {"page_size": 2}, **self.headers).json()
+        self.assertNotIn("count", cursor_page)
+        self.assertTrue(cursor_page["next_cursor"])
+
+    def test_notifications_keep_full_list_unless_paged(self):
+        for i in range(3):
+            UserNotification.objects.create(user=self.user, title=f"n{i}")
+        full = self.client.get("/api/channels/notifications/", **self.headers).json()
+        self.assertEqual((full["count"], full["pages"]), (3, 1))
+        # The apps send page_size without a cursor and expect the full list
+        sized = self.client.get("/api/channels/notifications/", {"page_size": 2}, **self.headers).json()
+        self.assertEqual(len(sized["results"]), 3)
+        paged = self.client.get("/api/channels/notifications/", {"cursor": "", "page_size": 2}, **self.headers).json()
+        self.assertEqual([n["title"] for n in paged["results"]], ["n2", "n1"])
+        self.assertTrue(paged["next_cursor"])
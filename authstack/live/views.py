@@ -13,6 +13,7 @@ from urllib.parse import urlencode
 from urllib.request import Request, urlopen
 from urllib.error import URLError, HTTPError
 from django.urls import reverse
+from accounts.authz import get_authz
 
 from .models import Live, LiveRadio
 from .serializers import LiveSerializer, LiveRadioSerializer
@@ -71,10 +72,10 @@ class LiveViewSet(viewsets.ModelViewSet):
         user = self.request.user
         # Non-admins: active only
         try:
-            is_admin_fe = bool(getattr(user, 'is_superuser', False)) or user.groups.filter(name='AdminFrontend').exists()
+            is_admin_fe = get_authz(self.request).is_admin_frontend
         except Exception:
             is_admin_fe = bool(getattr(user, 'is_superuser', False))
-        if not (is_admin_fe or user.has_perm('live.change_live')):
+        if not (is_admin_fe or get_authz(self.request).has_perm('live.change_live')):
             qs = qs.filter(is_active=True)
         tenant = self.request.headers.get('X-Tenant-Id') or self.request.query_params.get('tenant') or 'ontime'
         qs = qs.filter(tenant=tenant)
@@ -108,10 +109,10 @@ class LiveBySlugView(APIView):
         tenant = request.headers.get('X-Tenant-Id') or request.query_params.get('tenant') or 'ontime'
         qs = Live.objects.select_related('channel').filter(tenant=tenant, channel__id_slug=slug)
         try:
-            is_admin_fe = bool(getattr(request.user, 'is_superuser', False)) or request.user.groups.filter(name='AdminFrontend').exists()
+            is_admin_fe = get_authz(request).is_admin_frontend
         except Exception:
             is_admin_fe = bool(getattr(request.user, 'is_superuser', False))
-        if not (is_admin_fe or request.user.has_perm('live.change_live')):
+        if not (is_admin_fe or get_authz(request).has_perm('live.change_live')):
             qs = qs.filter(is_active=True)
         obj = get_object_or_404(qs)
         return Response(LiveSerializer(obj, context={'request': request}).data)
@@ -135,10 +136,10 @@ class LiveRadioViewSet(viewsets.ModelViewSet):
         qs = qs.filter(tenant=tenant)
         # Non-admins see only active & verified
         try:
-            is_admin_fe = bool(getattr(self.request.user, 'is_superuser', False)) or self.request.user.groups.filter(name='AdminFrontend').exists()
+            is_admin_fe = get_authz(self.request).is_admin_frontend
         except Exception:
             is_admin_fe = bool(getattr(self.request.user, 'is_superuser', False))
-        if not (is_admin_fe or self.request.user.has_perm('live.change_liveradio')):
+        if not (is_admin_fe or get_authz(self.request).has_perm('live.change_liveradio')):
             qs = qs.filter(is_active=True, is_verified=True)
         return qs
 
@@ -164,10 +165,10 @@ class RadioListView(APIView):
         tenant = request.headers.get('X-Tenant-Id') or request.query_params.get('tenant') or 'ontime'
         qs = LiveRadio.objects.all().filter(tenant=tenant)
         try:
-            is_admin_fe = bool(getattr(request.user, 'is_superuser', False)) or request.user.groups.filter(name='AdminFrontend').exists()
+            is_admin_fe = get_authz(request).is_admin_frontend
         except Exception:
             is_admin_fe = bool(getattr(request.user, 'is_superuser', False))
-        if not (is_admin_fe or request.user.has_perm('live.change_liveradio')):
+        if not (is_admin_fe or get_authz(request).has_perm('live.change_liveradio')):
             qs = qs.filter(is_active=True, is_verified=True)
         # Optional filters
         q = request.query_params.get('q')
@@ -486,10 +487,10 @@ class RadioBySlugView(APIView):
         tenant = request.headers.get('X-Tenant-Id') or request.query_params.get('tenant') or 'ontime'
         qs = LiveRadio.objects.filter(tenant=tenant, slug=slug)
         try:
-            is_admin_fe = bool(getattr(request.user, 'is_superuser', False)) or request.user.groups.filter(name='AdminFrontend').exists()
+            is_admin_fe = get_authz(request).is_admin_frontend
         except Exception:
             is_admin_fe = bool(getattr(request.user, 'is_superuser', False))
-        if not (is_admin_fe or request.user.has_perm('live.change_liveradio')):
+        if not (is_admin_fe or get_authz(request).has_perm('live.change_liveradio')):
             qs = qs.filter(is_active=True, is_verified=True)
         obj = get_object_or_404(qs)
         return Response(LiveRadioSerializer(obj, context={'request': request}).data)
@@ -690,8 +690,12 @@ class ShortJobAdmin(admin.ModelAdmin):
         'reserved_bytes', 'used_bytes', 'created_at'
     )
     list_filter = ('tenant', 'status', 'content_class', 'ladder_profile')
-    search_fields = ('id', 'source_url', 'tenant')
-    readonly_fields = ('created_at', 'updated_at', 'error_message', 'retry_count', 'hls_master_url')
+    search_fields = ('id', 'source_url', 'tenant', 'video_id', 'video_title')
+    readonly_fields = (
+        'created_at', 'updated_at', 'error_message', 'retry_count', 'hls_master_url',
+        # Kept in sync from Video/Channel; see onchannels.shorts_metadata
+        'video_id', 'video_title', 'channel_slug', 'channel_name', 'thumbnail_url', 'video_published_at',
+    )
     actions = ['retry_ingestion']
 
     def retry_ingestion(self, request, queryset):  # noqa: D401
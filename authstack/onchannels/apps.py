@@ -8,3 +8,6 @@ class ChannelsConfig(AppConfig):
     # Django app label (kept as 'channels' for admin display/migrations)
     label = "channels"
     verbose_name = "Channels"
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,89 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from onchannels.models import ShortJob, Video
+from onchannels.shorts_metadata import video_fields, yt_video_id_from_url
+
+FIELDS = ["video_id", "video_title", "channel_slug", "channel_name", "thumbnail_url", "video_published_at"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy video title/channel/thumbnail onto ShortJob rows created before they were denormalized. "
+        "Walks jobs in primary key order; rerun with --start-after to resume."
+    )
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--batch-size", type=int, default=500, help="Jobs per batch (default 500)")
+        parser.add_argument("--start-after", type=str, default=None, help="Resume after this job id")
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Refresh every job, not only those without a video_id",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, int(options.get("batch_size") or 500))
+        last_pk = options.get("start_after")
+        jobs = ShortJob.objects.order_by("pk")
+        if not options.get("all"):
+            jobs = jobs.filter(video_id="")
+
+        scanned = updated = 0
+        while True:
+            page = jobs.filter(pk__gt=last_pk) if last_pk else jobs
+            batch = list(page[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            scanned += len(batch)
+
+            wanted = {}
+            for job in batch:
+                vid = job.video_id or yt_video_id_from_url(job.source_url)
+                if vid:
+                    wanted[job.pk] = vid
+            videos = {}
+            # One query per batch; the first row per video_id wins, as in
+            # the old per-job lookups
+            for v in Video.objects.select_related("channel").filter(video_id__in=set(wanted.values())):
+                videos.setdefault(v.video_id, v)
+
+            # A live job may only claim a video id no other live job of its
+            # tenant holds (uniq_shortjob_tenant_video); duplicates keep an
+            # empty video_id but still get the metadata
+            claims = {
+                job.pk: wanted[job.pk]
+                for job in batch
+                if job.pk in wanted and not job.video_id and job.status != ShortJob.STATUS_DELETED
+            }
+            taken = set(
+                ShortJob.objects.filter(video_id__in=set(claims.values()))
+                .exclude(status=ShortJob.STATUS_DELETED)
+                .exclude(pk__in=list(claims))
+                .values_list("tenant", "video_id")
+            ) if claims else set()
+
+            changed = []
+            for job in batch:
+                vid = wanted.get(job.pk)
+                if not vid:
+                    continue
+                job.video_id = vid
+                if job.pk in claims:
+                    if (job.tenant, vid) in taken:
+                        job.video_id = ""
+                    else:
+                        taken.add((job.tenant, vid))
+                video = videos.get(vid)
+                if video is not None:
+                    for name, value in video_fields(video).items():
+                        setattr(job, name, value)
+                changed.append(job)
+            if changed:
+                # bulk_update leaves updated_at alone, so feed order is unchanged
+                ShortJob.objects.bulk_update(changed, FIELDS)
+                updated += len(changed)
+            self.stdout.write(f" - through {last_pk}: {scanned} scanned, {updated} updated")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {updated} of {scanned} short job(s)"))
+        return 0
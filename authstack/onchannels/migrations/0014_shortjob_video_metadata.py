@@ -0,0 +1,43 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('channels', '0013_playlist_yt_last_item_published_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='shortjob',
+            name='channel_name',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='shortjob',
+            name='channel_slug',
+            field=models.CharField(blank=True, default='', max_length=128),
+        ),
+        migrations.AddField(
+            model_name='shortjob',
+            name='thumbnail_url',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='shortjob',
+            name='video_id',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='shortjob',
+            name='video_published_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='shortjob',
+            name='video_title',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import migrations, models
+
+from onchannels.shorts_metadata import yt_video_id_from_url
+
+BATCH_SIZE = 1000
+
+
+def fill_video_ids(apps, schema_editor):
+    """Give every live job its video_id and keep one live job per video.
+
+    Dedupe now matches on (tenant, video_id) only, so jobs that predate the
+    column get it parsed from source_url here (metadata is left to
+    backfill_short_metadata). Where a tenant already has several live jobs
+    for a video, the ready (else most recently updated) one keeps the id;
+    the others are left without one so the constraint can be added.
+    """
+    ShortJob = apps.get_model('channels', 'ShortJob')
+    live = ShortJob.objects.exclude(status='deleted')
+
+    pending = []
+    for job in live.filter(video_id='').only('pk', 'source_url').iterator(chunk_size=BATCH_SIZE):
+        vid = yt_video_id_from_url(job.source_url)
+        if vid:
+            job.video_id = vid[:32]
+            pending.append(job)
+        if len(pending) >= BATCH_SIZE:
+            ShortJob.objects.bulk_update(pending, ['video_id'])
+            pending = []
+    if pending:
+        ShortJob.objects.bulk_update(pending, ['video_id'])
+
+    dupes = (
+        live.exclude(video_id='')
+        .values('tenant', 'video_id')
+        .annotate(n=models.Count('pk'))
+        .filter(n__gt=1)
+    )
+    for row in dupes.iterator():
+        jobs = list(
+            live.filter(tenant=row['tenant'], video_id=row['video_id'])
+            .order_by('-updated_at')
+            .values_list('pk', 'status')
+        )
+        keep = next((pk for pk, status in jobs if status == 'ready'), jobs[0][0])
+        ShortJob.objects.filter(pk__in=[pk for pk, _ in jobs if pk != keep]).update(video_id='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('channels', '0014_shortjob_video_metadata'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_video_ids, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='shortjob',
+            constraint=models.UniqueConstraint(condition=models.Q(models.Q(('video_id', ''), _negated=True), models.Q(('status', 'deleted'), _negated=True)), fields=('tenant', 'video_id'), name='uniq_shortjob_tenant_video'),
+        ),
+    ]
@@ -229,6 +229,15 @@ class ShortJob(models.Model):
 
     content_class = models.CharField(max_length=16, choices=CLASS_CHOICES, default=CLASS_NORMAL)
 
+    # Copied from Video/Channel so the shorts feeds need no per-item lookup
+    # (see onchannels.shorts_metadata)
+    video_id = models.CharField(max_length=32, blank=True, default='', db_index=True)
+    video_title = models.CharField(max_length=255, blank=True, default='')
+    channel_slug = models.CharField(max_length=128, blank=True, default='')
+    channel_name = models.CharField(max_length=255, blank=True, default='')
+    thumbnail_url = models.TextField(blank=True, default='')
+    video_published_at = models.DateTimeField(blank=True, null=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -236,6 +245,15 @@ class ShortJob(models.Model):
         indexes = [
             models.Index(fields=['tenant', 'status', '-created_at']),
         ]
+        constraints = [
+            # One live job per video and tenant; imports dedupe on this key
+            # (see onchannels.shorts_imports)
+            models.UniqueConstraint(
+                fields=['tenant', 'video_id'],
+                condition=~models.Q(video_id='') & ~models.Q(status='deleted'),
+                name='uniq_shortjob_tenant_video',
+            ),
+        ]
         ordering = ['-created_at']
         verbose_name = 'Short Ingestion Job'
         verbose_name_plural = 'Short Ingestion Jobs'
@@ -2,8 +2,8 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
-from django.core.paginator import Paginator
 from django.utils import timezone
+from common.pagination import CURSOR_PARAM, paginate
 from .models import UserNotification
 
 
@@ -14,11 +14,16 @@ def list_notifications_view(request):
 
     Query params:
       - read: '0' for unread only, '1' for read only, omit for all
+      - cursor: return one page (common.pagination) plus next_cursor;
+        send an empty cursor for the first page. page_size applies only
+        here, count only with count=1
       
     NOTE: This endpoint previously paginated with a default page_size=20. It
     now returns all matching notifications in a single response, ordered by
     newest first. The response shape still includes count/page/pages/results
-    for backward compatibility, but page/pages are always 1.
+    for backward compatibility, but page/pages are always 1. Existing clients
+    send page/page_size and expect that full list, so only a cursor param
+    switches to cursor pages.
     """
     user = request.user
     qs = UserNotification.objects.filter(user=user)
@@ -28,9 +33,8 @@ def list_notifications_view(request):
     elif read == '1':
         qs = qs.filter(read_at__isnull=False)
 
-    qs = qs.order_by('-created_at')
-    items = [
-        {
+    def row(n):
+        return {
             'id': n.id,
             'title': n.title,
             'body': n.body,
@@ -38,8 +42,15 @@ def list_notifications_view(request):
             'created_at': n.created_at.isoformat(),
             'read_at': n.read_at.isoformat() if n.read_at else None,
         }
-        for n in qs
-    ]
+
+    if CURSOR_PARAM in request.GET:
+        page = paginate(qs, request, ['-created_at', '-id'])
+        body = {'results': [row(n) for n in page.items], 'next_cursor': page.next_cursor}
+        if page.count is not None:
+            body['count'] = page.count
+        return Response(body)
+
+    items = [row(n) for n in qs.order_by('-created_at')]
     return Response({
         'count': len(items),
         'page': 1,
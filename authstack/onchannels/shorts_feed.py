@@ -0,0 +1,131 @@
+"""Precomputed per-tenant shorts feed.
+
+ShortsReadyFeedView used to load and shuffle the newest ready jobs on every
+request. The feed is now read from a snapshot in the default cache: the
+newest ``SHORTS_FEED_SNAPSHOT_SIZE`` ready jobs of a tenant, each already
+rendered as its payload fragment. A request only orders the snapshot by its
+seed and slices after its cursor, so it costs the same whatever the size of
+the job table.
+
+The order for a seed is by a per-item hash of (seed, job id) rather than a
+shuffle of the whole list. As the old view shuffled only the newest
+``limit * 3`` jobs, the first page is drawn from the newest ``limit * 3``
+items of the snapshot and the rest of the snapshot follows them. The
+cursor carries that window's updated_at boundary along with the last key
+returned, so an item keeps its place when others enter or leave the
+snapshot and a rebuild between two pages neither repeats nor shifts what
+was already seen.
+
+Snapshots are rebuilt:
+  - after a job's status changes to ready or deleted (the ShortJob
+    post_save receiver in onchannels.signals, which covers the end of
+    ingestion);
+  - after eviction, which deletes jobs with queryset.update();
+  - by the rebuild-shorts-feeds beat task, for everything else (e.g. title
+    changes synced from Video/Channel);
+  - on a request that finds no snapshot.
+
+Without a shared cache (LocMem) each process has its own snapshot and never
+sees the ones rebuilt by Celery or by other workers, so snapshots only live
+for ``SHORTS_FEED_LOCAL_TTL`` there and every web process rebuilds its own
+copy on that cadence instead of serving evicted jobs for the full TTL.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from common.cache import cache_is_shared
+
+from .models import ShortJob
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "shorts:feed:"
+
+
+def _key(tenant: str) -> str:
+    return f"{_KEY_PREFIX}{tenant}"
+
+
+def fragment(job: ShortJob) -> Dict[str, object]:
+    """Feed payload of job; ``hls`` stays relative to MEDIA_PUBLIC_BASE."""
+    return {
+        "job_id": str(job.id),
+        "title": job.video_title,
+        "channel": job.channel_name,
+        "duration_seconds": int(job.duration_seconds or 0),
+        "hls": job.hls_master_url or "",
+        "thumbnail_url": job.thumbnail_url,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
+
+
+def build_snapshot(tenant: str) -> Dict[str, object]:
+    """Render the tenant's feed from the newest ready jobs and cache it."""
+    size = getattr(settings, "SHORTS_FEED_SNAPSHOT_SIZE", 300)
+    jobs = (
+        ShortJob.objects.filter(tenant=tenant, status=ShortJob.STATUS_READY)
+        .order_by("-updated_at")[:size]
+    )
+    snapshot = {"built_at": timezone.now().isoformat(), "items": [fragment(j) for j in jobs]}
+    ttl = getattr(settings, "SHORTS_FEED_TTL", 900)
+    if not cache_is_shared():
+        ttl = min(ttl, getattr(settings, "SHORTS_FEED_LOCAL_TTL", 60))
+    cache.set(_key(tenant), snapshot, ttl)
+    return snapshot
+
+
+def get_snapshot(tenant: str) -> Dict[str, object]:
+    snapshot = cache.get(_key(tenant))
+    if snapshot is None:
+        snapshot = build_snapshot(tenant)
+    return snapshot
+
+
+def drop_snapshot(tenant: str) -> None:
+    cache.delete(_key(tenant))
+
+
+def rebuild_snapshots() -> int:
+    """Rebuild the snapshot of every tenant that has shorts; returns the count."""
+    tenants = list(ShortJob.objects.order_by().values_list("tenant", flat=True).distinct())
+    for tenant in tenants:
+        build_snapshot(tenant)
+    return len(tenants)
+
+
+def _rank(seed: str, job_id: str) -> str:
+    return hashlib.blake2b(f"{seed}:{job_id}".encode(), digest_size=8).hexdigest()
+
+
+def feed_page(
+    snapshot: Dict[str, object], seed: str, limit: int, cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, object]], Optional[str]]:
+    """Items after cursor in seed order, plus the cursor of the next page.
+
+    Items updated at or after the boundary (the oldest of the newest
+    ``limit * 3`` when there is no cursor) come first.
+    """
+    items = snapshot["items"]
+    last = None
+    if cursor:
+        last, _, boundary = cursor.partition(":")
+    else:
+        boundary = min((item.get("updated_at") or "" for item in items[: limit * 3]), default="")
+
+    def key(item) -> str:
+        recent = (item.get("updated_at") or "") >= boundary
+        return ("0" if recent else "1") + _rank(seed, item["job_id"])
+
+    ranked = sorted(((key(item), item) for item in items), key=lambda p: p[0])
+    if last:
+        ranked = [(k, item) for k, item in ranked if k > last]
+    page = ranked[:limit]
+    next_cursor = f"{page[-1][0]}:{boundary}" if len(ranked) > limit else None
+    return [item for _, item in page], next_cursor
@@ -0,0 +1,160 @@
+"""Dedupe and creation of ShortJobs for YouTube videos.
+
+A tenant has at most one live (not deleted) job per video_id, enforced by
+the ``uniq_shortjob_tenant_video`` constraint. Imports used to look for an
+existing job with ``source_url__icontains=<id>``, which cannot use an index
+and ran once per candidate video. Now:
+
+  - ``find_jobs(tenant, video_ids)`` returns the live job for each id in
+    one ``IN`` query on the (tenant, video_id) index.
+  - ``start_jobs`` queues the candidates that need work: a failed job is
+    requeued in place (it holds the key), missing ones are bulk inserted.
+    Inserts skip conflicts and requeues are conditional on the job still
+    being failed, so a concurrent import of the same video ends up with the
+    other request's job instead of an IntegrityError or a second task.
+
+Video ids are clamped to ShortJob.video_id's length here, so callers can
+pass them as they come. New videos in a batch of any size cost a fixed
+handful of queries; each failed job requeued costs one UPDATE.
+"""
+from __future__ import annotations
+
+import logging
+import uuid
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ShortJob, Video
+from .shorts_metadata import video_fields
+
+logger = logging.getLogger(__name__)
+
+
+class Candidate(NamedTuple):
+    video_id: str
+    source_url: str
+    # Synced Video row, if the caller has it (with channel loaded)
+    video: Optional[Video] = None
+
+
+def _job_video_id(video_id: str) -> str:
+    return video_id[:ShortJob._meta.get_field('video_id').max_length]
+
+
+def find_jobs(tenant: str, video_ids: Iterable[str]) -> Dict[str, ShortJob]:
+    """Live job per video id for tenant, in one query."""
+    keys = {vid: _job_video_id(vid) for vid in video_ids if vid}
+    if not keys:
+        return {}
+    jobs = ShortJob.objects.filter(tenant=tenant, video_id__in=set(keys.values())).exclude(
+        status=ShortJob.STATUS_DELETED
+    )
+    by_key = {job.video_id: job for job in jobs}
+    return {vid: by_key[key] for vid, key in keys.items() if key in by_key}
+
+
+def is_reusable(job: Optional[ShortJob]) -> bool:
+    """True if job already covers its video (anything but a failed attempt)."""
+    return job is not None and job.status != ShortJob.STATUS_FAILED
+
+
+def start_jobs(
+    tenant: str,
+    candidates: List[Candidate],
+    existing: Dict[str, ShortJob],
+    requested_by=None,
+    ladder_profile: str = 'shorts_v1',
+    content_class: str = ShortJob.CLASS_NORMAL,
+) -> Dict[str, Tuple[ShortJob, bool]]:
+    """Queue ingestion for candidates whose job in existing is missing or failed.
+
+    Returns video_id -> (job, started); started is False when another
+    import created the job first. Tasks are enqueued after commit.
+    """
+    out: Dict[str, Tuple[ShortJob, bool]] = {}
+    retry, fresh = [], []
+    for c in candidates:
+        job = existing.get(c.video_id)
+        if is_reusable(job) or c.video_id in out:
+            continue
+        if job is not None:
+            retry.append((c.video_id, job))
+            out[c.video_id] = (job, True)
+        else:
+            fresh.append(c)
+            out[c.video_id] = (None, True)
+
+    if retry:
+        requeued_elsewhere = []
+        for vid, job in retry:
+            # Row by row: only the import whose UPDATE moved the job starts it
+            moved = ShortJob.objects.filter(pk=job.pk, status=ShortJob.STATUS_FAILED).update(
+                status=ShortJob.STATUS_QUEUED, error_message='', retry_count=F('retry_count') + 1,
+                updated_at=timezone.now(),
+            )
+            if moved:
+                job.status = ShortJob.STATUS_QUEUED
+                job.error_message = ''
+                job.retry_count = (job.retry_count or 0) + 1
+            else:
+                requeued_elsewhere.append(vid)
+        if requeued_elsewhere:
+            current = find_jobs(tenant, requeued_elsewhere)
+            for vid in requeued_elsewhere:
+                out.pop(vid)
+                if vid in current:
+                    out[vid] = (current[vid], False)
+
+    if fresh:
+        # One lookup for candidates the caller had no Video row for
+        missing = {c.video_id for c in fresh if c.video is None}
+        videos = {}
+        if missing:
+            for v in Video.objects.select_related('channel').filter(video_id__in=missing):
+                videos.setdefault(v.video_id, v)
+        new_jobs = []
+        for c in fresh:
+            video = c.video or videos.get(c.video_id)
+            job_id = uuid.uuid4()
+            job = ShortJob(
+                id=job_id,
+                tenant=tenant,
+                requested_by=requested_by,
+                source_url=c.source_url,
+                status=ShortJob.STATUS_QUEUED,
+                ladder_profile=ladder_profile,
+                content_class=content_class,
+                artifact_prefix=f"shorts/{tenant}/{job_id}",
+                video_id=_job_video_id(c.video_id),
+                **(video_fields(video) if video is not None else {}),
+            )
+            new_jobs.append(job)
+            out[c.video_id] = (job, True)
+        ShortJob.objects.bulk_create(new_jobs, ignore_conflicts=True)
+        inserted = set(ShortJob.objects.filter(pk__in=[j.pk for j in new_jobs]).values_list('pk', flat=True))
+        lost = [c.video_id for c, j in zip(fresh, new_jobs) if j.pk not in inserted]
+        if lost:
+            winners = find_jobs(tenant, lost)
+            for vid in lost:
+                out.pop(vid)
+                if vid in winners:
+                    out[vid] = (winners[vid], False)
+
+    started = [str(job.pk) for job, is_new in out.values() if is_new]
+    if started:
+        transaction.on_commit(lambda: _enqueue(started))
+    return out
+
+
+def _enqueue(job_ids: List[str]) -> None:
+    from .tasks import process_short_job
+
+    for job_id in job_ids:
+        try:
+            process_short_job.delay(job_id)
+        except Exception as e:
+            # Job stays queued; it can be retried from the admin
+            logger.warning("shorts.import.enqueue_fail", extra={"job_id": job_id, "error": str(e)[:200]})
@@ -0,0 +1,117 @@
+"""Video metadata denormalized onto ShortJob.
+
+The ready-shorts endpoints list ShortJob rows with the title, channel and
+thumbnail of the YouTube video behind each one. Those used to be looked up
+per job (``Video.objects.filter(video_id=...)``), so a feed page cost one
+query per item. ShortJob now carries the values itself:
+
+  - ``job_metadata`` gives the fields for a new job; the import views and
+    ``select_and_enqueue_recent_shorts`` pass them to ``create``.
+  - The Video and Channel post_save receivers (onchannels.signals) call
+    ``sync_video`` / ``sync_channel`` so edits from the YouTube sync reach
+    existing jobs.
+  - ``manage.py backfill_short_metadata`` fills jobs created before this.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+# Largest first; YouTube omits sizes the upload does not have
+THUMBNAIL_SIZES = ("maxres", "standard", "high", "medium", "default")
+
+
+def yt_video_id_from_url(url: str | None) -> str | None:
+    if not url:
+        return None
+    try:
+        import urllib.parse as _up
+        p = _up.urlparse(url)
+        host = (p.netloc or '').lower()
+        path = p.path or ''
+        qs = _up.parse_qs(p.query)
+        # https://www.youtube.com/watch?v=ID
+        if 'v' in qs and qs['v']:
+            return qs['v'][0]
+        # https://youtu.be/ID or /shorts/ID
+        parts = [s for s in path.split('/') if s]
+        if host.endswith('youtu.be') and parts:
+            return parts[0]
+        if host.endswith('youtube.com') and len(parts) >= 2 and parts[0] in {'shorts', 'embed', 'live'}:
+            return parts[1]
+    except Exception:
+        return None
+    return None
+
+
+def best_thumbnail_url(thumbnails) -> str:
+    thumbnails = thumbnails if isinstance(thumbnails, dict) else {}
+    for size in THUMBNAIL_SIZES:
+        t = thumbnails.get(size) or {}
+        url = t.get('url') if isinstance(t, dict) else None
+        if url:
+            return url
+    return ''
+
+
+def channel_fields(channel) -> Dict[str, str]:
+    if channel is None:
+        return {"channel_slug": '', "channel_name": ''}
+    return {
+        "channel_slug": channel.id_slug or '',
+        "channel_name": channel.name_en or channel.id_slug or '',
+    }
+
+
+def video_fields(video) -> Dict[str, object]:
+    """The denormalized ShortJob fields for video (video_id excluded)."""
+    return {
+        "video_title": video.title or '',
+        "thumbnail_url": best_thumbnail_url(video.thumbnails),
+        "video_published_at": video.published_at,
+        **channel_fields(video.channel),
+    }
+
+
+def job_metadata(video_id: Optional[str], video=None) -> Dict[str, object]:
+    """Keyword arguments for ShortJob.objects.create() for a YouTube video.
+
+    Looks the Video up unless it is passed in. A video not synced yet only
+    gets video_id; sync_video fills the rest when it arrives.
+    """
+    if not video_id:
+        return {}
+    if video is None:
+        from .models import Video
+
+        video = Video.objects.select_related('channel').filter(video_id=video_id).first()
+    fields = {"video_id": video_id}
+    if video is not None:
+        fields.update(video_fields(video))
+    return fields
+
+
+def sync_video(video) -> int:
+    """Copy video's metadata onto every job for its video_id; rows updated."""
+    from .models import ShortJob
+
+    fields = video_fields(video)
+    # exclude() skips jobs that are already current, so a re-sync of an
+    # unchanged playlist writes nothing
+    return (
+        ShortJob.objects.filter(video_id=video.video_id)
+        .exclude(**fields)
+        .update(**fields)
+    )
+
+
+def sync_channel(channel) -> int:
+    """Refresh the channel name on jobs for channel's videos; rows updated."""
+    from .models import ShortJob, Video
+
+    fields = channel_fields(channel)
+    video_ids = Video.objects.filter(channel=channel).values('video_id')
+    return (
+        ShortJob.objects.filter(video_id__in=video_ids)
+        .exclude(**fields)
+        .update(**fields)
+    )
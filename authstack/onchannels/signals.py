@@ -0,0 +1,60 @@
+"""Signal handlers for the channels app (connected in ChannelsConfig.ready)."""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import Channel, ShortJob, Video
+from .shorts_feed import build_snapshot, drop_snapshot
+from .shorts_metadata import job_metadata, sync_channel, sync_video, yt_video_id_from_url
+from .version_models import AppVersion
+from .version_policy import clear_platform_policies
+
+
+@receiver(post_save, sender=AppVersion, dispatch_uid="channels_appversion_saved")
+@receiver(post_delete, sender=AppVersion, dispatch_uid="channels_appversion_deleted")
+def drop_version_policies(sender, **kwargs):
+    clear_platform_policies()
+
+
+@receiver(pre_save, sender=ShortJob, dispatch_uid="channels_shortjob_metadata")
+def fill_short_metadata(sender, instance, raw=False, **kwargs):
+    # Jobs created outside the import paths (admin, shell) still get their
+    # video metadata; once video_id is set this is a no-op
+    if raw or instance.video_id or not instance._state.adding:
+        return
+    for name, value in job_metadata(yt_video_id_from_url(instance.source_url)).items():
+        setattr(instance, name, value)
+
+
+@receiver(post_init, sender=ShortJob, dispatch_uid="channels_shortjob_loaded")
+def remember_short_status(sender, instance, **kwargs):
+    # Deferred status stays unknown rather than costing a query per row
+    instance._feed_status = instance.__dict__.get("status")
+
+
+@receiver(post_save, sender=ShortJob, dispatch_uid="channels_shortjob_feed")
+def refresh_short_feed(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    # Ingestion finishing (ready) or a job removed with save(); other saves
+    # of a ready job (used_bytes, metadata) are left to the beat rebuild.
+    # Requests rebuild from the table until the new snapshot is in
+    previous = None if created else instance._feed_status
+    instance._feed_status = instance.status
+    if raw or (update_fields is not None and "status" not in update_fields):
+        return
+    if instance.status == previous or instance.status not in (ShortJob.STATUS_READY, ShortJob.STATUS_DELETED):
+        return
+    tenant = instance.tenant
+    drop_snapshot(tenant)
+    transaction.on_commit(lambda: build_snapshot(tenant))
+
+
+@receiver(post_save, sender=Video, dispatch_uid="channels_video_saved")
+def sync_short_metadata(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync_video(instance)
+
+
+@receiver(post_save, sender=Channel, dispatch_uid="channels_channel_saved")
+def sync_short_channel_name(sender, instance, created=False, raw=False, **kwargs):
+    if not raw and not created:
+        sync_channel(instance)
@@ -16,6 +16,8 @@ import time
 
 from onchannels.models import ScheduledNotification, ShortJob, Video, Playlist
 from onchannels.models import Channel
+from onchannels.shorts_feed import build_snapshot, rebuild_snapshots
+from onchannels.shorts_imports import Candidate, find_jobs, is_reusable, start_jobs
 from user_sessions.models import Device
 from common.fcm_sender import send_to_token, send_to_topic
 
@@ -873,6 +875,7 @@ def evict_shorts_low_water(self) -> dict:
     # Class order: Ephemeral -> Normal -> Preferred (skip Pinned)
     class_order = [getattr(ShortJob, 'CLASS_EPHEMERAL', 'ephemeral'), getattr(ShortJob, 'CLASS_NORMAL', 'normal'), getattr(ShortJob, 'CLASS_PREFERRED', 'preferred')]
     evicted = 0
+    tenants = set()
 
     def _delete_job(j: ShortJob) -> int:
         nonlocal media_root
@@ -885,6 +888,7 @@ def evict_shorts_low_water(self) -> dict:
                     shutil.rmtree(p, ignore_errors=True)
             # Update DB
             ShortJob.objects.filter(id=j.id).update(status=ShortJob.STATUS_DELETED, used_bytes=0, reserved_bytes=0, updated_at=timezone.now())
+            tenants.add(j.tenant)
             logger.info("shorts.evict.delete", extra={"job_id": str(j.id), "freed": bytes_freed, "class": j.content_class})
         except Exception as e:
             logger.warning("shorts.evict.delete_fail", extra={"job_id": str(j.id), "error": str(e)[:200]})
@@ -902,6 +906,10 @@ def evict_shorts_low_water(self) -> dict:
             if used_total <= low_water:
                 break
 
+    # Evicted jobs must leave the feeds now, not at the next scheduled rebuild
+    for tenant in tenants:
+        build_snapshot(tenant)
+
     # Refresh metrics after eviction
     try:
         from django.db.models import Count
@@ -931,6 +939,14 @@ def evict_shorts_low_water(self) -> dict:
     return {"evicted": evicted, "used_bytes": used_total, "low_water": low_water}
 
 
+@shared_task(bind=True)
+def rebuild_shorts_feeds(self) -> int:
+    """Rebuild every tenant's feed snapshot (see onchannels.shorts_feed)."""
+    count = rebuild_snapshots()
+    logger.info("shorts.feed.rebuilt", extra={"tenants": count})
+    return count
+
+
 # Helper to select recent shorts and enqueue ingestion jobs
 
 def select_and_enqueue_recent_shorts(tenant: str, limit: int = 10, per_playlist_limit: int | None = None) -> list[dict]:
@@ -946,13 +962,16 @@ def select_and_enqueue_recent_shorts(tenant: str, limit: int = 10, per_playlist_
             Playlist.objects.filter(is_shorts=True, is_active=True, channel__tenant=tenant)
             .order_by("-latest_video_published_at", "-last_synced_at")
         )
+        by_playlist: dict[str, list[Video]] = {}
+        for v in (
+            Video.objects.select_related("playlist", "channel")
+            .filter(playlist__in=pls)
+            .order_by("-published_at", "-position")
+        ):
+            by_playlist.setdefault(v.playlist_id, []).append(v)
         per_lists: list[list[Video]] = []
         for pl in pls:
-            pv = list(
-                Video.objects.select_related("playlist", "channel")
-                .filter(playlist=pl)
-                .order_by("-published_at", "-position")[: per_playlist_limit]
-            )
+            pv = by_playlist.get(pl.id, [])[: per_playlist_limit]
             if pv:
                 per_lists.append(pv)
 
@@ -980,38 +999,24 @@ def select_and_enqueue_recent_shorts(tenant: str, limit: int = 10, per_playlist_
             .order_by("-published_at", "-position")[: limit]
         )
 
+    candidates: list[Candidate] = []
+    seen: set[str] = set()
     for v in vids:
         vid = getattr(v, "video_id", None)
-        if not vid:
-            continue
-        source_url = f"https://youtu.be/{vid}"
-        base_qs = ShortJob.objects.filter(tenant=tenant).exclude(status=ShortJob.STATUS_DELETED)
-        existing_ready = base_qs.filter(status=ShortJob.STATUS_READY, source_url__icontains=vid).order_by("-updated_at").first()
-        if existing_ready:
-            results.append({"video_id": vid, "job_id": str(existing_ready.id), "status": existing_ready.status, "deduped": True})
-            continue
-        existing_inprog = base_qs.filter(
-            status__in=[ShortJob.STATUS_QUEUED, ShortJob.STATUS_DOWNLOADING, ShortJob.STATUS_TRANSCODING],
-            source_url__icontains=vid,
-        ).order_by("-updated_at").first()
-        if existing_inprog:
-            results.append({"video_id": vid, "job_id": str(existing_inprog.id), "status": existing_inprog.status, "deduped": True})
-            continue
-        job = ShortJob.objects.create(
-            tenant=tenant,
-            requested_by=None,
-            source_url=source_url,
-            status=ShortJob.STATUS_QUEUED,
-            ladder_profile="shorts_v1",
-            content_class=getattr(ShortJob, "CLASS_EPHEMERAL", "ephemeral"),
-        )
-        job.artifact_prefix = f"shorts/{tenant}/{job.id}"
-        job.save(update_fields=["artifact_prefix", "updated_at"])
-        try:
-            process_short_job.delay(str(job.id))
-        except Exception:
-            pass
-        results.append({"video_id": vid, "job_id": str(job.id), "status": job.status, "deduped": False})
+        if vid and vid not in seen:
+            seen.add(vid)
+            candidates.append(Candidate(vid, f"https://youtu.be/{vid}", v))
+    existing = find_jobs(tenant, [c.video_id for c in candidates])
+    started = start_jobs(
+        tenant, candidates, existing, content_class=getattr(ShortJob, "CLASS_EPHEMERAL", "ephemeral"),
+    )
+    for c in candidates:
+        job = existing.get(c.video_id)
+        if is_reusable(job):
+            results.append({"video_id": c.video_id, "job_id": str(job.id), "status": job.status, "deduped": True})
+        elif c.video_id in started:
+            job, is_new = started[c.video_id]
+            results.append({"video_id": c.video_id, "job_id": str(job.id), "status": job.status, "deduped": not is_new})
     return results
 
 
@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from onchannels.models import UserNotification
+from tenants.models import Tenant
+
+User = get_user_model()
+
+
+class TestNotificationsList(TestCase):
+    def setUp(self):
+        Tenant.objects.create(slug="ontime", name="Ontime", active=True)
+        self.user = User.objects.create_user(username="inbox", password="Passw0rd!")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.headers = {"HTTP_X_TENANT_ID": "ontime"}
+        for i in range(30):
+            UserNotification.objects.create(user=self.user, title=f"n{i}")
+
+    def test_app_paging_params_still_return_the_full_list(self):
+        # Exact queries of the Flutter inbox and the web notifications page
+        for query in ("?page=1&page_size=20", "?page=2&page_size=20", "?page_size=100"):
+            resp = self.client.get(f"/api/channels/notifications/{query}", **self.headers)
+            self.assertEqual(resp.status_code, 200)
+            body = resp.json()
+            self.assertEqual(body["count"], 30)
+            self.assertEqual((body["page"], body["pages"]), (1, 1))
+            self.assertEqual(len(body["results"]), 30)
+
+    def test_cursor_pages(self):
+        resp = self.client.get("/api/channels/notifications/?cursor=&page_size=20", **self.headers)
+        body = resp.json()
+        self.assertEqual(len(body["results"]), 20)
+        self.assertNotIn("pages", body)
+
+        resp = self.client.get(
+            "/api/channels/notifications/", {"cursor": body["next_cursor"], "page_size": 20}, **self.headers
+        )
+        rest = resp.json()
+        self.assertEqual(len(rest["results"]), 10)
+        self.assertIsNone(rest["next_cursor"])
+        seen = {r["id"] for r in body["results"]} | {r["id"] for r in rest["results"]}
+        self.assertEqual(len(seen), 30)
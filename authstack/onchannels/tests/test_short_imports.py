@@ -0,0 +1,109 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from onchannels.models import Channel, Playlist, ShortJob, Video
+from onchannels.shorts_imports import Candidate, find_jobs, start_jobs
+from tenants.models import Tenant
+
+User = get_user_model()
+
+
+class ShortImportDedupeTests(TestCase):
+    def setUp(self):
+        Tenant.objects.create(slug="ontime", name="Ontime", active=True)
+        self.user = User.objects.create_user(username="importer", password="Passw0rd!")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.headers = {"HTTP_X_TENANT_ID": "ontime"}
+        self.channel = Channel.objects.create(tenant="ontime", id_slug="ebs", name_en="EBS", is_active=True)
+
+    def _playlist(self, name, count):
+        pl = Playlist.objects.create(id=f"PL_{name}", channel=self.channel, title=name, is_active=True, is_shorts=True)
+        for i in range(count):
+            Video.objects.create(
+                channel=self.channel, playlist=pl, video_id=f"{name}{i}", title=f"{name} {i}",
+                published_at=timezone.now(), position=i,
+            )
+        return pl
+
+    def _import(self, url):
+        return self.client.post("/api/channels/shorts/import/", {"source_url": url}, format="json", **self.headers)
+
+    def test_single_import_dedupes_on_video_id(self):
+        first = self._import("https://www.youtube.com/watch?v=abc123")
+        self.assertEqual(first.status_code, 202)
+        job = ShortJob.objects.get(pk=first.json()["job_id"])
+        self.assertEqual((job.video_id, job.artifact_prefix), ("abc123", f"shorts/ontime/{job.pk}"))
+
+        again = self._import("https://youtu.be/abc123")
+        self.assertEqual(again.json(), {"job_id": str(job.pk), "deduped": True, "status": "queued"})
+
+        ShortJob.objects.filter(pk=job.pk).update(status=ShortJob.STATUS_READY)
+        self.assertEqual(self._import("https://youtube.com/shorts/abc123").status_code, 200)
+        self.assertEqual(ShortJob.objects.count(), 1)
+
+    def test_failed_job_is_requeued_in_place(self):
+        job = ShortJob.objects.create(
+            tenant="ontime", source_url="https://youtu.be/xyz", status=ShortJob.STATUS_FAILED, error_message="boom"
+        )
+        resp = self._import("https://youtu.be/xyz")
+        self.assertEqual(resp.json(), {"job_id": str(job.pk)})
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error_message, job.retry_count), (ShortJob.STATUS_QUEUED, "", 1))
+
+    def test_racing_retries_start_a_failed_job_once(self):
+        job = ShortJob.objects.create(tenant="ontime", source_url="https://youtu.be/race", status=ShortJob.STATUS_FAILED)
+        # Both imports read the job while it was still failed
+        seen_first, seen_second = find_jobs("ontime", ["race"]), find_jobs("ontime", ["race"])
+        with mock.patch("onchannels.shorts_imports._enqueue") as enqueue, self.captureOnCommitCallbacks(execute=True):
+            first = start_jobs("ontime", [Candidate("race", "https://youtu.be/race")], seen_first)
+            second = start_jobs("ontime", [Candidate("race", "https://youtu.be/race")], seen_second)
+        self.assertTrue(first["race"][1])
+        self.assertEqual((second["race"][0].pk, second["race"][1]), (job.pk, False))
+        enqueue.assert_called_once_with([str(job.pk)])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.retry_count), (ShortJob.STATUS_QUEUED, 1))
+
+    def test_long_video_ids_are_clamped(self):
+        vid = "v" * 40
+        started = start_jobs("ontime", [Candidate(vid, f"https://youtu.be/{vid}")], {})
+        job, is_new = started[vid]
+        self.assertTrue(is_new)
+        self.assertEqual(ShortJob.objects.get(pk=job.pk).video_id, vid[:32])
+        self.assertEqual(find_jobs("ontime", [vid])[vid].pk, job.pk)
+
+    def test_one_live_job_per_tenant_and_video(self):
+        ShortJob.objects.create(tenant="ontime", source_url="https://youtu.be/dup", status=ShortJob.STATUS_DELETED)
+        ShortJob.objects.create(tenant="ontime", source_url="https://youtu.be/dup")
+        ShortJob.objects.create(tenant="other", source_url="https://youtu.be/dup")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ShortJob.objects.create(tenant="ontime", source_url="https://youtu.be/dup")
+        self.assertEqual(find_jobs("ontime", ["dup", "missing"])["dup"].status, ShortJob.STATUS_QUEUED)
+
+    def _batch_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post("/api/channels/shorts/import/batch/recent/?limit=10", **self.headers)
+        self.assertEqual(resp.status_code, 200)
+        return resp.json()["results"], len(ctx.captured_queries)
+
+    def test_batch_import_query_count_is_flat(self):
+        self._playlist("a", 2)
+        self._batch_queries()  # warm tenant/auth caches
+        ShortJob.objects.all().delete()
+        results, small = self._batch_queries()
+        self.assertEqual(len(results), 2)
+
+        self._playlist("b", 10)
+        ShortJob.objects.filter(video_id="a0").update(status=ShortJob.STATUS_READY)
+        results, large = self._batch_queries()
+        self.assertEqual(small, large)
+        by_video = {r["video_id"]: r for r in results}
+        self.assertTrue(by_video["a0"]["deduped"])
+        self.assertEqual(sum(not r["deduped"] for r in results), 10)
+        self.assertEqual(ShortJob.objects.filter(tenant="ontime").count(), 12)
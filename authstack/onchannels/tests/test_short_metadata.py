@@ -0,0 +1,125 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from onchannels.models import Channel, Playlist, ShortJob, Video
+from tenants.models import Tenant
+
+User = get_user_model()
+
+
+class ShortJobMetadataTests(TestCase):
+    def setUp(self):
+        Tenant.objects.create(slug="ontime", name="Ontime", active=True)
+        self.user = User.objects.create_user(username="viewer", password="Passw0rd!")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.headers = {"HTTP_X_TENANT_ID": "ontime"}
+        self.channel = Channel.objects.create(tenant="ontime", id_slug="ebs", name_en="EBS", is_active=True)
+        self.playlist = Playlist.objects.create(
+            id="PL_shorts", channel=self.channel, title="Shorts", is_active=True, is_shorts=True
+        )
+
+    def _video(self, video_id, title):
+        return Video.objects.create(
+            channel=self.channel,
+            playlist=self.playlist,
+            video_id=video_id,
+            title=title,
+            thumbnails={"high": {"url": f"https://i.ytimg.com/{video_id}/hq.jpg"}, "default": {"url": "x"}},
+            published_at=timezone.now(),
+        )
+
+    def _job(self, video_id, **extra):
+        fields = {"status": ShortJob.STATUS_READY, **extra}
+        return ShortJob.objects.create(
+            tenant="ontime",
+            source_url=f"https://youtu.be/{video_id}",
+            hls_master_url=f"/media/{video_id}/master.m3u8",
+            **fields,
+        )
+
+    def test_new_job_copies_video_metadata(self):
+        self._video("abc123", "Morning news")
+        job = self._job("abc123")
+        self.assertEqual(job.video_id, "abc123")
+        self.assertEqual(job.video_title, "Morning news")
+        self.assertEqual(job.channel_name, "EBS")
+        self.assertEqual(job.channel_slug, "ebs")
+        self.assertEqual(job.thumbnail_url, "https://i.ytimg.com/abc123/hq.jpg")
+        self.assertIsNotNone(job.video_published_at)
+
+    def test_video_and_channel_edits_reach_jobs(self):
+        job = self._job("late1")
+        self.assertEqual((job.video_id, job.video_title), ("late1", ""))
+
+        video = self._video("late1", "Synced later")
+        job.refresh_from_db()
+        self.assertEqual(job.video_title, "Synced later")
+
+        video.title = "Renamed"
+        video.save()
+        self.channel.name_en = "EBS TV"
+        self.channel.save()
+        job.refresh_from_db()
+        self.assertEqual(job.video_title, "Renamed")
+        self.assertEqual(job.channel_name, "EBS TV")
+
+    def test_backfill_command_is_resumable(self):
+        self._video("old1", "Old one")
+        self._video("old2", "Old two")
+        first, second = sorted([self._job("old1"), self._job("old2")], key=lambda j: j.pk)
+        ShortJob.objects.update(video_id="", video_title="", channel_name="", thumbnail_url="")
+
+        out = StringIO()
+        call_command("backfill_short_metadata", "--start-after", str(first.pk), stdout=out)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.video_id, "")
+        self.assertNotEqual(second.video_id, "")
+        self.assertEqual(second.channel_name, "EBS")
+
+        call_command("backfill_short_metadata", "--batch-size", "1", stdout=out)
+        first.refresh_from_db()
+        self.assertEqual(first.video_title, Video.objects.get(video_id=first.video_id).title)
+
+    def _feed_queries(self):
+        # First request also loads the tenant into the cache
+        self.client.get("/api/channels/shorts/ready/feed/?limit=10", **self.headers)
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.get("/api/channels/shorts/ready/feed/?limit=10", **self.headers)
+        self.assertEqual(resp.status_code, 200)
+        return resp.json()["results"], len(ctx.captured_queries)
+
+    def test_ready_feed_query_count_is_flat(self):
+        self._video("v0", "Clip 0")
+        self._job("v0")
+        results, one = self._feed_queries()
+        self.assertEqual(results[0]["title"], "Clip 0")
+        self.assertEqual(results[0]["thumbnail_url"], "https://i.ytimg.com/v0/hq.jpg")
+
+        for i in range(1, 5):
+            self._video(f"v{i}", f"Clip {i}")
+            self._job(f"v{i}")
+        results, five = self._feed_queries()
+        self.assertEqual(len(results), 5)
+        self.assertEqual(one, five)
+
+    def test_search_reads_job_fields(self):
+        self._video("s1", "Football highlights")
+        self._video("s2", "Cooking")
+        self._job("s1", status=ShortJob.STATUS_DELETED)
+        self._job("s1")
+        self._job("s2")
+        resp = self.client.get("/api/channels/shorts/search/?q=football", **self.headers)
+        self.assertEqual(resp.status_code, 200)
+        data = resp.json()
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]["title"], "Football highlights")
+        self.assertEqual(data[0]["channel"], "EBS")
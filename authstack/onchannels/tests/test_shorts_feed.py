@@ -0,0 +1,130 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from onchannels.models import ShortJob
+from onchannels.shorts_feed import build_snapshot, feed_page, get_snapshot
+from tenants.models import Tenant
+
+User = get_user_model()
+
+
+class ShortsFeedSnapshotTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Tenant.objects.create(slug="ontime", name="Ontime", active=True)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username="viewer", password="Passw0rd!"))
+        self.headers = {"HTTP_X_TENANT_ID": "ontime"}
+
+    def _job(self, video_id, status=ShortJob.STATUS_READY, tenant="ontime"):
+        return ShortJob.objects.create(
+            tenant=tenant,
+            source_url=f"https://youtu.be/{video_id}",
+            status=status,
+            hls_master_url=f"/media/{video_id}/master.m3u8",
+            video_title=f"Clip {video_id}",
+        )
+
+    def _feed(self, **params):
+        resp = self.client.get("/api/channels/shorts/ready/feed/", {"seed": "s1", **params}, **self.headers)
+        self.assertEqual(resp.status_code, 200)
+        return resp.json()
+
+    def test_requests_read_the_snapshot_not_the_job_table(self):
+        for i in range(4):
+            self._job(f"v{i}")
+        self._job("q1", status=ShortJob.STATUS_QUEUED)
+        self._job("o1", tenant="other")
+        self._feed()
+        with CaptureQueriesContext(connection) as ctx:
+            body = self._feed(limit=10)
+        self.assertFalse([q for q in ctx.captured_queries if "channels_shortjob" in q["sql"]])
+        self.assertEqual(sorted(r["title"] for r in body["results"]), [f"Clip v{i}" for i in range(4)])
+        self.assertTrue(body["results"][0]["absolute_hls"].endswith("/master.m3u8"))
+        self.assertIsNone(body["next_cursor"])
+
+    @override_settings(SHORTS_FEED_SNAPSHOT_SIZE=3)
+    def test_snapshot_keeps_the_newest_ready_jobs(self):
+        jobs = [self._job(f"v{i}") for i in range(5)]
+        ids = {item["job_id"] for item in build_snapshot("ontime")["items"]}
+        self.assertEqual(ids, {str(j.id) for j in jobs[2:]})
+
+    def test_cursor_pages_are_stable_across_rebuilds(self):
+        for i in range(5):
+            self._job(f"v{i}")
+        first = self._feed(limit=2)
+        self.assertEqual(first["results"], self._feed(limit=2)["results"])
+
+        # A new short between pages must not repeat or skip what was seen
+        self._job("late")
+        seen = [r["job_id"] for r in first["results"]]
+        cursor = first["next_cursor"]
+        while cursor:
+            page = self._feed(limit=2, cursor=cursor)
+            seen += [r["job_id"] for r in page["results"]]
+            cursor = page["next_cursor"]
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertGreaterEqual(len(seen), 5)
+
+    def test_ready_and_deleted_jobs_rebuild_the_snapshot(self):
+        job = self._job("v0", status=ShortJob.STATUS_TRANSCODING)
+        self.assertEqual(get_snapshot("ontime")["items"], [])
+
+        job.status = ShortJob.STATUS_READY
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+        self.assertEqual([i["job_id"] for i in cache.get("shorts:feed:ontime")["items"]], [str(job.id)])
+
+        job.status = ShortJob.STATUS_DELETED
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+        self.assertEqual(cache.get("shorts:feed:ontime")["items"], [])
+
+    def test_only_status_changes_rebuild_the_snapshot(self):
+        job = self._job("v0")
+        get_snapshot("ontime")
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            job.used_bytes = 1024
+            job.save()
+            ShortJob.objects.get(pk=job.pk).save()
+        self.assertEqual(callbacks, [])
+        self.assertIsNotNone(cache.get("shorts:feed:ontime"))
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self._job("v1")
+        self.assertEqual(len(callbacks), 1)
+
+    @override_settings(SHARED_CACHE=False, SHORTS_FEED_TTL=900, SHORTS_FEED_LOCAL_TTL=60)
+    def test_local_snapshots_expire_at_the_local_ttl(self):
+        with mock.patch("onchannels.shorts_feed.cache") as local:
+            build_snapshot("ontime")
+        self.assertEqual(local.set.call_args.args[2], 60)
+        with override_settings(SHARED_CACHE=True), mock.patch("onchannels.shorts_feed.cache") as shared:
+            build_snapshot("ontime")
+        self.assertEqual(shared.set.call_args.args[2], 900)
+
+    def test_first_page_comes_from_the_newest_items(self):
+        # Snapshot items are newest first
+        snapshot = {"items": [{"job_id": str(i), "updated_at": f"2026-01-01T00:{59 - i:02d}:00"} for i in range(40)]}
+        for seed in ("a", "b", "c"):
+            first, cursor = feed_page(snapshot, seed, 4)
+            self.assertTrue(all(int(i["job_id"]) < 12 for i in first))
+            seen = [i["job_id"] for i in first]
+            while cursor:
+                page, cursor = feed_page(snapshot, seed, 4, cursor)
+                seen += [i["job_id"] for i in page]
+            self.assertEqual(sorted(seen, key=int), [str(i) for i in range(40)])
+            self.assertTrue(all(int(i) < 12 for i in seen[:12]))
+
+    def test_seeds_order_differently(self):
+        snapshot = {"items": [{"job_id": str(i)} for i in range(20)]}
+        a, _ = feed_page(snapshot, "a", 20)
+        b, _ = feed_page(snapshot, "b", 20)
+        self.assertEqual(sorted(i["job_id"] for i in a), sorted(i["job_id"] for i in b))
+        self.assertNotEqual(a, b)
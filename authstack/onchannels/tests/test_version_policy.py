@@ -0,0 +1,44 @@
+from django.test import TestCase
+
+from tenants.models import Tenant
+from onchannels.version_models import AppVersion, VersionStatus
+from onchannels.version_policy import clear_platform_policies, get_platform_policy
+
+
+class TestVersionPolicy(TestCase):
+    def setUp(self):
+        clear_platform_policies()
+        AppVersion.objects.create(platform="ios", version="1.0.0", status=VersionStatus.BLOCKED.value)
+        self.latest = AppVersion.objects.create(
+            platform="ios",
+            version="1.2.0",
+            status=VersionStatus.ACTIVE.value,
+            min_supported_version="1.1.0",
+        )
+
+    def test_policy_compiled_once(self):
+        policy = get_platform_policy("ios")
+        self.assertEqual(policy.latest, self.latest)
+        with self.assertNumQueries(0):
+            self.assertIs(get_platform_policy("ios"), policy)
+            self.assertIsNone(get_platform_policy("symbian"))
+
+    def test_requires_update(self):
+        policy = get_platform_policy("ios")
+        self.assertTrue(policy.requires_update("1.0.0"))  # blocked
+        self.assertTrue(policy.requires_update("1.0.5"))  # below min supported
+        self.assertFalse(policy.requires_update("1.1.0"))
+        self.assertIsNone(get_platform_policy("android"))
+
+    def test_save_rebuilds_policy(self):
+        self.assertFalse(get_platform_policy("ios").requires_update("1.1.0"))
+        AppVersion.objects.create(platform="ios", version="1.1.0", status=VersionStatus.UNSUPPORTED.value)
+        self.assertTrue(get_platform_policy("ios").requires_update("1.1.0"))
+
+    def test_middleware_rejects_outdated_build(self):
+        Tenant.objects.create(slug="ontime", name="Ontime", active=True)
+        resp = self.client.get(
+            "/api/channels/", HTTP_X_DEVICE_PLATFORM="ios", HTTP_X_APP_VERSION="1.0.5", HTTP_X_TENANT_ID="ontime"
+        )
+        self.assertEqual(resp.status_code, 426)
+        self.assertEqual(resp.json()["latest_version"], "1.2.0")
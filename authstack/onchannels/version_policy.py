@@ -0,0 +1,124 @@
+"""Compiled per-platform app-version policy.
+
+AppVersionEnforceMiddleware needs the same answer for every request coming
+from one app build: the latest active release, its min_supported_version and
+whether the build itself is marked blocked/unsupported. Instead of querying
+AppVersion on every request, each platform's rows are compiled once into a
+``PlatformPolicy`` kept in process memory.
+
+AppVersion saves/deletes clear the compiled policies (see onchannels.signals);
+``APP_VERSION_POLICY_TTL`` bounds how long other worker processes keep using
+an older policy.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from django.conf import settings
+
+from .version_models import AppVersion, VersionStatus
+
+PLATFORMS = frozenset(p for p, _ in AppVersion.PLATFORM_CHOICES)
+
+_FORCED_STATUSES = {VersionStatus.BLOCKED.value, VersionStatus.UNSUPPORTED.value}
+
+_lock = threading.Lock()
+# platform -> (expires_at monotonic, policy or None)
+_policies: Dict[str, Tuple[float, Optional["PlatformPolicy"]]] = {}
+
+
+def parse_version_tuple(v: str) -> tuple:
+    parts = (v or "0").split(".")
+    out = []
+    for p in parts:
+        try:
+            out.append(int(p))
+        except Exception:
+            out.append(0)
+    while len(out) < 3:
+        out.append(0)
+    return tuple(out[:3])
+
+
+@dataclass(frozen=True)
+class PlatformPolicy:
+    latest: AppVersion
+    min_supported: Optional[tuple]
+    forced_versions: FrozenSet[str]
+
+    def requires_update(self, version: str) -> bool:
+        """True when this build must update before using the API."""
+        if version in self.forced_versions:
+            return True
+        if self.min_supported is not None:
+            return parse_version_tuple(version) < self.min_supported
+        return False
+
+
+def _compile_rows(rows) -> Optional[PlatformPolicy]:
+    latest = None
+    forced = set()
+    for row in rows:
+        if row.status in _FORCED_STATUSES:
+            forced.add(row.version)
+        if row.status == VersionStatus.ACTIVE.value and (latest is None or row.released_at > latest.released_at):
+            latest = row
+    if latest is None:
+        # Nothing to enforce without an active release
+        return None
+    msv = (latest.min_supported_version or "").strip()
+    return PlatformPolicy(
+        latest=latest,
+        min_supported=parse_version_tuple(msv) if msv else None,
+        forced_versions=frozenset(forced),
+    )
+
+
+def _ttl() -> float:
+    return float(getattr(settings, "APP_VERSION_POLICY_TTL", 60))
+
+
+def _cached(platform: str):
+    if _ttl() <= 0:
+        return None
+    hit = _policies.get(platform)
+    if hit is not None and hit[0] > time.monotonic():
+        return hit
+    return None
+
+
+def _store(platform: str, policy: Optional[PlatformPolicy]) -> Optional[PlatformPolicy]:
+    ttl = _ttl()
+    if ttl > 0:
+        with _lock:
+            _policies[platform] = (time.monotonic() + ttl, policy)
+    return policy
+
+
+def get_platform_policy(platform: str) -> Optional[PlatformPolicy]:
+    """Return the compiled policy for platform, or None when nothing applies."""
+    if platform not in PLATFORMS:
+        return None
+    hit = _cached(platform)
+    if hit is not None:
+        return hit[1]
+    return _store(platform, _compile_rows(AppVersion.objects.filter(platform=platform)))
+
+
+async def aget_platform_policy(platform: str) -> Optional[PlatformPolicy]:
+    """Async get_platform_policy (compiled policies never leave the event loop)."""
+    if platform not in PLATFORMS:
+        return None
+    hit = _cached(platform)
+    if hit is not None:
+        return hit[1]
+    rows = [row async for row in AppVersion.objects.filter(platform=platform)]
+    return _store(platform, _compile_rows(rows))
+
+
+def clear_platform_policies() -> None:
+    with _lock:
+        _policies.clear()
@@ -3,6 +3,7 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
+from common.route_policy import route_policy
 from onchannels.version_service import VersionCheckService
 from onchannels.version_models import AppVersion, FeatureFlag
 from django.utils import timezone
@@ -11,6 +12,7 @@ from onchannels.notification_models import Announcement
 from django.db import models
 
 
+@route_policy(version_gate=False)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def check_version_view(request):
@@ -70,6 +72,7 @@ def get_feature_flags_view(request):
     }, status=status.HTTP_200_OK)
 
 
+@route_policy(version_gate=False)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_latest_version_view(request):
@@ -99,6 +102,7 @@ def get_latest_version_view(request):
     }, status=status.HTTP_200_OK)
 
 
+@route_policy(version_gate=False)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_supported_versions_view(request):
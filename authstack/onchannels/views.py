@@ -1,25 +1,7 @@
 # --- Helpers: YouTube video_id normalization for dedupe ---
-def _yt_video_id_from_url(url: str | None) -> str | None:
-    if not url:
-        return None
-    try:
-        import urllib.parse as _up
-        p = _up.urlparse(url)
-        host = (p.netloc or '').lower()
-        path = p.path or ''
-        qs = _up.parse_qs(p.query)
-        # https://www.youtube.com/watch?v=ID
-        if 'v' in qs and qs['v']:
-            return qs['v'][0]
-        # https://youtu.be/ID or /shorts/ID
-        parts = [s for s in path.split('/') if s]
-        if host.endswith('youtu.be') and parts:
-            return parts[0]
-        if host.endswith('youtube.com') and len(parts) >= 2 and parts[0] in {'shorts', 'embed', 'live'}:
-            return parts[1]
-    except Exception:
-        return None
-    return None
+from .shorts_feed import feed_page, get_snapshot as get_feed_snapshot
+from .shorts_imports import Candidate, find_jobs, is_reusable, start_jobs
+from .shorts_metadata import yt_video_id_from_url as _yt_video_id_from_url
 
 
 def _yt_video_id_via_ytdlp(url: str | None, timeout_sec: int = 5) -> str | None:
@@ -35,6 +17,7 @@ def _yt_video_id_via_ytdlp(url: str | None, timeout_sec: int = 5) -> str | None:
     return None
 from rest_framework import viewsets, filters, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.http import FileResponse
@@ -49,6 +32,9 @@ import hmac
 import base64
 from django.db import models
 from django.db.models import Max, F, Q
+from accounts.authz import ADMIN_FRONTEND_ROLE, get_authz
+from common.pagination import paginate, sign_cursor, unsign_cursor
+from search.backends import get_search_backend
 
 from .models import Channel, Playlist, Video, ShortJob, ShortReaction, ShortComment
 from .serializers import (
@@ -977,23 +963,32 @@ class ShortImportView(APIView):
         if not source_url:
             return Response({"detail": "source_url is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Dedupe: find existing job by normalized video_id (fallback to url contains)
+        ladder_profile = payload.get('ladder_profile', 'shorts_v1')
+        content_class = payload.get('content_class', ShortJob.CLASS_NORMAL)
         vid = _yt_video_id_from_url(source_url) or _yt_video_id_via_ytdlp(source_url)
-        base_qs = ShortJob.objects.filter(tenant=tenant).exclude(status=ShortJob.STATUS_DELETED)
-        existing_ready = None
-        existing_inprog = None
         if vid:
-            existing_ready = base_qs.filter(status=ShortJob.STATUS_READY).filter(Q(source_url__icontains=vid)).order_by('-updated_at').first()
-            if not existing_ready:
-                existing_inprog = base_qs.filter(status__in=[ShortJob.STATUS_QUEUED, ShortJob.STATUS_DOWNLOADING, ShortJob.STATUS_TRANSCODING]).filter(Q(source_url__icontains=vid)).order_by('-updated_at').first()
-        else:
-            # Fallback: exact URL match
-            existing_ready = base_qs.filter(status=ShortJob.STATUS_READY, source_url=source_url).first()
-            if not existing_ready:
-                existing_inprog = base_qs.filter(status__in=[ShortJob.STATUS_QUEUED, ShortJob.STATUS_DOWNLOADING, ShortJob.STATUS_TRANSCODING], source_url=source_url).first()
-
+            # Dedupe on the indexed (tenant, video_id) key
+            existing = find_jobs(tenant, [vid])
+            job = existing.get(vid)
+            if is_reusable(job):
+                code = status.HTTP_200_OK if job.status == ShortJob.STATUS_READY else status.HTTP_202_ACCEPTED
+                return Response({"job_id": str(job.id), "deduped": True, "status": job.status}, status=code)
+            started = start_jobs(
+                tenant, [Candidate(vid, source_url)], existing,
+                requested_by=getattr(request, 'user', None),
+                ladder_profile=ladder_profile, content_class=content_class,
+            )
+            job, is_new = started[vid]
+            if not is_new:
+                return Response({"job_id": str(job.id), "deduped": True, "status": job.status}, status=status.HTTP_202_ACCEPTED)
+            return Response({"job_id": str(job.id)}, status=status.HTTP_202_ACCEPTED)
+
+        # Not a YouTube URL: fall back to an exact URL match
+        base_qs = ShortJob.objects.filter(tenant=tenant, source_url=source_url).exclude(status=ShortJob.STATUS_DELETED)
+        existing_ready = base_qs.filter(status=ShortJob.STATUS_READY).first()
         if existing_ready:
             return Response({"job_id": str(existing_ready.id), "deduped": True, "status": existing_ready.status}, status=status.HTTP_200_OK)
+        existing_inprog = base_qs.filter(status__in=[ShortJob.STATUS_QUEUED, ShortJob.STATUS_DOWNLOADING, ShortJob.STATUS_TRANSCODING]).first()
         if existing_inprog:
             return Response({"job_id": str(existing_inprog.id), "deduped": True, "status": existing_inprog.status}, status=status.HTTP_202_ACCEPTED)
 
@@ -1002,8 +997,8 @@ class ShortImportView(APIView):
             requested_by=getattr(request, 'user', None),
             source_url=source_url,
             status=ShortJob.STATUS_QUEUED,
-            ladder_profile=payload.get('ladder_profile', 'shorts_v1'),
-            content_class=payload.get('content_class', ShortJob.CLASS_NORMAL),
+            ladder_profile=ladder_profile,
+            content_class=content_class,
         )
         # Compute artifact prefix now for stable pathing
         job.artifact_prefix = f"shorts/{tenant}/{job.id}"
@@ -1060,7 +1055,7 @@ class AdminShortsMetricsView(APIView):
         user = request.user
         is_admin_fe = False
         try:
-            is_admin_fe = user.groups.filter(name='AdminFrontend').exists()
+            is_admin_fe = ADMIN_FRONTEND_ROLE in get_authz(request).roles
         except Exception:
             is_admin_fe = False
         if not (user.is_staff or is_admin_fe):
@@ -1134,59 +1129,51 @@ class ShortsBatchImportRecentView(APIView):
             channel__tenant=tenant,
         ).order_by("channel__id_slug", "title")
 
-        base_qs = ShortJob.objects.filter(tenant=tenant).exclude(status=ShortJob.STATUS_DELETED)
-        new_created = 0
+        # Newest videos per playlist, all in one query, then one dedupe
+        # lookup for every candidate
+        by_playlist: dict[str, list] = {}
+        for v in (
+            Video.objects.filter(playlist__in=playlists)
+            .exclude(video_id='')
+            .select_related("channel")
+            .order_by("-published_at", "-position")
+        ):
+            by_playlist.setdefault(v.playlist_id, []).append(v)
+        existing = find_jobs(tenant, [v.video_id for vids in by_playlist.values() for v in vids])
 
+        picked: list[tuple] = []
+        picked_ids: set[str] = set()
+        new_created = 0
         for pl in playlists:
             if new_created >= global_new_cap:
                 break
-            # Newest videos in this playlist
-            vids = (
-                Video.objects.filter(playlist=pl)
-                .order_by("-published_at", "-position")
-            )
             created_for_playlist = 0
-            for v in vids:
+            for v in by_playlist.get(pl.id, []):
                 if new_created >= global_new_cap or created_for_playlist >= per_playlist_limit:
                     break
-                vid = v.video_id
-                if not vid:
-                    continue
-                source_url = f"https://youtu.be/{vid}"
-                # Dedupe using existing helpers
-                norm = _yt_video_id_from_url(source_url) or _yt_video_id_via_ytdlp(source_url)
-                existing_ready = None
-                existing_inprog = None
-                if norm:
-                    existing_ready = base_qs.filter(status=ShortJob.STATUS_READY, source_url__icontains=norm).order_by('-updated_at').first()
-                    if not existing_ready:
-                        existing_inprog = base_qs.filter(status__in=[ShortJob.STATUS_QUEUED, ShortJob.STATUS_DOWNLOADING, ShortJob.STATUS_TRANSCODING], source_url__icontains=norm).order_by('-updated_at').first()
-                if existing_ready:
-                    results.append({"video_id": vid, "job_id": str(existing_ready.id), "status": existing_ready.status, "deduped": True})
+                job = existing.get(v.video_id)
+                if is_reusable(job):
+                    results.append({"video_id": v.video_id, "job_id": str(job.id), "status": job.status, "deduped": True})
                     continue
-                if existing_inprog:
-                    results.append({"video_id": vid, "job_id": str(existing_inprog.id), "status": existing_inprog.status, "deduped": True})
+                if v.video_id in picked_ids:
                     continue
-                # Create new job (Ephemeral by default) and enqueue
-                job = ShortJob.objects.create(
-                    tenant=tenant,
-                    requested_by=getattr(request, 'user', None),
-                    source_url=source_url,
-                    status=ShortJob.STATUS_QUEUED,
-                    ladder_profile='shorts_v1',
-                    content_class=getattr(ShortJob, 'CLASS_EPHEMERAL', 'ephemeral'),
-                )
-                job.artifact_prefix = f"shorts/{tenant}/{job.id}"
-                job.save(update_fields=["artifact_prefix", "updated_at"])
-                try:
-                    from .tasks import process_short_job
-                    process_short_job.delay(str(job.id))
-                except Exception:
-                    pass
-                results.append({"video_id": vid, "job_id": str(job.id), "status": job.status, "deduped": False, "playlist_id": pl.id})
+                # New (or failed) job, Ephemeral by default
+                picked.append((Candidate(v.video_id, f"https://youtu.be/{v.video_id}", v), pl.id))
+                picked_ids.add(v.video_id)
                 new_created += 1
                 created_for_playlist += 1
 
+        started = start_jobs(
+            tenant, [c for c, _ in picked], existing,
+            requested_by=getattr(request, 'user', None),
+            content_class=getattr(ShortJob, 'CLASS_EPHEMERAL', 'ephemeral'),
+        )
+        for c, playlist_id in picked:
+            if c.video_id not in started:
+                continue
+            job, is_new = started[c.video_id]
+            results.append({"video_id": c.video_id, "job_id": str(job.id), "status": job.status, "deduped": not is_new, "playlist_id": playlist_id})
+
         return Response({"count": len(results), "results": results})
 
 
@@ -1212,24 +1199,10 @@ class ShortsReadyView(APIView):
                 abs_url = f"{base}{rel}"
             else:
                 abs_url = rel
-            # Try to enrich with title/channel from Video if available
-            title = ''
-            channel_name = ''
-            try:
-                vid = _yt_video_id_from_url(getattr(j, 'source_url', '') or '')
-                if vid:
-                    v = Video.objects.filter(video_id=vid).select_related('channel').first()
-                    if v:
-                        title = (getattr(v, 'title', '') or '')
-                        ch = getattr(v, 'channel', None)
-                        if ch:
-                            channel_name = getattr(ch, 'name_en', '') or getattr(ch, 'id_slug', '') or ''
-            except Exception:
-                pass
             out.append({
                 "job_id": str(j.id),
-                "title": title,
-                "channel": channel_name,
+                "title": j.video_title,
+                "channel": j.channel_name,
                 "duration_seconds": int(getattr(j, 'duration_seconds', 0) or 0),
                 "absolute_hls": abs_url,
                 "updated_at": j.updated_at.isoformat() if getattr(j, 'updated_at', None) else None,
@@ -1249,61 +1222,30 @@ class ShortsReadyFeedView(APIView):
             limit, bias_count = 50, 15
 
         base = os.environ.get('MEDIA_PUBLIC_BASE', 'http://127.0.0.1:8080')
+        limit = max(1, limit)
 
-        jobs = (
-            ShortJob.objects.filter(tenant=tenant, status=ShortJob.STATUS_READY)
-            .order_by('-updated_at')[: max(1, min(limit * 3, 300))]
-        )
-        items = list(jobs)
-
-        # Seeded shuffle so each user/device gets a stable but random order
+        # Stable but random order per user/device over the tenant's snapshot
         seed = request.query_params.get("seed") or request.headers.get("X-Device-Id") or str(getattr(request.user, "id", "0"))
-        import hashlib, random
-        seed_int = int.from_bytes(hashlib.sha256(seed.encode("utf-8")).digest(), "big")
-        rng = random.Random(seed_int)
-        rng.shuffle(items)
-        ordered = items
+        snapshot = get_feed_snapshot(tenant)
+        cursor = request.query_params.get("cursor")
+        cursor = unsign_cursor(cursor) if cursor else None
+        if cursor is not None and not isinstance(cursor, str):
+            raise NotFound("Invalid cursor")
+        items, next_cursor = feed_page(snapshot, seed, limit, cursor)
 
         out = []
-        for j in ordered[:limit]:
-            rel = j.hls_master_url or ''
-            abs_url = f"{base}{rel}" if rel and not rel.startswith('http') else rel
-            # Enrich title/channel best-effort
-            title = ''
-            channel_name = ''
-            thumb_url = ''
-            try:
-                vid = _yt_video_id_from_url(getattr(j, 'source_url', '') or '')
-                if vid:
-                    v = Video.objects.filter(video_id=vid).select_related('channel').first()
-                    if v:
-                        title = (getattr(v, 'title', '') or '')
-                        ch = getattr(v, 'channel', None)
-                        if ch:
-                            channel_name = getattr(ch, 'name_en', '') or getattr(ch, 'id_slug', '') or ''
-                        # Prefer best available YouTube thumbnail
-                        try:
-                            thumbs = getattr(v, 'thumbnails', {}) or {}
-                            for k in ['maxres', 'standard', 'high', 'medium', 'default']:
-                                t = thumbs.get(k) or {}
-                                u = t.get('url') if isinstance(t, dict) else None
-                                if u:
-                                    thumb_url = u
-                                    break
-                        except Exception:
-                            pass
-            except Exception:
-                pass
-            out.append({
-                "job_id": str(j.id),
-                "title": title,
-                "channel": channel_name,
-                "duration_seconds": int(getattr(j, 'duration_seconds', 0) or 0),
-                "absolute_hls": abs_url,
-                "thumbnail_url": thumb_url,
-                "updated_at": j.updated_at.isoformat() if getattr(j, 'updated_at', None) else None,
-            })
-        return Response({"count": len(out), "results": out, "seed_source": "device_or_user"})
+        for item in items:
+            item = dict(item)
+            rel = item.pop('hls')
+            item['absolute_hls'] = f"{base}{rel}" if rel and not rel.startswith('http') else rel
+            out.append(item)
+        return Response({
+            "count": len(out),
+            "results": out,
+            "next_cursor": sign_cursor(next_cursor) if next_cursor else None,
+            "snapshot_at": snapshot["built_at"],
+            "seed_source": "device_or_user",
+        })
 
 
 class ShortsReactionView(APIView):
@@ -1368,11 +1310,18 @@ class ShortsCommentsView(APIView):
             offset = int(request.query_params.get('offset', 0))
         except Exception:
             limit, offset = 20, 0
-        qs = job.comments.filter(is_deleted=False).select_related('user').order_by('-created_at')
-        total = qs.count()
-        page = qs[offset: offset + max(1, min(limit, 100))]
-        ser = ShortCommentSerializer(page, many=True)
-        return Response({"count": total, "results": ser.data})
+        qs = job.comments.filter(is_deleted=False).select_related('user')
+        if offset and 'cursor' not in request.query_params:
+            # Clients that still page by offset get the previous response
+            qs = qs.order_by('-created_at', '-id')
+            page = qs[offset: offset + max(1, min(limit, 100))]
+            return Response({"count": qs.count(), "results": ShortCommentSerializer(page, many=True).data})
+        page = paginate(qs, request, ['-created_at', '-id'], page_size=limit)
+        ser = ShortCommentSerializer(page.items, many=True)
+        body = {"results": ser.data, "next_cursor": page.next_cursor}
+        if page.count is not None:
+            body["count"] = page.count
+        return Response(body)
 
     def post(self, request, job_id: str):
         tenant = request.headers.get("X-Tenant-Id") or request.query_params.get("tenant") or "ontime"
@@ -1418,33 +1367,20 @@ class ShortsSearchView(APIView):
             limit = 30
         if not q:
             return Response({"count": 0, "results": []})
-        vids = (
-            Video.objects.select_related('channel')
-            .filter(
-                Q(channel__tenant=tenant),
-                Q(title__icontains=q) | Q(channel__name_en__icontains=q) | Q(channel__id_slug__icontains=q)
-            )
-            .order_by('-published_at')[: max(1, min(limit, 100))]
-        )
+        # Ranked full-text match over ready shorts (search app)
+        docs = get_search_backend().search(tenant, q, ['short'], limit=max(1, min(limit, 100)))
         base = os.environ.get('MEDIA_PUBLIC_BASE', 'http://127.0.0.1:8080')
         results = []
-        for v in vids:
-            # Find a READY short for this video_id
-            sj = (
-                ShortJob.objects.filter(tenant=tenant, status=ShortJob.STATUS_READY, source_url__icontains=v.video_id)
-                .order_by('-updated_at')
-                .first()
-            )
-            if not sj:
-                continue
-            rel = sj.hls_master_url or ''
+        for doc in docs:
+            data = doc.data or {}
+            rel = data.get('hls_master_url') or ''
             abs_url = f"{base}{rel}" if rel and not rel.startswith('http') else rel
             results.append({
-                "job_id": str(sj.id),
-                "title": v.title or '',
-                "channel": getattr(v.channel, 'name_en', '') or getattr(v.channel, 'id_slug', ''),
-                "duration_seconds": int(getattr(sj, 'duration_seconds', 0) or 0),
+                "job_id": data.get('job_id') or doc.object_id,
+                "title": doc.title,
+                "channel": doc.subtitle,
+                "duration_seconds": int(data.get('duration_seconds') or 0),
                 "absolute_hls": abs_url,
-                "updated_at": sj.updated_at.isoformat() if getattr(sj, 'updated_at', None) else None,
+                "updated_at": data.get('updated_at'),
             })
         return Response(results)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OtpAuthConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'otp_auth'
+
+    def ready(self):
+        from . import signals  # noqa: F401
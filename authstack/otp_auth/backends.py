@@ -0,0 +1,176 @@
+"""Pluggable storage for OTP challenges.
+
+``request_otp_view`` and ``verify_otp_view`` talk to the backend named by
+``OTP_BACKEND`` (see get_otp_backend):
+
+  - ``DatabaseOTPBackend`` keeps each challenge in an OTPRequest row, as
+    before. Attempts and verification are single conditional UPDATEs, so
+    concurrent guesses cannot exceed max_attempts or use a code twice.
+  - ``CacheOTPBackend`` keeps the hot state (hash, expiry, attempts) in the
+    shared cache, with an atomic incr per attempt and an atomic add as the
+    single-use guard. The database only receives an audit copy of each
+    OTPRequest, written by Celery (``OTP_AUDIT_ASYNC``), so SMS campaigns
+    no longer turn otp_requests into a write hotspot.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OTP_RATE_WINDOW, OTPRequest, generate_otp_code, rate_limit_key, request_metadata
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class OTPChallenge:
+    id: str
+    otp_type: str
+    destination: str
+    purpose: str
+    user_id: Optional[int]
+    expires_at: datetime
+    # Plain code, only populated by create() so the caller can send it
+    otp_code: str = ""
+
+
+def _hash(code: str, destination: str) -> str:
+    return hashlib.sha256(f"{code}{destination}".encode()).hexdigest()
+
+
+def _lifetime(otp_type: str) -> timedelta:
+    # 5 minutes for phone, 10 for email
+    return timedelta(minutes=5) if otp_type == 'phone' else timedelta(minutes=10)
+
+
+class DatabaseOTPBackend:
+    """OTPRequest rows as the source of truth."""
+
+    def create(self, otp_type, destination, purpose, user=None, request=None) -> OTPChallenge:
+        row = OTPRequest.create_otp(otp_type, destination, purpose, user=user, request=request)
+        return OTPChallenge(
+            str(row.id), row.otp_type, row.destination, row.purpose, row.user_id, row.expires_at, row.otp_code
+        )
+
+    def discard(self, otp_id: str) -> None:
+        OTPRequest.objects.filter(id=otp_id).delete()
+
+    def verify(self, otp_id, code) -> Tuple[bool, str, Optional[OTPChallenge]]:
+        try:
+            row = OTPRequest.objects.get(id=otp_id)
+        except (OTPRequest.DoesNotExist, ValidationError, ValueError, TypeError):
+            return False, 'Invalid OTP request', None
+        challenge = OTPChallenge(
+            str(row.id), row.otp_type, row.destination, row.purpose, row.user_id, row.expires_at
+        )
+        ok, message = row.verify(code)
+        return ok, message, challenge
+
+
+class CacheOTPBackend:
+    """Challenge state in the shared cache; OTPRequest rows are audit only."""
+
+    _STATE_PREFIX = "otp:state:"
+    _ATTEMPTS_PREFIX = "otp:attempts:"
+    _USED_PREFIX = "otp:used:"
+
+    def create(self, otp_type, destination, purpose, user=None, request=None) -> OTPChallenge:
+        code = generate_otp_code()
+        now = timezone.now()
+        expires_at = now + _lifetime(otp_type)
+        otp_id = str(uuid.uuid4())
+        ttl = int((expires_at - now).total_seconds())
+        state = {
+            'otp_type': otp_type,
+            'destination': destination,
+            'purpose': purpose,
+            'user_id': user.pk if user is not None else None,
+            'otp_hash': _hash(code, destination),
+            'expires_at': expires_at,
+            'max_attempts': 3,
+        }
+        cache.set(f"{self._STATE_PREFIX}{otp_id}", state, ttl)
+        # The audit row is written later via bulk_create (no post_save), so
+        # count the request for check_rate_limit here
+        from common.ratelimit import record
+        record(rate_limit_key(destination), OTP_RATE_WINDOW)
+
+        ip_address, user_agent = request_metadata(request)
+        _audit(
+            'create',
+            id=otp_id,
+            user_id=state['user_id'],
+            otp_type=otp_type,
+            destination=destination,
+            # Plain codes are not persisted; the hash is enough for audit
+            otp_code='',
+            otp_hash=state['otp_hash'],
+            purpose=purpose,
+            expires_at=expires_at.isoformat(),
+            ip_address=ip_address,
+            user_agent=user_agent,
+        )
+        return OTPChallenge(otp_id, otp_type, destination, purpose, state['user_id'], expires_at, code)
+
+    def discard(self, otp_id: str) -> None:
+        cache.delete_many([f"{self._STATE_PREFIX}{otp_id}", f"{self._ATTEMPTS_PREFIX}{otp_id}"])
+
+    def verify(self, otp_id, code) -> Tuple[bool, str, Optional[OTPChallenge]]:
+        state = cache.get(f"{self._STATE_PREFIX}{otp_id}")
+        if state is None:
+            # Unknown, or gone from the cache because it expired
+            return False, 'Invalid OTP request', None
+        challenge = OTPChallenge(
+            str(otp_id), state['otp_type'], state['destination'], state['purpose'],
+            state['user_id'], state['expires_at'],
+        )
+        ttl = max(1, int((state['expires_at'] - timezone.now()).total_seconds()))
+        if cache.get(f"{self._USED_PREFIX}{otp_id}"):
+            return False, 'OTP already used', challenge
+        if state['expires_at'] < timezone.now():
+            return False, 'OTP expired', challenge
+
+        attempts_key = f"{self._ATTEMPTS_PREFIX}{otp_id}"
+        cache.add(attempts_key, 0, ttl)
+        attempts = cache.incr(attempts_key)
+        if attempts > state['max_attempts']:
+            return False, 'Too many attempts', challenge
+        if _hash(code, state['destination']) != state['otp_hash']:
+            return False, 'Invalid OTP', challenge
+        # add() is atomic: only one concurrent verification can win
+        if not cache.add(f"{self._USED_PREFIX}{otp_id}", 1, ttl):
+            return False, 'OTP already used', challenge
+        _audit('verified', id=str(otp_id), attempts=attempts, verified_at=timezone.now().isoformat())
+        return True, 'OTP verified', challenge
+
+
+def _audit(action: str, **fields) -> None:
+    from . import tasks
+
+    task = tasks.write_otp_audit
+    if getattr(settings, 'OTP_AUDIT_ASYNC', True):
+        try:
+            task.delay(action, fields)
+            return
+        except Exception as e:
+            logger.warning("[OTP] Audit enqueue failed, writing inline: %s", e)
+    try:
+        task(action, fields)
+    except Exception as e:
+        logger.error("[OTP] Audit write failed: %s", e)
+
+
+def get_otp_backend():
+    """Instance of the backend named by settings.OTP_BACKEND."""
+    path = getattr(settings, 'OTP_BACKEND', 'otp_auth.backends.DatabaseOTPBackend')
+    return import_string(path)()
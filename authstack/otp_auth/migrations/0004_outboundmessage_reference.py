@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('otp_auth', '0003_outboundmessage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboundmessage',
+            name='reference',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
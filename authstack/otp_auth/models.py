@@ -11,6 +11,38 @@ import hashlib
 
 User = get_user_model()
 
+# Window of the per-destination OTP request counter
+OTP_RATE_WINDOW = 3600
+
+
+def rate_limit_key(destination: str) -> str:
+    return f"otp:{destination}"
+
+
+def generate_otp_code() -> str:
+    """Random 6-digit OTP (fixed in DEBUG and under the test runner)"""
+    otp_code = ''.join(random.choices(string.digits, k=6))
+    
+    # For development and testing, use simple codes
+    import sys
+    if settings.DEBUG or 'test' in sys.argv:
+        otp_code = '123456'
+    return otp_code
+
+
+def request_metadata(request):
+    """(ip_address, user_agent) of the requesting client"""
+    ip_address = '0.0.0.0'
+    user_agent = ''
+    if request:
+        x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
+        if x_forwarded_for:
+            ip_address = x_forwarded_for.split(',')[0]
+        else:
+            ip_address = request.META.get('REMOTE_ADDR', '0.0.0.0')
+        user_agent = request.META.get('HTTP_USER_AGENT', '')
+    return ip_address, user_agent
+
 class OTPRequest(models.Model):
     """Track OTP requests for rate limiting and verification"""
     
@@ -62,13 +94,7 @@ class OTPRequest(models.Model):
     @classmethod
     def create_otp(cls, otp_type, destination, purpose, user=None, request=None):
         """Create new OTP request"""
-        # Generate 6-digit OTP
-        otp_code = ''.join(random.choices(string.digits, k=6))
-        
-        # For development and testing, use simple codes
-        import sys
-        if settings.DEBUG or 'test' in sys.argv:
-            otp_code = '123456'
+        otp_code = generate_otp_code()
         
         # Hash for storage
         otp_hash = hashlib.sha256(f"{otp_code}{destination}".encode()).hexdigest()
@@ -79,16 +105,7 @@ class OTPRequest(models.Model):
         else:
             expires_at = timezone.now() + timedelta(minutes=10)
         
-        # Get request metadata
-        ip_address = '0.0.0.0'
-        user_agent = ''
-        if request:
-            x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-            if x_forwarded_for:
-                ip_address = x_forwarded_for.split(',')[0]
-            else:
-                ip_address = request.META.get('REMOTE_ADDR', '0.0.0.0')
-            user_agent = request.META.get('HTTP_USER_AGENT', '')
+        ip_address, user_agent = request_metadata(request)
         
         otp_request = cls.objects.create(
             user=user,
@@ -115,8 +132,15 @@ class OTPRequest(models.Model):
         if self.attempts >= self.max_attempts:
             return False, 'Too many attempts'
         
+        # Conditional UPDATEs instead of save(): concurrent attempts cannot
+        # overshoot max_attempts or verify the same code twice
+        bumped = OTPRequest.objects.filter(
+            pk=self.pk, is_verified=False, attempts__lt=models.F('max_attempts')
+        ).update(attempts=models.F('attempts') + 1)
+        if not bumped:
+            self.refresh_from_db(fields=['is_verified', 'attempts'])
+            return False, 'OTP already used' if self.is_verified else 'Too many attempts'
         self.attempts += 1
-        self.save()
         
         # Compare hashed OTP
         code_hash = hashlib.sha256(f"{code}{self.destination}".encode()).hexdigest()
@@ -124,15 +148,25 @@ class OTPRequest(models.Model):
             return False, 'Invalid OTP'
         
         # Mark as verified
+        now = timezone.now()
+        if not OTPRequest.objects.filter(pk=self.pk, is_verified=False).update(is_verified=True, verified_at=now):
+            return False, 'OTP already used'
         self.is_verified = True
-        self.verified_at = timezone.now()
-        self.save()
+        self.verified_at = now
         
         return True, 'OTP verified'
     
     @classmethod
     def check_rate_limit(cls, destination, limit_minutes=60, max_requests=5):
         """Check if destination has exceeded rate limit"""
+        from common.cache import cache_is_shared
+
+        # The counter is only global when every worker shares the cache; a
+        # per-process one would allow max_requests per worker and reset on restart
+        if limit_minutes * 60 == OTP_RATE_WINDOW and cache_is_shared():
+            # Sliding-window counter bumped per created OTPRequest (see otp_auth.signals)
+            from common.ratelimit import peek
+            return not peek(rate_limit_key(destination), max_requests, OTP_RATE_WINDOW).allowed
         since = timezone.now() - timedelta(minutes=limit_minutes)
         count = cls.objects.filter(
             destination=destination,
@@ -140,3 +174,60 @@ class OTPRequest(models.Model):
         ).count()
         
         return count >= max_requests
+
+
+class OutboundMessage(models.Model):
+    """Transactional email/SMS waiting to be delivered (see otp_auth.outbox)"""
+
+    CHANNEL_EMAIL = 'email'
+    CHANNEL_SMS = 'sms'
+    CHANNEL_CHOICES = [
+        (CHANNEL_EMAIL, 'Email'),
+        (CHANNEL_SMS, 'SMS'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_SENDING, 'Sending'),
+        (STATUS_SENT, 'Sent'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    channel = models.CharField(max_length=10, choices=CHANNEL_CHOICES)
+    recipient = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    html_body = models.TextField(blank=True)
+    # Callers pass a key per logical message so a retried request does not
+    # enqueue (and send) it twice (outbox.request_dedupe_key)
+    dedupe_key = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    # Id of what the message carries (OTP challenge, action token), so a
+    # deduplicated retry can answer with the one that was actually sent
+    reference = models.CharField(max_length=64, blank=True)
+
+    # Delivery state
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.IntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.UUIDField(null=True, blank=True)
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    # Timestamps
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'outbound_messages'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+            models.Index(fields=['claim_token']),
+        ]
+
+    def __str__(self):
+        return f"{self.channel} to {self.recipient} ({self.status})"
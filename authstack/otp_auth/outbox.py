@@ -0,0 +1,250 @@
+"""Transactional email/SMS outbox.
+
+Request handlers only insert an OutboundMessage (``enqueue_email`` /
+``enqueue_sms``) and, once their transaction commits, nudge the
+``deliver_outbox`` Celery task. Workers claim pending rows in batches and
+deliver every email in a batch over one SMTP connection. The connection
+stays open for the life of the worker process, so the SSL handshake and
+login happen once instead of once per message. A beat entry also runs
+``deliver_outbox`` periodically, which picks up retries and messages whose
+nudge was lost.
+
+Failed deliveries are retried with exponential backoff up to
+``OUTBOX_MAX_ATTEMPTS``, then marked failed. Rows claimed by a worker that
+died are reclaimed once ``OUTBOX_CLAIM_SECONDS`` has passed; the lost try
+counts as an attempt, so a message that keeps crashing workers still ends
+up failed. Every status update is conditional on the claim token, so a
+worker whose claim was taken over cannot overwrite the new owner's result.
+
+A retried request must not send its message twice, so callers derive the
+``dedupe_key`` from the request rather than from rows it creates
+(``request_dedupe_key``), and pass the id of what the message carries (an
+OTP challenge, an action token) as ``reference``. When the returned
+message's reference is not theirs, a previous try already queued it and the
+caller answers with that reference instead. Clients should send an
+Idempotency-Key header with each user action and repeat it on retries.
+Without one the key falls back to a short time bucket. That key only holds
+while its message is still pending or sending, so a deliberate "resend"
+after the first message went out (or failed) queues a new one.
+"""
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+import uuid
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Q, When
+from django.utils import timezone
+
+from .models import OutboundMessage
+
+logger = logging.getLogger(__name__)
+
+# Per worker process; see _smtp_connection()
+_connection = None
+
+# request_dedupe_key: per client Idempotency-Key, or per time bucket
+_IDEMPOTENT_PREFIX = "req:"
+_WINDOW_PREFIX = "win:"
+_IN_FLIGHT = (OutboundMessage.STATUS_PENDING, OutboundMessage.STATUS_SENDING)
+
+
+def _setting(name: str, default: int) -> int:
+    return int(getattr(settings, name, default))
+
+
+def request_dedupe_key(request, *parts) -> str:
+    """dedupe_key for the message a request sends, e.g. (purpose, recipient).
+
+    With an Idempotency-Key header the key is per client attempt; without
+    one, repeats of the request within the same OUTBOX_DEDUPE_SECONDS bucket
+    share it for as long as the first message is pending or sending.
+    """
+    client_key = (request.META.get('HTTP_IDEMPOTENCY_KEY') or '').strip() if request is not None else ''
+    if client_key:
+        prefix, scope = _IDEMPOTENT_PREFIX, client_key
+    else:
+        prefix, scope = _WINDOW_PREFIX, str(int(time.time()) // max(1, _setting('OUTBOX_DEDUPE_SECONDS', 60)))
+    raw = "\x1f".join([str(p) for p in parts] + [scope])
+    return f"{prefix}{hashlib.sha256(raw.encode()).hexdigest()}"
+
+
+def _enqueue(channel: str, recipient: str, dedupe_key: Optional[str], **fields) -> OutboundMessage:
+    if dedupe_key:
+        existing = OutboundMessage.objects.filter(dedupe_key=dedupe_key).first()
+        if existing is not None:
+            if not dedupe_key.startswith(_WINDOW_PREFIX) or existing.status in _IN_FLIGHT:
+                return existing
+            # A time-bucket key only covers a message still on its way; free
+            # it so this request queues a new one
+            OutboundMessage.objects.filter(pk=existing.pk).exclude(status__in=_IN_FLIGHT).update(dedupe_key=None)
+    try:
+        # Savepoint so a duplicate key does not break the caller's transaction
+        with transaction.atomic():
+            message = OutboundMessage.objects.create(
+                channel=channel, recipient=recipient, dedupe_key=dedupe_key or None, **fields
+            )
+    except IntegrityError:
+        # Lost a race with an identical request
+        return OutboundMessage.objects.get(dedupe_key=dedupe_key)
+    transaction.on_commit(_kick)
+    return message
+
+
+def enqueue_email(recipient, subject, body, html_body='', dedupe_key=None, reference='') -> OutboundMessage:
+    """Queue an email for delivery by the outbox workers."""
+    return _enqueue(
+        OutboundMessage.CHANNEL_EMAIL, recipient, dedupe_key,
+        subject=subject, body=body, html_body=html_body or '', reference=str(reference or ''),
+    )
+
+
+def enqueue_sms(recipient, body, dedupe_key=None, reference='') -> OutboundMessage:
+    """Queue an SMS for delivery by the outbox workers."""
+    return _enqueue(OutboundMessage.CHANNEL_SMS, recipient, dedupe_key, body=body, reference=str(reference or ''))
+
+
+def _kick() -> None:
+    from .tasks import deliver_outbox
+
+    try:
+        deliver_outbox.delay()
+    except Exception as e:
+        # The periodic deliver_outbox run still picks the message up
+        logger.warning("[Outbox] Could not enqueue delivery task: %s", e)
+
+
+def _smtp_connection():
+    global _connection
+    if _connection is None:
+        _connection = get_connection(fail_silently=False)
+    # open() is a no-op while the connection is alive
+    _connection.open()
+    return _connection
+
+
+def _drop_smtp_connection() -> None:
+    global _connection
+    if _connection is not None:
+        try:
+            _connection.close()
+        except Exception:
+            pass
+    _connection = None
+
+
+def _send_email(message: OutboundMessage) -> None:
+    email = EmailMultiAlternatives(
+        message.subject,
+        message.body,
+        settings.DEFAULT_FROM_EMAIL,
+        [message.recipient],
+    )
+    if message.html_body:
+        email.attach_alternative(message.html_body, 'text/html')
+    try:
+        email.connection = _smtp_connection()
+        email.send(fail_silently=False)
+    except Exception:
+        # Most likely the server closed the idle connection: retry once on
+        # a fresh one before counting it as a failed attempt
+        _drop_smtp_connection()
+        try:
+            email.connection = _smtp_connection()
+            email.send(fail_silently=False)
+        except Exception:
+            _drop_smtp_connection()
+            raise
+
+
+def _send_sms(message: OutboundMessage) -> None:
+    # No SMS provider is wired up yet (Twilio is the planned one); in
+    # development the message is logged so codes can be read from the console
+    if settings.DEBUG:
+        logger.info("SMS for %s: %s", message.recipient, message.body)
+
+
+_SENDERS = {
+    OutboundMessage.CHANNEL_EMAIL: _send_email,
+    OutboundMessage.CHANNEL_SMS: _send_sms,
+}
+
+
+def _claim(batch_size: int, now) -> list:
+    """Mark up to batch_size due messages as ours and return them."""
+    abandoned = Q(status=OutboundMessage.STATUS_SENDING, claimed_until__lt=now)
+    due = OutboundMessage.objects.filter(
+        Q(status=OutboundMessage.STATUS_PENDING, next_attempt_at__lte=now) | abandoned
+    ).order_by('next_attempt_at')
+    ids = list(due.values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    token = uuid.uuid4()
+    # Conditional UPDATE: a row another worker claimed in between no longer
+    # matches, so every message is delivered by one worker at most
+    due.filter(id__in=ids).update(
+        status=OutboundMessage.STATUS_SENDING,
+        claim_token=token,
+        claimed_until=now + timedelta(seconds=_setting('OUTBOX_CLAIM_SECONDS', 300)),
+        # The previous owner died mid-send: that try counts
+        attempts=Case(When(abandoned, then=F('attempts') + 1), default=F('attempts')),
+    )
+    return list(OutboundMessage.objects.filter(claim_token=token, status=OutboundMessage.STATUS_SENDING))
+
+
+def _backoff(attempts: int) -> timedelta:
+    base = _setting('OUTBOX_RETRY_BASE_SECONDS', 30)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 3600))
+
+
+def deliver_pending(batch_size: Optional[int] = None, now=None) -> int:
+    """Deliver one batch of due messages; returns how many were sent."""
+    now = now or timezone.now()
+    batch_size = batch_size or _setting('OUTBOX_BATCH_SIZE', 50)
+    max_attempts = _setting('OUTBOX_MAX_ATTEMPTS', 5)
+    sent = 0
+    for message in _claim(batch_size, now):
+        claimed = OutboundMessage.objects.filter(pk=message.pk, claim_token=message.claim_token)
+        if message.attempts >= max_attempts:
+            # Only reclaims by crashed workers get here
+            claimed.update(
+                status=OutboundMessage.STATUS_FAILED,
+                claim_token=None,
+                claimed_until=None,
+                last_error='Delivery abandoned by a worker too many times',
+            )
+            continue
+        attempts = message.attempts + 1
+        try:
+            _SENDERS[message.channel](message)
+        except Exception as e:
+            logger.warning("[Outbox] %s to %s failed (attempt %s): %s", message.channel, message.recipient, attempts, e)
+            failed = attempts >= max_attempts
+            claimed.update(
+                status=OutboundMessage.STATUS_FAILED if failed else OutboundMessage.STATUS_PENDING,
+                attempts=attempts,
+                next_attempt_at=timezone.now() + _backoff(attempts),
+                claim_token=None,
+                claimed_until=None,
+                last_error=str(e)[:1000],
+            )
+            continue
+        # Bodies carry one-time codes and links; keep only the envelope
+        claimed.update(
+            status=OutboundMessage.STATUS_SENT,
+            attempts=attempts,
+            sent_at=timezone.now(),
+            body='',
+            html_body='',
+            claim_token=None,
+            claimed_until=None,
+            last_error='',
+        )
+        sent += 1
+    return sent
@@ -1,16 +1,23 @@
-from django.conf import settings
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 import logging
 
+from .outbox import enqueue_email, enqueue_sms
+
 logger = logging.getLogger(__name__)
 
 class OTPService:
-    """Service for sending OTP via email/SMS"""
+    """Service for sending OTP via email/SMS
+
+    Messages are queued in the outbox and delivered by Celery workers
+    (otp_auth.outbox). The queued OutboundMessage is returned (None if it
+    could not be queued). Pass dedupe_key (outbox.request_dedupe_key) so a
+    retried request does not send twice, and the challenge id as reference:
+    on a retry the returned message carries the first request's reference.
+    """
     
     @staticmethod
-    def send_email_otp(email, otp_code, purpose='login'):
-        """Send OTP via email"""
+    def send_email_otp(email, otp_code, purpose='login', dedupe_key=None, reference=''):
+        """Queue OTP email"""
         try:
             subject_map = {
                 'login': 'Your Login Code',
@@ -41,45 +48,22 @@ If you didn't request this code, please ignore this email.
             </div>
             """
             
-            send_mail(
-                subject,
-                message,
-                settings.DEFAULT_FROM_EMAIL,
-                [email],
-                html_message=html_message,
-                fail_silently=False,
+            return enqueue_email(
+                email, subject, message, html_body=html_message, dedupe_key=dedupe_key, reference=reference
             )
             
-            return True
-            
         except Exception as e:
-            logger.error(f"Failed to send email OTP: {e}")
-            return False
+            logger.error(f"Failed to queue email OTP: {e}")
+            return None
     
     @staticmethod
-    def send_sms_otp(phone, otp_code, purpose='login'):
-        """Send OTP via SMS using Twilio"""
+    def send_sms_otp(phone, otp_code, purpose='login', dedupe_key=None, reference=''):
+        """Queue OTP SMS (delivered by the outbox's SMS sender)"""
         try:
-            # For development, just log it
-            if settings.DEBUG:
-                logger.info(f"SMS OTP for {phone}: {otp_code}")
-                return True
-            
-            # Production: Use Twilio
-            # from twilio.rest import Client
-            # 
-            # client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-            # 
-            # message = client.messages.create(
-            #     body=f"Your verification code is: {otp_code}",
-            #     from_=settings.TWILIO_PHONE_NUMBER,
-            #     to=phone
-            # )
-            # 
-            # return message.sid is not None
-            
-            return True
+            return enqueue_sms(
+                phone, f"Your verification code is: {otp_code}", dedupe_key=dedupe_key, reference=reference
+            )
             
         except Exception as e:
-            logger.error(f"Failed to send SMS OTP: {e}")
-            return False
+            logger.error(f"Failed to queue SMS OTP: {e}")
+            return None
@@ -0,0 +1,14 @@
+"""Signal handlers for the otp_auth app (connected in OtpAuthConfig.ready)."""
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from common.ratelimit import record
+
+from .models import OTP_RATE_WINDOW, OTPRequest, rate_limit_key
+
+
+@receiver(post_save, sender=OTPRequest, dispatch_uid="otp_auth_rate_counter")
+def count_otp_request(sender, instance, created, **kwargs):
+    # Feeds OTPRequest.check_rate_limit without a COUNT query per request
+    if created:
+        record(rate_limit_key(instance.destination), OTP_RATE_WINDOW)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from celery import shared_task
+from django.utils.dateparse import parse_datetime
+
+from .models import OTPRequest
+from .outbox import deliver_pending
+
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True, retry_kwargs={"max_retries": 3})
+def write_otp_audit(self, action: str, fields: dict) -> bool:
+    """Persist the audit copy of a cache-backed OTP (see otp_auth.backends)."""
+    if action == 'create':
+        data = dict(fields)
+        data['expires_at'] = parse_datetime(data['expires_at'])
+        # bulk_create skips post_save: the rate counter was already bumped
+        OTPRequest.objects.bulk_create([OTPRequest(**data)], ignore_conflicts=True)
+        return True
+    if action == 'verified':
+        updated = OTPRequest.objects.filter(id=fields['id']).update(
+            is_verified=True,
+            attempts=fields['attempts'],
+            verified_at=parse_datetime(fields['verified_at']),
+        )
+        if not updated:
+            # The 'create' audit has not landed yet; autoretry covers the race
+            raise OTPRequest.DoesNotExist(fields['id'])
+        return True
+    return False
+
+
+@shared_task(bind=True)
+def deliver_outbox(self, max_batches: int = 20) -> int:
+    """Drain due outbox messages (see otp_auth.outbox), one batch at a time."""
+    total = 0
+    for _ in range(max_batches):
+        sent = deliver_pending()
+        total += sent
+        if not sent:
+            break
+    return total
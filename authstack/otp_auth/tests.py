@@ -1,3 +1,206 @@
-from django.test import TestCase
+import uuid
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from tenants.models import Tenant
+
+from . import outbox
+from .backends import CacheOTPBackend, DatabaseOTPBackend
+from .models import OTPRequest, OutboundMessage
+from .services import OTPService
+
+User = get_user_model()
+
+
+@override_settings(OTP_AUDIT_ASYNC=False)
+class CacheOTPBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.backend = CacheOTPBackend()
+        self.user = User.objects.create_user(username="otp@example.com", email="otp@example.com")
+
+    def test_verify_touches_no_hot_rows(self):
+        challenge = self.backend.create('email', 'otp@example.com', 'login', user=self.user)
+        audit = OTPRequest.objects.get(id=challenge.id)
+        self.assertEqual(audit.otp_code, '')
+        with self.assertNumQueries(0):
+            ok, message, _ = self.backend.verify(challenge.id, '000000')
+        self.assertFalse(ok)
+        self.assertEqual(message, 'Invalid OTP')
+
+        ok, _, verified = self.backend.verify(challenge.id, challenge.otp_code)
+        self.assertTrue(ok)
+        self.assertEqual(verified.user_id, self.user.pk)
+        audit.refresh_from_db()
+        self.assertTrue(audit.is_verified)
+        self.assertEqual(audit.attempts, 2)
+
+        self.assertEqual(self.backend.verify(challenge.id, challenge.otp_code)[1], 'OTP already used')
+
+    def test_attempts_are_capped(self):
+        challenge = self.backend.create('phone', '+251900000000', 'verify')
+        for _ in range(3):
+            self.assertEqual(self.backend.verify(challenge.id, '000000')[1], 'Invalid OTP')
+        self.assertEqual(self.backend.verify(challenge.id, challenge.otp_code)[1], 'Too many attempts')
+
+    @override_settings(SHARED_CACHE=True)
+    def test_rate_limit_counts_cache_backed_requests(self):
+        for _ in range(5):
+            self.backend.create('email', 'otp@example.com', 'login')
+        self.assertTrue(OTPRequest.check_rate_limit('otp@example.com'))
+
+
+class DatabaseOTPBackendTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_code_is_single_use(self):
+        backend = DatabaseOTPBackend()
+        challenge = backend.create('email', 'db@example.com', 'verify')
+        self.assertTrue(backend.verify(challenge.id, challenge.otp_code)[0])
+        self.assertEqual(backend.verify(challenge.id, challenge.otp_code)[1], 'OTP already used')
+        self.assertEqual(backend.verify('not-a-uuid', '123456')[1], 'Invalid OTP request')
+
+    @override_settings(SHARED_CACHE=False)
+    def test_rate_limit_counts_rows_without_shared_cache(self):
+        backend = DatabaseOTPBackend()
+        for _ in range(5):
+            backend.create('email', 'limit@example.com', 'login')
+        # Another worker's cache never saw these requests
+        cache.clear()
+        self.assertTrue(OTPRequest.check_rate_limit('limit@example.com'))
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_BASE_SECONDS=30)
+class OutboxTests(TestCase):
+    def test_request_path_only_enqueues(self):
+        self.assertTrue(OTPService.send_email_otp('a@example.com', '123456', 'login', dedupe_key='otp:1'))
+        self.assertTrue(OTPService.send_email_otp('a@example.com', '123456', 'login', dedupe_key='otp:1'))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundMessage.objects.count(), 1)
+
+        self.assertEqual(outbox.deliver_pending(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['a@example.com'])
+        self.assertIn('123456', mail.outbox[0].alternatives[0][0])
+        message = OutboundMessage.objects.get()
+        self.assertEqual(message.status, OutboundMessage.STATUS_SENT)
+        self.assertEqual(message.body, '')
+        # Nothing left to claim
+        self.assertEqual(outbox.deliver_pending(), 0)
+
+    def test_failures_back_off_then_give_up(self):
+        OTPService.send_sms_otp('+251900000000', '123456')
+        failing = mock.Mock(side_effect=RuntimeError('gateway down'))
+        with mock.patch.dict(outbox._SENDERS, {OutboundMessage.CHANNEL_SMS: failing}):
+            self.assertEqual(outbox.deliver_pending(), 0)
+            message = OutboundMessage.objects.get()
+            self.assertEqual((message.status, message.attempts), (OutboundMessage.STATUS_PENDING, 1))
+            self.assertGreater(message.next_attempt_at, timezone.now() + timedelta(seconds=20))
+            # Not due yet
+            outbox.deliver_pending()
+            self.assertEqual(failing.call_count, 1)
+
+            outbox.deliver_pending(now=timezone.now() + timedelta(minutes=5))
+        message.refresh_from_db()
+        self.assertEqual((message.status, message.attempts), (OutboundMessage.STATUS_FAILED, 2))
+        self.assertEqual(message.last_error, 'gateway down')
+
+    def test_abandoned_claims_are_retaken(self):
+        OTPService.send_email_otp('b@example.com', '654321')
+        OutboundMessage.objects.update(
+            status=OutboundMessage.STATUS_SENDING, claimed_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(outbox.deliver_pending(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_workers_that_keep_dying_use_up_attempts(self):
+        OTPService.send_email_otp('c@example.com', '111111')
+        for _ in range(2):
+            # Claimed, then the worker died before recording anything
+            OutboundMessage.objects.update(
+                status=OutboundMessage.STATUS_SENDING, claimed_until=timezone.now() - timedelta(seconds=1)
+            )
+            outbox._claim(10, timezone.now())
+        OutboundMessage.objects.update(claimed_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(OutboundMessage.objects.get().attempts, 2)
+        self.assertEqual(outbox.deliver_pending(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundMessage.objects.get().status, OutboundMessage.STATUS_FAILED)
+
+    def test_a_taken_over_claim_cannot_record_its_result(self):
+        OTPService.send_email_otp('d@example.com', '222222')
+
+        def slow_send(message):
+            # Meanwhile another worker reclaimed the row
+            OutboundMessage.objects.update(claim_token=uuid.uuid4())
+
+        with mock.patch.dict(outbox._SENDERS, {OutboundMessage.CHANNEL_EMAIL: slow_send}):
+            outbox.deliver_pending()
+        self.assertEqual(OutboundMessage.objects.get().status, OutboundMessage.STATUS_SENDING)
+
+
+@override_settings(OUTBOX_DEDUPE_SECONDS=60)
+class RetriedRequestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        Tenant.objects.create(slug='default', name='Default')
+        User.objects.create_user(username='retry', email='retry@example.com', password='x')
+
+    def _request(self, **headers):
+        return self.client.post(
+            '/api/auth/otp/request/',
+            {'destination': 'retry@example.com', 'purpose': 'login'},
+            HTTP_X_TENANT_ID='default',
+            **headers,
+        )
+
+    def test_retry_sends_once_and_returns_the_first_challenge(self):
+        with mock.patch('otp_auth.outbox.time.time', return_value=1_000_000.0):
+            first = self._request()
+            retry = self._request()
+        self.assertEqual((first.status_code, retry.status_code), (200, 200))
+        self.assertEqual(retry.json()['otp_id'], first.json()['otp_id'])
+        message = OutboundMessage.objects.get()
+        self.assertEqual(message.reference, first.json()['otp_id'])
+        # The retry's own challenge was discarded
+        self.assertEqual(list(OTPRequest.objects.values_list('id', flat=True)), [uuid.UUID(first.json()['otp_id'])])
+
+    def test_later_request_or_new_idempotency_key_sends_again(self):
+        with mock.patch('otp_auth.outbox.time.time', return_value=1_000_000.0):
+            first = self._request()
+        with mock.patch('otp_auth.outbox.time.time', return_value=1_000_060.0):
+            later = self._request()
+            keyed = self._request(HTTP_IDEMPOTENCY_KEY='attempt-1')
+            keyed_retry = self._request(HTTP_IDEMPOTENCY_KEY='attempt-1')
+        self.assertNotEqual(later.json()['otp_id'], first.json()['otp_id'])
+        self.assertNotEqual(keyed.json()['otp_id'], later.json()['otp_id'])
+        self.assertEqual(keyed_retry.json()['otp_id'], keyed.json()['otp_id'])
+        self.assertEqual(OutboundMessage.objects.count(), 3)
+
+    def test_resend_after_delivery_or_failure_sends_again(self):
+        with mock.patch('otp_auth.outbox.time.time', return_value=1_000_000.0):
+            first = self._request()
+            outbox.deliver_pending()
+            resend = self._request()
+            OutboundMessage.objects.filter(reference=resend.json()['otp_id']).update(
+                status=OutboundMessage.STATUS_FAILED
+            )
+            after_failure = self._request()
+        ids = {first.json()['otp_id'], resend.json()['otp_id'], after_failure.json()['otp_id']}
+        self.assertEqual(len(ids), 3)
+        self.assertEqual(OutboundMessage.objects.count(), 3)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_idempotency_key_holds_after_delivery(self):
+        first = self._request(HTTP_IDEMPOTENCY_KEY='attempt-1')
+        outbox.deliver_pending()
+        retry = self._request(HTTP_IDEMPOTENCY_KEY='attempt-1')
+        self.assertEqual(retry.json()['otp_id'], first.json()['otp_id'])
+        self.assertEqual(OutboundMessage.objects.count(), 1)
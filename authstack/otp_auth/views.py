@@ -10,7 +10,9 @@ from datetime import timedelta
 import re
 import uuid
 from django.conf import settings
+from .backends import get_otp_backend
 from .models import OTPRequest
+from .outbox import request_dedupe_key
 from .services import OTPService
 
 User = get_user_model()
@@ -77,7 +79,8 @@ def request_otp_view(request):
             }, status=status.HTTP_403_FORBIDDEN)
     
     # Create OTP request
-    otp_request = OTPRequest.create_otp(
+    backend = get_otp_backend()
+    otp_request = backend.create(
         otp_type=otp_type,
         destination=destination,
         purpose=purpose,
@@ -86,21 +89,29 @@ def request_otp_view(request):
     )
     
     # Send OTP
-    if otp_type == 'email':
-        success = OTPService.send_email_otp(destination, otp_request.otp_code, purpose)
-    else:
-        success = OTPService.send_sms_otp(destination, otp_request.otp_code, purpose)
+    send = OTPService.send_email_otp if otp_type == 'email' else OTPService.send_sms_otp
+    message = send(
+        destination, otp_request.otp_code, purpose,
+        dedupe_key=request_dedupe_key(request, 'otp', purpose, destination),
+        reference=otp_request.id,
+    )
     
-    if not success:
-        otp_request.delete()
+    if not message:
+        backend.discard(otp_request.id)
         return Response({
             'code': 'SEND_FAILED',
             'message': f'Failed to send OTP to {otp_type}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    otp_id = str(otp_request.id)
+    if message.reference != otp_id:
+        # A retry: the code already on its way belongs to the first challenge
+        backend.discard(otp_request.id)
+        otp_id = message.reference
+    
     return Response({
         'message': f'OTP sent to {otp_type}',
-        'otp_id': str(otp_request.id),
+        'otp_id': otp_id,
         'expires_in': 300 if otp_type == 'phone' else 600,  # seconds
         'destination_masked': _mask_destination(destination, otp_type)
     }, status=status.HTTP_200_OK)
@@ -118,16 +129,8 @@ def verify_otp_view(request):
             'message': 'OTP ID and code required'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    try:
-        otp_request = OTPRequest.objects.get(id=otp_id)
-    except OTPRequest.DoesNotExist:
-        return Response({
-            'code': 'INVALID_OTP',
-            'message': 'Invalid OTP request'
-        }, status=status.HTTP_400_BAD_REQUEST)
-    
     # Verify OTP
-    success, message = otp_request.verify(otp_code)
+    success, message, otp_request = get_otp_backend().verify(otp_id, otp_code)
     
     if not success:
         return Response({
@@ -138,7 +141,7 @@ def verify_otp_view(request):
     # Handle based on purpose
     if otp_request.purpose == 'login':
         # Login user
-        user = otp_request.user
+        user = User.objects.filter(pk=otp_request.user_id).first() if otp_request.user_id else None
         if not user:
             # Find user by destination
             if otp_request.otp_type == 'email':
@@ -154,7 +157,9 @@ def verify_otp_view(request):
             }, status=status.HTTP_404_NOT_FOUND)
         
         # Create session
-        from user_sessions.models import Session, Device
+        from accounts.models import UserSession
+        from accounts.session_store import hash_refresh_token
+        from user_sessions.models import Device
         from accounts.jwt_auth import CustomTokenObtainPairSerializer
         
         # Get device info
@@ -185,26 +190,27 @@ def verify_otp_view(request):
         user_agent = request.META.get('HTTP_USER_AGENT', '')
         
         # Create session with proper fields
-        import secrets
-        import hashlib
-        refresh_token = secrets.token_urlsafe(32)
-        refresh_token_hash = hashlib.sha256(refresh_token.encode()).hexdigest()
-        
-        session = Session.objects.create(
+        session_id = uuid.uuid4()
+        # Add session info to tokens
+        refresh['sid'] = str(session_id)
+        access['sid'] = str(session_id)
+        UserSession.objects.create(
+            id=session_id,
             user=user,
-            device=device,
+            registered_device=device,
+            device_id=device_id or str(session_id),
+            device_name=device.device_name if device else '',
+            device_type=device.device_type if device else '',
             ip_address=ip_address,
             user_agent=user_agent,
-            refresh_token_hash=refresh_token_hash,
+            refresh_token_jti=refresh['jti'],
+            access_token_jti=access['jti'],
+            refresh_token_hash=hash_refresh_token(str(refresh)),
             refresh_token_family=str(uuid.uuid4()),
             rotation_counter=0,
             expires_at=timezone.now() + timedelta(days=7)
         )
         
-        # Add session info to tokens
-        refresh['sid'] = str(session.id)
-        access['sid'] = str(session.id)
-        
         # Mark phone/email as verified if fields exist
         if otp_request.otp_type == 'email' and hasattr(user, 'email_verified'):
             user.email_verified = True
@@ -216,7 +222,7 @@ def verify_otp_view(request):
         # Set refresh token in HTTP-only cookie
         response = Response({
             'access': str(access),
-            'session_id': str(session.id),
+            'session_id': str(session_id),
             'expires_in': settings.SIMPLE_JWT['ACCESS_TOKEN_LIFETIME'].total_seconds(),
             'user': {
                 'id': str(user.id),
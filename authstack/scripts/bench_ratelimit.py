@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Per-check cost of the sliding-window limiter vs DRF's history throttle.
+
+Uses the project's default cache, so run it once per backend:
+
+    python scripts/bench_ratelimit.py                                  # LocMem
+    REDIS_URL=redis://127.0.0.1:6379/5 python scripts/bench_ratelimit.py
+
+Each limiter is checked --iterations times against --keys distinct keys with
+a limit high enough that every check is allowed (the expensive path for
+DRF, whose history list grows with every hit). Reports mean and p99 in
+microseconds.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "authstack.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from rest_framework.throttling import SimpleRateThrottle  # noqa: E402
+
+from common.ratelimit import hit  # noqa: E402
+
+
+class _HistoryThrottle(SimpleRateThrottle):
+    rate = "100000/hour"
+
+    def __init__(self, key):
+        super().__init__()
+        self._key = key
+
+    def get_cache_key(self, request, view):
+        return self._key
+
+
+def bench(name, check, keys, iterations):
+    # Fresh keys per run; the cache itself is never cleared
+    run = f"bench:{name}:{time.time_ns()}"
+    samples = []
+    for i in range(iterations):
+        key = f"{run}:{i % keys}"
+        start = time.perf_counter()
+        check(key)
+        samples.append((time.perf_counter() - start) * 1e6)
+    samples.sort()
+    return statistics.mean(samples), samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark rate-limit checks")
+    p.add_argument("--iterations", type=int, default=20000)
+    p.add_argument("--keys", type=int, default=100, help="Distinct client keys")
+    args = p.parse_args()
+
+    backend = settings.CACHES["default"]["BACKEND"].rsplit(".", 1)[-1]
+    print(f"Cache: {backend}  iterations={args.iterations}  keys={args.keys}")
+    print(f"{'limiter':<16} {'mean us':>9} {'p99 us':>9}")
+    runs = [
+        ("sliding-window", lambda key: hit(key, 100000, 3600)),
+        ("drf-history", lambda key: _HistoryThrottle(key).allow_request(None, None)),
+    ]
+    for name, check in runs:
+        mean, p99 = bench(name, check, args.keys, args.iterations)
+        print(f"{name:<16} {mean:>9.1f} {p99:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Compare WSGI vs ASGI throughput on hot authenticated endpoints.
+
+Run the same code under both servers, e.g.:
+
+    gunicorn authstack.wsgi:application -w 4 -b 127.0.0.1:8001
+    gunicorn authstack.asgi:application -w 4 -k uvicorn.workers.UvicornWorker -b 127.0.0.1:8002
+
+then:
+
+    python scripts/bench_wsgi_asgi.py --wsgi http://127.0.0.1:8001 --asgi http://127.0.0.1:8002
+
+Each target logs in once and then hammers every endpoint with --concurrency
+worker threads for --duration seconds, reporting req/s and latency
+percentiles. Only 2xx responses count as successes.
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+TENANT = os.environ.get("ONTIME_TENANT", "ontime")
+DEFAULT_PATHS = ("/api/me/", "/api/channels/shorts/feed/")
+
+
+def login(base, username, password, verify=True):
+    r = requests.post(
+        f"{base}/api/token/",
+        json={"username": username, "password": password},
+        headers={"X-Tenant-Id": TENANT},
+        timeout=15,
+        verify=verify,
+    )
+    r.raise_for_status()
+    return r.json().get("access")
+
+
+def run(base, path, access, concurrency, duration, verify=True):
+    headers = {"Authorization": f"Bearer {access}", "X-Tenant-Id": TENANT}
+    deadline = time.monotonic() + duration
+    lock = threading.Lock()
+    latencies, errors = [], [0]
+
+    def worker():
+        session = requests.Session()
+        local, local_errors = [], 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                r = session.get(f"{base}{path}", headers=headers, timeout=30, verify=verify)
+                ok = 200 <= r.status_code < 300
+            except requests.RequestException:
+                ok = False
+            if ok:
+                local.append(time.perf_counter() - start)
+            else:
+                local_errors += 1
+        with lock:
+            latencies.extend(local)
+            errors[0] += local_errors
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+
+    def pct(p):
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+
+    return {
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "ok": len(latencies),
+        "errors": errors[0],
+        "p50": pct(0.50),
+        "p95": pct(0.95),
+        "mean": statistics.mean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark WSGI vs ASGI deployments of the API")
+    p.add_argument("--wsgi", default=os.environ.get("ONTIME_WSGI_BASE", "http://127.0.0.1:8001"))
+    p.add_argument("--asgi", default=os.environ.get("ONTIME_ASGI_BASE", "http://127.0.0.1:8002"))
+    p.add_argument("--user", default=os.environ.get("ONTIME_USER"))
+    p.add_argument("--passw", dest="password", default=os.environ.get("ONTIME_PASS"))
+    p.add_argument("--path", action="append", dest="paths", help="Endpoint to hit (repeatable)")
+    p.add_argument("--concurrency", type=int, default=32)
+    p.add_argument("--duration", type=float, default=20.0, help="Seconds per endpoint and target")
+    p.add_argument("--insecure", action="store_true", help="Disable SSL verification")
+    args = p.parse_args()
+
+    if not args.user or not args.password:
+        print("Set --user/--passw (or ONTIME_USER/ONTIME_PASS)")
+        sys.exit(1)
+
+    verify = not args.insecure
+    paths = args.paths or list(DEFAULT_PATHS)
+    targets = [("wsgi", args.wsgi.rstrip("/")), ("asgi", args.asgi.rstrip("/"))]
+
+    print(f"Tenant: {TENANT}  concurrency={args.concurrency}  duration={args.duration}s")
+    print(f"{'target':<6} {'path':<32} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} {'errors':>7}")
+    for name, base in targets:
+        try:
+            access = login(base, args.user, args.password, verify=verify)
+        except Exception as e:
+            print(f"{name}: login failed: {e}")
+            continue
+        for path in paths:
+            r = run(base, path, access, args.concurrency, args.duration, verify=verify)
+            print(
+                f"{name:<6} {path:<32} {r['rps']:>9.1f} {r['p50']:>8.1f} {r['p95']:>8.1f} "
+                f"{r['mean']:>8.1f} {r['errors']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
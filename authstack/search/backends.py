@@ -0,0 +1,111 @@
+"""Query side of the search index.
+
+Every backend answers ``search(tenant, query, kinds, offset, limit)`` with
+ranked SearchDocument rows in a single SQL statement; ``rank`` is set on
+each row. ``get_search_backend`` returns the one named by
+``SEARCH_BACKEND``, or picks by database vendor:
+
+  - ``SqliteFTSBackend``: FTS5 (unicode61 tokenizer, prefix indexes), bm25
+    ranking with title words weighted above body words.
+  - ``PostgresSearchBackend``: ``simple`` tsvector (no stemming, which has
+    no Amharic dictionary anyway) plus pg_trgm word similarity on titles so
+    misspelled queries still find something.
+  - ``SimpleSearchBackend``: icontains over the term columns, for any other
+    database. Unranked beyond recency and not indexed.
+
+Queries are normalized with search.text.terms, the same as indexed text,
+and every word is matched as a prefix so partial input works.
+"""
+from __future__ import annotations
+
+from typing import List, Optional, Sequence
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils.module_loading import import_string
+
+from .models import SearchDocument
+from .text import terms
+
+_TABLE = SearchDocument._meta.db_table
+
+
+def _kind_filter(kinds: Optional[Sequence[str]], column: str = 'd.kind'):
+    if not kinds:
+        return '', []
+    return f" AND {column} IN ({', '.join(['%s'] * len(kinds))})", list(kinds)
+
+
+class SqliteFTSBackend:
+    FTS_TABLE = 'search_document_fts'
+    # bm25 column weights: title_terms, body_terms
+    WEIGHTS = (10.0, 1.0)
+
+    def search(self, tenant, query, kinds=None, offset=0, limit=20) -> List[SearchDocument]:
+        words = terms(query)
+        if not words:
+            return []
+        match = ' '.join(f'"{w}"*' for w in words)
+        kind_sql, kind_params = _kind_filter(kinds)
+        sql = (
+            f"SELECT d.*, bm25({self.FTS_TABLE}, {self.WEIGHTS[0]}, {self.WEIGHTS[1]}) AS rank "
+            f"FROM {self.FTS_TABLE} JOIN {_TABLE} d ON d.id = {self.FTS_TABLE}.rowid "
+            f"WHERE {self.FTS_TABLE} MATCH %s AND d.tenant = %s{kind_sql} "
+            # bm25 is lower-is-better; NULL dates sort last under DESC
+            "ORDER BY rank, d.published_at DESC LIMIT %s OFFSET %s"
+        )
+        return list(SearchDocument.objects.raw(sql, [match, tenant, *kind_params, limit, offset]))
+
+
+class PostgresSearchBackend:
+    VECTOR = (
+        "(setweight(to_tsvector('simple', d.title_terms), 'A') || "
+        "setweight(to_tsvector('simple', d.body_terms), 'B'))"
+    )
+
+    def search(self, tenant, query, kinds=None, offset=0, limit=20) -> List[SearchDocument]:
+        words = terms(query)
+        if not words:
+            return []
+        tsquery = ' & '.join(f"'{w}':*" for w in words)
+        text = ' '.join(words)
+        kind_sql, kind_params = _kind_filter(kinds)
+        sql = (
+            f"SELECT d.*, ts_rank({self.VECTOR}, q) + word_similarity(%s, d.title_terms) AS rank "
+            f"FROM {_TABLE} d, to_tsquery('simple', %s) q "
+            f"WHERE d.tenant = %s{kind_sql} AND ({self.VECTOR} @@ q OR %s <%% d.title_terms) "
+            "ORDER BY rank DESC, d.published_at DESC NULLS LAST LIMIT %s OFFSET %s"
+        )
+        params = [text, tsquery, tenant, *kind_params, text, limit, offset]
+        return list(SearchDocument.objects.raw(sql, params))
+
+
+class SimpleSearchBackend:
+    def search(self, tenant, query, kinds=None, offset=0, limit=20) -> List[SearchDocument]:
+        words = terms(query)
+        if not words:
+            return []
+        qs = SearchDocument.objects.filter(tenant=tenant)
+        if kinds:
+            qs = qs.filter(kind__in=kinds)
+        for w in words:
+            qs = qs.filter(Q(title_terms__icontains=w) | Q(body_terms__icontains=w))
+        rows = list(qs.order_by('-published_at', '-id')[offset:offset + limit])
+        for row in rows:
+            row.rank = 0.0
+        return rows
+
+
+_VENDOR_BACKENDS = {
+    'sqlite': SqliteFTSBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    """Instance of settings.SEARCH_BACKEND, else the one for the database vendor."""
+    path = getattr(settings, 'SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    return _VENDOR_BACKENDS.get(connection.vendor, SimpleSearchBackend)()
@@ -0,0 +1,227 @@
+"""Write side of the search index.
+
+``SOURCES`` says, per document kind, which rows are searchable and what
+their SearchDocument looks like. ``index_ids`` is the single write path:
+it reloads the given rows, drops their old documents and bulk-inserts new
+ones for the rows that are still searchable, so it also handles
+unpublishing and deletes.
+
+It is called from the model signals in search.signals and, for changes
+made with queryset.update() (which sends no signals, e.g. shorts
+eviction), from ``refresh_index``, which a beat task runs periodically
+over rows whose updated_at moved. Reindexing those ids also removes the
+documents of rows in that window that stopped being searchable, and
+deletes go through post_delete, so a refresh never scans the whole index.
+Its high-water mark is an IndexState row rather than a cache entry, so a
+cache flush or a per-process cache does not trigger a full reindex.
+``rebuild_search_index`` reindexes everything and prunes.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+from typing import Callable, Dict, Iterable, List, NamedTuple
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import IndexState, SearchDocument
+from .text import index_text
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+_REFRESH_STATE = "refresh"
+# Overlap between refresh runs, for rows committed late in the previous one
+_REFRESH_SLACK = timedelta(minutes=1)
+
+
+class Source(NamedTuple):
+    model: str
+    # Rows that should have a document
+    searchable: Q
+    select_related: tuple
+    document: Callable[[object], Dict[str, object]]
+
+    def queryset(self):
+        qs = apps.get_model(self.model).objects.all()
+        return qs.select_related(*self.select_related) if self.select_related else qs
+
+
+def _thumbnail(thumbnails) -> str:
+    from onchannels.shorts_metadata import best_thumbnail_url
+
+    return best_thumbnail_url(thumbnails)
+
+
+def _strings(values) -> List[str]:
+    """Text out of a JSON list of strings or {"value": ...} dicts."""
+    out = []
+    for v in values or []:
+        if isinstance(v, dict):
+            v = v.get("value") or v.get("name")
+        if isinstance(v, str):
+            out.append(v)
+    return out
+
+
+def _channel_name(channel) -> str:
+    return channel.name_en or channel.name_am or channel.id_slug
+
+
+def _short_document(job):
+    return {
+        "tenant": job.tenant,
+        "title": job.video_title,
+        "subtitle": job.channel_name,
+        "image_url": job.thumbnail_url,
+        "published_at": job.video_published_at,
+        "data": {
+            "job_id": str(job.pk),
+            "video_id": job.video_id,
+            "hls_master_url": job.hls_master_url,
+            "duration_seconds": int(job.duration_seconds or 0),
+            "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        },
+        "title_terms": index_text(job.video_title),
+        "body_terms": index_text(job.channel_name, job.channel_slug),
+    }
+
+
+def _channel_document(channel):
+    image = next((i.get("url") for i in channel.images or [] if isinstance(i, dict) and i.get("url")), "")
+    return {
+        "tenant": channel.tenant,
+        "title": _channel_name(channel),
+        "subtitle": (channel.name_am or "") if channel.name_en else "",
+        "image_url": image,
+        "published_at": None,
+        "data": {"id_slug": channel.id_slug},
+        "title_terms": index_text(channel.name_en, channel.name_am),
+        "body_terms": index_text(channel.id_slug, *_strings(channel.aliases), *_strings(channel.tags)),
+    }
+
+
+def _show_document(show):
+    return {
+        "tenant": show.tenant,
+        "title": show.title,
+        "subtitle": _channel_name(show.channel),
+        "image_url": show.cover_image or "",
+        "published_at": None,
+        "data": {"slug": show.slug},
+        "title_terms": index_text(show.title),
+        "body_terms": index_text(
+            show.synopsis, *_strings(show.tags), show.channel.name_en, show.channel.name_am
+        ),
+    }
+
+
+def _episode_document(episode):
+    show = episode.season.show
+    return {
+        "tenant": episode.tenant,
+        "title": episode.display_title,
+        "subtitle": show.title,
+        "image_url": _thumbnail(episode.thumbnails),
+        "published_at": episode.source_published_at,
+        "data": {
+            "episode_id": episode.pk,
+            "show_slug": show.slug,
+            "season_id": episode.season_id,
+            "season_number": episode.season.number,
+            "episode_number": episode.episode_number,
+            "source_video_id": episode.source_video_id,
+            "duration_seconds": episode.duration_seconds,
+        },
+        "title_terms": index_text(episode.display_title),
+        "body_terms": index_text(episode.description_override or episode.description, show.title),
+    }
+
+
+SOURCES: Dict[str, Source] = {
+    SearchDocument.KIND_SHORT: Source(
+        "channels.ShortJob", Q(status="ready") & ~Q(video_id=""), (), _short_document,
+    ),
+    SearchDocument.KIND_CHANNEL: Source(
+        "channels.Channel", Q(is_active=True), (), _channel_document,
+    ),
+    SearchDocument.KIND_SHOW: Source(
+        "series.Show", Q(is_active=True), ("channel",), _show_document,
+    ),
+    SearchDocument.KIND_EPISODE: Source(
+        "series.Episode",
+        Q(visible=True, status="published", season__is_enabled=True, season__show__is_active=True),
+        ("season__show",),
+        _episode_document,
+    ),
+}
+
+
+def _chunks(items: List, size: int = BATCH_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def index_ids(kind: str, ids: Iterable) -> int:
+    """Bring the documents of kind for ids up to date; returns documents written."""
+    source = SOURCES[kind]
+    written = 0
+    for chunk in _chunks([str(pk) for pk in ids]):
+        rows = source.queryset().filter(source.searchable, pk__in=chunk)
+        docs = [SearchDocument(kind=kind, object_id=str(row.pk), **source.document(row)) for row in rows]
+        with transaction.atomic():
+            SearchDocument.objects.filter(kind=kind, object_id__in=chunk).delete()
+            SearchDocument.objects.bulk_create(docs)
+        written += len(docs)
+    return written
+
+
+def remove_ids(kind: str, ids: Iterable) -> None:
+    SearchDocument.objects.filter(kind=kind, object_id__in=[str(pk) for pk in ids]).delete()
+
+
+def prune(kind: str) -> int:
+    """Delete documents of kind whose row is gone or no longer searchable."""
+    source = SOURCES[kind]
+    object_ids = list(SearchDocument.objects.filter(kind=kind).values_list("object_id", flat=True))
+    removed = 0
+    for chunk in _chunks(object_ids):
+        live = {
+            str(pk) for pk in
+            source.queryset().filter(source.searchable, pk__in=chunk).values_list("pk", flat=True)
+        }
+        stale = [oid for oid in chunk if oid not in live]
+        if stale:
+            remove_ids(kind, stale)
+            removed += len(stale)
+    return removed
+
+
+def refresh_index(now=None) -> Dict[str, int]:
+    """Reindex rows changed since the last run (everything on the first run)."""
+    now = now or timezone.now()
+    state = IndexState.objects.filter(name=_REFRESH_STATE).first()
+    if state is None:
+        counts = rebuild()
+    else:
+        counts = {}
+        for kind, source in SOURCES.items():
+            changed = apps.get_model(source.model).objects.filter(updated_at__gte=state.refreshed_at - _REFRESH_SLACK)
+            counts[kind] = index_ids(kind, changed.values_list("pk", flat=True))
+            if counts[kind]:
+                logger.info("search.refresh", extra={"kind": kind, "written": counts[kind]})
+    IndexState.objects.update_or_create(name=_REFRESH_STATE, defaults={"refreshed_at": now})
+    return counts
+
+
+def rebuild(kinds: Iterable[str] = ()) -> Dict[str, int]:
+    """Reindex every row of the given kinds (all by default)."""
+    counts = {}
+    for kind in kinds or SOURCES:
+        model = apps.get_model(SOURCES[kind].model)
+        counts[kind] = index_ids(kind, model.objects.values_list("pk", flat=True))
+        prune(kind)
+    return counts
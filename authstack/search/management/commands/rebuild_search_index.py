@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand, CommandParser
+
+from search.indexer import SOURCES, rebuild
+
+
+class Command(BaseCommand):
+    help = "Reindex every searchable row (shorts, channels, shows, episodes)."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--kind",
+            action="append",
+            choices=sorted(SOURCES),
+            help="Only this document kind (repeatable). Default: all",
+        )
+
+    def handle(self, *args, **options):
+        counts = rebuild(options.get("kind") or ())
+        for kind, count in counts.items():
+            self.stdout.write(f" - {kind}: {count} document(s)")
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt"))
+        return 0
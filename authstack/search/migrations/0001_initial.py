@@ -0,0 +1,35 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('short', 'Short'), ('channel', 'Channel'), ('show', 'Show'), ('episode', 'Episode')], max_length=16)),
+                ('object_id', models.CharField(max_length=64)),
+                ('tenant', models.CharField(default='ontime', max_length=64)),
+                ('title', models.CharField(blank=True, default='', max_length=255)),
+                ('subtitle', models.CharField(blank=True, default='', max_length=255)),
+                ('image_url', models.TextField(blank=True, default='')),
+                ('published_at', models.DateTimeField(blank=True, null=True)),
+                ('data', models.JSONField(blank=True, default=dict)),
+                ('title_terms', models.TextField(blank=True, default='')),
+                ('body_terms', models.TextField(blank=True, default='')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tenant', 'kind'], name='search_sear_tenant_720196_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='uniq_search_document')],
+            },
+        ),
+    ]
@@ -0,0 +1,74 @@
+from django.db import migrations
+
+# Must match the queries in search.backends
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE search_document_fts USING fts5(
+        title_terms, body_terms,
+        content='search_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER search_document_ai AFTER INSERT ON search_searchdocument BEGIN
+        INSERT INTO search_document_fts(rowid, title_terms, body_terms)
+        VALUES (new.id, new.title_terms, new.body_terms);
+    END
+    """,
+    """
+    CREATE TRIGGER search_document_ad AFTER DELETE ON search_searchdocument BEGIN
+        INSERT INTO search_document_fts(search_document_fts, rowid, title_terms, body_terms)
+        VALUES ('delete', old.id, old.title_terms, old.body_terms);
+    END
+    """,
+    """
+    CREATE TRIGGER search_document_au AFTER UPDATE ON search_searchdocument BEGIN
+        INSERT INTO search_document_fts(search_document_fts, rowid, title_terms, body_terms)
+        VALUES ('delete', old.id, old.title_terms, old.body_terms);
+        INSERT INTO search_document_fts(rowid, title_terms, body_terms)
+        VALUES (new.id, new.title_terms, new.body_terms);
+    END
+    """,
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS search_document_au",
+    "DROP TRIGGER IF EXISTS search_document_ad",
+    "DROP TRIGGER IF EXISTS search_document_ai",
+    "DROP TABLE IF EXISTS search_document_fts",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    CREATE INDEX search_document_fts_idx ON search_searchdocument USING GIN (
+        (setweight(to_tsvector('simple', title_terms), 'A') ||
+         setweight(to_tsvector('simple', body_terms), 'B'))
+    )
+    """,
+    "CREATE INDEX search_document_title_trgm_idx ON search_searchdocument USING GIN (title_terms gin_trgm_ops)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS search_document_title_trgm_idx",
+    "DROP INDEX IF EXISTS search_document_fts_idx",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_REVERSE, 'postgresql': POSTGRES_REVERSE}),
+        ),
+    ]
@@ -0,0 +1,60 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """One searchable item (ready short, channel, show or episode).
+
+    Rows are derived data, written only by search.indexer. The full-text
+    index over title_terms/body_terms lives outside the ORM: an FTS5 table
+    kept in sync by triggers on SQLite, GIN expression indexes on Postgres
+    (see migration 0001 and search.backends).
+    """
+
+    KIND_SHORT = 'short'
+    KIND_CHANNEL = 'channel'
+    KIND_SHOW = 'show'
+    KIND_EPISODE = 'episode'
+    KIND_CHOICES = [
+        (KIND_SHORT, 'Short'),
+        (KIND_CHANNEL, 'Channel'),
+        (KIND_SHOW, 'Show'),
+        (KIND_EPISODE, 'Episode'),
+    ]
+
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES)
+    object_id = models.CharField(max_length=64)
+    tenant = models.CharField(max_length=64, default='ontime')
+
+    # Display fields, returned as-is so results need no further lookups
+    title = models.CharField(max_length=255, blank=True, default='')
+    subtitle = models.CharField(max_length=255, blank=True, default='')
+    image_url = models.TextField(blank=True, default='')
+    published_at = models.DateTimeField(blank=True, null=True)
+    data = models.JSONField(default=dict, blank=True)
+
+    # Normalized words (search.text.term_text); title matches rank higher
+    title_terms = models.TextField(blank=True, default='')
+    body_terms = models.TextField(blank=True, default='')
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='uniq_search_document'),
+        ]
+        indexes = [
+            models.Index(fields=['tenant', 'kind']),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind}:{self.object_id} {self.title}"
+
+
+class IndexState(models.Model):
+    """Bookkeeping of search.indexer that must survive cache flushes (one row per name)."""
+
+    name = models.CharField(max_length=64, primary_key=True)
+    refreshed_at = models.DateTimeField()
+
+    def __str__(self) -> str:
+        return f"{self.name} @ {self.refreshed_at}"
@@ -0,0 +1,74 @@
+"""Keep SearchDocument rows current (connected in SearchConfig.ready).
+
+Related rows are reindexed with their parent: a Video or Channel edit
+changes the titles and channel names copied onto shorts, and a show or
+season being hidden hides its episodes. The onchannels receivers that copy
+Video/Channel metadata onto ShortJob are connected first (the app is
+listed before search), so the shorts read here are already updated.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from onchannels.models import Channel, ShortJob, Video
+from series.models import Episode, Season, Show
+
+from .indexer import index_ids, remove_ids
+from .models import SearchDocument
+
+SHORT = SearchDocument.KIND_SHORT
+CHANNEL = SearchDocument.KIND_CHANNEL
+SHOW = SearchDocument.KIND_SHOW
+EPISODE = SearchDocument.KIND_EPISODE
+
+
+@receiver(post_save, sender=ShortJob, dispatch_uid="search_shortjob_saved")
+def index_short(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_ids(SHORT, [instance.pk])
+
+
+@receiver(post_save, sender=Video, dispatch_uid="search_video_saved")
+def index_video_shorts(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_ids(SHORT, ShortJob.objects.filter(video_id=instance.video_id).values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Channel, dispatch_uid="search_channel_saved")
+def index_channel(sender, instance, raw=False, created=False, **kwargs):
+    if raw:
+        return
+    index_ids(CHANNEL, [instance.pk])
+    if not created:
+        index_ids(SHORT, ShortJob.objects.filter(channel_slug=instance.id_slug).values_list("pk", flat=True))
+        index_ids(SHOW, Show.objects.filter(channel=instance).values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Show, dispatch_uid="search_show_saved")
+def index_show(sender, instance, raw=False, created=False, **kwargs):
+    if raw:
+        return
+    index_ids(SHOW, [instance.pk])
+    if not created:
+        index_ids(EPISODE, Episode.objects.filter(season__show=instance).values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Season, dispatch_uid="search_season_saved")
+def index_season(sender, instance, raw=False, created=False, **kwargs):
+    if not raw and not created:
+        index_ids(EPISODE, Episode.objects.filter(season=instance).values_list("pk", flat=True))
+
+
+@receiver(post_save, sender=Episode, dispatch_uid="search_episode_saved")
+def index_episode(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_ids(EPISODE, [instance.pk])
+
+
+_DELETED_KINDS = {ShortJob: SHORT, Channel: CHANNEL, Show: SHOW, Episode: EPISODE}
+
+
+@receiver(post_delete, dispatch_uid="search_row_deleted")
+def drop_document(sender, instance, **kwargs):
+    kind = _DELETED_KINDS.get(sender)
+    if kind:
+        remove_ids(kind, [instance.pk])
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from celery import shared_task
+
+from search.indexer import refresh_index
+
+
+@shared_task(bind=True)
+def refresh_search_index(self) -> dict:
+    """Catch up on changes made without signals (see search.indexer)."""
+    return refresh_index()
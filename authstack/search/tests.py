@@ -0,0 +1,138 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from onchannels.models import Channel, Playlist, ShortJob, Video
+from series.models import Episode, Season, Show
+from tenants.models import Tenant
+
+from .indexer import refresh_index
+from .models import IndexState, SearchDocument
+from .text import index_text, term_text, terms
+from .views import search_page
+
+User = get_user_model()
+
+
+class TextTests(TestCase):
+    def test_latin_is_casefolded_without_diacritics(self):
+        self.assertEqual(terms("Café NEWS_today"), ["cafe", "news", "today"])
+
+    def test_ethiopic_separators_and_homophones(self):
+        self.assertEqual(terms("ሰላም፡ዓለም።"), terms("ሰላም ኣለም"))
+        self.assertEqual(term_text("ሐበሻ"), term_text("ሀበሻ"))
+        self.assertEqual(term_text("ፀሐይ"), term_text("ጸሀይ"))
+        self.assertEqual(term_text("ሠላም"), "ሰላም")
+
+    def test_index_text_adds_words_without_prepositions(self):
+        self.assertEqual(index_text("የሐበሻ ቤት"), "የሀበሻ ሀበሻ ቤት")
+        self.assertEqual(index_text("እንደገና"), "እንደገና ገና")
+        self.assertEqual(terms("የሐበሻ"), ["የሀበሻ"])
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.channel = Channel.objects.create(
+            tenant="ontime", id_slug="ebs", name_en="EBS", name_am="ኢቢኤስ", is_active=True
+        )
+        self.playlist = Playlist.objects.create(id="PL1", channel=self.channel, title="Shorts", is_shorts=True)
+
+    def _short(self, video_id, title, status=ShortJob.STATUS_READY, tenant="ontime"):
+        Video.objects.create(
+            channel=self.channel, playlist=self.playlist, video_id=video_id, title=title,
+            published_at=timezone.now(),
+        )
+        return ShortJob.objects.create(
+            tenant=tenant, source_url=f"https://youtu.be/{video_id}", status=status,
+            hls_master_url=f"/media/{video_id}/master.m3u8",
+        )
+
+    def _search(self, q, kinds=None, tenant="ontime", **kwargs):
+        rows, _ = search_page(tenant, q, kinds, **kwargs)
+        return [(doc.kind, doc.title) for doc in rows]
+
+    def test_ready_shorts_are_indexed_and_matched_by_prefix(self):
+        self._short("v1", "Ethiopian football highlights")
+        self._short("v2", "Football training", status=ShortJob.STATUS_QUEUED)
+        self.assertEqual(self._search("footb high"), [("short", "Ethiopian football highlights")])
+
+    def test_amharic_spelling_variants_match(self):
+        self._short("v1", "የሐበሻ ዜና")
+        self.assertEqual(self._search("ሀበሻ"), [("short", "የሐበሻ ዜና")])
+        # Channel found by its Amharic name too
+        self.assertEqual(self._search("ኢቢ", kinds=["channel"]), [("channel", "EBS")])
+
+    def test_title_matches_rank_above_body_matches_and_tenant_is_isolated(self):
+        self._short("v1", "Weather report")
+        show = Show.objects.create(slug="ebs-weather", title="Morning show", synopsis="Daily weather", channel=self.channel)
+        self._short("v2", "Weather elsewhere", tenant="other")
+        results = self._search("weather")
+        self.assertEqual(results, [("short", "Weather report"), ("show", show.title)])
+
+    def test_pagination_and_single_query(self):
+        for i in range(5):
+            self._short(f"n{i}", f"News clip {i}")
+        with CaptureQueriesContext(connection) as ctx:
+            first, has_next = search_page("ontime", "news", ["short"], page=1, page_size=3)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertEqual((len(first), has_next), (3, True))
+        second, has_next = search_page("ontime", "news", ["short"], page=2, page_size=3)
+        self.assertEqual((len(second), has_next), (2, False))
+        self.assertFalse({d.pk for d in first} & {d.pk for d in second})
+
+    def test_edits_and_hidden_parents_update_documents(self):
+        video_job = self._short("v1", "Old title")
+        video = Video.objects.get(video_id="v1")
+        video.title = "New title"
+        video.save()
+        self.assertEqual(self._search("new title"), [("short", "New title")])
+
+        show = Show.objects.create(slug="drama", title="Drama", channel=self.channel)
+        season = Season.objects.create(show=show, number=1, yt_playlist_id="PLS1")
+        Episode.objects.create(season=season, source_video_id="e1", title="Pilot episode")
+        self.assertEqual(self._search("pilot"), [("episode", "Pilot episode")])
+        show.is_active = False
+        show.save()
+        self.assertEqual(self._search("pilot"), [])
+
+        # Eviction uses queryset.update(); the periodic refresh catches it
+        ShortJob.objects.filter(pk=video_job.pk).update(status=ShortJob.STATUS_DELETED, updated_at=timezone.now())
+        refresh_index()
+        self.assertFalse(SearchDocument.objects.filter(kind="short").exists())
+
+    def test_refresh_only_touches_the_changed_window(self):
+        kept = self._short("v1", "Kept clip")
+        refresh_index()
+        self.assertTrue(IndexState.objects.filter(name="refresh").exists())
+
+        # Changed long ago and already indexed: outside the window
+        ShortJob.objects.filter(pk=kept.pk).update(updated_at=timezone.now() - timedelta(days=1))
+        gone = self._short("v2", "Evicted clip")
+        ShortJob.objects.filter(pk=gone.pk).update(status=ShortJob.STATUS_DELETED, updated_at=timezone.now())
+        with mock.patch("search.indexer.prune") as prune:
+            counts = refresh_index()
+        prune.assert_not_called()
+        self.assertEqual(counts["short"], 0)
+        self.assertEqual(self._search("clip"), [("short", "Kept clip")])
+
+
+class SearchViewTests(TestCase):
+    def setUp(self):
+        Tenant.objects.create(slug="ontime", name="Ontime", active=True)
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user(username="searcher", password="Passw0rd!"))
+        Channel.objects.create(tenant="ontime", id_slug="fana", name_en="Fana TV", is_active=True)
+
+    def test_search_endpoint(self):
+        resp = self.client.get("/api/search/?q=fana&type=channel,bogus", HTTP_X_TENANT_ID="ontime")
+        self.assertEqual(resp.status_code, 200)
+        body = resp.json()
+        self.assertEqual((body["count"], body["has_next"]), (1, False))
+        self.assertEqual(body["results"][0]["type"], "channel")
+        self.assertEqual(body["results"][0]["id_slug"], "fana")
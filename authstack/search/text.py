@@ -0,0 +1,75 @@
+"""Text normalization shared by indexing and querying.
+
+Both sides go through ``terms()``, so the database tokenizers only ever see
+lowercase, space-separated words:
+
+  - Latin text is casefolded and stripped of diacritics ("Café" -> "cafe").
+  - Ethiopic word separators (``፡``, ``።``, ``፣`` ...) split words like
+    spaces do.
+  - Amharic writes several sounds with more than one letter series (ሀ/ሐ/ኀ,
+    ሰ/ሠ, አ/ዐ, ጸ/ፀ) and spellings vary between sources, so each redundant
+    series is folded onto one. "ሐበሻ" and "ሀበሻ" then index and match the
+    same way.
+  - Amharic attaches prepositions to the word ("የሀበሻ", "በአዲስ"). Indexed
+    text (``index_text``) also carries the word without them, so a search
+    for "ሀበሻ" finds "የሀበሻ". Queries are not expanded.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import List
+
+# (first syllable of redundant series, first syllable of canonical series,
+# syllables in the series); series are laid out in the same vowel order
+_HOMOPHONE_SERIES = (
+    (0x1210, 0x1200, 8),  # ሐ -> ሀ
+    (0x1280, 0x1200, 7),  # ኀ -> ሀ
+    (0x1220, 0x1230, 8),  # ሠ -> ሰ
+    (0x12D0, 0x12A0, 7),  # ዐ -> አ
+    (0x1340, 0x1338, 7),  # ፀ -> ጸ
+)
+_FOLD = {
+    src + i: chr(dst + i)
+    for src, dst, count in _HOMOPHONE_SERIES
+    for i in range(count)
+}
+
+# Letters and digits; "_" and punctuation (Ethiopic included) separate words
+_WORD = re.compile(r"[^\W_]+")
+_ETHIOPIC = re.compile(r"^[\u1200-\u137F]+$")
+# Longest first
+_PREFIXES = ("እንደ", "ከ", "የ", "በ", "ለ")
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return unicodedata.normalize("NFC", text).casefold().translate(_FOLD)
+
+
+def terms(*parts) -> List[str]:
+    """Normalized words of parts (None and empty values are skipped)."""
+    out: List[str] = []
+    for part in parts:
+        if part:
+            out.extend(_WORD.findall(normalize(str(part))))
+    return out
+
+
+def term_text(*parts) -> str:
+    return " ".join(terms(*parts))
+
+
+def index_text(*parts) -> str:
+    """term_text plus Ethiopic words stripped of a leading preposition."""
+    out = []
+    for word in terms(*parts):
+        out.append(word)
+        if _ETHIOPIC.match(word):
+            for prefix in _PREFIXES:
+                # Keep at least two syllables so short words are not mangled
+                if word.startswith(prefix) and len(word) - len(prefix) >= 2:
+                    out.append(word[len(prefix):])
+                    break
+    return " ".join(out)
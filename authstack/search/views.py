@@ -0,0 +1,52 @@
+from django.conf import settings
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .backends import get_search_backend
+from .indexer import SOURCES
+
+MAX_PAGE_SIZE = 50
+
+
+def _int(value, default):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def search_page(tenant, q, kinds=None, page=1, page_size=None):
+    """One page of ranked documents plus whether another page follows."""
+    page = max(1, page)
+    page_size = max(1, min(page_size or getattr(settings, 'SEARCH_PAGE_SIZE', 20), MAX_PAGE_SIZE))
+    # One extra row tells us about the next page without a COUNT query
+    rows = get_search_backend().search(tenant, q, kinds, offset=(page - 1) * page_size, limit=page_size + 1)
+    return rows[:page_size], len(rows) > page_size
+
+
+class SearchView(APIView):
+    """GET /api/search/?q=&type=short,channel,show,episode&page=&page_size="""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        tenant = request.headers.get("X-Tenant-Id") or request.query_params.get("tenant") or "ontime"
+        q = (request.query_params.get('q') or '').strip()
+        kinds = [k for k in (request.query_params.get('type') or '').split(',') if k in SOURCES]
+        page = max(1, _int(request.query_params.get('page'), 1))
+        if not q:
+            return Response({"count": 0, "page": page, "has_next": False, "results": []})
+        rows, has_next = search_page(tenant, q, kinds, page, _int(request.query_params.get('page_size'), None))
+        results = [
+            {
+                "type": doc.kind,
+                "id": doc.object_id,
+                "title": doc.title,
+                "subtitle": doc.subtitle,
+                "image_url": doc.image_url,
+                "published_at": doc.published_at.isoformat() if doc.published_at else None,
+                **(doc.data or {}),
+            }
+            for doc in rows
+        ]
+        return Response({"count": len(results), "page": page, "has_next": has_next, "results": results})
@@ -0,0 +1,111 @@
+"""Per-process lookup cache for tenant resolution.
+
+TenantResolverMiddleware resolves a tenant on every request, but there are
+only a handful of tenants and they almost never change. Lookups by slug and
+by host are kept in a small in-process map for ``TENANT_CACHE_TTL`` seconds.
+Misses are cached too, so a flood of unknown slugs does not reach the
+database on every request.
+
+Tenant/TenantDomain saves and deletes clear the map (see tenants.signals).
+That only reaches the current process; other workers pick the change up
+once their entries expire.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+
+from .models import Tenant, TenantDomain
+
+_lock = threading.Lock()
+# (kind, key) -> (expires_at monotonic, tenant or None)
+_entries: Dict[Tuple[str, str], Tuple[float, Optional[Tenant]]] = {}
+
+
+def _ttl() -> float:
+    return float(getattr(settings, "TENANT_CACHE_TTL", 60))
+
+
+def _max_entries() -> int:
+    return int(getattr(settings, "TENANT_CACHE_MAX_ENTRIES", 1024))
+
+
+_MISS = object()
+
+
+def _get(kind: str, key: str):
+    if _ttl() <= 0:
+        return _MISS
+    hit = _entries.get((kind, key))
+    if hit is not None and hit[0] > time.monotonic():
+        return hit[1]
+    return _MISS
+
+
+def _put(kind: str, key: str, tenant: Optional[Tenant]) -> Optional[Tenant]:
+    if _ttl() <= 0:
+        return tenant
+    with _lock:
+        if len(_entries) >= _max_entries():
+            # Keeps memory bounded when clients send random slugs/hosts
+            _entries.clear()
+        _entries[(kind, key)] = (time.monotonic() + _ttl(), tenant)
+    return tenant
+
+
+def _domain_tenant(dom: Optional[TenantDomain]) -> Optional[Tenant]:
+    if dom and dom.tenant.active:
+        return dom.tenant
+    return None
+
+
+def get_tenant_by_slug(slug: str) -> Optional[Tenant]:
+    """Active tenant with this slug, or None."""
+    if not slug:
+        return None
+    cached = _get("slug", slug)
+    if cached is not _MISS:
+        return cached
+    tenant = Tenant.objects.filter(slug=slug, active=True).first()
+    return _put("slug", slug, tenant)
+
+
+def get_tenant_by_domain(host: str) -> Optional[Tenant]:
+    """Active tenant mapped to this host via TenantDomain, or None."""
+    if not host:
+        return None
+    cached = _get("domain", host)
+    if cached is not _MISS:
+        return cached
+    tenant = _domain_tenant(TenantDomain.objects.filter(domain=host).select_related("tenant").first())
+    return _put("domain", host, tenant)
+
+
+async def aget_tenant_by_slug(slug: str) -> Optional[Tenant]:
+    """Async get_tenant_by_slug (cache hits never leave the event loop)."""
+    if not slug:
+        return None
+    cached = _get("slug", slug)
+    if cached is not _MISS:
+        return cached
+    tenant = await Tenant.objects.filter(slug=slug, active=True).afirst()
+    return _put("slug", slug, tenant)
+
+
+async def aget_tenant_by_domain(host: str) -> Optional[Tenant]:
+    """Async get_tenant_by_domain."""
+    if not host:
+        return None
+    cached = _get("domain", host)
+    if cached is not _MISS:
+        return cached
+    tenant = _domain_tenant(await TenantDomain.objects.filter(domain=host).select_related("tenant").afirst())
+    return _put("domain", host, tenant)
+
+
+def clear_tenant_cache() -> None:
+    with _lock:
+        _entries.clear()
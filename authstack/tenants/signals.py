@@ -0,0 +1,15 @@
+"""Signal handlers for the tenants app (connected in TenantsConfig.ready)."""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import clear_tenant_cache
+from .models import Tenant, TenantDomain
+
+
+@receiver(post_save, sender=Tenant, dispatch_uid="tenants_tenant_saved")
+@receiver(post_delete, sender=Tenant, dispatch_uid="tenants_tenant_deleted")
+@receiver(post_save, sender=TenantDomain, dispatch_uid="tenants_domain_saved")
+@receiver(post_delete, sender=TenantDomain, dispatch_uid="tenants_domain_deleted")
+def drop_tenant_cache(sender, **kwargs):
+    # Slug renames and domain moves affect several keys; the map is tiny
+    clear_tenant_cache()
@@ -0,0 +1,31 @@
+from django.test import TestCase
+
+from .cache import clear_tenant_cache, get_tenant_by_domain, get_tenant_by_slug
+from .models import Tenant, TenantDomain
+
+
+class TenantCacheTests(TestCase):
+    def setUp(self):
+        clear_tenant_cache()
+        self.tenant = Tenant.objects.create(slug="ontime", name="Ontime")
+
+    def test_slug_lookup_cached(self):
+        self.assertEqual(get_tenant_by_slug("ontime"), self.tenant)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_tenant_by_slug("ontime"), self.tenant)
+
+    def test_unknown_slug_negatively_cached(self):
+        self.assertIsNone(get_tenant_by_slug("nope"))
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_tenant_by_slug("nope"))
+
+    def test_save_invalidates(self):
+        self.assertEqual(get_tenant_by_slug("ontime"), self.tenant)
+        self.tenant.active = False
+        self.tenant.save()
+        self.assertIsNone(get_tenant_by_slug("ontime"))
+
+    def test_domain_mapping(self):
+        self.assertIsNone(get_tenant_by_domain("portal.example.com"))
+        TenantDomain.objects.create(tenant=self.tenant, domain="portal.example.com")
+        self.assertEqual(get_tenant_by_domain("portal.example.com"), self.tenant)
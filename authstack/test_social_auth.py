@@ -1,7 +1,9 @@
 import json
+from datetime import timedelta
 from django.test import TestCase
+from django.utils import timezone
 from django.contrib.auth import get_user_model
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from rest_framework import status
 from accounts.models import SocialAccount
 from tenants.models import Tenant, TenantDomain
@@ -316,12 +318,14 @@ class SocialAuthTestCase(TestCase):
         )
         
         # Create a session for the user (simulate social login)
-        from user_sessions.models import Session
-        session, refresh_token = Session.create_session(
+        from accounts.models import UserSession
+        UserSession.objects.create(
             user=user,
-            request=MagicMock(
-                META={'REMOTE_ADDR': '127.0.0.1', 'HTTP_USER_AGENT': 'test'}
-            )
+            device_id='social-device',
+            ip_address='127.0.0.1',
+            user_agent='test',
+            refresh_token_jti='social-jti',
+            expires_at=timezone.now() + timedelta(days=30)
         )
         
         # Generate access token
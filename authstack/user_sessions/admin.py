@@ -4,12 +4,21 @@ from .models import Session, Device
 
 @admin.register(Session)
 class SessionAdmin(admin.ModelAdmin):
-    """Admin for refresh token sessions"""
+    """Admin for refresh token sessions (read-only view over accounts.UserSession)"""
     list_display = ('user', 'device', 'rotation_counter', 'created_at')
     list_filter = ('created_at',)
     search_fields = ('user__username', 'user__email')
     readonly_fields = ('id', 'refresh_token_family', 'created_at')
 
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 @admin.register(Device)
 class DeviceAdmin(admin.ModelAdmin):
     """Admin for user devices"""
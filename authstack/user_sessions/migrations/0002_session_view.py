@@ -0,0 +1,148 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# Columns of user_sessions; the view and COPY_BACK must match the fields
+# of user_sessions.models.Session
+SESSION_COLUMNS = (
+    "id, user_id, device_id, refresh_token_hash, refresh_token_family, rotation_counter, "
+    "revoked_at, revoke_reason, ip_address, user_agent, created_at, last_used_at, expires_at"
+)
+
+CREATE_VIEW = """
+    CREATE VIEW user_sessions AS
+    SELECT
+        id,
+        user_id,
+        registered_device_id AS device_id,
+        refresh_token_hash,
+        refresh_token_family,
+        rotation_counter,
+        CASE WHEN is_active THEN NULL ELSE COALESCE(revoked_at, last_activity) END AS revoked_at,
+        CASE WHEN is_active THEN '' ELSE revoke_reason END AS revoke_reason,
+        ip_address,
+        user_agent,
+        created_at,
+        last_activity AS last_used_at,
+        expires_at
+    FROM accounts_usersession
+"""
+
+# Reverse of the view: put every session back into the recreated table
+COPY_BACK = f"""
+    INSERT INTO user_sessions ({SESSION_COLUMNS})
+    SELECT
+        id,
+        user_id,
+        registered_device_id,
+        refresh_token_hash,
+        refresh_token_family,
+        rotation_counter,
+        CASE WHEN is_active THEN NULL ELSE COALESCE(revoked_at, last_activity) END,
+        CASE WHEN is_active THEN '' ELSE SUBSTR(revoke_reason, 1, 50) END,
+        ip_address,
+        user_agent,
+        created_at,
+        last_activity,
+        expires_at
+    FROM accounts_usersession
+"""
+
+
+def merge_into_user_sessions(apps, schema_editor):
+    """Fold every user_sessions row into the accounts.UserSession sharing its id.
+
+    Login mirrored its sessions here under the same id, so most rows only
+    contribute the refresh-token audit fields, a revocation and a newer
+    activity stamp. Rows with no counterpart (device and OTP logins) become
+    UserSession rows of their own.
+    """
+    Session = apps.get_model('user_sessions', 'Session')
+    UserSession = apps.get_model('accounts', 'UserSession')
+
+    for row in Session.objects.select_related('device').iterator(chunk_size=BATCH_SIZE):
+        fields = {
+            'refresh_token_hash': row.refresh_token_hash,
+            'refresh_token_family': row.refresh_token_family,
+            'rotation_counter': row.rotation_counter,
+            'registered_device_id': row.device_id,
+        }
+        if not UserSession.objects.filter(id=row.id).update(**fields):
+            device = row.device
+            UserSession.objects.create(
+                id=row.id,
+                user_id=row.user_id,
+                device_id=(device.device_id if device else '') or str(row.id),
+                device_name=device.device_name if device else '',
+                device_type=device.device_type if device else '',
+                ip_address=row.ip_address,
+                user_agent=row.user_agent,
+                refresh_token_jti=f'legacy:{row.id}',
+                expires_at=row.expires_at,
+                is_active=row.revoked_at is None,
+                revoked_at=row.revoked_at,
+                revoke_reason=row.revoke_reason,
+                **fields,
+            )
+            # created_at / last_activity are auto fields; keep the original values
+            UserSession.objects.filter(id=row.id).update(created_at=row.created_at, last_activity=row.last_used_at)
+            continue
+        if row.revoked_at is not None:
+            UserSession.objects.filter(id=row.id, is_active=True).update(
+                is_active=False, revoked_at=row.revoked_at, revoke_reason=row.revoke_reason
+            )
+        UserSession.objects.filter(id=row.id, last_activity__lt=row.last_used_at).update(last_activity=row.last_used_at)
+
+
+def drop_session_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model('user_sessions', 'Session'))
+
+
+def create_session_table(apps, schema_editor):
+    # The 0001 model, with its three indexes and foreign keys
+    schema_editor.create_model(apps.get_model('user_sessions', 'Session'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_sessions', '0001_initial'),
+        ('accounts', '0008_usersession_refresh_token_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # Going back, the rows merged into accounts_usersession stay there;
+        # COPY_BACK restores user_sessions from them
+        migrations.RunPython(merge_into_user_sessions, reverse_code=migrations.RunPython.noop),
+        migrations.SeparateDatabaseAndState(
+            # Backwards these run bottom-up: drop the view, recreate the
+            # table, then copy the sessions into it
+            database_operations=[
+                migrations.RunSQL(migrations.RunSQL.noop, reverse_sql=COPY_BACK),
+                migrations.RunPython(drop_session_table, reverse_code=create_session_table),
+                migrations.RunSQL(CREATE_VIEW, reverse_sql='DROP VIEW user_sessions'),
+            ],
+            state_operations=[
+                migrations.RemoveIndex(model_name='session', name='user_sessio_user_id_35bce9_idx'),
+                migrations.RemoveIndex(model_name='session', name='user_sessio_refresh_90d2e5_idx'),
+                migrations.RemoveIndex(model_name='session', name='user_sessio_revoked_759f1e_idx'),
+                migrations.AlterField(
+                    model_name='session',
+                    name='user',
+                    field=models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='refresh_sessions', to=settings.AUTH_USER_MODEL),
+                ),
+                migrations.AlterField(
+                    model_name='session',
+                    name='device',
+                    field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.DO_NOTHING, to='user_sessions.device'),
+                ),
+                migrations.AlterModelOptions(
+                    name='session',
+                    options={'managed': False},
+                ),
+            ],
+        ),
+    ]
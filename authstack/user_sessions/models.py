@@ -1,7 +1,4 @@
-import hashlib
-import secrets
 import uuid
-from datetime import timedelta
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils import timezone
@@ -10,10 +7,16 @@ User = get_user_model()
 
 
 class Session(models.Model):
-    """Tracks refresh tokens and sessions"""
+    """Read-only view of refresh sessions.
+
+    Rows live in accounts.UserSession; ``user_sessions`` is a database view
+    over that table kept for the admin and code that still reads this model.
+    Write through accounts.UserSession (see accounts.session_store).
+    """
     id = models.UUIDField(primary_key=True, default=uuid.uuid4)
-    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='refresh_sessions')
-    device = models.ForeignKey('Device', on_delete=models.SET_NULL, null=True, blank=True)
+    # The view has no constraints; deletes cascade on accounts.UserSession
+    user = models.ForeignKey(User, on_delete=models.DO_NOTHING, related_name='refresh_sessions')
+    device = models.ForeignKey('Device', on_delete=models.DO_NOTHING, null=True, blank=True)
     
     # Token management
     refresh_token_hash = models.CharField(max_length=128)
@@ -32,49 +35,8 @@ class Session(models.Model):
     expires_at = models.DateTimeField()
     
     class Meta:
+        managed = False
         db_table = 'user_sessions'
-        indexes = [
-            models.Index(fields=['user', '-created_at']),
-            models.Index(fields=['refresh_token_family']),
-            models.Index(fields=['revoked_at']),
-        ]
-    
-    @classmethod
-    def create_session(cls, user, request, device=None):
-        """Create new session with refresh token"""
-        refresh_token = secrets.token_urlsafe(32)
-        refresh_token_hash = hashlib.sha256(refresh_token.encode()).hexdigest()
-        family = secrets.token_urlsafe(16)
-
-        # Prefer the original client IP from X-Forwarded-For when running
-        # behind a proxy/load balancer, falling back to REMOTE_ADDR.
-        meta = getattr(request, "META", {}) or {}
-        xff = meta.get("HTTP_X_FORWARDED_FOR", "")
-        if xff:
-            # Format is typically "client, proxy1, proxy2"; take the first.
-            ip = xff.split(",")[0].strip() or meta.get("REMOTE_ADDR")
-        else:
-            ip = meta.get("REMOTE_ADDR")
-
-        session = cls.objects.create(
-            user=user,
-            device=device,
-            refresh_token_hash=refresh_token_hash,
-            refresh_token_family=family,
-            ip_address=ip,
-            user_agent=request.META.get('HTTP_USER_AGENT', ''),
-            expires_at=timezone.now() + timedelta(days=30)
-        )
-        return session, refresh_token
-    
-    def rotate_token(self):
-        """Rotate refresh token (for security)"""
-        new_token = secrets.token_urlsafe(32)
-        self.refresh_token_hash = hashlib.sha256(new_token.encode()).hexdigest()
-        self.rotation_counter += 1
-        self.last_used_at = timezone.now()
-        self.save()
-        return new_token
     
     def is_valid(self):
         """Check if session is still valid"""
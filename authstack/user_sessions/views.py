@@ -5,8 +5,8 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.utils import timezone
 from django.db import transaction
+from accounts.models import UserSession
 from .models import Device
-from .models import Session
 
 logger = logging.getLogger(__name__)
 
@@ -67,15 +67,12 @@ class RegisterDeviceView(APIView):
                 device.save()
                 created = True
 
-            # Option B: bind the refresh Session to this Device if session_id was provided.
+            # Option B: bind the session to this Device if session_id was provided.
             if session_id:
                 try:
-                    sess = Session.objects.select_for_update().get(id=session_id, user=user)
-                    if sess.device_id != device.id:
-                        sess.device = device
-                        sess.save(update_fields=['device'])
-                except Session.DoesNotExist:
-                    pass
+                    UserSession.objects.filter(id=session_id, user=user).exclude(
+                        registered_device=device
+                    ).update(registered_device=device)
                 except Exception:
                     pass
 
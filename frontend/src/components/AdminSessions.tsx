@@ -26,6 +26,8 @@ const AdminSessions: React.FC = () => {
   const [page, setPage] = useState(0);
   const [pageSize, setPageSize] = useState(10);
   const [total, setTotal] = useState(0);
+  // Cursor for each page reached so far (the API pages by cursor, not number)
+  const [cursors, setCursors] = useState<(string | undefined)[]>([undefined]);
   const [ordering, setOrdering] = useState<string>('-last_activity');
   const [urlParams, setUrlParams] = useSearchParams();
 
@@ -33,12 +35,22 @@ const AdminSessions: React.FC = () => {
     setLoading(true);
     setError(null);
     try {
+      if (page > 0 && cursors[page] === undefined) {
+        setPage(0);
+        return;
+      }
+      // Only the first page asks for the total; later pages keep it
       const res = await api.get('/sessions/admin/list/', {
-        params: { search: debouncedSearch, page: page + 1, page_size: pageSize, ordering },
+        params: { search: debouncedSearch, cursor: cursors[page], page_size: pageSize, ordering, count: page === 0 ? 1 : undefined },
       });
       const list: AdminSessionRow[] = res.data?.results || [];
-      setTotal(res.data?.count ?? list.length);
+      if (page === 0) setTotal(res.data?.count ?? list.length);
       setRows(list);
+      setCursors(prev => {
+        const next = prev.slice(0, page + 1);
+        next[page + 1] = res.data?.next_cursor || undefined;
+        return next;
+      });
     } catch (e: any) {
       setError(e?.response?.data?.detail || e?.message || 'Failed to load sessions');
     } finally {
@@ -75,6 +87,9 @@ const AdminSessions: React.FC = () => {
     setUrlParams(p, { replace: true });
   }, [search, page, pageSize, ordering]);
 
+  // Cursors belong to one search/ordering/page size
+  useEffect(() => { setCursors([undefined]); setPage(0); }, [debouncedSearch, pageSize, ordering]);
+
   useEffect(() => { load(); }, [debouncedSearch, page, pageSize, ordering]);
 
   const fmt = (iso?: string) => {
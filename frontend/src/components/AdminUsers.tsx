@@ -28,6 +28,8 @@ const AdminUsers: React.FC = () => {
   const [page, setPage] = useState(0);
   const [pageSize, setPageSize] = useState(10);
   const [total, setTotal] = useState(0);
+  // Cursor for each page reached so far (the API pages by cursor, not number)
+  const [cursors, setCursors] = useState<(string | undefined)[]>([undefined]);
   const [selfId, setSelfId] = useState<number | null>(null);
   const [ordering, setOrdering] = useState<string>('');
   const [debouncedSearch, setDebouncedSearch] = useState('');
@@ -45,10 +47,20 @@ const AdminUsers: React.FC = () => {
     try {
       const resMe = await api.get('/me/');
       setSelfId(resMe?.data?.id ?? null);
-      const res = await api.get('/admin/users/', { params: { search: debouncedSearch, page: page + 1, page_size: pageSize, ordering } });
+      if (page > 0 && cursors[page] === undefined) {
+        setPage(0);
+        return;
+      }
+      // Only the first page asks for the total; later pages keep it
+      const res = await api.get('/admin/users/', { params: { search: debouncedSearch, cursor: cursors[page], page_size: pageSize, ordering, count: page === 0 ? 1 : undefined } });
       const list: AdminUser[] = res.data?.results || [];
-      setTotal(res.data?.count ?? list.length);
+      if (page === 0) setTotal(res.data?.count ?? list.length);
       setUsers(list);
+      setCursors(prev => {
+        const next = prev.slice(0, page + 1);
+        next[page + 1] = res.data?.next_cursor || undefined;
+        return next;
+      });
     } catch (e: any) {
       setError(e?.response?.data?.detail || e?.message || 'Failed to load users');
     } finally {
@@ -89,6 +101,9 @@ const AdminUsers: React.FC = () => {
     setUrlParams(newParams, { replace: true });
   }, [search, page, pageSize, ordering]);
 
+  // Cursors belong to one search/ordering/page size
+  useEffect(() => { setCursors([undefined]); setPage(0); }, [debouncedSearch, pageSize, ordering]);
+
   useEffect(() => { load(); }, [debouncedSearch, page, pageSize, ordering]);
 
   const startEdit = (u: AdminUser) => {